@@ -33,9 +33,10 @@ try:
     from . import sg13_tech
     from . import klayoutDRC
     from . import klayoutLVS
+    from . import verificationQueue
 
     __all__ = ['callbacks', 'layoutLayers', 'pcells', 'process', 'schLayers', 'symLayers',
-               'sg13_tech', 'klayoutDRC', 'klayoutLVS']
+               'sg13_tech', 'klayoutDRC', 'klayoutLVS', 'verificationQueue']
 except ImportError:
     # Fallback for when modules can't be imported
     __all__ = []
@@ -0,0 +1,250 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Per-rule runtime profile of SG13G2 DRC runs.
+
+The DRC decks print one ``PROFILE:`` line per rule output and one
+``PROFILE_STAGE:`` line around the layer setup and derivation blocks. This
+module turns that output into a profile sorted by cost, writes it as a JSON
+artefact and compares two profiles to spot deck performance regressions.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+PROFILE_RE = re.compile(
+    r"^PROFILE: (?P<name>\S+) (?P<seconds>[\d.]+) (?P<memory>\d+) (?P<count>\d+)\s*$"
+)
+STAGE_RE = re.compile(
+    r"^PROFILE_STAGE: (?P<name>\S+) (?P<seconds>[\d.]+) (?P<memory>\d+)\s*$"
+)
+
+
+def rule_group(rule_name):
+    """Return the rule group of a rule name, e.g. ``M1`` for ``M1.b``."""
+    return rule_name.split(".", 1)[0]
+
+
+def profile_line_seconds(line):
+    """Return ``(name, seconds)`` of a ``PROFILE:`` or ``PROFILE_STAGE:`` line, else None."""
+    if "PROFILE" not in line:
+        return None
+    match = PROFILE_RE.match(line.strip()) or STAGE_RE.match(line.strip())
+    if match is None:
+        return None
+    return match.group("name"), float(match.group("seconds"))
+
+
+def parse_profile(lines):
+    """
+    Parse DRC output lines into a profile.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        KLayout stdout lines of a DRC run.
+
+    Returns
+    -------
+    dict
+        ``{"rules": [...], "stages": [...]}`` in execution order. Rules
+        written more than once are merged.
+    """
+    rules = {}
+    stages = []
+    last_memory = 0
+    for raw_line in lines:
+        line = raw_line.strip()
+        match = PROFILE_RE.match(line)
+        if match:
+            memory = int(match.group("memory"))
+            entry = rules.setdefault(
+                match.group("name"),
+                {
+                    "rule": match.group("name"),
+                    "group": rule_group(match.group("name")),
+                    "seconds": 0.0,
+                    "count": 0,
+                    "memory_kb": 0,
+                    "memory_delta_kb": 0,
+                },
+            )
+            entry["seconds"] += float(match.group("seconds"))
+            entry["count"] += int(match.group("count"))
+            entry["memory_kb"] = max(entry["memory_kb"], memory)
+            entry["memory_delta_kb"] += memory - last_memory if last_memory else 0
+            last_memory = memory
+            continue
+        match = STAGE_RE.match(line)
+        if match:
+            memory = int(match.group("memory"))
+            stages.append(
+                {
+                    "stage": match.group("name"),
+                    "seconds": float(match.group("seconds")),
+                    "memory_kb": memory,
+                }
+            )
+            last_memory = memory
+    return {"rules": list(rules.values()), "stages": stages}
+
+
+def summarize_profile(profile):
+    """
+    Sort rules and rule groups by cost.
+
+    Parameters
+    ----------
+    profile : dict
+        Profile as returned by :func:`parse_profile`.
+
+    Returns
+    -------
+    dict
+        Profile with ``rules`` and ``groups`` sorted by descending wall time,
+        plus ``total_seconds`` and ``peak_memory_kb``.
+    """
+    groups = {}
+    for entry in profile["rules"]:
+        group = groups.setdefault(
+            entry["group"],
+            {"group": entry["group"], "seconds": 0.0, "count": 0, "rules": 0},
+        )
+        group["seconds"] += entry["seconds"]
+        group["count"] += entry["count"]
+        group["rules"] += 1
+
+    all_entries = profile["rules"] + profile["stages"]
+    return {
+        "rules": sorted(profile["rules"], key=lambda e: e["seconds"], reverse=True),
+        "groups": sorted(groups.values(), key=lambda e: e["seconds"], reverse=True),
+        "stages": profile["stages"],
+        "total_seconds": round(sum(e["seconds"] for e in all_entries), 3),
+        "peak_memory_kb": max((e["memory_kb"] for e in all_entries), default=0),
+    }
+
+
+def write_profile_json(summary, json_path, run_meta=None):
+    """Write a summarized profile (and optional run metadata) as JSON."""
+    data = dict(summary)
+    if run_meta:
+        data["run"] = run_meta
+    with open(json_path, "w") as f:
+        json.dump(data, f, indent=4)
+    return json_path
+
+
+def load_profile_json(json_path):
+    """Load a profile JSON artefact written by :func:`write_profile_json`."""
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+
+def format_profile_table(summary, limit=20):
+    """
+    Format the most expensive rules as an ASCII table.
+
+    Returns
+    -------
+    list of str
+        Table lines, ready to be logged or printed.
+    """
+    header = f"{'Rule':<24} {'Group':<12} {'Time (s)':>10} {'Share':>7} {'Mem (MB)':>10} {'Count':>9}"
+    border = "-" * len(header)
+    total = summary["total_seconds"] or 1.0
+    lines = [border, header, border]
+    for entry in summary["rules"][:limit]:
+        lines.append(
+            f"{entry['rule'][:24]:<24} {entry['group'][:12]:<12} "
+            f"{entry['seconds']:>10.3f} {100.0 * entry['seconds'] / total:>6.1f}% "
+            f"{entry['memory_kb'] / 1024.0:>10.1f} {entry['count']:>9}"
+        )
+    lines.append(border)
+    for stage in summary["stages"]:
+        lines.append(f"{'[' + stage['stage'] + ']':<37} {stage['seconds']:>10.3f}")
+    lines.append(
+        f"{'Total':<37} {summary['total_seconds']:>10.3f}"
+        f"  peak memory {summary['peak_memory_kb'] / 1024.0:.1f} MB"
+    )
+    lines.append(border)
+    return lines
+
+
+def compare_profiles(baseline, current, threshold=0.2, min_seconds=0.5):
+    """
+    Compare two profiles rule by rule.
+
+    Parameters
+    ----------
+    baseline, current : dict
+        Summarized profiles.
+    threshold : float
+        Relative slowdown above which a rule is reported.
+    min_seconds : float
+        Rules faster than this in both runs are ignored as noise.
+
+    Returns
+    -------
+    list of dict
+        Regressed rules sorted by absolute slowdown.
+    """
+    base_rules = {entry["rule"]: entry for entry in baseline.get("rules", [])}
+    regressions = []
+    for entry in current.get("rules", []):
+        base = base_rules.get(entry["rule"])
+        if base is None:
+            continue
+        if max(base["seconds"], entry["seconds"]) < min_seconds:
+            continue
+        slowdown = entry["seconds"] - base["seconds"]
+        if base["seconds"] > 0 and slowdown / base["seconds"] > threshold:
+            regressions.append(
+                {
+                    "rule": entry["rule"],
+                    "baseline_seconds": base["seconds"],
+                    "seconds": entry["seconds"],
+                    "slowdown": round(slowdown, 3),
+                }
+            )
+    return sorted(regressions, key=lambda e: e["slowdown"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build a per-rule profile from SG13G2 DRC output."
+    )
+    parser.add_argument("log", help="KLayout DRC stdout/log file.")
+    parser.add_argument("--json", default=None, help="Write the profile JSON here.")
+    parser.add_argument("--limit", type=int, default=20, help="Rules to show. [default: 20]")
+    parser.add_argument(
+        "--compare_to", default=None, help="Baseline profile JSON to compare against."
+    )
+    args = parser.parse_args()
+
+    with open(args.log, "r", errors="replace") as log_file:
+        profile_summary = summarize_profile(parse_profile(log_file))
+    if not profile_summary["rules"]:
+        print(f"No PROFILE lines found in {args.log}.", file=sys.stderr)
+        sys.exit(1)
+    print("\n".join(format_profile_table(profile_summary, args.limit)))
+    if args.json:
+        write_profile_json(profile_summary, os.path.abspath(args.json))
+    if args.compare_to:
+        slower = compare_profiles(load_profile_json(args.compare_to), profile_summary)
+        for item in slower:
+            print(
+                f"SLOWER {item['rule']}: {item['baseline_seconds']:.3f}s -> "
+                f"{item['seconds']:.3f}s"
+            )
+        sys.exit(1 if slower else 0)
@@ -0,0 +1,522 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Incremental reader for KLayout report databases (.lyrdb).
+
+The reader parses the XML in chunks with a pull parser so that very large
+DRC reports never have to be materialised as a whole.  Only compact
+per-category tables (marker count, cell index, bounding box and file offset
+per marker) are kept in memory; marker geometry is decoded on demand for one
+category at a time, reading only the items of that category.  The reader can follow a report file that KLayout is still writing:
+every call to :meth:`LyrdbStreamReader.poll` continues from the last file
+offset and simply returns 0 when no new data is available yet.
+"""
+
+from array import array
+from collections import OrderedDict
+import re
+import xml.etree.ElementTree as ET
+
+_NUM_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TEXT_POS_RE = re.compile(r",\s*[rm]\d+\s+([-+\d.eE]+)\s*,\s*([-+\d.eE]+)\s*\)\s*$")
+
+GEOMETRY_KINDS = ("polygon", "box", "edge", "edge-pair", "path", "text")
+_ITEM_TAG = b"<item>"
+_ITEM_END_TAG = b"</item>"
+
+
+def split_category_path(path):
+    """Split a KLayout category path (``'M1.a'`` or ``A.'b.c'``) into names."""
+    parts = []
+    current = []
+    quote = None
+    for char in path.strip():
+        if quote:
+            if char == quote:
+                quote = None
+            else:
+                current.append(char)
+        elif char in ("'", '"'):
+            quote = char
+        elif char == ".":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part]
+
+
+def _value_kind(value_text):
+    kind, sep, _ = value_text.partition(":")
+    return kind.strip() if sep else ""
+
+
+def value_bbox(value_text):
+    """Return the (left, bottom, right, top) box of a marker value in microns.
+
+    Only the numbers are scanned, no geometry objects are built.  Values that
+    carry no geometry (floats, strings, images) return None.
+    """
+    kind = _value_kind(value_text)
+    if kind not in GEOMETRY_KINDS:
+        return None
+    body = value_text.partition(":")[2]
+    if kind == "text":
+        match = _TEXT_POS_RE.search(body)
+        if not match:
+            return None
+        x, y = float(match.group(1)), float(match.group(2))
+        return (x, y, x, y)
+    if kind == "path":
+        body = body.split(")", 1)[0]
+    numbers = _NUM_RE.findall(body)
+    if len(numbers) < 2:
+        return None
+    xs = [float(n) for n in numbers[0::2]]
+    ys = [float(n) for n in numbers[1::2]]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _parse_points(text):
+    numbers = [float(n) for n in _NUM_RE.findall(text)]
+    return list(zip(numbers[0::2], numbers[1::2]))
+
+
+def parse_value_geometry(value_text):
+    """Decode a marker value into ``(kind, [point lists])`` in microns.
+
+    Boxes are returned as closed four-point outlines, edges as two-point
+    lists and edge pairs as the quadrilateral spanned by both edges so that
+    every marker can be drawn as a polygon.
+    """
+    kind = _value_kind(value_text)
+    body = value_text.partition(":")[2].strip()
+    if kind == "polygon":
+        # Holes follow the hull after a '/' separator.
+        return kind, [_parse_points(contour) for contour in body.strip("()").split("/")]
+    if kind == "box":
+        points = _parse_points(body)
+        if len(points) < 2:
+            return kind, []
+        (x1, y1), (x2, y2) = points[0], points[1]
+        return kind, [[(x1, y1), (x2, y1), (x2, y2), (x1, y2)]]
+    if kind == "edge":
+        return kind, [_parse_points(body)]
+    if kind == "edge-pair":
+        points = _parse_points(body)
+        if len(points) < 4:
+            return kind, [points]
+        return kind, [[points[0], points[1], points[3], points[2]]]
+    if kind == "path":
+        return kind, [_parse_points(body.split(")", 1)[0])]
+    if kind == "text":
+        bbox = value_bbox(value_text)
+        return kind, [[(bbox[0], bbox[1])]] if bbox else []
+    return kind, []
+
+
+class MarkerIndex:
+    """Uniform grid index over marker bounding boxes.
+
+    Markers are referenced by ``(category_index, item_index)``, packed into
+    one 64-bit integer and stored in array-backed buckets.  A marker is
+    registered in every grid bucket its box touches, which keeps queries for
+    small areas (the usual zoom-to-error case) independent of report size.
+    Markers that touch more than ``max_buckets`` buckets (density tiles,
+    global checks) are kept in one list that every query returns, so they
+    are found wherever they are queried.
+    """
+
+    def __init__(self, cell_size=50.0, max_buckets=64):
+        self.cell_size = float(cell_size)
+        self.max_buckets = max_buckets
+        self._buckets = {}
+        self._large = array("q")
+
+    def _bucket_range(self, left, bottom, right, top):
+        size = self.cell_size
+        return (
+            range(int(left // size), int(right // size) + 1),
+            range(int(bottom // size), int(top // size) + 1),
+        )
+
+    def insert(self, key, bbox):
+        packed = (key[0] << 32) | key[1]
+        xs, ys = self._bucket_range(*bbox)
+        if len(xs) * len(ys) > self.max_buckets:
+            self._large.append(packed)
+            return
+        buckets = self._buckets
+        for gx in xs:
+            for gy in ys:
+                bucket = buckets.get((gx, gy))
+                if bucket is None:
+                    bucket = buckets[(gx, gy)] = array("q")
+                bucket.append(packed)
+
+    def query(self, bbox):
+        """Return the set of marker keys whose bucket overlaps ``bbox``.
+
+        Large markers are always returned, callers test the exact boxes.
+        """
+        xs, ys = self._bucket_range(*bbox)
+        found = set(self._large)
+        if len(xs) * len(ys) > len(self._buckets):
+            # Queries larger than the occupied grid walk the buckets.
+            for (gx, gy), bucket in self._buckets.items():
+                if gx in xs and gy in ys:
+                    found.update(bucket)
+        else:
+            for gx in xs:
+                for gy in ys:
+                    found.update(self._buckets.get((gx, gy), ()))
+        return {(packed >> 32, packed & 0xFFFFFFFF) for packed in found}
+
+    def clear(self):
+        self._buckets.clear()
+        self._large = array("q")
+
+
+class LyrdbCategory:
+    """Compact per-category marker table."""
+
+    __slots__ = ("index", "name", "description", "cells", "boxes", "offsets", "count")
+
+    def __init__(self, index, name, description=""):
+        self.index = index
+        self.name = name
+        self.description = description
+        self.cells = array("i")
+        self.boxes = array("d")
+        # File offset of every <item> element, for geometry reads.
+        self.offsets = array("q")
+        self.count = 0
+
+    def bbox(self, item_index):
+        """Return the stored box of one marker, or None if it has no geometry."""
+        offset = item_index * 4
+        box = tuple(self.boxes[offset:offset + 4])
+        if box[0] > box[2]:
+            return None
+        return box
+
+
+class LyrdbStreamReader:
+    """Stream a .lyrdb report into category summaries and a marker index.
+
+    Usage::
+
+        reader = LyrdbStreamReader(path)
+        while not reader.complete:
+            reader.poll(max_items=5000)
+        for category in reader.categories():
+            print(category.name, category.count)
+    """
+
+    def __init__(self, filepath, chunk_size=1 << 20, index_cell_size=50.0,
+                 spatial_index=True):
+        self.filepath = str(filepath)
+        self.chunk_size = chunk_size
+        self.complete = False
+        self.top_cell = ""
+        self.description = ""
+        # Readers that only walk the marker tables skip the index.
+        self.index = MarkerIndex(index_cell_size) if spatial_index else None
+        self._categories = OrderedDict()
+        self._cell_names = []
+        self._cell_ids = {}
+        self._offset = 0
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._pending = []
+        self._stack = []
+        self._items_elem = None
+        # Offsets of the <item> start tags in the file, found by a byte
+        # scan that runs ahead of the XML parser.
+        self._item_offsets = array("q")
+        self._item_count = 0
+        self._scan_tail = b""
+        self._geometry_cache = OrderedDict()
+        self._geometry_cache_size = 4
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+    def poll(self, max_items=5000):
+        """Parse up to ``max_items`` new markers and return how many were read.
+
+        Returns 0 when the file has no new data yet (for example because
+        KLayout has not flushed it) or when the report is complete.
+        """
+        if self.complete:
+            return 0
+        read_items = self._drain(max_items)
+        while read_items < max_items and not self.complete:
+            if not self._feed_chunk():
+                break
+            read_items += self._drain(max_items - read_items)
+        return read_items
+
+    def read_all(self):
+        """Parse the remaining file content in one go."""
+        while not self.complete:
+            if not self.poll(1 << 30):
+                if not self._feed_chunk():
+                    break
+        return self
+
+    def _feed_chunk(self):
+        try:
+            with open(self.filepath, "rb") as report:
+                report.seek(self._offset)
+                data = report.read(self.chunk_size)
+        except OSError:
+            return False
+        if not data:
+            return False
+        self._scan_items(data)
+        self._offset += len(data)
+        self._parser.feed(data)
+        self._pending.extend(self._parser.read_events())
+        return True
+
+    def _scan_items(self, data):
+        # The tail of the previous chunk is shorter than the tag, so a tag
+        # split across two chunks is found exactly once.
+        tail = self._scan_tail
+        text = tail + data
+        base = self._offset - len(tail)
+        position = text.find(_ITEM_TAG)
+        while position >= 0:
+            self._item_offsets.append(base + position)
+            position = text.find(_ITEM_TAG, position + 1)
+        self._scan_tail = text[-(len(_ITEM_TAG) - 1):]
+
+    def _drain(self, max_items):
+        read_items = 0
+        pending = self._pending
+        position = 0
+        while position < len(pending) and read_items < max_items:
+            event, elem = pending[position]
+            position += 1
+            if event == "start":
+                self._stack.append(elem.tag)
+                if elem.tag == "items" and len(self._stack) == 2:
+                    self._items_elem = elem
+                continue
+            self._stack.pop()
+            if self._handle_end(elem):
+                read_items += 1
+        del pending[:position]
+        if read_items and self._items_elem is not None:
+            # Drop finished <item> children so memory stays flat.
+            self._items_elem.clear()
+        return read_items
+
+    def _handle_end(self, elem):
+        tag = elem.tag
+        depth = len(self._stack)
+        if tag == "item" and depth == 2:
+            self._add_item(elem)
+            return True
+        if tag == "category" and self._stack[-1:] == ["categories"]:
+            self._add_category_definition(elem)
+        elif tag == "top-cell" and depth == 1:
+            self.top_cell = (elem.text or "").strip()
+        elif tag == "description" and depth == 1:
+            self.description = (elem.text or "").strip()
+        elif tag == "cell" and depth == 2:
+            self._cell_id((elem.findtext("name") or "").strip())
+        elif tag == "report-database":
+            self.complete = True
+        return False
+
+    def _add_category_definition(self, elem, parent_path=""):
+        # Category definitions are nested: only top-level <categories> ends
+        # are processed here, sub-categories are walked recursively.
+        if len(self._stack) != 2:
+            return
+        self._register_category_tree(elem, parent_path)
+        elem.clear()
+
+    def _register_category_tree(self, elem, parent_path):
+        name = (elem.findtext("name") or "").strip().strip("'\"")
+        path = f"{parent_path}.{name}" if parent_path else name
+        self._category(path, (elem.findtext("description") or "").strip())
+        for child in elem.findall("categories/category"):
+            self._register_category_tree(child, path)
+
+    def _category(self, path, description=""):
+        category = self._categories.get(path)
+        if category is None:
+            category = LyrdbCategory(len(self._categories), path, description)
+            self._categories[path] = category
+        elif description and not category.description:
+            category.description = description
+        return category
+
+    def _cell_id(self, name):
+        cell_id = self._cell_ids.get(name)
+        if cell_id is None:
+            cell_id = len(self._cell_names)
+            self._cell_ids[name] = cell_id
+            self._cell_names.append(name)
+        return cell_id
+
+    def _add_item(self, elem):
+        path = ".".join(split_category_path(elem.findtext("category") or ""))
+        category = self._category(path)
+        item_index = category.count
+        category.count += 1
+        if self._item_count < len(self._item_offsets):
+            category.offsets.append(self._item_offsets[self._item_count])
+        self._item_count += 1
+        category.cells.append(self._cell_id((elem.findtext("cell") or "").strip()))
+        bbox = None
+        for value in elem.iterfind("values/value"):
+            bbox = value_bbox(value.text or "")
+            if bbox:
+                break
+        if bbox:
+            category.boxes.extend(bbox)
+            if self.index is not None:
+                self.index.insert((category.index, item_index), bbox)
+        else:
+            category.boxes.extend((1.0, 1.0, 0.0, 0.0))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def categories(self):
+        """Return all categories seen so far, in report order."""
+        return list(self._categories.values())
+
+    def category(self, name):
+        return self._categories.get(name)
+
+    def category_by_index(self, index):
+        return self.categories()[index]
+
+    def cell_name(self, cell_id):
+        return self._cell_names[cell_id] if 0 <= cell_id < len(self._cell_names) else ""
+
+    @property
+    def marker_count(self):
+        return sum(category.count for category in self._categories.values())
+
+    def markers_in(self, bbox):
+        """Return ``(category, item_index)`` pairs with boxes touching ``bbox``.
+
+        Needs the spatial index.
+        """
+        left, bottom, right, top = bbox
+        categories = self.categories()
+        result = []
+        for cat_index, item_index in self.index.query(bbox):
+            category = categories[cat_index]
+            box = category.bbox(item_index)
+            if box and box[0] <= right and box[2] >= left and box[1] <= top and box[3] >= bottom:
+                result.append((category, item_index))
+        return result
+
+    def load_category_geometry(self, name):
+        """Decode marker geometry of one category.
+
+        Only the <item> elements of the category are read, at the offsets
+        found while streaming.  Returns a list with one
+        ``(kind, [point lists])`` entry per marker, in report order.  The
+        last few categories are cached.
+        """
+        if name in self._geometry_cache:
+            self._geometry_cache.move_to_end(name)
+            return self._geometry_cache[name]
+        category = self._categories.get(name)
+        if category is not None and category.count and len(category.offsets) == category.count:
+            markers = self._read_item_geometry(category.offsets)
+        else:
+            markers = self._scan_category_geometry(name)
+        self._geometry_cache[name] = markers
+        while len(self._geometry_cache) > self._geometry_cache_size:
+            self._geometry_cache.popitem(last=False)
+        return markers
+
+    def load_marker_geometry(self, name, index):
+        """Decode the geometry of one marker of a category.
+
+        Reads the single <item> at its offset, or takes it from the
+        category cache.  Returns ``(kind, [point lists])``, None if the
+        marker or its offset is not known.
+        """
+        cached = self._geometry_cache.get(name)
+        if cached is not None:
+            return cached[index] if 0 <= index < len(cached) else None
+        category = self._categories.get(name)
+        if category is None or not 0 <= index < len(category.offsets):
+            return None
+        return self._read_item_geometry([category.offsets[index]])[0]
+
+    def _read_item_geometry(self, offsets):
+        markers = []
+        buffer = b""
+        buffer_start = 0
+        with open(self.filepath, "rb") as report:
+            for offset in offsets:
+                # Offsets are ascending, neighbouring items share one read.
+                if not buffer_start <= offset < buffer_start + len(buffer):
+                    report.seek(offset)
+                    buffer = report.read(1 << 16)
+                    buffer_start = offset
+                start = offset - buffer_start
+                end = buffer.find(_ITEM_END_TAG, start)
+                while end < 0:
+                    report.seek(buffer_start + len(buffer))
+                    more = report.read(1 << 16)
+                    if not more:
+                        break
+                    buffer = buffer[start:] + more
+                    buffer_start = offset
+                    start = 0
+                    end = buffer.find(_ITEM_END_TAG)
+                geometry = ("", [])
+                if end >= 0:
+                    item = ET.fromstring(buffer[start:end + len(_ITEM_END_TAG)])
+                    for value in item.iterfind("values/value"):
+                        geometry = parse_value_geometry(value.text or "")
+                        if geometry[1]:
+                            break
+                markers.append(geometry)
+        return markers
+
+    def _scan_category_geometry(self, name):
+        # Fallback for reports whose item offsets are not known.
+        markers = []
+        depth = 0
+        items_elem = None
+        for event, elem in ET.iterparse(self.filepath, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if elem.tag == "items" and depth == 2:
+                    items_elem = elem
+                continue
+            depth -= 1
+            if elem.tag != "item" or depth != 2:
+                continue
+            path = ".".join(split_category_path(elem.findtext("category") or ""))
+            if path == name:
+                geometry = ("", [])
+                for value in elem.iterfind("values/value"):
+                    geometry = parse_value_geometry(value.text or "")
+                    if geometry[1]:
+                        break
+                markers.append(geometry)
+            if items_elem is not None:
+                items_elem.clear()
+        return markers
@@ -0,0 +1,383 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Black-boxing of DRC-certified pcell variants.
+
+Pcell cells in an exported layout are recognised by their cell name (the
+``sg13g2_pr`` library cell names with a ``pcell.json`` view and the pcell
+names they reference, optionally followed by a parameter suffix) or by a
+``pcell`` cell property. Every distinct cell geometry is one variant. A
+variant is certified once by checking it in isolation; the outcome is kept
+in a JSON certification cache keyed by the rule deck and the variant
+geometry.
+
+For the actual run, certified cells are replaced by an abstract that only
+keeps their shapes in a ring of ``halo`` µm along the cell boundary, plus a
+core marker on ``CORE_LAYER``. The decks drop all markers that touch a core
+because they come from the clipped interior. Instances whose core is
+approached by shapes from outside the pcell are left untouched, so routing
+over a pcell is still checked against its full content.
+
+The halo has to be at least twice the largest spacing checked around pcell
+shapes. Density and latch-up results depend on the whole layout and are
+therefore run on the original layout. Black-boxing is meant for iteration
+runs; sign-off runs should check the full layout.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import klayout.db
+
+CORE_LAYER = (1000, 0)
+# Groups that cannot be evaluated on a layout with clipped pcell interiors.
+CONTEXT_GROUPS = ("density", "latchUp")
+CACHE_VERSION = 1
+CERTIFICATION_PITCH = 20.0
+
+
+def pcell_cell_names(pdk_root=None):
+    """
+    Collect the cell names that identify pcells.
+
+    Returns
+    -------
+    dict
+        Lower-case cell name to pcell reference name, for every library cell
+        with a pcell view and for the referenced pcells themselves.
+    """
+    if pdk_root is None:
+        pdk_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    library_path = os.path.join(pdk_root, "sg13g2_pr")
+    names = {}
+    if not os.path.isdir(library_path):
+        return names
+    for cell_name in sorted(os.listdir(library_path)):
+        pcell_json = os.path.join(library_path, cell_name, "pcell.json")
+        if not os.path.isfile(pcell_json):
+            continue
+        try:
+            with open(pcell_json, "r") as f:
+                items = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        reference = next(
+            (item["reference"] for item in items if "reference" in item), cell_name
+        )
+        names[cell_name.lower()] = reference
+        names.setdefault(reference.lower(), reference)
+    return names
+
+
+class PcellIdentifier:
+    """Map layout cells to the pcell they were generated from."""
+
+    SEPARATORS = "_$#."
+
+    def __init__(self, names=None, property_key="pcell"):
+        self.names = names if names is not None else pcell_cell_names()
+        self.property_key = property_key
+        # Longest names first so that nmosHV is not taken for nmos.
+        self._ordered = sorted(self.names, key=len, reverse=True)
+
+    def identify(self, cell):
+        """Return the pcell name of a cell, or None for ordinary cells."""
+        value = cell.property(self.property_key)
+        if value:
+            return str(value)
+        if cell.is_pcell_variant():
+            return cell.pcell_declaration().name()
+        name = cell.name.lower()
+        for candidate in self._ordered:
+            if name == candidate or (
+                name.startswith(candidate) and name[len(candidate)] in self.SEPARATORS
+            ):
+                return self.names[candidate]
+        return None
+
+
+def variant_key(layout, cell):
+    """
+    Hash the geometry of a cell including its children.
+
+    Two cells with the same key were generated with the same parameters, so
+    a certification of one applies to the other.
+    """
+    digest = hashlib.sha256()
+    for layer_index in sorted(
+        layout.layer_indexes(), key=lambda li: str(layout.get_info(li))
+    ):
+        region = klayout.db.Region(cell.begin_shapes_rec(layer_index))
+        if region.is_empty():
+            continue
+        region.merge()
+        digest.update(str(layout.get_info(layer_index)).encode())
+        for polygon in sorted(str(polygon) for polygon in region.each()):
+            digest.update(polygon.encode())
+    return digest.hexdigest()
+
+
+def deck_key(deck_path):
+    """Hash of the rule deck, certifications are only valid for one deck."""
+    with open(deck_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class CertificationCache:
+    """JSON store of pcell variant certifications."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}
+
+    @staticmethod
+    def _key(deck, variant):
+        return f"{deck}:{variant}"
+
+    def lookup(self, deck, variant, groups):
+        """
+        Return True/False for a valid certification, None if unknown.
+
+        A certification is valid if it covered all requested rule groups.
+        """
+        entry = self.entries.get(self._key(deck, variant))
+        if entry is None or not set(groups) <= set(entry["groups"]):
+            return None
+        return entry["clean"]
+
+    def store(self, deck, variant, pcell, cell_name, groups, markers):
+        self.entries[self._key(deck, variant)] = {
+            "pcell": pcell,
+            "cell": cell_name,
+            "groups": sorted(groups),
+            "clean": markers == 0,
+            "markers": markers,
+            "certified": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def find_pcell_variants(layout, identifier=None):
+    """
+    Find pcell cells and group them by variant.
+
+    Returns
+    -------
+    dict
+        Variant key to ``{"pcell": name, "cells": [cell indexes]}``.
+    """
+    identifier = identifier or PcellIdentifier()
+    variants = {}
+    for cell in layout.each_cell():
+        pcell = identifier.identify(cell)
+        if pcell is None or cell.bbox().empty():
+            continue
+        key = variant_key(layout, cell)
+        variant = variants.setdefault(key, {"pcell": pcell, "cells": []})
+        variant["cells"].append(cell.cell_index())
+    return variants
+
+
+def build_certification_layout(layout, variants, out_path, pitch=CERTIFICATION_PITCH):
+    """
+    Place one representative per variant on a grid in a new layout.
+
+    Returns
+    -------
+    dict
+        Variant key to its placement box in µm in the new layout.
+    """
+    target = klayout.db.Layout()
+    target.dbu = layout.dbu
+    top = target.create_cell("PCELL_CERTIFICATION")
+    keys = list(variants)
+    columns = max(1, int(len(keys) ** 0.5 + 0.999))
+    max_width = max(layout.cell(variants[k]["cells"][0]).dbbox().width() for k in keys)
+    max_height = max(layout.cell(variants[k]["cells"][0]).dbbox().height() for k in keys)
+    step_x = max_width + pitch
+    step_y = max_height + pitch
+    placements = {}
+    for index, key in enumerate(keys):
+        source = layout.cell(variants[key]["cells"][0])
+        copy = target.create_cell(f"variant_{index}")
+        copy.copy_tree(source)
+        box = source.dbbox()
+        x = (index % columns) * step_x
+        y = (index // columns) * step_y
+        trans = klayout.db.DTrans(x - box.left, y - box.bottom)
+        top.insert(klayout.db.DCellInstArray(copy.cell_index(), trans))
+        placements[key] = (x, y, x + box.width(), y + box.height())
+    target.write(out_path)
+    return placements
+
+
+def count_variant_markers(report_path, placements):
+    """
+    Count report markers that touch each variant placement box.
+
+    Every marker box is tested against every placement in one pass over
+    the report. A marker without a box cannot be attributed and counts
+    for every variant, so no variant is certified clean because of it.
+    """
+    try:
+        from .lyrdb_reader import LyrdbStreamReader
+    except ImportError:
+        from lyrdb_reader import LyrdbStreamReader
+    reader = LyrdbStreamReader(report_path, spatial_index=False).read_all()
+    boxes = list(placements.items())
+    counts = dict.fromkeys(placements, 0)
+    for category in reader.categories():
+        for item_index in range(category.count):
+            box = category.bbox(item_index)
+            if box is None:
+                for key in counts:
+                    counts[key] += 1
+                continue
+            left, bottom, right, top = box
+            for key, (x1, y1, x2, y2) in boxes:
+                if left <= x2 and right >= x1 and bottom <= y2 and top >= y1:
+                    counts[key] += 1
+    return counts
+
+
+def _core_box(cell, halo_dbu):
+    box = cell.bbox()
+    if box.width() <= 2 * halo_dbu or box.height() <= 2 * halo_dbu:
+        return None
+    return klayout.db.Box(box.left + halo_dbu, box.bottom + halo_dbu,
+                          box.right - halo_dbu, box.top - halo_dbu)
+
+
+def _abstract_cell(layout, cell, core, core_layer_index):
+    """Create the halo-ring abstract of a certified cell."""
+    abstract = layout.create_cell(f"{cell.name}$ABSTRACT")
+    ring = klayout.db.Region(cell.bbox()) - klayout.db.Region(core)
+    removed = 0
+    for layer_index in layout.layer_indexes():
+        if layer_index == core_layer_index:
+            continue
+        polygons = klayout.db.Region(cell.begin_shapes_rec(layer_index))
+        texts = klayout.db.Texts(cell.begin_shapes_rec(layer_index))
+        if not polygons.is_empty():
+            kept = polygons & ring
+            removed += max(0, polygons.count() - kept.count())
+            abstract.shapes(layer_index).insert(kept)
+        if not texts.is_empty():
+            # Labels drive device recognition and are cheap, keep them all.
+            abstract.shapes(layer_index).insert(texts)
+    abstract.shapes(core_layer_index).insert(core)
+    return abstract, removed
+
+
+def abstract_layout(layout, certified, halo=4.0, clearance=None,
+                    core_layer=CORE_LAYER):
+    """
+    Replace instances of certified pcell cells by their halo abstracts.
+
+    Parameters
+    ----------
+    layout : klayout.db.Layout
+        Layout to modify in place.
+    certified : dict
+        Cell index to pcell name for certified cells.
+    halo : float
+        Width of the kept boundary ring in µm.
+    clearance : float or None
+        Minimum distance in µm between foreign shapes and a core for an
+        instance to be abstracted. Defaults to half the halo.
+
+    Returns
+    -------
+    dict
+        Statistics: abstracted and kept instance counts, removed shapes.
+    """
+    stats = {"abstracted_instances": 0, "kept_instances": 0, "removed_shapes": 0}
+    if not certified:
+        return stats
+    top = layout.top_cell()
+    halo_dbu = int(round(halo / layout.dbu))
+    clearance_dbu = int(round((halo / 2.0 if clearance is None else clearance) / layout.dbu))
+    core_layer_index = layout.layer(*core_layer)
+
+    cores = {}
+    for cell_index in certified:
+        core = _core_box(layout.cell(cell_index), halo_dbu)
+        if core is not None:
+            cores[cell_index] = core
+    if not cores:
+        return stats
+
+    # Everything that does not belong to a certified pcell.
+    foreign = klayout.db.Region()
+    for layer_index in layout.layer_indexes():
+        if layer_index == core_layer_index:
+            continue
+        iterator = top.begin_shapes_rec(layer_index)
+        iterator.unselect_cells(list(cores))
+        foreign += klayout.db.Region(iterator)
+
+    # Flat core boxes per (parent cell, pcell cell) placement group.
+    placement_boxes = {}
+    instance_iterator = klayout.db.RecursiveInstanceIterator(layout, top)
+    instance_iterator.targets = list(cores)
+    while not instance_iterator.at_end():
+        key = (instance_iterator.cell_index(), instance_iterator.inst_cell().cell_index())
+        trans = instance_iterator.trans() * instance_iterator.inst_trans()
+        placement_boxes.setdefault(key, []).append(
+            cores[key[1]].transformed(trans).enlarged(clearance_dbu, clearance_dbu)
+        )
+        instance_iterator.next()
+
+    all_cores = klayout.db.Region()
+    all_cores.merged_semantics = False
+    box_keys = {}
+    for key, boxes in placement_boxes.items():
+        for box in boxes:
+            all_cores.insert(box)
+            box_keys.setdefault(str(box), set()).add(key)
+    blocked = set()
+    for polygon in all_cores.interacting(foreign).each():
+        blocked |= box_keys.get(str(polygon.bbox()), set())
+
+    abstracts = {}
+    for (parent_index, cell_index), boxes in placement_boxes.items():
+        if (parent_index, cell_index) in blocked:
+            stats["kept_instances"] += len(boxes)
+            continue
+        if cell_index not in abstracts:
+            abstracts[cell_index] = _abstract_cell(
+                layout, layout.cell(cell_index), cores[cell_index], core_layer_index
+            )
+        abstract, removed = abstracts[cell_index]
+        parent = layout.cell(parent_index)
+        for instance in list(parent.each_inst()):
+            if instance.cell_index == cell_index:
+                instance.cell_index = abstract.cell_index()
+        stats["abstracted_instances"] += len(boxes)
+        stats["removed_shapes"] += removed * len(boxes)
+    return stats
@@ -0,0 +1,125 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Named rule groups of the SG13G2 DRC decks.
+
+Every group is switched in the decks by a ``-rd <group>Rules=true|false``
+variable. ``-rd groups=<group>,<group>`` selects only the listed groups;
+groups that are not listed default to false. The density, filler, latch-up
+and off-grid groups keep the switch names the decks have always used.
+Derived layers that only unselected groups need are not computed.
+"""
+
+# group name: (description, rule name prefixes)
+RULE_GROUPS = {
+    "frontEnd": (
+        "Wells, Activ, GatPoly, implants, SalBlock and Cont",
+        ("NW", "PWB", "NBL", "NBLB", "Act", "TGO", "Gat", "pSD", "nSDB",
+         "EXTB", "Sal", "Cnt", "CntB"),
+    ),
+    "metal1": ("Metal1 and Via1", ("M1", "V1")),
+    "metal2": ("Metal2 and Via2", ("M2", "V2")),
+    "metal3": ("Metal3 and Via3", ("M3", "V3")),
+    "metal4": ("Metal4 and Via4", ("M4", "V4")),
+    "metal5": ("Metal5 and TopVia1", ("M5", "TV1")),
+    "topMetal1": ("TopMetal1 and TopVia2", ("TM1", "TV2")),
+    "topMetal2": ("TopMetal2 and Passiv", ("TM2", "Pas")),
+    "device": (
+        "Bipolar transistors, resistors, MIM, Schottky and isolated NMOS",
+        ("npnG2", "npn13G2", "npn13G2L", "npn13G2V", "Rsil", "Rppd", "Rhi",
+         "nmosi", "Sdiod", "MIM"),
+    ),
+    "pad": ("Pads", ("Pad", "Padc")),
+    "seal": ("Edge seal", ("Seal",)),
+    "slit": ("Metal slits", ("Slt",)),
+    "pin": ("Pin enclosures", ("Pin",)),
+    "misc": ("LBE and forbidden layers", ("LBE", "forbidden")),
+    "density": ("Global and windowed density", ()),
+    "filler": (
+        "Filler shapes",
+        ("AFil", "GFil", "M1Fil", "M2Fil", "M3Fil", "M4Fil", "M5Fil",
+         "TM1Fil", "TM2Fil"),
+    ),
+    "latchUp": ("Latch-up tie distances", ("LU",)),
+    "offGrid": ("Off-grid shapes", ("OffGrid",)),
+}
+
+# Groups whose rules are selected by their enclosing deck switch rather than
+# by rule name prefix.
+SWITCH_GROUPS = ("density", "filler", "latchUp", "offGrid")
+
+_PREFIX_GROUP = {
+    prefix: group
+    for group, (_, prefixes) in RULE_GROUPS.items()
+    for prefix in prefixes
+}
+
+
+def group_switch(group):
+    """Return the deck variable name of a rule group."""
+    return f"{group}Rules"
+
+
+def rule_group_name(rule_name):
+    """
+    Return the rule group of a rule by its name prefix.
+
+    Density rules share their prefix with the layer they check (for example
+    ``M1.j/k``), so a name alone maps them to the layer group; the deck
+    itself keeps them under the density switch.
+    """
+    return _PREFIX_GROUP.get(rule_name.split(".", 1)[0], "misc")
+
+
+def normalize_groups(groups):
+    """
+    Validate a group selection.
+
+    Parameters
+    ----------
+    groups : str or iterable of str or None
+        Comma separated string or list of group names. None selects all.
+
+    Returns
+    -------
+    list of str
+        Selected groups in deck order.
+
+    Raises
+    ------
+    ValueError
+        If an unknown group name is given.
+    """
+    if groups is None:
+        return list(RULE_GROUPS)
+    if isinstance(groups, str):
+        groups = [name.strip() for name in groups.replace(";", ",").split(",")]
+    selected = {name for name in groups if name}
+    unknown = selected - set(RULE_GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown DRC rule groups: {', '.join(sorted(unknown))}")
+    return [group for group in RULE_GROUPS if group in selected]
+
+
+def group_switches(groups=None):
+    """
+    Build the ``-rd`` switches for a group selection.
+
+    Returns
+    -------
+    dict
+        ``{"<group>Rules": "true"|"false"}`` for every known group.
+    """
+    selected = set(normalize_groups(groups))
+    return {
+        group_switch(group): "true" if group in selected else "false"
+        for group in RULE_GROUPS
+    }
@@ -0,0 +1,443 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Run IHP 130nm BiCMOS Open Source PDK - SG13G2 DRC in batch mode."""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from subprocess import Popen, PIPE, STDOUT
+
+try:
+    from .drc_profile import (parse_profile, summarize_profile, write_profile_json,
+                              format_profile_table, load_profile_json,
+                              compare_profiles)
+except ImportError:
+    from drc_profile import (parse_profile, summarize_profile, write_profile_json,
+                             format_profile_table, load_profile_json,
+                             compare_profiles)
+try:
+    from .rule_groups import RULE_GROUPS, group_switches, normalize_groups
+except ImportError:
+    from rule_groups import RULE_GROUPS, group_switches, normalize_groups
+try:
+    from ..verification.job_queue import stop_child_on_terminate
+    from ..verification.klayout_probe import KLayoutProbeError, check_version, probe_klayout
+    from ..verification.verification_daemon import DaemonClient
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from verification.job_queue import stop_child_on_terminate
+    from verification.klayout_probe import KLayoutProbeError, check_version, probe_klayout
+    from verification.verification_daemon import DaemonClient
+
+DRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def setup_logging(drc_run_dir, run_name):
+    """Configure console/file logging and return the main log path."""
+    log_format = "%(asctime)s | %(levelname)-7s | %(message)s"
+    log_datefmt = "%d-%b-%Y %H:%M:%S"
+    main_log_path = os.path.join(drc_run_dir, f"{run_name}.log")
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    root.handlers.clear()
+
+    file_handler = logging.FileHandler(main_log_path)
+    file_handler.setFormatter(logging.Formatter(fmt=log_format, datefmt=log_datefmt))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(fmt=log_format, datefmt=log_datefmt))
+    root.addHandler(file_handler)
+    root.addHandler(console_handler)
+    return main_log_path
+
+
+def resolve_deck(deck):
+    """
+    Resolve a deck name (``maximal``/``minimal``) or path to a .lydrc file.
+
+    Parameters
+    ----------
+    deck : str
+        Deck name or path.
+
+    Returns
+    -------
+    str
+        Absolute path of the rule deck.
+    """
+    if os.path.isfile(deck):
+        return os.path.abspath(deck)
+    name = deck if deck.startswith("sg13g2_") else f"sg13g2_{deck}"
+    deck_path = os.path.join(DRC_DIR, f"{name}.lydrc")
+    if not os.path.isfile(deck_path):
+        logging.error(f"DRC deck {deck} could not be found.")
+        exit(1)
+    return deck_path
+
+
+def generate_klayout_switches(args, layout_path, report_path):
+    """
+    Build the ``-rd`` switches of a DRC run.
+
+    Returns
+    -------
+    dict
+        Switch name to value, None values are skipped.
+    """
+    switches = {
+        "in_gds": os.path.abspath(layout_path),
+        "cell": args.topcell,
+        "report_file": report_path,
+        "threads": str(args.threads) if args.threads else None,
+        "profile": str(args.klayout_profile) if args.klayout_profile else None,
+        "verbose": "true" if args.verbose else None,
+    }
+    if args.groups:
+        try:
+            switches.update(group_switches(args.groups))
+        except ValueError as e:
+            logging.error(f"{e}. Known groups: {', '.join(RULE_GROUPS)}")
+            exit(1)
+    return switches
+
+
+def run_check(klayout, drc_file, run_dir, sws, log_name="klayout_drc.log", daemon=None):
+    """
+    Run KLayout on a DRC deck and capture its output.
+
+    Parameters
+    ----------
+    klayout : str
+        KLayout executable.
+    drc_file : str
+        Full path of the rule deck.
+    run_dir : str
+        Run directory, the KLayout output is stored there as well.
+    sws : dict
+        Deck switches.
+    log_name : str
+        File name of the KLayout output log in ``run_dir``.
+    daemon : DaemonClient or None
+        Run the deck in the verification daemon instead of a new process.
+
+    Returns
+    -------
+    tuple
+        ``(returncode, output_lines, klayout_log_path)``.
+    """
+    cmd = [klayout, "-b", "-r", drc_file]
+    for key, value in sws.items():
+        if value is not None:
+            cmd.extend(["-rd", f"{key}={value}"])
+    logging.info("Running: %s", " ".join(cmd))
+
+    klayout_log_path = os.path.join(run_dir, log_name)
+    output_lines = []
+    with open(klayout_log_path, "w") as klayout_log:
+
+        def echo(line):
+            output_lines.append(line)
+            klayout_log.write(line)
+            if not line.startswith("PROFILE"):
+                sys.stdout.write(line)
+                sys.stdout.flush()
+
+        if daemon is not None:
+            try:
+                result = daemon.run(drc_file, {k: v for k, v in sws.items() if v is not None},
+                                    output=echo)
+            except OSError as e:
+                result = {"ok": False, "error": str(e)}
+            if not result["ok"]:
+                echo(f"ERROR: {result.get('error', 'DRC deck failed')}\n")
+            return (0 if result["ok"] else 1), output_lines, klayout_log_path
+        proc = Popen(cmd, text=True, stdout=PIPE, stderr=STDOUT, bufsize=1)
+        stop_child_on_terminate(proc)
+        for line in proc.stdout:
+            echo(line)
+        proc.wait()
+    return proc.returncode, output_lines, klayout_log_path
+
+
+def certify_pcells(args, drc_file, drc_run_dir, layout, groups, daemon=None):
+    """
+    Certify uncertified pcell variants of a layout and abstract the clean ones.
+
+    Parameters
+    ----------
+    layout : klayout.db.Layout
+        Layout to black-box, modified in place.
+    groups : list of str
+        Rule groups the certification has to cover.
+    daemon : DaemonClient or None
+        Run the certification deck in the verification daemon.
+
+    Returns
+    -------
+    dict
+        Abstraction statistics, see ``abstract_layout``.
+    """
+    try:
+        from . import pcell_certification as certification
+    except ImportError:
+        import pcell_certification as certification
+
+    cache_path = args.pcell_cache or os.path.join(drc_run_dir, "pcell_certification.json")
+    cache = certification.CertificationCache(cache_path)
+    deck = certification.deck_key(drc_file)
+    variants = certification.find_pcell_variants(layout)
+    pending = {
+        key: variant for key, variant in variants.items()
+        if cache.lookup(deck, key, groups) is None
+    }
+    logging.info(
+        "Found %d pcell variants, %d need certification.", len(variants), len(pending)
+    )
+
+    if pending:
+        certification_dir = os.path.join(drc_run_dir, "pcell_certification")
+        os.makedirs(certification_dir, exist_ok=True)
+        layout_path = os.path.join(certification_dir, "pcell_variants.gds")
+        report_path = os.path.join(certification_dir, "pcell_variants.lyrdb")
+        placements = certification.build_certification_layout(layout, pending, layout_path)
+        switches = {
+            "in_gds": layout_path,
+            "cell": "PCELL_CERTIFICATION",
+            "report_file": report_path,
+            "threads": str(args.threads) if args.threads else None,
+        }
+        switches.update(group_switches(groups))
+        returncode, _, _ = run_check(
+            args.klayout, drc_file, certification_dir, switches, daemon=daemon
+        )
+        if returncode != 0 or not os.path.isfile(report_path):
+            logging.error("Pcell certification run failed, no pcell is black-boxed.")
+            return {"abstracted_instances": 0, "kept_instances": 0, "removed_shapes": 0}
+        markers = certification.count_variant_markers(report_path, placements)
+        for key, variant in pending.items():
+            cell_name = layout.cell(variant["cells"][0]).name
+            cache.store(deck, key, variant["pcell"], cell_name, groups, markers[key])
+            if markers[key]:
+                logging.warning(
+                    "Pcell variant %s (%s) has %d DRC markers and is checked in full.",
+                    cell_name, variant["pcell"], markers[key],
+                )
+        cache.save()
+        logging.info("Pcell certification cache written to %s", cache_path)
+
+    certified = {
+        cell_index: variant["pcell"]
+        for key, variant in variants.items()
+        if cache.lookup(deck, key, groups)
+        for cell_index in variant["cells"]
+    }
+    return certification.abstract_layout(
+        layout, certified, halo=args.pcell_halo, core_layer=certification.CORE_LAYER
+    )
+
+
+def run_pcell_blackbox(args, drc_file, drc_run_dir, layout_path, report_path, daemon=None):
+    """
+    Run the DRC with certified pcells black-boxed.
+
+    The main pass checks an abstracted copy of the layout without the
+    context groups; those are run on the original layout in a second pass
+    that writes ``<layout>_context.lyrdb``. With ``daemon`` all passes run
+    in the verification daemon.
+
+    Returns
+    -------
+    tuple
+        ``(returncode, output_lines, klayout_log_path)`` of the main pass.
+    """
+    try:
+        from .pcell_certification import CONTEXT_GROUPS, CORE_LAYER
+    except ImportError:
+        from pcell_certification import CONTEXT_GROUPS, CORE_LAYER
+    import klayout.db
+
+    selected = normalize_groups(args.groups)
+    groups = [group for group in selected if group not in CONTEXT_GROUPS]
+    context_groups = [group for group in selected if group in CONTEXT_GROUPS]
+
+    layout = klayout.db.Layout()
+    layout.read(layout_path)
+    if args.topcell:
+        for cell in layout.top_cells():
+            if cell.name != args.topcell:
+                layout.prune_cell(cell.cell_index(), -1)
+    stats = certify_pcells(args, drc_file, drc_run_dir, layout, groups, daemon=daemon)
+    logging.info(
+        "Black-boxed %d pcell instances (%d kept for foreign shapes over their core).",
+        stats["abstracted_instances"], stats["kept_instances"],
+    )
+    layout_base_name = os.path.splitext(os.path.basename(report_path))[0]
+    abstract_path = os.path.join(drc_run_dir, f"{layout_base_name}_pcell_abstract.gds")
+    layout.write(abstract_path)
+
+    switches = generate_klayout_switches(args, abstract_path, report_path)
+    switches.update(group_switches(groups))
+    switches["pcell_core_layer"] = "%d/%d" % CORE_LAYER
+    result = run_check(args.klayout, drc_file, drc_run_dir, switches, daemon=daemon)
+
+    if context_groups:
+        context_report = os.path.join(drc_run_dir, f"{layout_base_name}_context.lyrdb")
+        switches = generate_klayout_switches(args, layout_path, context_report)
+        switches.update(group_switches(context_groups))
+        context_code, _, _ = run_check(
+            args.klayout, drc_file, drc_run_dir, switches, "klayout_drc_context.log",
+            daemon=daemon,
+        )
+        if context_code != 0:
+            logging.error("KLayout context DRC run failed with exit code %s.", context_code)
+        logging.info("Results of %s written to %s", ", ".join(context_groups), context_report)
+    return result
+
+
+def main(drc_run_dir, args):
+    """
+    Run the DRC and write the per-rule profile artefact.
+
+    Returns
+    -------
+    int
+        Process exit code.
+    """
+    layout_path = os.path.abspath(os.path.expanduser(args.layout))
+    if not os.path.isfile(layout_path):
+        logging.error(f"The input layout {layout_path} doesn't exist, please recheck.")
+        exit(1)
+
+    drc_file = resolve_deck(args.deck)
+    daemon = None
+    if args.engine == "daemon":
+        daemon = DaemonClient()
+        if not daemon.available():
+            logging.warning("No verification daemon is running, using a one-shot KLayout process.")
+            daemon = None
+    if daemon is None:
+        try:
+            capabilities = probe_klayout(args.klayout)
+        except KLayoutProbeError as e:
+            logging.error(str(e))
+            return 1
+        version_problem = check_version(capabilities)
+        if version_problem:
+            logging.warning("%s The DRC decks have not been assessed with it.", version_problem)
+        else:
+            logging.info("Using %s (%s).", capabilities.version_text, capabilities.executable)
+    layout_base_name = os.path.basename(layout_path).split(".")[0]
+    report_path = os.path.join(drc_run_dir, f"{layout_base_name}.lyrdb")
+    switches = generate_klayout_switches(args, layout_path, report_path)
+
+    if args.pcell_blackbox:
+        returncode, output_lines, klayout_log_path = run_pcell_blackbox(
+            args, drc_file, drc_run_dir, layout_path, report_path, daemon=daemon
+        )
+    else:
+        returncode, output_lines, klayout_log_path = run_check(
+            args.klayout, drc_file, drc_run_dir, switches, daemon=daemon
+        )
+    if returncode != 0:
+        logging.error("KLayout DRC run failed with exit code %s.", returncode)
+
+    summary = summarize_profile(parse_profile(output_lines))
+    if summary["rules"]:
+        profile_path = os.path.join(drc_run_dir, f"{layout_base_name}_drc_profile.json")
+        write_profile_json(
+            summary,
+            profile_path,
+            {
+                "layout": layout_path,
+                "deck": drc_file,
+                "topcell": args.topcell,
+                "klayout_log": klayout_log_path,
+            },
+        )
+        for line in format_profile_table(summary, args.profile_rows):
+            logging.info(line)
+        logging.info("Rule profile written to %s", profile_path)
+        if args.compare_profile:
+            regressions = compare_profiles(load_profile_json(args.compare_profile), summary)
+            for item in regressions:
+                logging.warning(
+                    "Rule %s slowed down: %.3fs -> %.3fs",
+                    item["rule"], item["baseline_seconds"], item["seconds"],
+                )
+    else:
+        logging.warning("No rule profile lines found in the KLayout output.")
+
+    return returncode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run IHP SG13G2 DRC checks.")
+    parser.add_argument("--layout", type=str, required=True, help="Input GDS/OAS layout.")
+    parser.add_argument(
+        "--deck", type=str, default="maximal",
+        help="Rule deck: maximal, minimal or a .lydrc path. [default: maximal]",
+    )
+    parser.add_argument("--topcell", type=str, default=None, help="Top cell name to check.")
+    parser.add_argument("--run_dir", type=str, default=None, help="Run directory for outputs.")
+    parser.add_argument("--threads", type=int, default=None, help="KLayout DRC threads.")
+    parser.add_argument("--klayout", type=str, default="klayout", help="KLayout executable.")
+    parser.add_argument(
+        "--engine", type=str, choices=["process", "daemon"], default="process",
+        help="Run in a one-shot KLayout process or the verification daemon. [default: process]",
+    )
+    parser.add_argument(
+        "--klayout_profile", type=int, default=0,
+        help="Also print KLayout's own operation profile with this many lines.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every DRC operation.")
+    parser.add_argument(
+        "--groups", type=str, default=None,
+        help="Comma-separated rule groups to run, e.g. metal1,metal2. [default: all]",
+    )
+    parser.add_argument(
+        "--profile_rows", type=int, default=20,
+        help="Rules listed in the profile table. [default: 20]",
+    )
+    parser.add_argument(
+        "--compare_profile", type=str, default=None,
+        help="Baseline *_drc_profile.json to report rule slowdowns against.",
+    )
+    parser.add_argument(
+        "--pcell_blackbox", action="store_true",
+        help="Black-box DRC-certified pcell variants (iteration runs, not sign-off).",
+    )
+    parser.add_argument(
+        "--pcell_cache", type=str, default=None,
+        help="Pcell certification cache. [default: <run_dir>/pcell_certification.json]",
+    )
+    parser.add_argument(
+        "--pcell_halo", type=float, default=4.0,
+        help="Width in um of the pcell boundary ring that is still checked. [default: 4.0]",
+    )
+    args = parser.parse_args()
+
+    now_str = datetime.now(timezone.utc).strftime("drc_run_%Y_%m_%d_%H_%M_%S")
+    if args.run_dir in ["pwd", "", None]:
+        drc_run_dir = os.path.join(os.path.abspath(os.getcwd()), now_str)
+    else:
+        drc_run_dir = os.path.abspath(args.run_dir)
+    os.makedirs(drc_run_dir, exist_ok=True)
+    setup_logging(drc_run_dir, now_str)
+
+    t0 = time.time()
+    exit_code = main(drc_run_dir, args)
+    logging.info("Total DRC time (s): %s", round(time.time() - t0, 3))
+    if exit_code != 0:
+        raise SystemExit(exit_code)
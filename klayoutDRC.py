@@ -21,24 +21,29 @@
 #     License: Mozilla Public License 2.0
 #     Licensor: Revolution Semiconductor (Registered in the Netherlands)
 
+import importlib
 import json
 import logging
 import pathlib
+import sys
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, Signal, QPointF, QRectF
+from PySide6.QtGui import QPolygonF
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QGroupBox, QHBoxLayout,
                                QFileDialog, QComboBox, QLabel, QPlainTextEdit,
                                QDialogButtonBox, QPushButton, QFormLayout,
-                               QScrollArea, QSplitter, QWidget, QCheckBox)
+                               QScrollArea, QSplitter, QWidget, QCheckBox,
+                               QTreeWidget, QTreeWidgetItem, QHeaderView,
+                               QListWidget, QListWidgetItem, QProgressBar)
 from quantiphy import Quantity
 
 import revedaEditor.backend.editFunctions as edf
-import revedaEditor.gui.layoutDialogues as ldlg
 from revedaEditor.backend.pdkLoader import importPDKModule
 
 logger = logging.getLogger("reveda")
 
 process = importPDKModule('process')
+verificationQueue = importPDKModule('verificationQueue')
 
 
 def klayoutDRCClick(editorwindow):
@@ -66,44 +71,144 @@ def klayoutDRCClick(editorwindow):
         klayoutPath = dlg.klayoutPathEdit.text().strip()
         cellName = dlg.cellNameEdit.text().strip()
         drcRunSetName = dlg.DRCRunSetCB.currentText().strip()
-        drcRunLimit = dlg.DRCRunLimitEdit.text().strip()
         drcRunPath = dlg.DRCRunPathEdit.text().strip()
         gdsExport = 1 if dlg.gdsExportBox.isChecked() else 0
         gdsUnit = Quantity(dlg.unitEdit.text().strip()).real
         gdsPrecision = Quantity(dlg.precisionEdit.text().strip()).real
+        drcRuleGroups = dlg.selectedRuleGroups()
+        layoutFormat = dlg.layoutFormatCB.currentText()
+        pcellBlackBox = 1 if dlg.pcellBlackBoxBox.isChecked() else 0
+        useDaemon = 1 if dlg.useDaemonBox.isChecked() else 0
+        batchJob = 1 if dlg.batchJobBox.isChecked() else 0
         drcRunPathObj = pathlib.Path(drcRunPath)
         drcRunPathObj.mkdir(parents=True, exist_ok=True)
         settingsPathObj = drcRunPathObj / 'drcSettings.json'
         with settingsPathObj.open('w') as f:
             json.dump({'klayoutPath': klayoutPath, 'cellName': cellName,
-                        'drcRunSetName': drcRunSetName, 'drcRunLimit':
-                            drcRunLimit, 'drcRunPath': drcRunPath,
+                        'drcRunSetName': drcRunSetName,
+                        'drcRunPath': drcRunPath,
                         'gdsExport': gdsExport, 'gdsUnit': gdsUnit,
-                        'gdsPrecision': gdsPrecision}, f, indent=4)
-
-    def DRCProcessFinished(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue'):
+                        'gdsPrecision': gdsPrecision,
+                        'layoutFormat': layoutFormat,
+                        'drcRuleGroups': drcRuleGroups,
+                        'pcellBlackBox': pcellBlackBox,
+                        'useDaemon': useDaemon,
+                        'batchJob': batchJob}, f, indent=4)
+
+    def openReportDialogue(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue'):
+        if dlg.reportDialogue is not None:
+            return dlg.reportDialogue
+        lyrdbReader = importlib.import_module(f"{drc.__name__}.lyrdb_reader")
+        reader = lyrdbReader.LyrdbStreamReader(filePath.resolve())
+        reportDlg = drcReportDialogue(editorwindow, reader)
+        reportDlg.drcTable.polygonSelected.connect(editorwindow.handlePolygonSelection)
+        reportDlg.drcTable.zoomToRect.connect(editorwindow.centralW.scene.zoomToRect)
+        reportDlg.show()
+        dlg.reportDialogue = reportDlg
+        return reportDlg
+
+    def watchReportFile(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue'):
+        # Open the report as soon as KLayout starts writing it so that
+        # results stream in while the run is still going.
+        if filePath.exists() and filePath.stat().st_size > 0:
+            dlg.reportWatcher.stop()
+            openReportDialogue(filePath, dlg)
+
+    def writeDRCProfile(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue'):
+        drcProfile = importlib.import_module(f"{drc.__name__}.drc_profile")
+        summary = drcProfile.summarize_profile(
+            drcProfile.parse_profile("".join(dlg.drcOutputBuffer).splitlines()))
+        if not summary["rules"]:
+            return
+        profilePath = filePath.with_name(f"{filePath.stem}_drc_profile.json")
+        drcProfile.write_profile_json(summary, profilePath,
+                                      {"report": str(filePath),
+                                       "deck": dlg.DRCRunSetCB.currentText()})
+        dlg.console.appendPlainText(
+            "\n".join(drcProfile.format_profile_table(summary, 10)))
+        dlg.console.appendPlainText(f"Rule profile: {profilePath}")
+
+    def expectedDRCSeconds(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue'):
+        # Total rule time of the previous run of the same deck.
+        drcProfile = importlib.import_module(f"{drc.__name__}.drc_profile")
+        try:
+            profile = drcProfile.load_profile_json(
+                filePath.with_name(f"{filePath.stem}_drc_profile.json"))
+        except (OSError, ValueError):
+            return None
+        if profile.get("run", {}).get("deck") != dlg.DRCRunSetCB.currentText():
+            return None
+        return profile.get("total_seconds")
+
+    def DRCProcessFinished(filePath: pathlib.Path, dlg: 'drcKLayoutDialogue', job):
+        dlg.reportWatcher.stop()
+        if job.state == verificationQueue.jobQueue.CANCELLED:
+            dlg.console.appendPlainText("\n--- DRC cancelled ---")
+            return
+        if job.error:
+            dlg.console.appendPlainText(f"ERROR: {job.error}")
         dlg.console.appendPlainText(f"\n--- DRC Finished. Report: {filePath} ---")
-        errorsDlg = ldlg.drcErrorsDialogue(editorwindow, filePath.resolve())
-        errorsDlg.drcTable.polygonSelected.connect(editorwindow.handlePolygonSelection)
-        errorsDlg.drcTable.zoomToRect.connect(editorwindow.centralW.scene.zoomToRect)
-        errorsDlg.show()
+        try:
+            writeDRCProfile(filePath, dlg)
+        except OSError as e:
+            logger.error(f"Cannot write DRC profile: {e}")
+        if not filePath.exists():
+            dlg.console.appendPlainText("DRC report file was not written.")
+            return
+        openReportDialogue(filePath, dlg).setRunFinished()
 
     def runKlayoutDRC(dlg):
         klayoutPath = dlg.klayoutPathEdit.text().strip()
         cellName = dlg.cellNameEdit.text().strip()
         drcRunSetName = dlg.DRCRunSetCB.currentText().strip()
-        drcRunLimit = dlg.DRCRunLimitEdit.text().strip()
         drcRunPath = dlg.DRCRunPathEdit.text().strip()
         gdsExport = 1 if dlg.gdsExportBox.isChecked() else 0
         gdsUnit = Quantity(dlg.unitEdit.text().strip()).real
         gdsPrecision = Quantity(dlg.precisionEdit.text().strip()).real
+        layoutFormat = dlg.layoutFormatCB.currentText()
         drcRunPathObj = pathlib.Path(drcRunPath)
         drcRunPathObj.mkdir(parents=True, exist_ok=True)
+        layoutExport = importlib.import_module(
+            f"{verification.__name__}.layout_export")
         if gdsExport:
-            editorwindow.centralW.scene.exportCellGDS(drcRunPathObj, gdsUnit,
-                                                gdsPrecision, process.dbu)
-        if (drcRunPathObj / f'{cellName}.gds').exists():
-            gdsPath = drcRunPathObj.joinpath(f'{cellName}.gds')
+            try:
+                exportedPath = layoutExport.export_layout(
+                    editorwindow.centralW.scene, drcRunPathObj, cellName,
+                    gdsUnit, gdsPrecision, process.dbu)
+            except RuntimeError as e:
+                editorwindow.logger.error(e)
+                return
+
+        layoutScan = importlib.import_module(
+            f"{verification.__name__}.layout_scan")
+
+        def prepareLayout():
+            # Runs in a worker thread, the scene is not touched and nothing
+            # is logged; returns the layout, its hierarchy and the scan error.
+            if gdsExport:
+                gdsPath = layoutExport.convert_export(exportedPath, layoutFormat)
+            else:
+                gdsPath = layoutExport.layout_file_path(drcRunPathObj, cellName,
+                                                        layoutFormat)
+            if not gdsPath.exists():
+                raise FileNotFoundError(f'{layoutFormat} file can not be found')
+            # Only cell names and references are read, not the shapes.
+            try:
+                return gdsPath, layoutScan.scan_layout(gdsPath), None
+            except layoutScan.LayoutScanError as e:
+                return gdsPath, None, e
+
+        def startDRC(prepared):
+            gdsPath, layoutHierarchy, scanError = prepared
+            if scanError is not None:
+                editorwindow.logger.warning(f'Layout scan failed: {scanError}')
+            if layoutHierarchy and cellName not in layoutHierarchy.cells:
+                editorwindow.logger.error(f'{cellName} is not in {gdsPath}')
+                return
+            # The deck checks the top cell of the layout unless a cell is
+            # given.
+            selectCell = (layoutHierarchy is not None and
+                          layoutHierarchy.top_cells() != [cellName])
             drcPath = pathlib.Path(drc.__file__).parent.resolve()
             drcRuleFilePath = drcPath.joinpath(f'{drcRunSetName}.lydrc')
             drcReportFilePath = drcRunPathObj.joinpath(f'{cellName}.lyrdb')
@@ -113,35 +218,100 @@ def klayoutDRCClick(editorwindow):
                                 f'in_gds={gdsPath}',
                                 '-rd',
                                 f'report_file={drcReportFilePath}']
-            editorwindow.processManager.maxProcesses = int(drcRunLimit)
-            dlg.console.appendPlainText("--- DRC Started ---")
-            drcProcess = editorwindow.processManager.add_process(klayoutPath,
-                                                            argumentsList)
-            # Redirect process output to dialog console instead of main logger
+            if selectCell:
+                argumentsList.extend(['-rd', f'cell={cellName}'])
+            selectedGroups = dlg.selectedRuleGroups()
+            executable = klayoutPath
+            if dlg.pcellBlackBoxBox.isChecked():
+                # Pcell certification and abstraction run in the batch
+                # runner, which needs the klayout Python module.
+                executable = sys.executable
+                argumentsList = [str(drcPath.joinpath('run_drc.py')),
+                                 '--layout', str(gdsPath),
+                                 '--deck', str(drcRuleFilePath),
+                                 '--run_dir', str(drcRunPathObj),
+                                 '--klayout', klayoutPath or 'klayout',
+                                 '--groups', ','.join(selectedGroups),
+                                 '--pcell_blackbox']
+                if selectCell:
+                    argumentsList.extend(['--topcell', cellName])
+                if dlg.useDaemonBox.isChecked():
+                    argumentsList.extend(['--engine', 'daemon'])
+                dlg.console.appendPlainText(
+                    "Certified pcells are black-boxed, use a full run for sign-off.")
+            elif len(selectedGroups) < dlg.ruleGroupList.count():
+                # Unselected groups are switched off explicitly, the deck
+                # then also skips the layers only they need.
+                for switch, value in ruleGroups.group_switches(selectedGroups).items():
+                    argumentsList.extend(['-rd', f'{switch}={value}'])
+                dlg.console.appendPlainText(
+                    f"Rule groups: {', '.join(selectedGroups) or 'none'}")
+            if dlg.useDaemonBox.isChecked() and executable == klayoutPath:
+                # The daemon client falls back to klayoutPath if no daemon
+                # runs.
+                verificationDaemon = importlib.import_module(
+                    f"{verification.__name__}.verification_daemon")
+                argumentsList = verificationDaemon.client_arguments(
+                    klayoutPath, argumentsList)
+                executable = sys.executable
+            # A report left over from a previous run would be picked up by
+            # the report watcher before KLayout overwrites it.
+            drcReportFilePath.unlink(missing_ok=True)
+            dlg.reportDialogue = None
+            dlg.drcOutputBuffer = []
             try:
-                drcProcess.process.readyReadStandardOutput.disconnect()
+                dlg.reportWatcher.timeout.disconnect()
             except RuntimeError:
                 pass
-            drcProcess.process.readyReadStandardOutput.connect(
-                lambda: dlg.appendDRCOutput(drcProcess.process))
-            drcProcess.process.readyReadStandardError.connect(
-                lambda: dlg.appendDRCError(drcProcess.process))
-            drcProcess.process.finished.connect(
-                lambda: DRCProcessFinished(drcReportFilePath, dlg))
-        else:
-            editorwindow.logger.error('GDS file can not be found')
+            dlg.reportWatcher.timeout.connect(
+                lambda: watchReportFile(drcReportFilePath, dlg))
+            dlg.reportWatcher.start()
+            jobs = verificationQueue.sharedJobQueue()
+            progress = None
+            if not dlg.pcellBlackBoxBox.isChecked():
+                # The batch runner does not pass the profile lines on.
+                drcProfile = importlib.import_module(f"{drc.__name__}.drc_profile")
+                progress = verificationQueue.jobQueue.ProfileProgress(
+                    expectedDRCSeconds(drcReportFilePath, dlg),
+                    drcProfile.profile_line_seconds)
+            priority = (verificationQueue.jobQueue.BATCH
+                        if dlg.batchJobBox.isChecked()
+                        else verificationQueue.jobQueue.INTERACTIVE)
+            drcJob = jobs.submitProcess(
+                'drc', cellName, executable, argumentsList, priority, progress,
+                dlg, dlg.appendDRCOutput, dlg.appendDRCError,
+                lambda job: DRCProcessFinished(drcReportFilePath, dlg, job))
+            if drcJob.state == verificationQueue.jobQueue.QUEUED:
+                dlg.console.appendPlainText(
+                    f"--- DRC Queued ({priority}), "
+                    f"{jobs.queue.position(drcJob)} jobs ahead ---")
+            elif drcJob.state == verificationQueue.jobQueue.RUNNING:
+                dlg.console.appendPlainText("--- DRC Started ---")
+
+        verificationQueue.runTask(prepareLayout, startDRC,
+                                  editorwindow.logger.error, dlg)
 
     dlg = drcKLayoutDialogue(editorwindow)
     drc = importPDKModule("drc")
     if drc is None:
         editorwindow.logger.error('PDK does not have DRC module.')
         return
+    verification = importPDKModule("verification")
+    if verification is None:
+        editorwindow.logger.error('PDK does not have verification module.')
+        return
     drcPath = pathlib.Path(drc.__file__).parent.resolve()
     rulesFiles = [pathItem.stem for pathItem in list(drcPath.glob("*.lydrc"))]
     dlg.DRCRunSetCB.addItems(rulesFiles)
+    ruleGroups = importlib.import_module(f"{drc.__name__}.rule_groups")
+    dlg.setRuleGroups({group: description for group, (description, _) in
+                       ruleGroups.RULE_GROUPS.items()})
     dlg.saveButton.clicked.connect(lambda: saveRunSet(dlg))
     dlg.loadButton.clicked.connect(lambda: loadRunSet(dlg))
     dlg.runButton.clicked.connect(lambda: runKlayoutDRC(dlg))
+    dlg.cancelButton.clicked.connect(
+        lambda: verificationQueue.sharedJobQueue().cancelOwner(dlg, 'drc'))
+    verificationQueue.connectJobStatus(dlg, dlg.setJobStatus)
     settingsPathObj = (editorwindow.gdsExportDirObj / 'drcSettings.json')
     if settingsPathObj.exists():
         try:
@@ -150,24 +320,32 @@ def klayoutDRCClick(editorwindow):
                 dlg.klayoutPathEdit.setText(settings['klayoutPath'])
                 dlg.cellNameEdit.setText(settings['cellName'])
                 dlg.DRCRunSetCB.setCurrentText(settings['drcRunSetName'])
-                dlg.DRCRunLimitEdit.setText(settings['drcRunLimit'])
                 dlg.DRCRunPathEdit.setText(settings['drcRunPath'])
                 dlg.gdsExportBox.setChecked(bool(settings['gdsExport']))
                 dlg.unitEdit.setText(str(settings['gdsUnit']))
                 dlg.precisionEdit.setText(str(settings['gdsPrecision']))
+                dlg.layoutFormatCB.setCurrentText(
+                    settings.get('layoutFormat', 'GDS'))
+                if 'drcRuleGroups' in settings:
+                    dlg.setSelectedRuleGroups(settings['drcRuleGroups'])
+                dlg.pcellBlackBoxBox.setChecked(
+                    bool(settings.get('pcellBlackBox', 0)))
+                dlg.useDaemonBox.setChecked(
+                    bool(settings.get('useDaemon', 0)))
+                if 'batchJob' in settings:
+                    dlg.batchJobBox.setChecked(bool(settings['batchJob']))
         except Exception as e:
             editorwindow.logger.error(e)
     else:
         dlg.gdsExportBox.setChecked(False)
         dlg.cellNameEdit.setText(editorwindow.cellName)
         dlg.DRCRunSetCB.setCurrentIndex(0)
-        dlg.DRCRunLimitEdit.setText('2')
         dlg.DRCRunPathEdit.setText(str(editorwindow.gdsExportDirObj))
         if hasattr(process, "gdsUnit"):
             dlg.unitEdit.setText(process.gdsUnit.render())
         if hasattr(process, "gdsPrecision"):
             dlg.precisionEdit.setText(process.gdsPrecision.render())
-
+    verificationQueue.connectRunLimit(dlg.DRCRunLimitEdit, 'drc')
     dlg.show()
 
 
@@ -221,6 +399,22 @@ class drcKLayoutDialogue(QDialog):
         self.drcRunPathButton.clicked.connect(self.onDRCRunPathButtonClicked)
         drcRunPathLayout.addWidget(self.drcRunPathButton, 1)
         filePathsLayout.addLayout(drcRunPathLayout)
+        daemonLayout = QHBoxLayout()
+        daemonLayout.addWidget(edf.boldLabel("Use Verification Daemon:"), 2)
+        self.useDaemonBox = QCheckBox()
+        self.useDaemonBox.setToolTip(
+            "Run in the warm KLayout workers of verification_daemon.py if it "
+            "is running, otherwise start KLayout as usual.")
+        daemonLayout.addWidget(self.useDaemonBox, 5)
+        filePathsLayout.addLayout(daemonLayout)
+        batchJobLayout = QHBoxLayout()
+        batchJobLayout.addWidget(edf.boldLabel("Run as Batch Job:"), 2)
+        self.batchJobBox = QCheckBox()
+        self.batchJobBox.setToolTip(
+            "Batch jobs are started after the interactive DRC and LVS runs of "
+            "all editors and leave a slot free for them.")
+        batchJobLayout.addWidget(self.batchJobBox, 5)
+        filePathsLayout.addLayout(batchJobLayout)
         filePathsGroup.setLayout(filePathsLayout)
         mainLayout.addWidget(filePathsGroup)
 
@@ -238,13 +432,56 @@ class drcKLayoutDialogue(QDialog):
         self.precisionEdit.setToolTip("The precision of the GDS file.")
         self.exportGDSLayout.addRow(edf.boldLabel("Precision:"),
                                     self.precisionEdit)
+        self.layoutFormatCB = QComboBox()
+        self.layoutFormatCB.addItems(["GDS", "OASIS"])
+        self.layoutFormatCB.setToolTip(
+            "OASIS is written with CBLOCK compression in strict mode, it is "
+            "smaller and faster to read for large layouts.")
+        self.exportGDSLayout.addRow(edf.boldLabel("Layout Format:"),
+                                    self.layoutFormatCB)
         self.exportGDSLayout.setRowVisible(1, False)
         self.exportGDSLayout.setRowVisible(2, False)
         exportGroupBox.setLayout(self.exportGDSLayout)
         mainLayout.addWidget(exportGroupBox)
+
+        ruleGroupBox = QGroupBox("Rule Groups")
+        ruleGroupLayout = QVBoxLayout()
+        self.ruleGroupList = QListWidget()
+        self.ruleGroupList.setToolTip(
+            "Only checked rule groups are run. Derived layers needed by "
+            "unchecked groups only are not computed.")
+        ruleGroupLayout.addWidget(self.ruleGroupList)
+        ruleGroupButtonsLayout = QHBoxLayout()
+        allGroupsButton = QPushButton("All")
+        allGroupsButton.clicked.connect(
+            lambda: self.setSelectedRuleGroups(self.ruleGroupNames()))
+        noGroupsButton = QPushButton("None")
+        noGroupsButton.clicked.connect(lambda: self.setSelectedRuleGroups([]))
+        ruleGroupButtonsLayout.addWidget(allGroupsButton)
+        ruleGroupButtonsLayout.addWidget(noGroupsButton)
+        ruleGroupButtonsLayout.addStretch()
+        ruleGroupLayout.addLayout(ruleGroupButtonsLayout)
+        self.pcellBlackBoxBox = QCheckBox("Black-box certified pcells")
+        self.pcellBlackBoxBox.setToolTip(
+            "Check pcell interiors once per parameter set and afterwards only "
+            "their boundaries. Faster iteration runs, not for sign-off.")
+        ruleGroupLayout.addWidget(self.pcellBlackBoxBox)
+        ruleGroupBox.setLayout(ruleGroupLayout)
+        mainLayout.addWidget(ruleGroupBox)
         mainLayout.addSpacing(20)
 
+        jobStatusLayout = QHBoxLayout()
+        self.jobStatusLabel = QLabel("No DRC job.")
+        jobStatusLayout.addWidget(self.jobStatusLabel, 3)
+        self.jobProgressBar = QProgressBar()
+        self.jobProgressBar.setRange(0, 100)
+        self.jobProgressBar.setValue(0)
+        jobStatusLayout.addWidget(self.jobProgressBar, 2)
+        mainLayout.addLayout(jobStatusLayout)
+
         self.runButton = QPushButton("Run DRC")
+        self.cancelButton = QPushButton("Cancel Run")
+        self.cancelButton.setEnabled(False)
         self.saveButton = QPushButton("Save DRC Config")
         self.loadButton = QPushButton("Load DRC Config")
         self.closeButton = QPushButton("Close")
@@ -253,6 +490,7 @@ class drcKLayoutDialogue(QDialog):
         self.buttonBox.addButton(self.loadButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.saveButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.runButton, QDialogButtonBox.ActionRole)
+        self.buttonBox.addButton(self.cancelButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.closeButton, QDialogButtonBox.RejectRole)
         self.buttonBox.rejected.connect(self.reject)
 
@@ -287,6 +525,12 @@ class drcKLayoutDialogue(QDialog):
         outerLayout = QHBoxLayout()
         outerLayout.addWidget(splitter)
         self.setLayout(outerLayout)
+        # Report streaming state, see klayoutDRCClick.
+        self.reportDialogue = None
+        self.reportWatcher = QTimer(self)
+        self.reportWatcher.setInterval(500)
+        # Raw KLayout output of the current run, used for the rule profile.
+        self.drcOutputBuffer = []
         self.show()
 
     def applySettings(self, settings: dict) -> None:
@@ -301,8 +545,6 @@ class drcKLayoutDialogue(QDialog):
             self.cellNameEdit.setText(settings["cellName"])
         if "drcRunSetName" in settings:
             self.DRCRunSetCB.setCurrentText(settings["drcRunSetName"])
-        if "drcRunLimit" in settings:
-            self.DRCRunLimitEdit.setText(str(settings["drcRunLimit"]))
         if "drcRunPath" in settings:
             self.DRCRunPathEdit.setText(settings["drcRunPath"])
         if "gdsExport" in settings:
@@ -311,6 +553,41 @@ class drcKLayoutDialogue(QDialog):
             self.unitEdit.setText(str(settings["gdsUnit"]))
         if "gdsPrecision" in settings and settings["gdsPrecision"]:
             self.precisionEdit.setText(str(settings["gdsPrecision"]))
+        if "layoutFormat" in settings:
+            self.layoutFormatCB.setCurrentText(settings["layoutFormat"])
+        if "drcRuleGroups" in settings:
+            self.setSelectedRuleGroups(settings["drcRuleGroups"])
+        if "pcellBlackBox" in settings:
+            self.pcellBlackBoxBox.setChecked(bool(settings["pcellBlackBox"]))
+        if "useDaemon" in settings:
+            self.useDaemonBox.setChecked(bool(settings["useDaemon"]))
+        if "batchJob" in settings:
+            self.batchJobBox.setChecked(bool(settings["batchJob"]))
+
+    def setRuleGroups(self, ruleGroups: dict) -> None:
+        """Fill the rule group list, all groups are checked initially."""
+        self.ruleGroupList.clear()
+        for group, description in ruleGroups.items():
+            item = QListWidgetItem(f"{group} - {description}")
+            item.setData(Qt.UserRole, group)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.ruleGroupList.addItem(item)
+
+    def ruleGroupNames(self) -> list:
+        return [self.ruleGroupList.item(row).data(Qt.UserRole)
+                for row in range(self.ruleGroupList.count())]
+
+    def selectedRuleGroups(self) -> list:
+        return [self.ruleGroupList.item(row).data(Qt.UserRole)
+                for row in range(self.ruleGroupList.count())
+                if self.ruleGroupList.item(row).checkState() == Qt.Checked]
+
+    def setSelectedRuleGroups(self, groups: list) -> None:
+        for row in range(self.ruleGroupList.count()):
+            item = self.ruleGroupList.item(row)
+            item.setCheckState(
+                Qt.Checked if item.data(Qt.UserRole) in groups else Qt.Unchecked)
 
     def onkfilePathButtonClicked(self):
         self.klayoutPathEdit.setText(
@@ -332,14 +609,203 @@ class drcKLayoutDialogue(QDialog):
             self.exportGDSLayout.setRowVisible(2, False)
 
     def onDRCRunSetChanged(self, index: int):
-        print(index)
+        # Full chip decks run as batch jobs so that interactive checks are
+        # not queued behind them.
+        self.batchJobBox.setChecked("maximal" in self.DRCRunSetCB.itemText(index))
 
-    def appendDRCOutput(self, process) -> None:
-        output = process.readAllStandardOutput().data().decode("utf-8")
+    def setJobStatus(self, job) -> None:
+        """Show the state and progress of a DRC job of this dialogue."""
+        if job.owner is not self or job.kind != 'drc':
+            return
+        self.jobStatusLabel.setText(job.status_text())
+        fraction = job.fraction()
+        if fraction is None:
+            # No earlier run to compare with, show a busy indicator.
+            self.jobProgressBar.setRange(0, 0)
+        else:
+            self.jobProgressBar.setRange(0, 100)
+            self.jobProgressBar.setValue(int(fraction * 100))
+        self.cancelButton.setEnabled(
+            bool(verificationQueue.sharedJobQueue().ownerJobs(self, 'drc')))
+
+    def appendDRCOutput(self, output: str) -> None:
+        self.drcOutputBuffer.append(output)
+        # Per-rule profile lines are summarised when the run finishes.
+        output = "\n".join(line for line in output.splitlines()
+                           if not line.startswith("PROFILE"))
         if output.strip():
             self.console.appendPlainText(output.rstrip())
 
-    def appendDRCError(self, process) -> None:
-        error = process.readAllStandardError().data().decode("utf-8")
+    def appendDRCError(self, error: str) -> None:
         if error.strip():
             self.console.appendPlainText(f"[STDERR] {error.rstrip()}")
+
+
+class drcReportTree(QTreeWidget):
+    polygonSelected = Signal(QPolygonF)
+    zoomToRect = Signal(QRectF)
+
+
+class drcReportDialogue(QDialog):
+    """
+    DRC results browser fed by a streaming .lyrdb reader.
+
+    Category counts are shown first and updated while the report is parsed
+    in small batches on a timer, so the editor stays responsive. Markers of a
+    category are only listed when it is expanded and their geometry is only
+    decoded when a marker is selected.
+    """
+
+    pollBatch = 5000
+    fillBatch = 2000
+    zoomMargin = 0.25
+
+    def __init__(self, parent, reader):
+        super().__init__(parent)
+        self.reader = reader
+        self.runFinished = False
+        self._categoryItems = {}
+        self._fillQueue = []
+        self.setWindowTitle(f"DRC Results - {pathlib.Path(reader.filepath).name}")
+        self.setMinimumSize(700, 500)
+        layout = QVBoxLayout(self)
+        self.summaryLabel = QLabel("Waiting for DRC report...")
+        layout.addWidget(self.summaryLabel)
+        self.drcTable = drcReportTree()
+        self.drcTable.setColumnCount(3)
+        self.drcTable.setHeaderLabels(["Rule / Marker", "Count", "Description"])
+        self.drcTable.header().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        self.drcTable.itemExpanded.connect(self.onItemExpanded)
+        self.drcTable.itemClicked.connect(self.onItemClicked)
+        layout.addWidget(self.drcTable)
+        self.followBox = QCheckBox("Follow report while DRC is running")
+        self.followBox.setChecked(True)
+        layout.addWidget(self.followBox)
+        self._pollTimer = QTimer(self)
+        self._pollTimer.setInterval(0)
+        self._pollTimer.timeout.connect(self._pollReport)
+        self._fillTimer = QTimer(self)
+        self._fillTimer.setInterval(0)
+        self._fillTimer.timeout.connect(self._fillMarkers)
+        self._pollTimer.start()
+
+    def setRunFinished(self) -> None:
+        """Called once KLayout has exited; the remaining report is read."""
+        self.runFinished = True
+        if not self.reader.complete:
+            self._pollTimer.setInterval(0)
+            self._pollTimer.start()
+
+    def _pollReport(self) -> None:
+        try:
+            readCount = self.reader.poll(self.pollBatch)
+        except Exception as e:
+            self._pollTimer.stop()
+            logger.error(f"Cannot read DRC report {self.reader.filepath}: {e}")
+            self.summaryLabel.setText(f"Report could not be read: {e}")
+            return
+        if readCount or self.reader.complete:
+            self._refreshCategories()
+        if self.reader.complete:
+            self._pollTimer.stop()
+        elif not readCount:
+            if self.runFinished or not self.followBox.isChecked():
+                # Nothing more will be written.
+                self._pollTimer.stop()
+            else:
+                # Wait for KLayout to write more of the report.
+                self._pollTimer.setInterval(250)
+        else:
+            self._pollTimer.setInterval(0)
+
+    def _refreshCategories(self) -> None:
+        for category in self.reader.categories():
+            item = self._categoryItems.get(category.name)
+            if item is None:
+                item = QTreeWidgetItem([category.name, "", category.description])
+                item.setData(0, Qt.UserRole, (category.name, -1))
+                item.setChildIndicatorPolicy(
+                    QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+                self._categoryItems[category.name] = item
+                self.drcTable.addTopLevelItem(item)
+            elif category.description and not item.text(2):
+                item.setText(2, category.description)
+            item.setText(1, str(category.count))
+            item.setHidden(category.count == 0)
+            if item.isExpanded() and item.childCount() < category.count:
+                self._queueMarkers(item, category)
+        state = "complete" if self.reader.complete else "loading"
+        self.summaryLabel.setText(
+            f"{self.reader.marker_count} markers in "
+            f"{sum(1 for category in self.reader.categories() if category.count)}"
+            f" rules ({state})")
+
+    def onItemExpanded(self, item: QTreeWidgetItem) -> None:
+        name, index = item.data(0, Qt.UserRole)
+        if index >= 0:
+            return
+        category = self.reader.category(name)
+        if category is not None:
+            self._queueMarkers(item, category)
+
+    def _queueMarkers(self, item: QTreeWidgetItem, category) -> None:
+        if all(queued[0] is not item for queued in self._fillQueue):
+            self._fillQueue.append((item, category))
+        self._fillTimer.start()
+
+    def _fillMarkers(self) -> None:
+        if not self._fillQueue:
+            self._fillTimer.stop()
+            return
+        item, category = self._fillQueue[0]
+        start = item.childCount()
+        stop = min(category.count, start + self.fillBatch)
+        children = []
+        for index in range(start, stop):
+            bbox = category.bbox(index)
+            location = ("" if bbox is None else
+                        f"({bbox[0]:g}, {bbox[1]:g}; {bbox[2]:g}, {bbox[3]:g})")
+            child = QTreeWidgetItem(
+                [f"#{index + 1}", "", f"{self.reader.cell_name(category.cells[index])} {location}"])
+            child.setData(0, Qt.UserRole, (category.name, index))
+            children.append(child)
+        item.addChildren(children)
+        if item.childCount() >= category.count:
+            self._fillQueue.pop(0)
+
+    def _showOverlappingMarkers(self, category, index: int, bbox) -> None:
+        # Markers of other rules at the selected error, from the marker
+        # index of the reader.
+        counts = {}
+        for other, otherIndex in self.reader.markers_in(bbox):
+            if other is category and otherIndex == index:
+                continue
+            counts[other.name] = counts.get(other.name, 0) + 1
+        text = f"{category.name} #{index + 1}"
+        if counts:
+            text += " overlaps " + ", ".join(
+                f"{name} ({count})" for name, count in sorted(counts.items()))
+        self.summaryLabel.setText(text)
+
+    def onItemClicked(self, item: QTreeWidgetItem, column: int) -> None:
+        name, index = item.data(0, Qt.UserRole)
+        if index < 0:
+            return
+        category = self.reader.category(name)
+        bbox = category.bbox(index) if category is not None else None
+        if bbox is None:
+            return
+        dbu = process.dbu
+        width = (bbox[2] - bbox[0]) * dbu
+        height = (bbox[3] - bbox[1]) * dbu
+        margin = max(width, height, dbu) * self.zoomMargin
+        rect = QRectF(QPointF(bbox[0] * dbu, bbox[1] * dbu),
+                      QPointF(bbox[2] * dbu, bbox[3] * dbu)).normalized()
+        self.drcTable.zoomToRect.emit(rect.adjusted(-margin, -margin, margin, margin))
+        self._showOverlappingMarkers(category, index, bbox)
+        # Only the clicked item is read from the file, its offset is known
+        # once the item has been streamed.
+        marker = self.reader.load_marker_geometry(name, index)
+        if marker is not None and marker[1]:
+            self.drcTable.polygonSelected.emit(QPolygonF(
+                [QPointF(x * dbu, y * dbu) for x, y in marker[1][0]]))
@@ -22,13 +22,14 @@
 #     Licensor: Revolution Semiconductor (Registered in the Netherlands)
 
 from contextlib import contextmanager
-from functools import lru_cache
+import importlib
 import json
 import logging
 import pathlib
+import sys
 import time
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QObject, QThread, Qt, Signal
 from PySide6.QtGui import QStandardItemModel
 from PySide6.QtWidgets import (
     QApplication,
@@ -44,6 +45,7 @@ from PySide6.QtWidgets import (
     QLabel,
     QMessageBox,
     QPlainTextEdit,
+    QProgressBar,
     QPushButton,
     QRadioButton,
     QScrollArea,
@@ -63,6 +65,7 @@ from revedaEditor.fileio.extractedSchematic import klayoutSchematicGenerator
 from revedaEditor.gui.schematicEditor import schematicEditor, xyceNetlist
 
 process = importPDKModule("process")
+verificationQueue = importPDKModule("verificationQueue")
 
 
 logger = logging.getLogger("reveda")
@@ -83,31 +86,257 @@ def _measureDuration():
         )
 
 
-def klayoutLVSClick(layoutEditor):
-    from revedaEditor.fileio.importlvsdb import LVSDBParser 
+class lvsResultsLoader(QThread):
+    """
+    Parse an LVS database and prepare the data of the results dialogue off
+    the GUI thread.
 
-    @lru_cache(maxsize=16)
-    def findSymbolViewNameTuple(extractedCellName: str, libraryModel: QStandardItemModel):
-        """Find (libName, cellName, viewName) tuple for a cell type."""
+    ``tasks`` are run first, e.g. recording the matched subcells. The
+    prepared data is delivered as a dict of plain Python data and the parser
+    with ``resultsReady``; widgets are only created on the GUI thread.
 
-        root = libraryModel.invisibleRootItem()
+    The results are read from the binary index next to the database if it
+    is up to date (``lvs/lvsdb_index.py``). Otherwise the outcome of every
+    circuit pair is reported from a streaming scan (``lvs/lvsdb_stream.py``)
+    before the database is parsed, and the index is written for the next
+    time.
 
-        # Iterate through libraries (level 0)
-        for libRow in range(root.rowCount()):
-            libItem = root.child(libRow)  # libraryItem
-            libName = libItem.libraryName
+    ``summaryReady`` delivers the scan summary and ``countReady`` the size
+    of each result list as soon as they are known, so that the results can
+    be shown before the parse has ended, see lvsResultsPlaceholder.
+    """
+
+    progress = Signal(str)
+    summaryReady = Signal(object)
+    countReady = Signal(str, int)
+    resultsReady = Signal(object)
+    failed = Signal(str)
+
+    def __init__(
+        self, parserClass, indexModule, streamModule, filePath, layoutLayers, cellName,
+        tasks=(), parent=None,
+    ):
+        super().__init__(parent)
+        self.parserClass = parserClass
+        self.indexModule = indexModule
+        self.streamModule = streamModule
+        self.filePath = filePath
+        self.layoutLayers = layoutLayers
+        self.cellName = cellName
+        self.tasks = list(tasks)
+
+    def loadParser(self):
+        parser = self.parserClass(self.filePath, self.layoutLayers)
+        parser.load()
+        return parser
 
-            # Iterate through cells in this library (level 1)
+    def run(self):
+        try:
+            for task in self.tasks:
+                task()
+            parser = self.indexModule.IndexedLVSDB(
+                self.filePath,
+                self.loadParser,
+                self.parserClass,
+                self.indexModule.open_index(self.filePath),
+            )
+            if parser.indexed:
+                self.progress.emit(f"Reading the results index of {self.filePath.name}...")
+            else:
+                self.reportOutcome()
+                self.progress.emit(f"Reading {self.filePath.name}...")
+            results = {"parser": parser}
+            results["crossrefs"] = self.collect(
+                "crossrefs", parser.get_all_crossrefs_formatted)
+            results["nets"] = self.collect("nets", parser.get_nets, self.cellName)
+            results["devices"] = self.collect(
+                "devices", parser.get_layout_devices, self.cellName)
+            results["cells"] = self.collect("cells", parser.get_layout_cells_with_bbox)
+            self.progress.emit(
+                f"Layout: {len(results['nets'] or ())} nets, "
+                f"{len(results['devices'] or ())} devices, "
+                f"{len(results['cells'] or ())} cells, "
+                f"{len(results['crossrefs'] or ())} cross-references."
+            )
+            schemCellName = self.cellName
+            xref = parser.get_crossref(self.cellName)
+            if xref and xref.get("schematic_name"):
+                schemCellName = xref["schematic_name"]
+            results["schem_nets"] = self.collect(
+                "schem_nets", parser.get_schematic_nets, schemCellName)
+            results["schem_devices"] = self.collect(
+                "schem_devices", parser.get_schematic_devices, schemCellName)
+            self.progress.emit(
+                f"Schematic: {len(results['schem_nets'] or ())} nets, "
+                f"{len(results['schem_devices'] or ())} devices."
+            )
+            results["extracted"] = parser.get_extracted_schematic(self.cellName)
+        except Exception as e:
+            self.failed.emit(f"Reading LVS results from {self.filePath} failed: {e}")
+            return
+        # Written before the dialogue can add results of its own calls, an
+        # index without them, e.g. of lvs_diff.py, is completed.
+        try:
+            parser.write_index()
+        except (OSError, ValueError) as e:
+            self.progress.emit(f"Results index not written: {e}")
+        self.resultsReady.emit(results)
+
+    def collect(self, name, getter, *args):
+        result = getter(*args)
+        self.countReady.emit(name, len(result or ()))
+        return result
+
+    def reportOutcome(self):
+        # The scan skips the cell bodies, it takes a fraction of the parse.
+        try:
+            summary = self.streamModule.LVSDBReader(self.filePath).scan().summary()
+        except (OSError, ValueError) as e:
+            self.progress.emit(f"Scanning {self.filePath.name} failed: {e}")
+            return
+        self.summaryReady.emit(summary)
+        mismatched = summary["mismatched_circuits"]
+        message = (
+            f"{summary['layout_cells']} layout cells, {summary['circuit_pairs']} circuit "
+            f"pairs, {len(mismatched)} not matching"
+        )
+        if mismatched:
+            names = [
+                f"{pair['layout'] or pair['schematic']} ({pair['status']})"
+                for pair in mismatched[:10]
+            ]
+            if len(mismatched) > 10:
+                names.append("...")
+            message += ": " + ", ".join(names)
+        self.progress.emit(message + ".")
+
+
+class lvsResultsPlaceholder(QDialog):
+    """
+    Shown while lvsResultsLoader reads an LVS database: the outcome of the
+    circuit pairs from the scan and the size of each result list as it is
+    read. The results dialogue takes its place when the data is complete.
+    """
+
+    countLabels = {
+        "nets": "Layout nets:",
+        "devices": "Layout devices:",
+        "cells": "Layout cells:",
+        "crossrefs": "Cross-references:",
+        "schem_nets": "Schematic nets:",
+        "schem_devices": "Schematic devices:",
+    }
+
+    def __init__(self, filePath: pathlib.Path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"LVS Results: {filePath.stem}")
+        self.setMinimumWidth(420)
+        mainLayout = QVBoxLayout()
+        self.statusLabel = QLabel(f"Reading {filePath.name}...")
+        mainLayout.addWidget(self.statusLabel)
+        self.progressBar = QProgressBar()
+        # Busy indicator, the parse time is not known beforehand.
+        self.progressBar.setRange(0, 0)
+        mainLayout.addWidget(self.progressBar)
+        countsLayout = QFormLayout()
+        self.outcomeLabel = QLabel("...")
+        countsLayout.addRow(edf.boldLabel("Circuit pairs:"), self.outcomeLabel)
+        self.countValues = {}
+        for name, label in self.countLabels.items():
+            self.countValues[name] = QLabel("...")
+            countsLayout.addRow(edf.boldLabel(label), self.countValues[name])
+        mainLayout.addLayout(countsLayout)
+        self.mismatchedView = QPlainTextEdit()
+        self.mismatchedView.setReadOnly(True)
+        self.mismatchedView.setPlaceholderText("No circuit pairs known yet.")
+        mainLayout.addWidget(self.mismatchedView)
+        self.setLayout(mainLayout)
+
+    def setSummary(self, summary: dict) -> None:
+        mismatched = summary["mismatched_circuits"]
+        self.outcomeLabel.setText(
+            f"{summary['circuit_pairs']} in {summary['layout_cells']} layout "
+            f"cells, {len(mismatched)} not matching"
+        )
+        self.mismatchedView.setPlainText("\n".join(
+            f"{pair['layout'] or '-'} / {pair['schematic'] or '-'}: {pair['status']}"
+            for pair in mismatched
+        ))
+        if not mismatched:
+            self.mismatchedView.setPlaceholderText("All circuit pairs match.")
+
+    def setCount(self, name: str, count: int) -> None:
+        if name in self.countValues:
+            self.countValues[name].setText(str(count))
+
+    def setStatus(self, message: str) -> None:
+        self.statusLabel.setText(message)
+
+    def setFailed(self, message: str) -> None:
+        self.progressBar.setRange(0, 1)
+        self.progressBar.setValue(0)
+        self.statusLabel.setText(message)
+
+
+class symbolViewIndex(QObject):
+    """
+    Cell name to ``(libName, cellName, "symbol")`` of the cells with a symbol
+    view in a library model.
+
+    The index is built in one pass over the model, so a lookup does not
+    depend on the library size. It is rebuilt on the next lookup after the
+    model changed. As in a library search, the first library with the cell
+    wins.
+    """
+
+    def __init__(self, libraryModel: QStandardItemModel, parent=None):
+        super().__init__(parent)
+        self.libraryModel = libraryModel
+        self._index = None
+        for signal in (
+            libraryModel.rowsInserted,
+            libraryModel.rowsRemoved,
+            libraryModel.rowsMoved,
+            libraryModel.dataChanged,
+            libraryModel.layoutChanged,
+            libraryModel.modelReset,
+        ):
+            signal.connect(self.invalidate)
+
+    def invalidate(self, *args):
+        self._index = None
+
+    def build(self):
+        index = {}
+        root = self.libraryModel.invisibleRootItem()
+        # Libraries (level 0) -> cells (level 1) -> views (level 2)
+        for libRow in range(root.rowCount()):
+            libItem = root.child(libRow)
             for cellRow in range(libItem.rowCount()):
-                cellItem = libItem.child(cellRow)  # cellItem
-                if cellItem.cellName == extractedCellName:
-                    # Found the cell, now look for symbol view (level 2)
-                    for viewRow in range(cellItem.rowCount()):
-                        viewItem = cellItem.child(viewRow)  # viewItem
-                        if viewItem.viewName == "symbol":
-                            return ddef.viewNameTuple(libName, extractedCellName, "symbol")
+                cellItem = libItem.child(cellRow)
+                if cellItem.cellName in index:
+                    continue
+                for viewRow in range(cellItem.rowCount()):
+                    if cellItem.child(viewRow).viewName == "symbol":
+                        index[cellItem.cellName] = ddef.viewNameTuple(
+                            libItem.libraryName, cellItem.cellName, "symbol"
+                        )
+                        break
+        self._index = index
+
+    def lookup(self, extractedCellName: str, libraryModel: QStandardItemModel = None):
+        """
+        Find the (libName, cellName, viewName) tuple of a cell type, None if
+        no library has a symbol view of it. ``libraryModel`` is accepted for
+        the callback signature of ``klayoutSchematicGenerator``.
+        """
+        if self._index is None:
+            self.build()
+        return self._index.get(extractedCellName)
+
 
-        return None
+def klayoutLVSClick(layoutEditor):
+    from revedaEditor.fileio.importlvsdb import LVSDBParser 
 
     def saveRunSet(dlg):
         settings = dlg.collectSettings()
@@ -123,8 +352,24 @@ def klayoutLVSClick(layoutEditor):
         extractedNetlistPath: pathlib.Path,
         dlg: "klayoutLVSDialogue",
         schematic_editor=None,
+        reuse=None,
+        runModeRun=None,
+        job=None,
     ):
+        if job is not None:
+            if job.state == verificationQueue.jobQueue.CANCELLED:
+                logger.info(f"LVS of {job.name} cancelled.")
+                dlg.console.appendPlainText("\n--- LVS cancelled ---")
+                return
+            if job.error:
+                dlg.console.appendPlainText(f"ERROR: {job.error}")
         logger.info(f"LVS process finished. Report: {filePath}")
+        if runModeRun is not None and filePath.exists():
+            # Measured runtimes calibrate the automatic run mode choice.
+            runModeModule, runModeStatistics, runMode, startTime = runModeRun
+            runModeModule.record_runtime(
+                runModeStatistics, runMode, time.perf_counter() - startTime
+            )
         dlg.console.appendPlainText(f"\n--- LVS Finished. Report: {filePath} ---")
         if extractedNetlistPath.exists():
             dlg.console.appendPlainText(
@@ -135,21 +380,142 @@ def klayoutLVSClick(layoutEditor):
                 "--- Extracted layout netlist was not generated. ---"
             )
 
-        layoutLayers = importPDKModule("layoutLayers")
-        parser = LVSDBParser(filePath, layoutLayers)
-        parser.load()
-        logger.info(f"Parsed LVSDB: {parser.filepath}")
-        extracted = parser.get_extracted_schematic(layoutEditor.cellName)
+        tasks = []
+        lvsModule = importPDKModule("lvs")
+        if extractedNetlistPath.exists():
+            spiceIndex = importlib.import_module(f"{lvsModule.__name__}.spice_index")
+            def indexExtractedNetlist():
+                # Readers of the extracted netlist seek to a subcircuit or
+                # a device line instead of loading the file.
+                try:
+                    spiceIndex.index_netlist(str(extractedNetlistPath))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Extracted netlist not indexed: {e}")
+
+            tasks.append(indexExtractedNetlist)
+        if reuse is not None:
+            lvsReuse, reuseDbPath, fingerprints = reuse
+            lvsdbStream = importlib.import_module(f"{lvsModule.__name__}.lvsdb_stream")
+
+            def recordReuse():
+                # The pair statuses come from the streaming scan, the
+                # database is not loaded for them.
+                try:
+                    pairs = lvsdbStream.LVSDBReader(str(filePath)).scan()
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Matched subcells not recorded: {e}")
+                    return
+                lvsReuse.record_results(str(reuseDbPath), fingerprints, pairs)
+
+            tasks.append(recordReuse)
+        loadLVSResults(filePath, dlg, schematic_editor, tasks)
+
+    def stageReportPath(filePath: pathlib.Path) -> pathlib.Path:
+        # Same name as the stage report of run_lvs.py.
+        return filePath.with_name(f"{filePath.stem}_stages.json")
+
+    def writeStageReport(filePath: pathlib.Path, job, runMode: str):
+        # Stage times of this run are the progress estimate of the next one.
+        stages = job.progress.stages(end_time=job.ended)
+        if not stages:
+            return
+        stageTiming = importlib.import_module(
+            f"{importPDKModule('verification').__name__}.stage_timing"
+        )
+        try:
+            stageTiming.write_stage_report(
+                str(stageReportPath(filePath)), stages, topcell=job.name,
+                run_mode=runMode, returncode=job.returncode,
+            )
+        except OSError as e:
+            logger.warning(f"Stage report not written: {e}")
 
+    def loadLVSResults(filePath, dlg, schematic_editor=None, tasks=()):
+        # The LVS database is parsed on a worker thread, the editor stays
+        # responsive. A placeholder opens with the first message and shows
+        # the outcome and the counts as they are known.
+        lvsModule = importPDKModule("lvs")
+        loader = lvsResultsLoader(
+            LVSDBParser,
+            importlib.import_module(f"{lvsModule.__name__}.lvsdb_index"),
+            importlib.import_module(f"{lvsModule.__name__}.lvsdb_stream"),
+            filePath,
+            importPDKModule("layoutLayers"),
+            layoutEditor.cellName,
+            tasks,
+            dlg,
+        )
+        placeholder = None
+        placeholderClosed = False
+
+        def resultsPlaceholder():
+            # None once the user has closed it, the results still open.
+            nonlocal placeholder
+            if placeholder is None and not placeholderClosed:
+                placeholder = lvsResultsPlaceholder(filePath, layoutEditor)
+                placeholder.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+                placeholder.finished.connect(placeholderFinished)
+                placeholder.show()
+            return placeholder
+
+        def placeholderFinished(*args):
+            nonlocal placeholder, placeholderClosed
+            placeholder = None
+            placeholderClosed = True
+
+        def showProgress(message):
+            dlg.console.appendPlainText(f"--- {message} ---")
+            if resultsPlaceholder() is not None:
+                placeholder.setStatus(message)
+
+        def showSummary(summary):
+            if resultsPlaceholder() is not None:
+                placeholder.setSummary(summary)
+
+        def showCount(name, count):
+            if resultsPlaceholder() is not None:
+                placeholder.setCount(name, count)
+
+        def showFailure(message):
+            logger.error(message)
+            if resultsPlaceholder() is not None:
+                placeholder.setFailed(message)
+
+        def showResults(results):
+            showLVSResults(results, dlg, schematic_editor, placeholder)
+
+        loader.progress.connect(showProgress)
+        loader.summaryReady.connect(showSummary)
+        loader.countReady.connect(showCount)
+        loader.failed.connect(showFailure)
+        loader.resultsReady.connect(showResults)
+        loader.finished.connect(loader.deleteLater)
+        dlg.resultsLoader = loader
+        loader.start()
+
+    def reopenLVSResults(dlg):
+        settings = dlg.collectSettings()
+        filePath = pathlib.Path(settings["lvsRunPath"]) / f"{settings['layoutCellName']}.lvsdb"
+        if not filePath.exists():
+            logger.error(f"No LVS results at {filePath}. Please run LVS first.")
+            return
+        schematic_editor = None
+        revedaMain = QApplication.instance().appMainW
+        if revedaMain:
+            schematic_editor = revedaMain.openViews.get(
+                ddef.viewNameTuple(
+                    settings["schematicLibName"],
+                    settings["schematicCellName"],
+                    settings["schematicViewName"],
+                )
+            )
+        dlg.console.appendPlainText(f"\n--- LVS Results: {filePath} ---")
+        loadLVSResults(filePath, dlg, schematic_editor)
 
-        # Gather cross-reference and schematic-side data for the results dialog
-        crossrefs = parser.get_all_crossrefs_formatted()
-        schem_cell_name = layoutEditor.cellName
-        xref = parser.get_crossref(layoutEditor.cellName)
-        if xref and xref.get("schematic_name"):
-            schem_cell_name = xref["schematic_name"]
-        schem_nets = parser.get_schematic_nets(schem_cell_name)
-        schem_devices = parser.get_schematic_devices(schem_cell_name)
+    def showLVSResults(results, dlg, schematic_editor=None, placeholder=None):
+        parser = results["parser"]
+        logger.info(f"Parsed LVSDB: {parser.filepath}")
+        extracted = results["extracted"]
 
         # Compute source schematic netlist path for hierarchy tree
         lvsSettings = dlg.collectSettings()
@@ -160,16 +526,22 @@ def klayoutLVSClick(layoutEditor):
         # Create LVS results dialog with the schematic editor from the dialogue settings
         lvsNetsDlg = lvsr.lvsResultsDialogue(
             layoutEditor,
-            parser.get_nets(layoutEditor.cellName),
-            parser.get_layout_devices(layoutEditor.cellName),
-            parser.get_layout_cells_with_bbox(),
+            results["nets"],
+            results["devices"],
+            results["cells"],
             parser=parser,
-            crossrefs=crossrefs,
-            schem_nets=schem_nets,
-            schem_devices=schem_devices,
+            crossrefs=results["crossrefs"],
+            schem_nets=results["schem_nets"],
+            schem_devices=results["schem_devices"],
             schematic_editor=schematic_editor,
             source_netlist_path=sourceNetlistPath,
         )
+        # Show the results before the schematic of the extracted netlist is
+        # built, which creates items and has to run on the GUI thread.
+        if placeholder is not None:
+            lvsNetsDlg.move(placeholder.pos())
+            placeholder.close()
+        lvsNetsDlg.show()
 
         schematicNetlistPath = None
         if extracted:
@@ -179,7 +551,7 @@ def klayoutLVSClick(layoutEditor):
                 parser,
                 layoutEditor,
                 revedaMain,
-                findSymbolViewNameTuple,
+                dlg.symbolIndex.lookup,
                 logger,
                 highlight_callback=lvsNetsDlg.register_schematic_view,
             )
@@ -189,15 +561,12 @@ def klayoutLVSClick(layoutEditor):
                 lvs_schematic_editor.raise_()
                 lvs_schematic_editor.activateWindow()
 
-        lvsNetsDlg.show()
-
     def runKlayoutLVS(dlg):
         settings = dlg.collectSettings()
         klayoutPath = settings["klayoutPath"]
         schematicCellName = settings["schematicCellName"]
         schematicViewName = settings["schematicViewName"]
         layoutCellName = settings["layoutCellName"]
-        lvsRunLimit = settings["lvsRunLimit"]
         lvsRunPath = settings["lvsRunPath"]
         gdsExport = settings["gdsExport"]
         lvsSwitches = settings["lvsSwitches"]
@@ -207,6 +576,7 @@ def klayoutLVSClick(layoutEditor):
         gdsPrecision = settings["gdsPrecision"]
         implicitNets = settings["implicitNets"]
         runMode = settings["runMode"]
+        layoutFormat = settings["layoutFormat"]
         lvsRunPathObj = pathlib.Path(lvsRunPath)
         lvsRunPathObj.mkdir(parents=True, exist_ok=True)
         lvsModule = importPDKModule("lvs")
@@ -256,10 +626,26 @@ def klayoutLVSClick(layoutEditor):
                 except Exception as e:
                     logger.warning(f"Failed to load schematic for {schematic_cell_name}: {e}")
         
+        verification = importPDKModule("verification")
+        if verification is None:
+            logger.error("PDK does not have verification module.")
+            return
+        layoutExport = importlib.import_module(
+            f"{verification.__name__}.layout_export"
+        )
         if gdsExport:
-            layoutEditor.centralW.scene.exportCellGDS(
-                lvsRunPathObj, gdsUnit, gdsPrecision, process.dbu
-            )
+            try:
+                exportedPath = layoutExport.export_layout(
+                    layoutEditor.centralW.scene,
+                    lvsRunPathObj,
+                    layoutCellName,
+                    gdsUnit,
+                    gdsPrecision,
+                    process.dbu,
+                )
+            except RuntimeError as e:
+                logger.error(e)
+                return
 
         if createNetlist:
             createSchematicNetlist(dlg, lvsRunPathObj, schematic_editor)
@@ -275,69 +661,192 @@ def klayoutLVSClick(layoutEditor):
             )
             return
 
-        gdsPath = lvsRunPathObj / f"{layoutCellName}.gds"
-        if not gdsPath.exists():
-            logger.error(
-                f"GDS file not found at {gdsPath}. Please check the GDS export settings and try again."
-            )
-            return
+        layoutScan = importlib.import_module(f"{verification.__name__}.layout_scan")
+        runModeModule = importlib.import_module(f"{verification.__name__}.run_mode")
+        deckSwitches = {
+            "net_only": "false",
+            "implicit_nets": implicitNets or None,
+            **{name: "true" if enabled else "false" for name, enabled in lvsSwitches.items()},
+        }
 
-        lvsReportFilePath = lvsRunPathObj / f"{layoutCellName}.lvsdb"
-        lvsExtractedNetlistPath = lvsRunPathObj / f"{layoutCellName}_extracted.cir"
-        argumentsList = [
-            "-b",
-            "-r",
-            str(lvsRulePath),
-            "-rd",
-            f"input={gdsPath}",
-            "-rd",
-            f"topcell={layoutCellName}",
-            "-rd",
-            f"report={lvsReportFilePath}",
-            "-rd",
-            f"target_netlist={lvsExtractedNetlistPath}",
-            "-rd",
-            f"net_only={'true' if netOnly else 'false'}",
-            "-rd",
-            f"run_mode={runMode}",
-        ]
-        if not netOnly:
-            argumentsList.extend(["-rd", f"schematic={schematicNetlistPathObj}"])
+        def prepareLayout():
+            # Runs in a worker thread, the scene is not touched and nothing
+            # is logged: scan and fingerprinting errors are returned.
+            prepared = {"runMode": runMode, "hierarchy": None, "scanError": None,
+                        "statistics": None, "reason": None, "fingerprints": None,
+                        "fingerprintError": None}
+            if gdsExport:
+                gdsPath = layoutExport.convert_export(exportedPath, layoutFormat)
+            else:
+                gdsPath = layoutExport.layout_file_path(
+                    lvsRunPathObj, layoutCellName, layoutFormat
+                )
+            if not gdsPath.exists():
+                raise FileNotFoundError(
+                    f"{layoutFormat} file not found at {gdsPath}. Please check the GDS export settings and try again."
+                )
+            prepared["gdsPath"] = gdsPath
+            # Only cell names and references are read, shapes are only counted
+            # for the automatic run mode.
+            try:
+                hierarchy = layoutScan.scan_layout(gdsPath, statistics=runMode == "auto")
+            except layoutScan.LayoutScanError as e:
+                prepared["scanError"] = e
+                hierarchy = None
+            else:
+                prepared["hierarchy"] = hierarchy
+                if layoutCellName not in hierarchy.cells:
+                    return prepared
+            if runMode == "auto":
+                prepared["runMode"] = "flat"
+                if hierarchy is not None:
+                    prepared["statistics"] = runModeModule.statistics_from_hierarchy(
+                        hierarchy, layoutCellName
+                    )
+                    prepared["runMode"], prepared["reason"] = runModeModule.choose_run_mode(
+                        prepared["statistics"]
+                    )
+                else:
+                    prepared["reason"] = "no layout statistics"
+            if prepared["runMode"] == "deep" and not netOnly:
+                # The layout and the netlist are hashed here, OASIS layouts
+                # are read with KLayout.
+                try:
+                    lvsReuse = importlib.import_module(f"{lvsModule.__name__}.lvs_reuse")
+                    prepared["fingerprints"] = lvsReuse.cell_fingerprints(
+                        str(gdsPath),
+                        str(schematicNetlistPathObj),
+                        lvsReuse.deck_digest(
+                            str(lvsPath), {"run_mode": "deep", **deckSwitches}
+                        ),
+                        layoutCellName,
+                    )
+                except (ImportError, OSError, ValueError, RuntimeError) as e:
+                    prepared["fingerprintError"] = e
+            return prepared
+
+        def startLVS(prepared):
+            gdsPath = prepared["gdsPath"]
+            layoutHierarchy = prepared["hierarchy"]
+            if prepared["scanError"] is not None:
+                logger.warning(f"Layout scan failed: {prepared['scanError']}")
+            elif layoutCellName not in layoutHierarchy.cells:
+                logger.error(f"Cell {layoutCellName} is not in {gdsPath}.")
+                return
+
+            runModeStatistics = prepared["statistics"]
+            runMode = prepared["runMode"]
+            if prepared["reason"] is not None:
+                logger.info(f"Run mode auto: {runMode} ({prepared['reason']})")
+                dlg.console.appendPlainText(
+                    f"--- Run mode: {runMode} ({prepared['reason']}) ---"
+                )
 
-        for switchName, enabled in lvsSwitches.items():
-            argumentsList.extend(["-rd", f"{switchName}={'true' if enabled else 'false'}"])
+            lvsReportFilePath = lvsRunPathObj / f"{layoutCellName}.lvsdb"
+            lvsExtractedNetlistPath = lvsRunPathObj / f"{layoutCellName}_extracted.cir"
+            argumentsList = [
+                "-b",
+                "-r",
+                str(lvsRulePath),
+                "-rd",
+                f"input={gdsPath}",
+                "-rd",
+                f"topcell={layoutCellName}",
+                "-rd",
+                f"report={lvsReportFilePath}",
+                "-rd",
+                f"target_netlist={lvsExtractedNetlistPath}",
+                "-rd",
+                f"net_only={'true' if netOnly else 'false'}",
+                "-rd",
+                f"run_mode={runMode}",
+            ]
+            if not netOnly:
+                argumentsList.extend(["-rd", f"schematic={schematicNetlistPathObj}"])
 
-        if implicitNets:
-            argumentsList.extend(["-rd", f"implicit_nets={implicitNets}"])
+            for switchName, enabled in lvsSwitches.items():
+                argumentsList.extend(["-rd", f"{switchName}={'true' if enabled else 'false'}"])
 
-        layoutEditor.processManager.maxProcesses = int(lvsRunLimit)
-        dlg.console.appendPlainText("--- LVS Started ---")
-        lvsProcess = layoutEditor.processManager.add_process(klayoutPath, argumentsList)
+            if implicitNets:
+                argumentsList.extend(["-rd", f"implicit_nets={implicitNets}"])
 
-        if lvsProcess.process is None:
-            dlg.console.appendPlainText("ERROR: Failed to start KLayout process")
-            logger.error("Failed to start KLayout process")
-            return
+            reuse = None
+            fingerprints = prepared["fingerprints"]
+            if prepared["fingerprintError"] is not None:
+                logger.warning(
+                    f"Subcell fingerprinting failed, comparing all cells: {prepared['fingerprintError']}"
+                )
+            elif fingerprints is not None:
+                # Unchanged subcells that matched before are compared by their pins.
+                lvsReuse = importlib.import_module(f"{lvsModule.__name__}.lvs_reuse")
+                reuseDbPath = lvsRunPathObj / lvsReuse.REUSE_FILE
+                reused = lvsReuse.reusable_cells(
+                    fingerprints, lvsReuse.load_reuse_db(str(reuseDbPath))
+                )
+                if reused:
+                    argumentsList.extend(["-rd", f"blank_circuits={','.join(reused)}"])
+                    logger.info(f"Reusing LVS results of unchanged subcells: {', '.join(reused)}")
+                reuse = (lvsReuse, reuseDbPath, fingerprints)
+
+            executable = klayoutPath
+            if settings["useDaemon"]:
+                # The daemon client falls back to klayoutPath if no daemon runs.
+                verificationDaemon = importlib.import_module(
+                    f"{verification.__name__}.verification_daemon"
+                )
+                argumentsList = verificationDaemon.client_arguments(klayoutPath, argumentsList)
+                executable = sys.executable
 
-        # Redirect process output to dialog console instead of main logger
-        try:
-            lvsProcess.process.readyReadStandardOutput.disconnect()
-        except RuntimeError:
-            pass
-        lvsProcess.process.readyReadStandardOutput.connect(
-            lambda: dlg.appendLVSOutput(lvsProcess.process)
-        )
-        lvsProcess.process.readyReadStandardError.connect(
-            lambda: dlg.appendLVSError(lvsProcess.process)
-        )
-        # Connect LVS-specific callback alongside the ProcessManager's own
-        # finished slot (process_finished), which removes the process from
-        # running_processes and frees the slot.  Do NOT disconnect the
-        # ProcessManager slot — otherwise the process is never cleaned up and
-        # consecutive runs exhaust the max-processes limit.
-        lvsProcess.process.finished.connect(
-            lambda: LVSProcessFinished(lvsReportFilePath, lvsExtractedNetlistPath, dlg, schematic_editor)
-        )
+            jobs = verificationQueue.sharedJobQueue()
+            progress = verificationQueue.jobQueue.StageProgress(
+                verificationQueue.jobQueue.expected_stages(
+                    str(stageReportPath(lvsReportFilePath)), run_mode=runMode
+                )
+            )
+            priority = (
+                verificationQueue.jobQueue.BATCH
+                if settings["batchJob"]
+                else verificationQueue.jobQueue.INTERACTIVE
+            )
+
+            def lvsJobFinished(job):
+                runModeRun = None
+                if job.state != verificationQueue.jobQueue.CANCELLED:
+                    writeStageReport(lvsReportFilePath, job, runMode)
+                    if runModeStatistics is not None:
+                        # Only the run is measured, not the time in the queue.
+                        runModeRun = (runModeModule, runModeStatistics, runMode,
+                                      time.perf_counter() - (job.ended - job.started))
+                LVSProcessFinished(
+                    lvsReportFilePath,
+                    lvsExtractedNetlistPath,
+                    dlg,
+                    schematic_editor,
+                    reuse,
+                    runModeRun,
+                    job,
+                )
+
+            lvsJob = jobs.submitProcess(
+                "lvs",
+                layoutCellName,
+                executable,
+                argumentsList,
+                priority,
+                progress,
+                dlg,
+                dlg.appendLVSOutput,
+                dlg.appendLVSError,
+                lvsJobFinished,
+            )
+            if lvsJob.state == verificationQueue.jobQueue.QUEUED:
+                dlg.console.appendPlainText(
+                    f"--- LVS Queued ({priority}), {jobs.queue.position(lvsJob)} jobs ahead ---"
+                )
+            elif lvsJob.state == verificationQueue.jobQueue.RUNNING:
+                dlg.console.appendPlainText("--- LVS Started ---")
+
+        verificationQueue.runTask(prepareLayout, startLVS, logger.error, dlg)
 
     def createSchematicNetlist(dlg, lvsRunPathObj, schematic_editor=None):
         settings = dlg.collectSettings()
@@ -347,24 +856,94 @@ def klayoutLVSClick(layoutEditor):
         schematicNetlistPathObj: pathlib.Path = (
             lvsRunPathObj / f"{schematicCellName}_{schematicViewName}.cir"
         )
-        # Reuse the already-open schematic editor if available; otherwise
-        # create a temporary one for netlisting.  Creating a new
-        # schematicEditor and calling loadSchematic() would register it in
-        # openViews, overwriting the user's actual open editor.
-        if schematic_editor is not None:
-            schematicE = schematic_editor
-        else:
-            libItem = libm.getLibItem(dlg.model, schematicLibName)
-            cellItem = libm.getCellItem(libItem, schematicCellName)
-            viewItem = libm.getViewItem(cellItem, schematicViewName)
+
+        revedaMain = QApplication.instance().appMainW
+        openViews = getattr(revedaMain, "openViews", None)
+        if openViews is None:
+            openViews = {}
+
+        def loadedSchematic(libName, cellName, viewName):
+            # Detached from the editors of the user: the editor is not kept
+            # in openViews and is deleted once it is netlisted.
+            viewTuple = ddef.viewNameTuple(libName, cellName, viewName)
+            openEditor = openViews.get(viewTuple)
+            libItem = libm.getLibItem(dlg.model, libName)
+            cellItem = libm.getCellItem(libItem, cellName)
+            viewItem = libm.getViewItem(cellItem, viewName)
             schematicE: schematicEditor = schematicEditor(
                 viewItem, dlg.model.libraryDict, dlg.layoutEditor.libraryView
             )
             schematicE.loadSchematic()
-        netlistObj = xyceNetlist(schematicE, schematicNetlistPathObj, False, True, True)
-        if netlistObj:
+            if openViews.get(viewTuple) is schematicE:
+                if openEditor is None:
+                    openViews.pop(viewTuple, None)
+                else:
+                    openViews[viewTuple] = openEditor
+            return schematicE
+
+        def openSchematic(libName, cellName, viewName):
+            # An open editor without unsaved edits has what is on disk, which
+            # is what the cache hashed. Returns the editor and whether it was
+            # loaded for the netlist.
+            editor = openViews.get(ddef.viewNameTuple(libName, cellName, viewName))
+            scene = getattr(getattr(editor, "centralW", None), "scene", None)
+            undoStack = getattr(scene, "undoStack", None)
+            if editor is not None and (undoStack is None or undoStack.isClean()):
+                return editor, False
+            return loadedSchematic(libName, cellName, viewName), True
+
+        def writeNetlist(schematicE, netlistPath, detached):
+            try:
+                netlistObj = xyceNetlist(schematicE, pathlib.Path(netlistPath), False, True, True)
+                if netlistObj:
+                    netlistObj.writeNetlist()
+            finally:
+                if detached:
+                    schematicE.deleteLater()
+
+        def netlistTop(netlistPath):
+            # The editor the dialogue was opened from is netlisted as shown,
+            # with unsaved edits.
+            if schematic_editor is not None:
+                schematicE, detached = schematic_editor, False
+            else:
+                schematicE, detached = openSchematic(
+                    schematicLibName, schematicCellName, schematicViewName
+                )
             with _measureDuration():
-                netlistObj.writeNetlist()
+                writeNetlist(schematicE, netlistPath, detached)
+
+        def netlistCell(libName, cellName, viewName, netlistPath):
+            schematicE, detached = openSchematic(libName, cellName, viewName)
+            writeNetlist(schematicE, netlistPath, detached)
+
+        # The cache hashes the files on disk, unsaved edits must be netlisted.
+        scene = getattr(getattr(schematic_editor, "centralW", None), "scene", None)
+        undoStack = getattr(scene, "undoStack", None)
+        if undoStack is not None and not undoStack.isClean():
+            logger.info("Schematic has unsaved changes, netlisting without cache.")
+            netlistTop(schematicNetlistPathObj)
+            return
+
+        lvsModule = importPDKModule("lvs")
+        netlistCache = importlib.import_module(f"{lvsModule.__name__}.netlist_cache")
+        try:
+            hierarchy = netlistCache.SchematicHierarchy(
+                dlg.model.libraryDict, schematicLibName, schematicCellName,
+                schematicViewName, "xyce:lvs",
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Schematic hierarchy could not be hashed, netlisting without cache: {e}")
+            netlistTop(schematicNetlistPathObj)
+            return
+        cache = netlistCache.NetlistCache(lvsRunPathObj / netlistCache.CACHE_DIR_NAME)
+        result = netlistCache.write_cached_netlist(
+            cache, hierarchy, schematicNetlistPathObj, netlistTop, netlistCell
+        )
+        if result["status"] == "hit":
+            logger.info("Schematic unchanged, reusing the cached netlist.")
+        elif result["status"] == "partial":
+            logger.info(f"Re-netlisted changed subcells: {', '.join(result['renetlisted'])}")
 
     def loadRunSet(dlg):
         filePath, _ = QFileDialog.getOpenFileName(
@@ -381,7 +960,12 @@ def klayoutLVSClick(layoutEditor):
         dlg.applySettings(settings)
         logger.info(f"LVS settings loaded from {filePath}")
 
+    if verificationQueue.jobQueue is None:
+        layoutEditor.logger.error('PDK does not have verification module.')
+        return
     dlg = klayoutLVSDialogue(layoutEditor)
+    dlg.symbolIndex = symbolViewIndex(dlg.model, dlg)
+    dlg.symbolIndex.build()
     dlg.unitEdit.setText(str(process.gdsUnit))
     dlg.precisionEdit.setText(str(process.gdsPrecision))
     dlg.gdsExportBox.setChecked(True)
@@ -389,6 +973,12 @@ def klayoutLVSClick(layoutEditor):
     dlg.runButton.clicked.connect(lambda: runKlayoutLVS(dlg))
     dlg.saveButton.clicked.connect(lambda: saveRunSet(dlg))
     dlg.loadButton.clicked.connect(lambda: loadRunSet(dlg))
+    dlg.resultsButton.clicked.connect(lambda: reopenLVSResults(dlg))
+    dlg.cancelButton.clicked.connect(
+        lambda: verificationQueue.sharedJobQueue().cancelOwner(dlg, "lvs")
+    )
+    verificationQueue.connectJobStatus(dlg, dlg.setJobStatus)
+    verificationQueue.connectRunLimit(dlg.LVSRunLimitEdit, "lvs")
     dlg.show()
 
 
@@ -477,6 +1067,13 @@ class klayoutLVSDialogue(QDialog):
         self.precisionEdit = edf.shortLineEdit()
         self.precisionEdit.setToolTip("The precision of the GDS file.")
         self.exportGDSLayout.addRow(edf.boldLabel("Precision:"), self.precisionEdit)
+        self.layoutFormatCB = QComboBox()
+        self.layoutFormatCB.addItems(["GDS", "OASIS"])
+        self.layoutFormatCB.setToolTip(
+            "OASIS is written with CBLOCK compression in strict mode, it is "
+            "smaller and faster to read for large layouts."
+        )
+        self.exportGDSLayout.addRow(edf.boldLabel("Layout Format:"), self.layoutFormatCB)
         self.exportGDSLayout.setRowVisible(1, False)
         self.exportGDSLayout.setRowVisible(2, False)
         exportGroupBox.setLayout(self.exportGDSLayout)
@@ -517,7 +1114,6 @@ class klayoutLVSDialogue(QDialog):
         self.LVSRunLimitEdit = edf.longLineEdit()
         lvsRunLimitDialogueLayout.addWidget(self.LVSRunLimitEdit)
         lvsOptionsLayout.addLayout(lvsRunLimitDialogueLayout)
-        self.LVSRunLimitEdit.setText("2")
 
         implicitNetsLayout = QHBoxLayout()
         implicitNetsLayout.addWidget(edf.boldLabel("Implicit Nets:"), 2)
@@ -529,6 +1125,26 @@ class klayoutLVSDialogue(QDialog):
         implicitNetsLayout.addWidget(self.implicitNetsEdit, 5)
         lvsOptionsLayout.addLayout(implicitNetsLayout)
 
+        daemonLayout = QHBoxLayout()
+        daemonLayout.addWidget(edf.boldLabel("Use Verification Daemon:"), 2)
+        self.useDaemonBox = QCheckBox()
+        self.useDaemonBox.setToolTip(
+            "Run in the warm KLayout workers of verification_daemon.py if it "
+            "is running, otherwise start KLayout as usual."
+        )
+        daemonLayout.addWidget(self.useDaemonBox, 5)
+        lvsOptionsLayout.addLayout(daemonLayout)
+
+        batchJobLayout = QHBoxLayout()
+        batchJobLayout.addWidget(edf.boldLabel("Run as Batch Job:"), 2)
+        self.batchJobBox = QCheckBox()
+        self.batchJobBox.setToolTip(
+            "Batch jobs are started after the interactive DRC and LVS runs of "
+            "all editors and leave a slot free for them."
+        )
+        batchJobLayout.addWidget(self.batchJobBox, 5)
+        lvsOptionsLayout.addLayout(batchJobLayout)
+
         self.mainLayout.addSpacing(20)
         # LVS switches – exclusive True/False radio buttons per option
         _lvsSwitchDefs = [
@@ -561,17 +1177,23 @@ class klayoutLVSDialogue(QDialog):
             lvsSwitchesLayout.addRow(labelText + ":", btnRowLayout)
             self.lvsSwitchGroups[attr] = btnGroup
         self.mainLayout.addSpacing(10)
-        # Run mode – exclusive Deep/Flat radio buttons (in same QFormLayout for alignment)
+        # Run mode – exclusive Deep/Flat/Auto radio buttons (in same QFormLayout for alignment)
         self.runModeGroup = QButtonGroup(self)
         self.deepBtn = QRadioButton("Deep")
         self.flatBtn = QRadioButton("Flat")
+        self.autoBtn = QRadioButton("Auto")
+        self.autoBtn.setToolTip(
+            "Choose deep or flat mode from the hierarchy statistics of the layout."
+        )
         self.deepBtn.setChecked(True)
         self.runModeGroup.addButton(self.deepBtn)
         self.runModeGroup.addButton(self.flatBtn)
+        self.runModeGroup.addButton(self.autoBtn)
         runModeRowLayout = QHBoxLayout()
         runModeRowLayout.setSpacing(14)
         runModeRowLayout.addWidget(self.deepBtn)
         runModeRowLayout.addWidget(self.flatBtn)
+        runModeRowLayout.addWidget(self.autoBtn)
         runModeRowLayout.addStretch()
         lvsSwitchesLayout.addRow("Run Mode:", runModeRowLayout)
 
@@ -580,14 +1202,29 @@ class klayoutLVSDialogue(QDialog):
         lvsOptionsGroup.setLayout(lvsOptionsLayout)
         self.mainLayout.addWidget(lvsOptionsGroup)
 
+        jobStatusLayout = QHBoxLayout()
+        self.jobStatusLabel = QLabel("No LVS job.")
+        jobStatusLayout.addWidget(self.jobStatusLabel, 3)
+        self.jobProgressBar = QProgressBar()
+        self.jobProgressBar.setRange(0, 100)
+        self.jobProgressBar.setValue(0)
+        jobStatusLayout.addWidget(self.jobProgressBar, 2)
+        self.mainLayout.addLayout(jobStatusLayout)
+
         self.runButton = QPushButton("Run LVS")
+        self.cancelButton = QPushButton("Cancel Run")
+        self.cancelButton.setEnabled(False)
         self.saveButton = QPushButton("Save LVS Config")
         self.loadButton = QPushButton("Load LVS Config")
+        self.resultsButton = QPushButton("Show Results")
+        self.resultsButton.setToolTip("Show the results of the last LVS run of this cell.")
         self.closeButton = QPushButton("Close")
         self.buttonBox = QDialogButtonBox()
         self.buttonBox.addButton(self.loadButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.saveButton, QDialogButtonBox.ActionRole)
+        self.buttonBox.addButton(self.resultsButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.runButton, QDialogButtonBox.ActionRole)
+        self.buttonBox.addButton(self.cancelButton, QDialogButtonBox.ActionRole)
         self.buttonBox.addButton(self.closeButton, QDialogButtonBox.RejectRole)
         self.buttonBox.rejected.connect(self.reject)
         self.mainLayout.addWidget(self.buttonBox)
@@ -702,13 +1339,15 @@ class klayoutLVSDialogue(QDialog):
             "layoutLibName": self.layoutEditor.libName,
             "layoutCellName": self.layoutEditor.cellName,
             "layoutViewName": self.layoutEditor.viewName,
-            "lvsRunLimit": self.LVSRunLimitEdit.text().strip(),
             "lvsRunPath": self.LVSRunPathEdit.text().strip(),
             "gdsExport": 1 if self.gdsExportBox.isChecked() else 0,
             "createNetlist": self.netlistBox.isChecked(),
             "gdsUnit": Quantity(unitText).real if unitText else 0,
             "gdsPrecision": Quantity(precisionText).real if precisionText else 0,
+            "layoutFormat": self.layoutFormatCB.currentText(),
             "implicitNets": self.implicitNetsEdit.text().strip(),
+            "useDaemon": self.useDaemonBox.isChecked(),
+            "batchJob": self.batchJobBox.isChecked(),
             "lvsSwitches": lvsSwitches,
             "runMode": self.runModeGroup.checkedButton().text().lower(),
         }
@@ -727,8 +1366,6 @@ class klayoutLVSDialogue(QDialog):
             self.klayoutPathEdit.setText(settings["klayoutPath"])
         if "lvsRunPath" in settings:
             self.LVSRunPathEdit.setText(settings["lvsRunPath"])
-        if "lvsRunLimit" in settings:
-            self.LVSRunLimitEdit.setText(str(settings["lvsRunLimit"]))
         if "gdsExport" in settings:
             self.gdsExportBox.setChecked(bool(settings["gdsExport"]))
         if "createNetlist" in settings:
@@ -737,6 +1374,12 @@ class klayoutLVSDialogue(QDialog):
             self.unitEdit.setText(str(settings["gdsUnit"]))
         if "gdsPrecision" in settings and settings["gdsPrecision"]:
             self.precisionEdit.setText(str(settings["gdsPrecision"]))
+        if "layoutFormat" in settings:
+            self.layoutFormatCB.setCurrentText(settings["layoutFormat"])
+        if "useDaemon" in settings:
+            self.useDaemonBox.setChecked(bool(settings["useDaemon"]))
+        if "batchJob" in settings:
+            self.batchJobBox.setChecked(bool(settings["batchJob"]))
         if "implicitNets" in settings:
             self.implicitNetsEdit.setText(settings["implicitNets"])
         elif "implicit_nets" in settings:
@@ -760,6 +1403,8 @@ class klayoutLVSDialogue(QDialog):
                 self.deepBtn.setChecked(True)
             elif runMode == "flat":
                 self.flatBtn.setChecked(True)
+            elif runMode == "auto":
+                self.autoBtn.setChecked(True)
         self._lockLayoutSelection()
 
         # Req 11.4: Validate filesystem paths and warn for missing ones
@@ -856,12 +1501,26 @@ class klayoutLVSDialogue(QDialog):
         self.applySettings(settings)
         logger.info(f"LVS settings loaded from {filepath}")
 
-    def appendLVSOutput(self, process) -> None:
-        output = process.readAllStandardOutput().data().decode("utf-8")
+    def setJobStatus(self, job) -> None:
+        """Show the state and progress of an LVS job of this dialogue."""
+        if job.owner is not self or job.kind != "lvs":
+            return
+        self.jobStatusLabel.setText(job.status_text())
+        fraction = job.fraction()
+        if fraction is None:
+            # No stage report of an earlier run, show a busy indicator.
+            self.jobProgressBar.setRange(0, 0)
+        else:
+            self.jobProgressBar.setRange(0, 100)
+            self.jobProgressBar.setValue(int(fraction * 100))
+        self.cancelButton.setEnabled(
+            bool(verificationQueue.sharedJobQueue().ownerJobs(self, "lvs"))
+        )
+
+    def appendLVSOutput(self, output: str) -> None:
         if output.strip():
             self.console.appendPlainText(output.rstrip())
 
-    def appendLVSError(self, process) -> None:
-        error = process.readAllStandardError().data().decode("utf-8")
+    def appendLVSError(self, error: str) -> None:
         if error.strip():
             self.console.appendPlainText(f"[STDERR] {error.rstrip()}")
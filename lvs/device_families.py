@@ -0,0 +1,207 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Device families an LVS run can skip.
+
+The deck derives the recognition layers, connects and extracts the devices
+of every device family, also for a digital block with only MOS transistors
+and taps. The families below are passed to the deck in ``skip_devices``
+when both scans show none of their devices:
+
+- schematic: no device or instance of the netlist uses one of the models
+  of the family, ``.INCLUDE`` files are read as well,
+- layout: no shape is on one of the recognition layers of the family and,
+  for RF MOS transistors, no marker text is on the text layer. The layout
+  is scanned without loading it (``layout_scan.py``), all cells together.
+
+MOS transistors and taps are always extracted. A family with devices on
+either side is extracted, so an unexpected device is reported by the
+compare and not lost.
+
+Command line::
+
+    python device_families.py design.cdl design.gds
+"""
+
+import argparse
+import os
+import sys
+
+try:
+    from ..verification.layout_scan import LayoutScanError, scan_layout_layers
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from verification.layout_scan import LayoutScanError, scan_layout_layers
+
+# Families the deck can skip, in deck order.
+SKIPPABLE_FAMILIES = ("rfmos", "bjt", "diode", "res", "cap", "esd", "ind")
+# Model names, lower case, as in PREFIX_MAP of rule_decks/globals.lvs.
+FAMILY_MODELS = {
+    "rfmos": ("rfnmos", "rfnmoshv", "rfpmos", "rfpmoshv"),
+    "bjt": ("npn13g2", "npn13g2l", "npn13g2v", "pnpmpa"),
+    "diode": ("dantenna", "dpantenna", "schottky_nbl1", "isolbox"),
+    "res": ("rsil", "rppd", "rhigh", "lvsres"),
+    "cap": ("cap_cmim", "rfcmim", "sg13_hv_svaricap"),
+    "esd": (
+        "diodevdd_2kv", "diodevdd_4kv", "diodevss_2kv", "diodevss_4kv",
+        "idiodevdd_2kv", "idiodevdd_4kv", "idiodevss_2kv", "idiodevss_4kv",
+        "nmoscl_2", "nmoscl_4",
+    ),
+    "ind": ("inductor", "inductor2", "inductor3"),
+}
+# Metal resistor models are matched by prefix, like the custom reader does.
+RES_MODEL_PREFIXES = ("res_metal", "res_topmetal")
+MODEL_FAMILIES = {model: family for family, models in FAMILY_MODELS.items() for model in models}
+# (layer, datatype) of layers_definitions.lvs without which the derivations
+# of a family are empty.
+FAMILY_LAYERS = {
+    # npn: TRANS.drawing, pnp and the isolated nwell: NBuLay.drawing
+    "bjt": ((26, 0), (32, 0)),
+    "diode": ((99, 31),),
+    # Poly resistors: PolyRes.drawing, metal resistors: Metal*.res
+    "res": ((128, 0), (8, 29), (10, 29), (30, 29), (50, 29), (67, 29), (126, 29), (134, 29)),
+    # MIM capacitors: MIM.drawing, varicaps: NBuLay.drawing
+    "cap": ((36, 0), (32, 0)),
+    "esd": ((99, 30),),
+    "ind": ((27, 0),),
+}
+# Text layer and lower case text strings that mark RF MOS transistors.
+TEXT_LAYER = (63, 0)
+FAMILY_TEXTS = {
+    "rfmos": ("rfnmos", "rfnmoshv", "rfpmos", "rfpmoshv"),
+}
+INCLUDE_STATEMENTS = (".include", ".inc")
+
+
+def model_family(name):
+    """Device family of a model name, None if the family is always extracted."""
+    name = name.lower()
+    family = MODEL_FAMILIES.get(name)
+    if family is None and name.startswith(RES_MODEL_PREFIXES):
+        family = "res"
+    return family
+
+
+def _model_name(token):
+    """Model name of a netlist token: ``MODEL=`` values and CDL ``$[name]``."""
+    if "=" in token:
+        token = token.split("=", 1)[1]
+    token = token.lstrip("$")
+    if token.startswith("[") and token.endswith("]"):
+        token = token[1:-1]
+    return token.lower()
+
+
+def netlist_families(netlist_path):
+    """
+    Device families used by the devices and instances of a SPICE or CDL
+    netlist and of the files it includes.
+
+    Raises
+    ------
+    OSError
+        If the netlist or an included file cannot be read.
+    """
+    families = set()
+    pending = [os.path.abspath(netlist_path)]
+    read = set()
+    while pending:
+        path = pending.pop()
+        if path in read:
+            continue
+        read.add(path)
+        # Continuation lines continue a control or an element line.
+        control = False
+        with open(path, "r", errors="replace") as f:
+            for line in f:
+                tokens = line.split()
+                if not tokens or tokens[0].startswith("*"):
+                    continue
+                if tokens[0].startswith("+"):
+                    tokens[0] = tokens[0][1:]
+                    if control:
+                        continue
+                elif tokens[0].startswith("."):
+                    control = True
+                    if tokens[0].lower() in INCLUDE_STATEMENTS and len(tokens) > 1:
+                        include = tokens[1].strip("'\"")
+                        pending.append(os.path.join(os.path.dirname(path), include))
+                    continue
+                else:
+                    control = False
+                    tokens = tokens[1:]
+                for token in tokens:
+                    family = model_family(_model_name(token))
+                    if family is not None:
+                        families.add(family)
+    return families
+
+
+def layout_families(layout_path):
+    """
+    Device families with recognition layers or marker texts in a layout.
+
+    Raises
+    ------
+    LayoutScanError
+        If the layout cannot be scanned.
+    """
+    layers = scan_layout_layers(layout_path, text_layers=(TEXT_LAYER,))
+    texts = {text.lower() for text in layers.texts[TEXT_LAYER]}
+    families = {
+        family for family, family_layers in FAMILY_LAYERS.items()
+        if layers.shape_layers.intersection(family_layers)
+    }
+    families.update(
+        family for family, markers in FAMILY_TEXTS.items() if texts.intersection(markers)
+    )
+    return families
+
+
+def skipped_device_families(netlist_path, layout_path):
+    """
+    Return the device families the deck can skip and the reason for the log.
+
+    Returns
+    -------
+    tuple
+        ``(families, reason)``, the families in deck order.
+
+    Raises
+    ------
+    OSError
+        If the netlist cannot be read.
+    LayoutScanError
+        If the layout cannot be scanned.
+    """
+    schematic = netlist_families(netlist_path)
+    layout = layout_families(layout_path)
+    skipped = [family for family in SKIPPABLE_FAMILIES if family not in schematic | layout]
+    reason = (
+        f"schematic uses {', '.join(sorted(schematic)) or 'none'}, "
+        f"layout has {', '.join(sorted(layout)) or 'none'}"
+    )
+    return skipped, reason
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Device families an LVS run can skip.")
+    parser.add_argument("netlist", help="Schematic netlist (.cdl/.spice/.cir).")
+    parser.add_argument("layout", help="GDS or OASIS file, optionally gzipped.")
+    args = parser.parse_args()
+
+    try:
+        skipped_families, skip_reason = skipped_device_families(args.netlist, args.layout)
+    except (LayoutScanError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"{','.join(skipped_families) or '(none)'}: {skip_reason}")
+    sys.exit(0)
@@ -0,0 +1,515 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Run SG13G2 LVS on many layout/netlist pairs in parallel.
+
+Every manifest entry is run by ``run_lvs.py`` in its own run directory on a
+bounded pool of workers. Jobs that ran before are started longest first,
+using the durations stored in the batch history file. The outcomes are
+collected in one summary table and a JSON report.
+
+A manifest is a YAML or JSON list of jobs (or a mapping with a ``jobs``
+list), or a CSV file with a header row. Job keys:
+
+    name      unique job name [default: layout file stem]
+    layout    layout file (GDS/OASIS)
+    netlist   schematic netlist, omit for net-only extraction
+    topcell   top cell name
+    run_mode  flat, deep or auto
+    switches  run_lvs.py flags, e.g. ``[purge, combine_devices]`` or
+              ``{implicit_nets: "VDD,VSS"}``; in CSV a ``;`` separated
+              list of ``flag`` or ``flag=value`` items
+    timeout   job timeout in seconds
+
+Relative paths are resolved against the manifest directory.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+try:
+    from .run_lvs import (evaluate_run_outcome, _summary_status_from_outcome, RUN_SUMMARY_FILE,
+                          collect_layout_log_signals, run_summary, load_run_summary,
+                          setup_logging, build_arg_parser,
+                          main as run_lvs_main, KLayoutRunError, KLayoutSession,
+                          DaemonClient, KLayoutProbeError, check_version, probe_klayout)
+except ImportError:
+    from run_lvs import (evaluate_run_outcome, _summary_status_from_outcome, RUN_SUMMARY_FILE,
+                         collect_layout_log_signals, run_summary, load_run_summary,
+                         setup_logging, build_arg_parser,
+                         main as run_lvs_main, KLayoutRunError, KLayoutSession,
+                         DaemonClient, KLayoutProbeError, check_version, probe_klayout)
+
+LVS_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_LVS = os.path.join(LVS_DIR, "run_lvs.py")
+HISTORY_FILE = "lvs_batch_history.json"
+# Weight of the latest duration in the smoothed job duration history.
+HISTORY_WEIGHT = 0.5
+FAILED_STATUSES = ("FAIL", "ERROR", "TIMEOUT", "UNKNOWN")
+
+
+class ManifestError(ValueError):
+    """Raised for unreadable or inconsistent batch manifests."""
+
+
+def _parse_csv_switches(text):
+    switches = {}
+    for item in (text or "").split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, value = item.partition("=")
+        switches[key.strip()] = value.strip() if value else True
+    return switches
+
+
+def load_manifest(manifest_path):
+    """
+    Read a batch manifest.
+
+    Parameters
+    ----------
+    manifest_path : str
+        YAML, JSON or CSV manifest.
+
+    Returns
+    -------
+    list of dict
+        Normalized jobs with absolute paths and a unique ``name``.
+
+    Raises
+    ------
+    ManifestError
+        If the manifest cannot be read or a job is invalid.
+    """
+    suffix = os.path.splitext(manifest_path)[1].lower()
+    try:
+        with open(manifest_path, "r", newline="") as f:
+            if suffix == ".csv":
+                entries = [dict(row) for row in csv.DictReader(f)]
+                for entry in entries:
+                    entry["switches"] = _parse_csv_switches(entry.get("switches"))
+            elif suffix in (".yaml", ".yml"):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ManifestError("YAML manifests need PyYAML.") from None
+                entries = yaml.safe_load(f)
+            else:
+                entries = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Cannot read manifest {manifest_path}: {e}") from None
+
+    if isinstance(entries, dict):
+        entries = entries.get("jobs", [])
+    if not isinstance(entries, list):
+        raise ManifestError(f"Manifest {manifest_path} does not contain a job list.")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    names = set()
+    for index, entry in enumerate(entries):
+        job = {key: value for key, value in entry.items() if value not in (None, "")}
+        if "layout" not in job and "layout_netlist" not in job:
+            raise ManifestError(f"Job {index + 1} has neither layout nor layout_netlist.")
+        for key in ("layout", "netlist", "layout_netlist"):
+            if key in job:
+                job[key] = os.path.normpath(
+                    os.path.join(base_dir, os.path.expanduser(str(job[key])))
+                )
+        source = job.get("layout") or job["layout_netlist"]
+        name = str(job.get("name") or os.path.basename(source).split(".")[0])
+        if name in names:
+            name = f"{name}_{index + 1}"
+        names.add(name)
+        job["name"] = name
+        if isinstance(job.get("switches"), (list, tuple)):
+            job["switches"] = {switch: True for switch in job["switches"]}
+        job.setdefault("switches", {})
+        if "timeout" in job:
+            job["timeout"] = float(job["timeout"])
+        jobs.append(job)
+    return jobs
+
+
+def job_command(job, run_dir, python=sys.executable, klayout=None):
+    """Build the ``run_lvs.py`` command line of a job."""
+    cmd = [python, RUN_LVS, "--run_dir", run_dir]
+    if klayout:
+        cmd.extend(["--klayout", klayout])
+    for key in ("layout", "netlist", "layout_netlist", "topcell", "run_mode"):
+        if job.get(key):
+            cmd.extend([f"--{key}", str(job[key])])
+    for switch, value in job["switches"].items():
+        if value is True or str(value).lower() == "true":
+            cmd.append(f"--{switch}")
+        elif value is not False and str(value).lower() != "false":
+            cmd.extend([f"--{switch}", str(value)])
+    return cmd
+
+
+def load_history(history_path):
+    """Load the job duration history, ``{job name: seconds}``."""
+    try:
+        with open(history_path, "r") as f:
+            return json.load(f).get("durations", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_history(history_path, durations, results):
+    """Merge the durations of finished jobs into the history file."""
+    for result in results:
+        if result["status"] in ("TIMEOUT", "ERROR"):
+            continue
+        name = result["name"]
+        previous = durations.get(name)
+        seconds = result["seconds"]
+        durations[name] = round(
+            seconds if previous is None
+            else HISTORY_WEIGHT * seconds + (1.0 - HISTORY_WEIGHT) * previous,
+            3,
+        )
+    tmp_path = f"{history_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"durations": durations}, f, indent=4)
+    os.replace(tmp_path, history_path)
+
+
+def schedule_jobs(jobs, durations):
+    """
+    Order jobs longest first.
+
+    Jobs without history are started before all others, as their duration
+    is unknown; among them larger layouts go first.
+    """
+    def sort_key(job):
+        if job["name"] in durations:
+            return (1, -durations[job["name"]])
+        source = job.get("layout") or job.get("layout_netlist")
+        size = os.path.getsize(source) if source and os.path.isfile(source) else 0
+        return (0, -size)
+
+    return sorted(jobs, key=sort_key)
+
+
+def _run_in_session(cmd, run_dir, session, timeout, job_log):
+    """
+    Run a job in a KLayout session.
+
+    Returns ``(returncode, timed_out, summary)``, the summary is that of
+    :func:`run_lvs.run_summary`, None if the run did not complete.
+    """
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        session.cancel()
+
+    timer = threading.Timer(timeout, expire) if timeout else None
+    if timer is not None:
+        timer.start()
+    summary = None
+    try:
+        run_meta = run_lvs_main(run_dir, build_arg_parser().parse_args(cmd[2:]), session, job_log)
+        returncode = 0
+        summary = run_summary(run_meta, returncode)
+    except KLayoutRunError as e:
+        returncode = e.returncode
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else 1
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return returncode, timed_out.is_set(), summary
+
+
+def run_job(job, batch_dir, default_timeout=None, cancel_event=None, session=None,
+            klayout=None):
+    """
+    Run one LVS job in ``<batch_dir>/<job name>``.
+
+    The job runs in ``session`` if one is given, otherwise in its own
+    ``run_lvs.py`` process, which starts ``klayout``.
+
+    Returns
+    -------
+    dict
+        Job result with status, outcome, duration and artifact paths.
+    """
+    run_dir = os.path.join(batch_dir, job["name"])
+    os.makedirs(run_dir, exist_ok=True)
+    cmd = job_command(job, run_dir, klayout=klayout)
+    timeout = job.get("timeout", default_timeout)
+    result = {
+        "name": job["name"],
+        "layout": job.get("layout"),
+        "netlist": job.get("netlist"),
+        "topcell": job.get("topcell"),
+        "run_dir": run_dir,
+        "returncode": None,
+    }
+    if cancel_event is not None and cancel_event.is_set():
+        result.update(status="ERROR", outcome="Cancelled before start.", seconds=0.0)
+        return result
+
+    # The summary of an earlier run in this directory is not this run's.
+    try:
+        os.remove(os.path.join(run_dir, RUN_SUMMARY_FILE))
+    except FileNotFoundError:
+        pass
+    start = time.time()
+    with open(os.path.join(run_dir, "batch_job.log"), "w") as job_log:
+        if session is not None:
+            result["returncode"], timed_out, summary = _run_in_session(
+                cmd, run_dir, session, timeout, job_log
+            )
+        else:
+            proc = subprocess.Popen(cmd, stdout=job_log, stderr=subprocess.STDOUT, text=True)
+            try:
+                result["returncode"] = proc.wait(timeout=timeout)
+                timed_out = False
+                summary = load_run_summary(run_dir)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                timed_out = True
+                summary = None
+    if timed_out:
+        result.update(
+            status="TIMEOUT",
+            outcome=f"Killed after {timeout:g} s.",
+            seconds=round(time.time() - start, 3),
+        )
+        return result
+    result["seconds"] = round(time.time() - start, 3)
+
+    # run_lvs.py names its outputs after the layout, or after the dummy
+    # layout it creates for netlist-vs-netlist jobs.
+    layout_base = os.path.basename(job.get("layout") or "__layout_netlist_dummy__").split(".")[0]
+    layout_log_path = os.path.join(run_dir, f"{layout_base}.log")
+    net_only = not job.get("netlist") or bool(job["switches"].get("net_only"))
+    report_path = os.path.join(run_dir, f"{layout_base}.lvsdb")
+    if summary is not None:
+        # The outcome and the log signals the run found while KLayout ran.
+        result["outcome"] = summary["outcome"]
+        errors = summary["errors"][:3]
+    else:
+        # The run ended before its summary was written.
+        result["outcome"] = evaluate_run_outcome(
+            layout_log_path, net_only, job.get("layout_netlist"), report_path
+        )
+        _, errors = collect_layout_log_signals(layout_log_path, limit=3)
+    result["status"] = _summary_status_from_outcome(result["outcome"])
+    if result["returncode"] != 0 and result["status"] != "FAIL":
+        result["status"] = "ERROR"
+    result["errors"] = errors
+    result["report_path"] = report_path
+    return result
+
+
+def run_batch(jobs, batch_dir, workers=2, default_timeout=None, history_path=None,
+              fail_fast=False, engine="process", klayout="klayout"):
+    """
+    Run jobs on a bounded worker pool.
+
+    Parameters
+    ----------
+    jobs : list of dict
+        Jobs as returned by :func:`load_manifest`.
+    batch_dir : str
+        Batch directory, every job gets a sub-directory.
+    workers : int
+        Concurrent KLayout runs.
+    default_timeout : float or None
+        Timeout of jobs without their own ``timeout``.
+    history_path : str or None
+        Duration history used for scheduling and updated afterwards.
+    fail_fast : bool
+        Do not start new jobs after the first failure.
+    engine : str
+        ``process`` runs every job in its own ``run_lvs.py`` process,
+        ``session`` keeps one KLayout session per worker and ``daemon``
+        sends the jobs to the verification daemon.
+    klayout : str
+        KLayout executable.
+
+    Returns
+    -------
+    list of dict
+        Job results in manifest order.
+    """
+    durations = load_history(history_path) if history_path else {}
+    ordered = schedule_jobs(jobs, durations)
+    cancel_event = threading.Event()
+    worker_state = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+
+    daemon = None
+    if engine == "daemon":
+        daemon = DaemonClient()
+        if not daemon.available():
+            logging.warning("No verification daemon is running, using run_lvs.py processes.")
+            daemon = None
+
+    def run_on_worker(job):
+        session = None
+        if daemon is not None:
+            # One client per worker, cancel() only hits this worker's job.
+            session = getattr(worker_state, "session", None)
+            if session is None:
+                session = worker_state.session = DaemonClient(daemon.state)
+        elif engine == "session":
+            session = getattr(worker_state, "session", None)
+            if session is None:
+                session = worker_state.session = KLayoutSession(klayout)
+                with sessions_lock:
+                    sessions.append(session)
+        return run_job(job, batch_dir, default_timeout, cancel_event, session, klayout)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_on_worker, job): job for job in ordered}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.exception("LVS job %s failed to run.", job["name"])
+                result = {"name": job["name"], "status": "ERROR", "outcome": str(e),
+                          "seconds": 0.0, "run_dir": os.path.join(batch_dir, job["name"])}
+            results[job["name"]] = result
+            log = logging.info if result["status"] not in FAILED_STATUSES else logging.error
+            log("[%d/%d] %s: %s (%.1f s)", len(results), len(jobs), result["name"],
+                result["status"], result["seconds"])
+            if fail_fast and result["status"] in FAILED_STATUSES:
+                cancel_event.set()
+    for session in sessions:
+        session.close()
+    ordered_results = [results[job["name"]] for job in jobs]
+    if history_path:
+        save_history(history_path, durations, ordered_results)
+    return ordered_results
+
+
+def summarize_batch(results, total_time):
+    """Count job statuses and return the summary dict of the JSON report."""
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "jobs": len(results),
+        "status_counts": counts,
+        "failed": [r["name"] for r in results if r["status"] in FAILED_STATUSES],
+        "total_seconds": round(total_time, 3),
+        "job_seconds": round(sum(r["seconds"] for r in results), 3),
+    }
+
+
+def emit_batch_table(results):
+    """Log one row per job."""
+    name_width = max([len("Job")] + [len(r["name"]) for r in results])
+    header = f"| {'Job':<{name_width}} | {'Status':<8} | {'Time (s)':>9} | Outcome"
+    border = "+" + "-" * (len(header) + 40)
+    logging.info(border)
+    logging.info(header)
+    logging.info(border)
+    for r in results:
+        logging.info(
+            "| %s | %s | %9.1f | %s",
+            r["name"].ljust(name_width), r["status"].ljust(8), r["seconds"], r["outcome"],
+        )
+    logging.info(border)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SG13G2 LVS jobs of a manifest in parallel.")
+    parser.add_argument("manifest", help="YAML, JSON or CSV job manifest.")
+    parser.add_argument("--run_dir", type=str, default=None, help="Batch run directory.")
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+        help="Concurrent KLayout runs. [default: half the CPU count]",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="Default job timeout in seconds.")
+    parser.add_argument(
+        "--history", type=str, default=None,
+        help=f"Job duration history. [default: {HISTORY_FILE} next to the manifest]",
+    )
+    parser.add_argument("--report", type=str, default=None, help="JSON report path.")
+    parser.add_argument("--fail_fast", action="store_true", help="Stop starting jobs after a failure.")
+    parser.add_argument(
+        "--engine", type=str, choices=["process", "session", "daemon"], default="process",
+        help=(
+            "One run_lvs.py process per job, one KLayout session per worker, or "
+            "the verification daemon. [default: process]"
+        ),
+    )
+    parser.add_argument("--klayout", type=str, default="klayout", help="KLayout executable.")
+    args = parser.parse_args()
+
+    now_str = datetime.now(timezone.utc).strftime("lvs_batch_%Y_%m_%d_%H_%M_%S")
+    if args.run_dir in ["pwd", "", None]:
+        batch_run_dir = os.path.join(os.path.abspath(os.getcwd()), now_str)
+    else:
+        batch_run_dir = os.path.abspath(args.run_dir)
+    os.makedirs(batch_run_dir, exist_ok=True)
+    setup_logging(batch_run_dir, now_str)
+
+    try:
+        batch_jobs = load_manifest(args.manifest)
+    except ManifestError as e:
+        logging.error(str(e))
+        raise SystemExit(2)
+    # Probed once here, the runs of the jobs find the probe in the cache.
+    try:
+        capabilities = probe_klayout(args.klayout)
+    except KLayoutProbeError as e:
+        logging.error(str(e))
+        raise SystemExit(2)
+    version_problem = check_version(capabilities)
+    if version_problem:
+        logging.error(version_problem)
+        raise SystemExit(2)
+    logging.info("Using %s (%s).", capabilities.version_text, capabilities.executable)
+    history = args.history or os.path.join(
+        os.path.dirname(os.path.abspath(args.manifest)), HISTORY_FILE
+    )
+    logging.info("Running %d LVS jobs on %d workers.", len(batch_jobs), args.workers)
+
+    t0 = time.time()
+    batch_results = run_batch(batch_jobs, batch_run_dir, args.workers, args.timeout,
+                              history, args.fail_fast, args.engine, args.klayout)
+    summary = summarize_batch(batch_results, time.time() - t0)
+    emit_batch_table(batch_results)
+    logging.info(
+        "%d jobs, %s, %.1f s wall time, %.1f s job time.",
+        summary["jobs"],
+        ", ".join(f"{count} {status}" for status, count in sorted(summary["status_counts"].items())),
+        summary["total_seconds"], summary["job_seconds"],
+    )
+
+    report_path = args.report or os.path.join(batch_run_dir, "lvs_batch_report.json")
+    with open(report_path, "w") as f:
+        json.dump({"summary": summary, "jobs": batch_results}, f, indent=4)
+    logging.info("Batch report written to %s", report_path)
+
+    if summary["failed"]:
+        raise SystemExit(1)
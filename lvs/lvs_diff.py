@@ -0,0 +1,673 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Structural diff of two LVS results.
+
+Two ``.lvsdb`` files, or their binary indexes (``lvsdb_index.py``), are
+aligned by cell and every circuit pair gets a signature: a hash of the
+bytes of its layout cell, its schematic cell and its cross-reference,
+taken while the streaming scan (``lvsdb_stream.py``) skips them. Pairs
+with the same signature in both results are unchanged and skipped without
+reading them. Only the changed pairs are read and compared by name:
+
+- nets, by schematic name or else layout name, with their match status,
+- pins, by name, with their match status,
+- devices, by schematic name or else type and terminal nets, with their
+  match status and the parameters of both sides. A device with both
+  sides that does not match and has a parameter with different values on
+  the two sides is a parameter mismatch; without one it is only reported
+  as a device that is now mismatched.
+
+The signatures and the compared cells are added to the index of each
+database, so a later diff against the same result does not scan it again
+and a result can be compared from its index after the ``.lvsdb`` is gone.
+The diff is written as JSON and as text lines.
+
+Command line::
+
+    python lvs_diff.py old/design.lvsdb new/design.lvsdb --json design_lvs_diff.json
+    python lvs_diff.py old/design.lvsdb.idx new/design.lvsdb
+    python lvs_diff.py design.lvsdb --index
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+
+try:
+    from .lvsdb_index import (INDEX_SUFFIX, LVSDBIndex, LVSDBIndexError, index_path,
+                              open_index, update_index)
+    from .lvsdb_stream import MATCH_STATUSES, LVSDBReader, LVSDBStreamError
+except ImportError:
+    from lvsdb_index import (INDEX_SUFFIX, LVSDBIndex, LVSDBIndexError, index_path,
+                             open_index, update_index)
+    from lvsdb_stream import MATCH_STATUSES, LVSDBReader, LVSDBStreamError
+
+REPORT_VERSION = 1
+SIGNATURE_SIZE = 16
+# Index keys of the scan and of the compared cells.
+SCAN_KEY = "lvs_diff.scan"
+CELL_KEY = "lvs_diff.cell\x1f"
+# Names listed per category in the text diff.
+TEXT_LIMIT = 10
+# Relative difference below which parameter values are equal, absorbs the
+# rounding of the values written to the .lvsdb.
+PARAM_TOLERANCE = 1e-9
+
+
+class LVSDiffError(ValueError):
+    """Raised if an LVS result cannot be read for a diff."""
+
+
+class SignatureReader(LVSDBReader):
+    """
+    :class:`LVSDBReader` that also hashes every cell and circuit pair it
+    skips while scanning.
+
+    Attributes
+    ----------
+    layout_digests, schematic_digests, crossref_digests : dict
+        Cell or pair name to the digest of its bytes.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.layout_digests = {}
+        self.schematic_digests = {}
+        self.crossref_digests = {}
+
+    def _on_layout_cell(self, scanner, offset):
+        scanner.start_digest(hashlib.blake2b(digest_size=SIGNATURE_SIZE))
+        name = self._cell_name(scanner)
+        self.layout_offsets[name] = offset
+        scanner.skip()
+        self.layout_digests[name] = scanner.end_digest().digest()
+
+    def _on_schematic_cell(self, scanner, offset):
+        scanner.start_digest(hashlib.blake2b(digest_size=SIGNATURE_SIZE))
+        name = self._cell_name(scanner)
+        self.schematic_offsets[name] = offset
+        scanner.skip()
+        self.schematic_digests[name] = scanner.end_digest().digest()
+
+    def _on_crossref(self, scanner, offset):
+        scanner.start_digest(hashlib.blake2b(digest_size=SIGNATURE_SIZE))
+        super()._on_crossref(scanner, offset)
+        digest = scanner.end_digest().digest()
+        # The pair read last is the one at ``offset``.
+        name = next(reversed(self._crossref_offsets))
+        self.crossref_digests[name] = digest
+
+    def signatures(self):
+        """
+        Signature of every circuit pair and of every cell without a pair.
+
+        Returns
+        -------
+        dict
+            Pair name to ``(signature, status)``, the name is the layout
+            cell name or else the schematic cell name.
+        """
+        pairs = {}
+        paired_layout = set()
+        paired_schematic = set()
+        for name, entry in self.crossrefs.items():
+            layout_name, schematic_name = entry["layout_name"], entry["schematic_name"]
+            paired_layout.add(layout_name)
+            paired_schematic.add(schematic_name)
+            digest = hashlib.blake2b(digest_size=SIGNATURE_SIZE)
+            for part in (self.layout_digests.get(layout_name),
+                         self.schematic_digests.get(schematic_name),
+                         self.crossref_digests.get(name)):
+                digest.update(part or b"-")
+            pairs[name] = (digest.digest(), entry["status"])
+        # Net-only results have no cross-reference.
+        for name, digest in self.layout_digests.items():
+            if name not in paired_layout:
+                pairs[name] = (digest, None)
+        for name, digest in self.schematic_digests.items():
+            if name not in paired_schematic and name not in pairs:
+                pairs[name] = (digest, None)
+        return pairs
+
+
+def _status_key(status):
+    return "match" if status in MATCH_STATUSES else status
+
+
+def _net_names(cell):
+    return {net["net_id"]: net["name"] for net in cell["nets"]} if cell else {}
+
+
+def _device_key(device, net_names):
+    terminals = ",".join(
+        f"{terminal}={net_names.get(net) or '$' + str(net)}"
+        for terminal, net in sorted(device["terminals"].items())
+    )
+    return f"{device['type']}({terminals})"
+
+
+def cell_record(reader, name):
+    """
+    Nets, pins and devices of a circuit pair or an unpaired cell, keyed by
+    names that are stable between runs.
+
+    Parameters
+    ----------
+    reader : LVSDBReader
+        Scanned reader of the database.
+    name : str
+        Pair or cell name as in :meth:`SignatureReader.signatures`.
+
+    Returns
+    -------
+    dict
+        ``status``, ``nets`` and ``pins`` (name to status), ``devices``
+        (key to ``[type, status, layout params, schematic params]``).
+    """
+    crossref = reader.get_crossref(name)
+    if crossref is not None:
+        layout_name, schematic_name = crossref["layout_name"], crossref["schematic_name"]
+        status = crossref["status"]
+    else:
+        layout_name = name if name in reader.layout_offsets else None
+        schematic_name = name if layout_name is None else None
+        status = None
+    layout = reader.layout_cell(layout_name) if layout_name else None
+    schematic = reader.schematic_cell(schematic_name) if schematic_name else None
+    layout_nets, schematic_nets = _net_names(layout), _net_names(schematic)
+    layout_pins = {pin["pin_id"]: pin["name"] for pin in layout["pins"]} if layout else {}
+    schematic_pins = (
+        {pin["pin_id"]: pin["name"] for pin in schematic["pins"]} if schematic else {}
+    )
+    layout_devices = {device["id"]: device for device in layout["devices"]} if layout else {}
+    schematic_devices = (
+        {device["id"]: device for device in schematic["devices"]} if schematic else {}
+    )
+
+    record = {"status": status, "nets": {}, "pins": {}, "devices": {}}
+    if crossref is None:
+        # Unpaired cell, everything is unmatched.
+        for net_name in list(layout_nets.values()) + list(schematic_nets.values()):
+            if net_name:
+                record["nets"][net_name] = None
+        for pin_name in list(layout_pins.values()) + list(schematic_pins.values()):
+            if pin_name:
+                record["pins"][pin_name] = None
+        for device in layout_devices.values():
+            record["devices"][_device_key(device, layout_nets)] = [
+                device["type"], None, device["params"], None]
+        for device in schematic_devices.values():
+            key = device["name"] or _device_key(device, schematic_nets)
+            record["devices"][key] = [device["type"], None, None, device["params"]]
+        return record
+
+    mapping = crossref["mapping"]
+    for entry in mapping["nets"]:
+        key = (schematic_nets.get(entry["schematic"]) or layout_nets.get(entry["layout"])
+               or f"${entry['layout'] or entry['schematic']}")
+        record["nets"][key] = entry["status"]
+    for entry in mapping["pins"]:
+        key = (schematic_pins.get(entry["schematic"]) or layout_pins.get(entry["layout"])
+               or f"${entry['layout'] or entry['schematic']}")
+        record["pins"][key] = entry["status"]
+    for entry in mapping["devices"]:
+        layout_device = layout_devices.get(entry["layout"])
+        schematic_device = schematic_devices.get(entry["schematic"])
+        if schematic_device is not None and schematic_device["name"]:
+            key = schematic_device["name"]
+        elif layout_device is not None:
+            key = _device_key(layout_device, layout_nets)
+        elif schematic_device is not None:
+            key = _device_key(schematic_device, schematic_nets)
+        else:
+            continue
+        record["devices"][key] = [
+            (schematic_device or layout_device)["type"],
+            entry["status"],
+            layout_device["params"] if layout_device else None,
+            schematic_device["params"] if schematic_device else None,
+        ]
+    return record
+
+
+class DiffSource:
+    """
+    One side of a diff: an ``.lvsdb`` with its index, or an index alone.
+
+    Parameters
+    ----------
+    path : str or path
+        The ``.lvsdb`` or its ``.lvsdb.idx``.
+    use_index : bool
+        Read and update the index, else always scan the database.
+    """
+
+    def __init__(self, path, use_index=True):
+        path = os.fspath(path)
+        if path.endswith(INDEX_SUFFIX):
+            path = path[:-len(INDEX_SUFFIX)]
+        self.path = path
+        self.use_index = use_index
+        self.pairs = {}
+        self.top_cell = None
+        self.from_index = False
+        self._index = None
+        self._reader = None
+        self._records = {}
+        self._new_entries = {}
+
+    def open(self):
+        """
+        Read the signatures from the index, or else scan the database.
+
+        Returns
+        -------
+        DiffSource
+            self
+
+        Raises
+        ------
+        LVSDiffError
+            If neither the database nor an index with signatures is readable.
+        """
+        if os.path.isfile(self.path):
+            if self.use_index:
+                self._index = open_index(self.path)
+            if self._index is not None and SCAN_KEY in self._index:
+                self._load_scan(self._index.get(SCAN_KEY))
+                self._reader = LVSDBReader(self.path)
+                self._reader.layout_offsets = dict(self._scan["layout_offsets"])
+                self._reader.schematic_offsets = dict(self._scan["schematic_offsets"])
+                self._reader._crossref_offsets = dict(self._scan["crossref_offsets"])
+                self._reader.crossrefs = dict(self._scan["crossrefs"])
+                self._reader.top_cell = self.top_cell
+                self._reader._scanned = True
+            else:
+                self._scan_database()
+            return self
+        try:
+            # The database is gone, its index is used as it is.
+            self._index = LVSDBIndex(index_path(self.path))
+        except (OSError, LVSDBIndexError) as e:
+            raise LVSDiffError(f"{self.path}: no LVS database or readable index ({e}).") from None
+        if SCAN_KEY not in self._index:
+            raise LVSDiffError(
+                f"{index_path(self.path)}: index without diff signatures, "
+                "write them with lvs_diff.py --index while the database exists."
+            )
+        self._load_scan(self._index.get(SCAN_KEY))
+        return self
+
+    def _load_scan(self, scan):
+        self._scan = scan
+        self.top_cell = scan["top_cell"]
+        self.pairs = {name: (signature, status)
+                      for name, (signature, status) in scan["pairs"].items()}
+        self.from_index = True
+
+    def _scan_database(self):
+        try:
+            reader = SignatureReader(self.path).scan()
+        except (LVSDBStreamError, OSError) as e:
+            raise LVSDiffError(f"{self.path}: {e}") from None
+        self._reader = reader
+        self.top_cell = reader.top_cell
+        self.pairs = reader.signatures()
+        self._new_entries[SCAN_KEY] = {
+            "top_cell": reader.top_cell,
+            "pairs": {name: list(pair) for name, pair in self.pairs.items()},
+            "layout_offsets": reader.layout_offsets,
+            "schematic_offsets": reader.schematic_offsets,
+            "crossref_offsets": reader._crossref_offsets,
+            "crossrefs": reader.crossrefs,
+        }
+
+    def record(self, name):
+        """Cell record of a pair, see :func:`cell_record`, None if not available."""
+        if name in self._records:
+            return self._records[name]
+        record = None
+        if self._index is not None and CELL_KEY + name in self._index:
+            record = self._index.get(CELL_KEY + name)
+        elif self._reader is not None:
+            try:
+                record = cell_record(self._reader, name)
+            except (LVSDBStreamError, OSError) as e:
+                raise LVSDiffError(f"{self.path}: {e}") from None
+            self._new_entries[CELL_KEY + name] = record
+        self._records[name] = record
+        return record
+
+    def index_all(self):
+        """Read every pair, so that the index can stand in for the database."""
+        for name in self.pairs:
+            self.record(name)
+
+    def close(self, write_index=True):
+        """
+        Close the index and add the new signatures and cell records to it.
+
+        Returns
+        -------
+        str or None
+            Path of the index if it was written.
+        """
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if not (write_index and self.use_index and self._new_entries
+                and os.path.isfile(self.path)):
+            return None
+        path = update_index(self.path, self._new_entries)
+        self._new_entries = {}
+        return path
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close(write_index=exc_type is None)
+        except (OSError, ValueError):
+            if exc_type is None:
+                raise
+
+
+def _changed_keys(old, new):
+    """Keys of both dicts split into added, removed and common."""
+    return (sorted(new.keys() - old.keys()), sorted(old.keys() - new.keys()),
+            sorted(old.keys() & new.keys()))
+
+
+def _param_pair(device):
+    _, _, layout_params, schematic_params = device
+    return {"layout": layout_params, "schematic": schematic_params}
+
+
+def _values_differ(layout_value, schematic_value):
+    if isinstance(layout_value, (int, float)) and isinstance(schematic_value, (int, float)):
+        return not math.isclose(layout_value, schematic_value, rel_tol=PARAM_TOLERANCE)
+    return layout_value != schematic_value
+
+
+def _parameter_mismatch(device):
+    """True for a non-matching device with a parameter that differs between the sides."""
+    _, status, layout_params, schematic_params = device
+    if layout_params is None or schematic_params is None or status in MATCH_STATUSES:
+        return False
+    schematic_values = {name.upper(): value for name, value in schematic_params.items()}
+    return any(
+        _values_differ(value, schematic_values[name.upper()])
+        for name, value in layout_params.items()
+        if name.upper() in schematic_values
+    )
+
+
+def diff_records(old, new):
+    """
+    Structural differences of a pair between two results.
+
+    Returns
+    -------
+    dict
+        Only the categories with differences: ``status`` (``[old, new]``),
+        ``nets_added``, ``nets_removed``, ``nets_now_mismatched``,
+        ``nets_now_matched``, the same for ``pins`` and ``devices``,
+        ``devices_params_changed`` (device key to the ``old`` and ``new``
+        parameters of both sides), ``parameter_mismatches_new`` and
+        ``parameter_mismatches_resolved`` (device key to the parameters of
+        both sides).
+    """
+    diff = {}
+    if old["status"] != new["status"]:
+        diff["status"] = [old["status"], new["status"]]
+    for category in ("nets", "pins", "devices"):
+        old_items, new_items = old[category], new[category]
+        added, removed, common = _changed_keys(old_items, new_items)
+        if category == "devices":
+            old_status = {key: old_items[key][1] for key in common}
+            new_status = {key: new_items[key][1] for key in common}
+        else:
+            old_status, new_status = old_items, new_items
+        now_mismatched = [key for key in common
+                          if _status_key(old_status[key]) == "match"
+                          and _status_key(new_status[key]) != "match"]
+        now_matched = [key for key in common
+                       if _status_key(old_status[key]) != "match"
+                       and _status_key(new_status[key]) == "match"]
+        for suffix, keys in (("added", added), ("removed", removed),
+                             ("now_mismatched", now_mismatched), ("now_matched", now_matched)):
+            if keys:
+                diff[f"{category}_{suffix}"] = keys
+    old_devices, new_devices = old["devices"], new["devices"]
+    params_changed = {
+        key: {"old": _param_pair(old_devices[key]), "new": _param_pair(device)}
+        for key, device in new_devices.items()
+        if key in old_devices and old_devices[key][2:] != device[2:]
+    }
+    if params_changed:
+        diff["devices_params_changed"] = dict(sorted(params_changed.items()))
+    new_mismatches = {
+        key: _param_pair(device) for key, device in new_devices.items()
+        if _parameter_mismatch(device)
+        and (key not in old_devices or not _parameter_mismatch(old_devices[key])
+             or old_devices[key][2:] != device[2:])
+    }
+    resolved = {
+        key: _param_pair(device) for key, device in old_devices.items()
+        if _parameter_mismatch(device)
+        and (key not in new_devices or not _parameter_mismatch(new_devices[key]))
+    }
+    if new_mismatches:
+        diff["parameter_mismatches_new"] = dict(sorted(new_mismatches.items()))
+    if resolved:
+        diff["parameter_mismatches_resolved"] = dict(sorted(resolved.items()))
+    return diff
+
+
+def diff_results(old_path, new_path, use_index=True, index_all=False):
+    """
+    Diff two LVS results.
+
+    Parameters
+    ----------
+    old_path, new_path : str or path
+        ``.lvsdb`` files or their ``.lvsdb.idx`` indexes.
+    use_index : bool
+        Read signatures and cells from the indexes and add new ones to them.
+    index_all : bool
+        Also index the unchanged pairs of the new result, so that it can be
+        compared from its index alone.
+
+    Returns
+    -------
+    dict
+        ``old``, ``new``, ``top_cell``, ``summary`` with the pair counts,
+        ``added`` and ``removed`` pairs with their status, and ``changed``
+        pairs with their :func:`diff_records` differences, or ``details``
+        False where a side has no cell record.
+
+    Raises
+    ------
+    LVSDiffError
+        If a result cannot be read.
+    """
+    with DiffSource(old_path, use_index) as old, DiffSource(new_path, use_index) as new:
+        added, removed, common = _changed_keys(old.pairs, new.pairs)
+        changed = {}
+        unchanged = 0
+        structural = 0
+        for name in common:
+            if old.pairs[name][0] == new.pairs[name][0]:
+                unchanged += 1
+                continue
+            old_record, new_record = old.record(name), new.record(name)
+            if old_record is None or new_record is None:
+                changed[name] = {"status": [old.pairs[name][1], new.pairs[name][1]],
+                                 "details": False}
+                structural += 1
+                continue
+            differences = diff_records(old_record, new_record)
+            if differences:
+                changed[name] = differences
+                structural += 1
+        if index_all:
+            new.index_all()
+        return {
+            "version": REPORT_VERSION,
+            "old": old.path,
+            "new": new.path,
+            "top_cell": new.top_cell or old.top_cell,
+            "summary": {
+                "pairs_old": len(old.pairs),
+                "pairs_new": len(new.pairs),
+                "unchanged": unchanged,
+                # Different bytes, e.g. moved shapes, but the same structure.
+                "changed_layout_only": len(common) - unchanged - structural,
+                "changed": structural,
+                "added": len(added),
+                "removed": len(removed),
+                "from_index": [old.from_index, new.from_index],
+            },
+            "added": {name: new.pairs[name][1] for name in added},
+            "removed": {name: old.pairs[name][1] for name in removed},
+            "changed": changed,
+        }
+
+
+def has_differences(diff):
+    """True if the diff has added, removed or structurally changed pairs."""
+    return bool(diff["added"] or diff["removed"] or diff["changed"])
+
+
+def diff_summary_text(diff):
+    """One line summary of a diff for run summaries."""
+    summary = diff["summary"]
+    return (
+        f"{summary['changed']} changed, {summary['added']} added, {summary['removed']} removed, "
+        f"{summary['unchanged']} unchanged"
+    )
+
+
+def _names_text(names):
+    names = list(names)
+    text = ", ".join(names[:TEXT_LIMIT])
+    if len(names) > TEXT_LIMIT:
+        text += f" ... ({len(names) - TEXT_LIMIT} more)"
+    return text
+
+
+def _params_text(params):
+    pair = []
+    for side in ("layout", "schematic"):
+        values = params[side] or {}
+        pair.append(" ".join(f"{name}={value}" for name, value in sorted(values.items())))
+    return f"layout {pair[0] or '-'} / schematic {pair[1] or '-'}"
+
+
+def format_diff(diff):
+    """Format a diff as text lines."""
+    summary = diff["summary"]
+    lines = [
+        f"LVS diff {diff['old']} -> {diff['new']}",
+        f"Pairs: {summary['pairs_old']} -> {summary['pairs_new']}, {diff_summary_text(diff)}, "
+        f"{summary['changed_layout_only']} changed in layout bytes only",
+    ]
+    for name, status in diff["added"].items():
+        lines.append(f"+ {name} ({status or 'unpaired'})")
+    for name, status in diff["removed"].items():
+        lines.append(f"- {name} ({status or 'unpaired'})")
+    for name, differences in diff["changed"].items():
+        status = differences.get("status")
+        status_text = f": {status[0] or 'unpaired'} -> {status[1] or 'unpaired'}" if status else ""
+        lines.append(f"~ {name}{status_text}")
+        if differences.get("details") is False:
+            lines.append("    cell details not available in the index")
+            continue
+        for category in ("nets", "pins", "devices"):
+            for suffix, label in (("added", "added"), ("removed", "removed"),
+                                  ("now_mismatched", "now mismatched"),
+                                  ("now_matched", "now matched")):
+                keys = differences.get(f"{category}_{suffix}")
+                if keys:
+                    lines.append(f"    {category} {label}: {_names_text(keys)}")
+        params_changed = differences.get("devices_params_changed")
+        if params_changed:
+            lines.append(f"    devices with changed parameters: {_names_text(params_changed)}")
+        for suffix, label in (("new", "new parameter mismatches"),
+                              ("resolved", "resolved parameter mismatches")):
+            mismatches = differences.get(f"parameter_mismatches_{suffix}")
+            if not mismatches:
+                continue
+            lines.append(f"    {label}:")
+            for key in list(mismatches)[:TEXT_LIMIT]:
+                lines.append(f"      {key}: {_params_text(mismatches[key])}")
+            if len(mismatches) > TEXT_LIMIT:
+                lines.append(f"      ... ({len(mismatches) - TEXT_LIMIT} more)")
+    if not has_differences(diff):
+        lines.append("No structural differences.")
+    return lines
+
+
+def write_diff_report(path, diff):
+    """Write a diff as JSON."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(diff, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_diff_index(lvsdb_path):
+    """
+    Add the signatures and the record of every pair to the index of an
+    ``.lvsdb``, so that it can be compared after the database is removed.
+
+    Returns
+    -------
+    str or None
+        Path of the index.
+    """
+    with DiffSource(lvsdb_path) as source:
+        source.index_all()
+    return index_path(source.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Structural diff of two LVS results.")
+    parser.add_argument("old", help="Earlier .lvsdb or its .lvsdb.idx index.")
+    parser.add_argument("new", nargs="?", default=None, help="Later .lvsdb or its index.")
+    parser.add_argument("--json", default=None, help="Also write the diff to this file.")
+    parser.add_argument("--no_index", action="store_true",
+                        help="Scan the databases, do not read or write their indexes.")
+    parser.add_argument("--index", action="store_true",
+                        help="Index every pair of the result, the new one if two are given.")
+    args = parser.parse_args()
+
+    try:
+        if args.new is None:
+            if not args.index:
+                parser.error("a second result is needed unless --index is given")
+            print(write_diff_index(args.old))
+            sys.exit(0)
+        lvs_diff = diff_results(args.old, args.new, use_index=not args.no_index,
+                                index_all=args.index)
+        print("\n".join(format_diff(lvs_diff)))
+        if args.json:
+            write_diff_report(args.json, lvs_diff)
+    except (LVSDiffError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(1 if has_differences(lvs_diff) else 0)
@@ -0,0 +1,150 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Structured results of an SG13G2 LVS run.
+
+The outcome is read from the ``.lvsdb`` the deck writes, not from the
+KLayout log: the extracted netlist, the schematic netlist and the
+cross-reference with the match status of every circuit pair.
+"""
+
+import os
+
+import klayout.db
+
+MATCH_STATUSES = ("Match", "MatchWithWarning")
+
+
+def _status_name(status):
+    """Return the name of a NetlistCrossReference status, e.g. ``Match``."""
+    return str(status).split(".")[-1]
+
+
+def _circuit_name(circuit):
+    return circuit.name if circuit is not None else None
+
+
+class LvsResult:
+    """
+    Results of one LVS run.
+
+    Parameters
+    ----------
+    report_path : str
+        Path of the ``.lvsdb`` written by the run.
+    """
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self.lvsdb = klayout.db.LayoutVsSchematic()
+        self.lvsdb.read(report_path)
+
+    @property
+    def netlist(self):
+        """Extracted layout netlist (``klayout.db.Netlist``)."""
+        return self.lvsdb.netlist()
+
+    @property
+    def reference(self):
+        """Schematic netlist, None for net-only runs."""
+        return self.lvsdb.reference
+
+    @property
+    def xref(self):
+        """Netlist cross-reference, None for net-only runs."""
+        return self.lvsdb.xref()
+
+    @property
+    def compared(self):
+        return self.reference is not None and self.xref is not None
+
+    def circuit_pairs(self):
+        """
+        Match status of every layout/schematic circuit pair.
+
+        Returns
+        -------
+        list of dict
+            ``{"layout", "schematic", "status"}``, a side is None for
+            circuits without counterpart.
+        """
+        if not self.compared:
+            return []
+        return [
+            {
+                "layout": _circuit_name(pair.first()),
+                "schematic": _circuit_name(pair.second()),
+                "status": _status_name(pair.status()),
+            }
+            for pair in self.xref.each_circuit_pair()
+        ]
+
+    @property
+    def matched(self):
+        """True if every circuit pair matches, None for net-only runs."""
+        if not self.compared:
+            return None
+        pairs = self.circuit_pairs()
+        return bool(pairs) and all(pair["status"] in MATCH_STATUSES for pair in pairs)
+
+    @property
+    def status(self):
+        """``PASS``, ``FAIL`` or ``NET_ONLY``."""
+        matched = self.matched
+        if matched is None:
+            return "NET_ONLY"
+        return "PASS" if matched else "FAIL"
+
+    def outcome(self):
+        """Outcome text in the wording of ``run_lvs.evaluate_run_outcome``."""
+        status = self.status
+        if status == "NET_ONLY":
+            return "NET_ONLY mode: extracted netlist generated from layout only."
+        if status == "PASS":
+            return "Comparison mode: PASS (netlists match)."
+        return "Comparison mode: FAIL (netlists do not match)."
+
+    def mismatched_circuits(self):
+        """Circuit pairs that do not match."""
+        return [
+            pair for pair in self.circuit_pairs() if pair["status"] not in MATCH_STATUSES
+        ]
+
+    def summary(self):
+        """JSON-serializable summary of the run."""
+        netlist = self.netlist
+        return {
+            "report_path": self.report_path,
+            "status": self.status,
+            "circuits": netlist.circuit_count() if netlist is not None else 0,
+            "top_circuit": (
+                _circuit_name(next(iter(netlist.each_circuit_top_down()), None))
+                if netlist is not None else None
+            ),
+            "mismatched_circuits": self.mismatched_circuits(),
+        }
+
+
+def read_lvs_result(report_path):
+    """
+    Read an LVS report, return None if it is missing or unreadable.
+
+    Parameters
+    ----------
+    report_path : str or None
+        Path of the ``.lvsdb``.
+    """
+    if not report_path or not os.path.isfile(report_path):
+        return None
+    try:
+        return LvsResult(report_path)
+    except (OSError, RuntimeError):
+        return None
@@ -0,0 +1,248 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Reuse the LVS results of unchanged subcells.
+
+A subcell fingerprint combines
+
+- the layout digest of the cell and everything below it,
+- the schematic digest of the ``.SUBCKT`` of the same name and the
+  subcircuits it instantiates,
+- the digest of the deck files and of the switches of the run.
+
+Subcells whose circuit pair matched in a previous run with the same
+fingerprint are passed to the deck in ``blank_circuits``. The deck compares
+them by their pins only. A change in a subcell changes the fingerprints of
+the cell and of all its parents, so these are compared in full.
+
+The fingerprints of matched subcells are kept in a JSON file, by default
+one per layout file in the user cache directory, see
+:func:`default_reuse_db`. Run directories are new for every run, the
+results of a run are reused by the next run of the same layout.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+
+try:
+    from .netlist_cache import split_subckts
+except ImportError:
+    from netlist_cache import split_subckts
+try:
+    from ..verification.layout_scan import LayoutScanError, gds_cell_digests, is_oasis
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from verification.layout_scan import LayoutScanError, gds_cell_digests, is_oasis
+
+REUSE_FILE = "lvs_reuse.json"
+REUSE_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "revolution-eda",
+    "lvs_reuse",
+)
+REUSE_VERSION = 1
+# Switches that name run artefacts and do not change the comparison.
+IGNORED_SWITCHES = ("input", "schematic", "report", "target_netlist", "topcell",
+                    "blank_circuits", "layout_netlist")
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _deep_digests(own, children):
+    """Combine own digests along the hierarchy, ``children`` maps to child names."""
+    deep = {}
+
+    def visit(name, path):
+        if name in deep:
+            return deep[name]
+        if name in path or name not in own:
+            # Undefined (ghost) cells and cycles only contribute their name.
+            return _sha256("undefined", name)
+        child_digests = sorted(
+            f"{child}={visit(child, path | {name})}" for child in children.get(name, ())
+        )
+        deep[name] = _sha256(own[name], *child_digests)
+        return deep[name]
+
+    for name in own:
+        visit(name, frozenset())
+    return deep
+
+
+def _klayout_cell_digests(layout_path):
+    import klayout.db
+
+    layout = klayout.db.Layout()
+    layout.read(layout_path)
+    own = {}
+    children = {}
+    for cell in layout.each_cell():
+        parts = []
+        for layer_index in layout.layer_indexes():
+            shapes = sorted(str(shape) for shape in cell.shapes(layer_index).each())
+            if shapes:
+                parts.append(f"{layout.get_info(layer_index)}:{';'.join(shapes)}")
+        instances = sorted(
+            f"{layout.cell(inst.cell_index).name}:{inst.cell_inst}" for inst in cell.each_inst()
+        )
+        own[cell.name] = _sha256(*parts, *instances)
+        children[cell.name] = {layout.cell(index).name for index in cell.each_child_cell()}
+    return own, children
+
+
+def layout_cell_digests(layout_path):
+    """
+    Digest of every layout cell including its subcells.
+
+    GDS files are hashed record by record without loading the layout,
+    OASIS files are read with KLayout.
+    """
+    try:
+        if not is_oasis(layout_path):
+            hierarchy, own = gds_cell_digests(layout_path)
+            return _deep_digests(own, hierarchy.children)
+    except LayoutScanError:
+        pass
+    return _deep_digests(*_klayout_cell_digests(layout_path))
+
+
+def _logical_lines(block):
+    """Netlist lines with continuations joined and comments removed."""
+    lines = []
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("*"):
+            continue
+        if stripped.startswith("+") and lines:
+            lines[-1] += " " + stripped[1:].strip()
+        else:
+            lines.append(stripped)
+    return lines
+
+
+def schematic_subckt_digests(netlist_path):
+    """Digest of every ``.SUBCKT`` of a netlist including the subcircuits it uses."""
+    with open(netlist_path, "r") as f:
+        parts = split_subckts(f.read())
+    blocks = {part[0]: _logical_lines(part[1]) for part in parts if isinstance(part, tuple)}
+    own = {}
+    children = {}
+    for name, lines in blocks.items():
+        own[name] = _sha256(*(line.upper() for line in lines))
+        used = set()
+        for line in lines[1:]:
+            if line[:1].upper() == "X":
+                used.update(
+                    token.upper() for token in line.split()[1:] if token.upper() in blocks
+                )
+        children[name] = used
+    return _deep_digests(own, children)
+
+
+def deck_digest(lvs_dir, switches):
+    """Digest of the deck files and of the switches that change the comparison."""
+    deck_files = [os.path.join(lvs_dir, "sg13g2.lvs")]
+    deck_files += sorted(glob.glob(os.path.join(lvs_dir, "rule_decks", "*.lvs")))
+    parts = []
+    for path in deck_files:
+        with open(path, "rb") as f:
+            parts.append(hashlib.sha256(f.read()).hexdigest())
+    parts += sorted(
+        f"{key}={value}" for key, value in switches.items()
+        if key not in IGNORED_SWITCHES and value is not None
+    )
+    return _sha256(*parts)
+
+
+def cell_fingerprints(layout_path, netlist_path, deck_hash, topcell):
+    """
+    Fingerprints of the subcells that are in both the layout and the netlist.
+
+    Cells are matched by name, ignoring case, like the LVS compare does.
+    The top cell is not included, it is always compared.
+
+    Returns
+    -------
+    dict
+        Layout cell name to fingerprint.
+    """
+    layout_digests = layout_cell_digests(layout_path)
+    schematic_digests = schematic_subckt_digests(netlist_path)
+    return {
+        name: _sha256(digest, schematic_digests[name.upper()], deck_hash)
+        for name, digest in layout_digests.items()
+        if name.upper() in schematic_digests and name != topcell
+    }
+
+
+def default_reuse_db(layout_path):
+    """Reuse file of a layout, ``lvs_reuse_<path digest>.json`` in :data:`REUSE_CACHE_DIR`."""
+    layout_key = _sha256(os.path.realpath(layout_path))[:16]
+    name, extension = os.path.splitext(REUSE_FILE)
+    return os.path.join(REUSE_CACHE_DIR, f"{name}_{layout_key}{extension}")
+
+
+def load_reuse_db(path):
+    """Fingerprints of previously matched cells, ``{cell: fingerprint}``."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != REUSE_VERSION:
+        return {}
+    return data.get("cells", {})
+
+
+def reusable_cells(fingerprints, reuse_db):
+    """Cells whose fingerprint matches a previously matched run."""
+    return sorted(name for name, fp in fingerprints.items() if reuse_db.get(name) == fp)
+
+
+def record_results(path, fingerprints, lvs_result):
+    """
+    Store the fingerprints of the cells that matched in ``lvs_result``.
+
+    ``lvs_result`` is a ``lvs_results.LvsResult`` or a scanned
+    ``lvsdb_stream.LVSDBReader``, only its circuit pairs are used. Cells
+    that were compared and did not match are removed. Returns the number
+    of recorded cells.
+    """
+    reuse_db = load_reuse_db(path)
+    statuses = {}
+    for pair in lvs_result.circuit_pairs():
+        if pair["layout"] is not None:
+            statuses[pair["layout"]] = pair["status"]
+    recorded = 0
+    for name, fp in fingerprints.items():
+        status = statuses.get(name)
+        if status in ("Match", "MatchWithWarning"):
+            reuse_db[name] = fp
+            recorded += 1
+        elif status is not None:
+            reuse_db.pop(name, None)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": REUSE_VERSION, "cells": reuse_db}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return recorded
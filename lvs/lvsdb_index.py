@@ -0,0 +1,332 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Binary index of the LVS results prepared from an ``.lvsdb``.
+
+Parsing an ``.lvsdb`` again each time its results are shown can take
+longer than the comparison itself. The results the LVS dialogue asks the
+LVSDB parser for (nets, devices, cross-references, layer maps, cell
+bounding boxes, ...) are written to ``<name>.lvsdb.idx`` next to the
+database. Reopening the results memory-maps the index and decodes only
+the entries that are asked for.
+
+Index layout, little-endian::
+
+    header   magic, version, lvsdb size and mtime, Python version,
+             entry count
+    entries  key length, key, value offset and value length per entry
+    values   one marshal blob per entry
+
+The values are the plain lists and dicts the parser returns. Decoding them
+is bound by creating the Python objects, which marshal does in C; repeated
+strings of an entry are stored once as references. The index is keyed by
+the size and modification time of the ``.lvsdb`` and by the Python
+version, a stale or unreadable index is ignored and the database is parsed
+again.
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"RVLVSIDX"
+INDEX_VERSION = 1
+MARSHAL_VERSION = 4
+# magic, index version, lvsdb size, lvsdb mtime_ns, Python major and minor
+# version, entry count
+_HEADER = struct.Struct("<8sIQQHHI")
+# key length, value offset, value length
+_ENTRY = struct.Struct("<IQQ")
+# Parser attributes kept in the index.
+INDEXED_ATTRIBUTES = ("layer_map", "gds_to_pdk", "crossrefs")
+
+
+class LVSDBIndexError(ValueError):
+    """Raised if an index file is corrupt or has an unknown version."""
+
+
+def index_path(lvsdb_path):
+    return f"{lvsdb_path}{INDEX_SUFFIX}"
+
+
+def call_key(name, args=(), kwargs=None):
+    """Index key of a parser method call."""
+    parts = [name, *(repr(arg) for arg in args)]
+    parts += [f"{key}={value!r}" for key, value in sorted((kwargs or {}).items())]
+    return "\x1f".join(parts)
+
+
+def _lvsdb_key(lvsdb_path):
+    stat = os.stat(lvsdb_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_index(lvsdb_path, entries):
+    """
+    Write the index of an ``.lvsdb``.
+
+    Parameters
+    ----------
+    lvsdb_path : str or path
+        The LVS database the entries were read from.
+    entries : dict
+        Key to plain data: None, bool, int, float, str, list, tuple, dict
+        and set. Use :func:`call_key` for parser method results.
+
+    Returns
+    -------
+    str
+        Path of the index.
+
+    Raises
+    ------
+    ValueError
+        If a value is not plain data.
+    """
+    size, mtime_ns = _lvsdb_key(lvsdb_path)
+    keys = [key.encode("utf-8") for key in entries]
+    blobs = [marshal.dumps(value, MARSHAL_VERSION) for value in entries.values()]
+    offset = _HEADER.size + sum(_ENTRY.size + len(key) for key in keys)
+    path = index_path(lvsdb_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, size, mtime_ns, *sys.version_info[:2], len(keys)
+        ))
+        for key, blob in zip(keys, blobs):
+            f.write(_ENTRY.pack(len(key), offset, len(blob)))
+            f.write(key)
+            offset += len(blob)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+class LVSDBIndex:
+    """
+    Memory-mapped index of an ``.lvsdb``. Entries are decoded on access.
+
+    Use :func:`open_index` to open the index of a database.
+
+    Raises
+    ------
+    LVSDBIndexError
+        If the file is not an index of this version.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._entries = {}
+        try:
+            (magic, version, self.lvsdb_size, self.lvsdb_mtime_ns, major, minor,
+             entry_count) = _HEADER.unpack_from(self._data)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise LVSDBIndexError(f"{path}: not an LVSDB index of version {INDEX_VERSION}.")
+            if (major, minor) != sys.version_info[:2]:
+                # The marshal format may change between Python versions.
+                raise LVSDBIndexError(f"{path}: written by Python {major}.{minor}.")
+            pos = _HEADER.size
+            for _ in range(entry_count):
+                key_length, value_offset, value_length = _ENTRY.unpack_from(self._data, pos)
+                pos += _ENTRY.size
+                key = self._data[pos:pos + key_length].decode("utf-8")
+                pos += key_length
+                if value_offset + value_length > len(self._data):
+                    raise LVSDBIndexError(f"{path}: truncated LVSDB index.")
+                self._entries[key] = (value_offset, value_length)
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise LVSDBIndexError(f"{path}: corrupt LVSDB index ({e}).") from None
+        except LVSDBIndexError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def keys(self):
+        return self._entries.keys()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        offset, length = entry
+        try:
+            return marshal.loads(self._data[offset:offset + length])
+        except (EOFError, ValueError, TypeError) as e:
+            raise LVSDBIndexError(f"{self.path}: corrupt LVSDB index ({e}).") from None
+
+
+def open_index(lvsdb_path):
+    """
+    Open the index of an ``.lvsdb``, None if it is missing, stale or corrupt.
+    """
+    path = index_path(lvsdb_path)
+    try:
+        index = LVSDBIndex(path)
+    except (OSError, ValueError):
+        return None
+    try:
+        current = _lvsdb_key(lvsdb_path)
+    except OSError:
+        current = None
+    if current != (index.lvsdb_size, index.lvsdb_mtime_ns):
+        index.close()
+        return None
+    return index
+
+
+def update_index(lvsdb_path, entries):
+    """
+    Add entries to the index of an ``.lvsdb``.
+
+    The entries of an up-to-date index are kept unless ``entries`` has the
+    same key, a stale index is replaced.
+
+    Returns
+    -------
+    str
+        Path of the index.
+    """
+    merged = {}
+    index = open_index(lvsdb_path)
+    if index is not None:
+        try:
+            merged = {key: index.get(key) for key in index.keys()}
+        finally:
+            index.close()
+    merged.update(entries)
+    return write_index(lvsdb_path, merged)
+
+
+_OWN_ATTRIBUTES = frozenset(
+    ("_lvsdb_path", "_parser_factory", "_parser_class", "_index", "_parser", "_recorded")
+)
+
+
+class IndexedLVSDB:
+    """
+    LVSDB parser stand-in that answers from the index.
+
+    Method calls and the attributes in ``INDEXED_ATTRIBUTES`` are served
+    from the index. Anything else loads the real parser once, made by
+    ``parser_factory``, and its method results are recorded so that
+    :meth:`write_index` can store them for the next time. Private names,
+    e.g. ``_get_layer_name``, are passed to the parser as they are.
+
+    Loading the parser is a full parse of the database on the calling
+    thread, without notice. A call the index has no entry for, e.g. the
+    nets of a cell the dialogue did not ask for before, therefore blocks
+    the GUI thread for as long as the first parse took; :attr:`loaded`
+    tells whether that has happened.
+
+    Parameters
+    ----------
+    lvsdb_path : str or path
+    parser_factory : callable
+        Returns a loaded LVSDB parser.
+    parser_class : type
+        Class of the parser, tells methods from attributes without loading.
+    index : LVSDBIndex or None
+        Index of ``lvsdb_path``, see :func:`open_index`.
+    """
+
+    def __init__(self, lvsdb_path, parser_factory, parser_class, index=None):
+        self.filepath = lvsdb_path
+        self._lvsdb_path = lvsdb_path
+        self._parser_factory = parser_factory
+        self._parser_class = parser_class
+        self._index = index
+        self._parser = None
+        self._recorded = {}
+
+    @property
+    def indexed(self):
+        """True if results come from an index."""
+        return self._index is not None
+
+    @property
+    def loaded(self):
+        """True if the real parser has been loaded."""
+        return self._parser is not None
+
+    @property
+    def parser(self):
+        """The real parser, loaded on first use."""
+        if self._parser is None:
+            self._parser = self._parser_factory()
+        return self._parser
+
+    def __getattr__(self, name):
+        if (name.startswith("__") and name.endswith("__")) or name in _OWN_ATTRIBUTES:
+            # Also before __init__, e.g. while copying.
+            raise AttributeError(name)
+        if name.startswith("_"):
+            return getattr(self.parser, name)
+        if callable(getattr(self._parser_class, name, None)):
+            def call(*args, **kwargs):
+                key = call_key(name, args, kwargs)
+                if key in self._recorded:
+                    return self._recorded[key]
+                if self._index is not None and key in self._index:
+                    value = self._index.get(key)
+                else:
+                    value = getattr(self.parser, name)(*args, **kwargs)
+                self._recorded[key] = value
+                return value
+
+            return call
+        if name in INDEXED_ATTRIBUTES and self._index is not None and name in self._index:
+            return self._index.get(name)
+        return getattr(self.parser, name)
+
+    def write_index(self):
+        """
+        Write the recorded results and the indexed attributes of a parsed
+        database to its index.
+
+        An index written by another tool, e.g. ``lvs_diff.py``, is kept and
+        the results missing from it are added.
+
+        Returns
+        -------
+        str or None
+            Path of the index, None if the index has all the results.
+        """
+        if self._index is None:
+            entries = {name: getattr(self.parser, name, None) for name in INDEXED_ATTRIBUTES}
+            entries.update(self._recorded)
+            return write_index(self._lvsdb_path, entries)
+        entries = {key: value for key, value in self._recorded.items() if key not in self._index}
+        if self._parser is not None:
+            entries.update(
+                (name, getattr(self._parser, name, None))
+                for name in INDEXED_ATTRIBUTES if name not in self._index
+            )
+        if not entries:
+            return None
+        return update_index(self._lvsdb_path, entries)
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
@@ -0,0 +1,900 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Streaming reader of KLayout ``.lvsdb`` files with bounded memory.
+
+The file is read in chunks and turned into events: an element opens with
+its tag (``N(`` gives ``N``, a bare ``(`` gives None), words and quoted
+strings, an element closes. The sections of the database are dispatched
+to handlers:
+
+- ``J`` layout: layers (``L``), top cell (``W``), cells (``X``),
+- ``H`` schematic: cells (``X``),
+- ``Z`` cross-reference: circuit pairs (``X``) with their status.
+
+A scan records the layers, the file offset of every cell and the status
+of every circuit pair. The body of a cell is skipped by counting
+parentheses, and only the cells that are asked for are read into a list
+tree and converted to the dicts described in ``docs/lvsdb_parser.md``:
+nets with their shapes, pins, devices and subcircuit instances. Memory is
+bound by the chunk size and the largest requested cell, not by the file.
+Short and long form databases are read.
+
+Command line::
+
+    python lvsdb_stream.py design.lvsdb --cell TOP
+    python lvsdb_stream.py --generate 1024 /tmp/synthetic.lvsdb
+    python lvsdb_stream.py /tmp/synthetic.lvsdb --benchmark --methods scan,cell
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+CHUNK_SIZE = 1 << 20
+# Block sizes for skipping, a block where the element may end is looked at
+# in smaller blocks and the smallest one parenthesis at a time.
+SKIP_BLOCKS = (1 << 16, 1 << 12, 1 << 8)
+OPEN, CLOSE, WORD = 0, 1, 2
+# Long form keywords and the short form tags used by this reader.
+LONG_TAGS = {
+    "layout": "J", "reference": "H", "xref": "Z", "top": "W", "unit": "U",
+    "layer": "L", "circuit": "X", "rect": "R", "polygon": "Q", "text": "J",
+    "net": "N", "name": "I", "pin": "P", "device": "D", "location": "Y",
+    "param": "E", "terminal": "T", "subcircuit": "X",
+}
+STATUS_NAMES = {
+    "1": "Match", "match": "Match",
+    "W": "MatchWithWarning", "warning": "MatchWithWarning",
+    "0": "NoMatch", "nomatch": "NoMatch",
+    "X": "Mismatch", "mismatch": "Mismatch",
+    "S": "Skipped", "skipped": "Skipped",
+}
+MATCH_STATUSES = ("Match", "MatchWithWarning")
+
+_TOKEN = re.compile(rb"""\s*(?:
+    (^\#[^\n]*)                             # 1 comment line
+  | ([()])                                  # 2 parenthesis
+  | ('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")   # 3 quoted string
+  | ([^\s()'"]+)                            # 4 word
+  | (['"])                                  # 5 string that ends in the next chunk
+)""", re.X | re.M)
+_QUOTED = re.compile(rb"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\"""")
+_ESCAPE = re.compile(rb"\\(.)", re.S)
+_NOT_PARENS = bytes(byte for byte in range(256) if byte not in b"()")
+# Text and elements nested up to three levels deep, e.g. a whole R(l1 (0 0)
+# (5 5)) shape, consumed in one match. Deeper elements and strings are
+# counted one parenthesis at a time.
+_FLAT = rb"""[^()'"]"""
+_SKIP = re.compile(
+    rb"(?:%s|\((?:%s|\((?:%s|\(%s*\))*\))*\))*" % (_FLAT, _FLAT, _FLAT, _FLAT)
+)
+
+
+def _depth_after(block, depth):
+    """
+    Depth after a block without strings, None if the block has strings or
+    the depth may drop to zero inside it.
+    """
+    if b"'" in block or b'"' in block:
+        return None
+    parens = block.translate(None, _NOT_PARENS)
+    while b"()" in parens:
+        parens = parens.replace(b"()", b"")
+    # What is left is ")...)(...(", the closes go below the starting depth.
+    closes = parens.find(b"(")
+    if closes < 0:
+        closes = len(parens)
+    if closes >= depth:
+        return None
+    return depth + len(parens) - 2 * closes
+
+
+class LVSDBStreamError(ValueError):
+    """Raised if an ``.lvsdb`` is not a well-formed S-expression file."""
+
+
+def _open(path):
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if gzipped else open(path, "rb")
+
+
+def _unquote(text):
+    return _ESCAPE.sub(rb"\1", text[1:-1]).decode("utf-8", "replace")
+
+
+class _Scanner:
+    """Events of a byte stream, read in chunks."""
+
+    def __init__(self, stream, offset=0, chunk_size=CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buf = b""
+        self._pos = 0
+        self._base = offset
+        self._eof = False
+        self._digest = None
+        self._digest_pos = 0
+
+    @property
+    def offset(self):
+        """File offset of the next unread byte."""
+        return self._base + self._pos
+
+    def _fill(self):
+        chunk = self._stream.read(self._chunk_size)
+        if self._digest is not None:
+            # The consumed bytes are dropped from the buffer below.
+            self._digest.update(self._buf[self._digest_pos:self._pos])
+            self._digest_pos = 0
+        self._base += self._pos
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def start_digest(self, digest):
+        """Feed the bytes consumed from now on to ``digest``, e.g. a hashlib object."""
+        self._digest = digest
+        self._digest_pos = self._pos
+
+    def end_digest(self):
+        """Stop feeding the digest started by :meth:`start_digest` and return it."""
+        digest = self._digest
+        digest.update(self._buf[self._digest_pos:self._pos])
+        self._digest = None
+        return digest
+
+    def next(self):
+        """
+        Next event, None at the end of the data.
+
+        Returns
+        -------
+        tuple or None
+            ``(OPEN, offset, tag)``, ``(CLOSE, offset, None)`` or
+            ``(WORD, offset, text)``.
+        """
+        while True:
+            m = _TOKEN.match(self._buf, self._pos)
+            if self._eof:
+                if m is None:
+                    return None
+                if m.lastindex == 5:
+                    raise LVSDBStreamError(f"Unterminated string at offset {self.offset}.")
+            elif m is None or m.lastindex == 5 or m.end() >= len(self._buf):
+                # The token may continue in the next chunk.
+                self._fill()
+                continue
+            kind = m.lastindex
+            start = self._base + m.start(kind)
+            self._pos = m.end()
+            if kind == 1:
+                continue
+            if kind == 2:
+                if m.group(2) == b"(":
+                    return OPEN, start, None
+                return CLOSE, start, None
+            if kind == 3:
+                return WORD, start, _unquote(m.group(3))
+            word = m.group(4).decode("utf-8", "replace")
+            if self._buf[self._pos:self._pos + 1] == b"(":
+                self._pos += 1
+                return OPEN, start, LONG_TAGS.get(word, word)
+            return WORD, start, word
+
+    def skip(self, depth=1):
+        """Skip to the end of the element ``depth`` levels up."""
+        # File offsets where the blocks that may hold the end stop, by size.
+        ends = []
+        while depth:
+            if len(self._buf) - self._pos < SKIP_BLOCKS[0] and not self._eof:
+                self._fill()
+                continue
+            while ends and self.offset >= ends[-1]:
+                ends.pop()
+            if len(ends) == len(SKIP_BLOCKS):
+                depth = self._skip_exact(depth, ends[-1])
+                continue
+            block = self._buf[self._pos:self._pos + SKIP_BLOCKS[len(ends)]]
+            if not block:
+                raise LVSDBStreamError(f"Unexpected end of data at offset {self.offset}.")
+            after = _depth_after(block, depth)
+            if after is None:
+                ends.append(self.offset + len(block))
+            else:
+                depth = after
+                self._pos += len(block)
+
+    def _skip_exact(self, depth, stop):
+        """Count parentheses one at a time up to file offset ``stop``."""
+        while depth and self.offset < stop:
+            limit = min(stop - self._base, len(self._buf))
+            pos = _SKIP.match(self._buf, self._pos, limit).end()
+            if pos >= limit:
+                self._pos = pos
+                if pos >= len(self._buf) and not self._fill():
+                    raise LVSDBStreamError(f"Unexpected end of data at offset {self.offset}.")
+                continue
+            char = self._buf[pos]
+            if char == 0x28:
+                depth += 1
+                self._pos = pos + 1
+            elif char == 0x29:
+                depth -= 1
+                self._pos = pos + 1
+            else:
+                m = _QUOTED.match(self._buf, pos)
+                self._pos = pos
+                if m is not None:
+                    self._pos = m.end()
+                elif not self._fill():
+                    raise LVSDBStreamError(f"Unterminated string at offset {self.offset}.")
+        return depth
+
+    def element(self, tag):
+        """
+        Read the rest of an element that opened with ``tag`` into a list tree.
+
+        Returns
+        -------
+        list
+            ``[tag, child, ...]``, a child is a string or a list.
+        """
+        root = [tag]
+        stack = [root]
+        while stack:
+            event = self.next()
+            if event is None:
+                raise LVSDBStreamError("Unexpected end of data.")
+            kind, _, value = event
+            if kind == WORD:
+                stack[-1].append(value)
+            elif kind == OPEN:
+                child = [value]
+                stack[-1].append(child)
+                stack.append(child)
+            else:
+                stack.pop()
+        return root
+
+
+def _number(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        try:
+            return float(text)
+        except (TypeError, ValueError):
+            return text
+
+
+def _point(item):
+    if isinstance(item, list) and len(item) >= 3:
+        return [_number(item[1]), _number(item[2])]
+    return None
+
+
+def _children(element, tag):
+    return [child for child in element[1:] if isinstance(child, list) and child[0] == tag]
+
+
+def _words(element):
+    return [child for child in element[1:] if not isinstance(child, list)]
+
+
+def _name(element):
+    """Text of the I(name) child, None without name."""
+    names = _children(element, "I")
+    return _words(names[0])[0] if names and _words(names[0]) else None
+
+
+def _params(element):
+    params = {}
+    for param in _children(element, "E"):
+        words = _words(param)
+        if len(words) >= 2:
+            params[words[0]] = _number(words[1])
+    return params
+
+
+def _terminals(element):
+    terminals = {}
+    for terminal in _children(element, "T"):
+        words = _words(terminal)
+        if len(words) >= 2:
+            terminals[words[0]] = words[1]
+    return terminals
+
+
+def _shape(element):
+    tag = element[0]
+    words = _words(element)
+    points = [_point(child) for child in element[1:] if isinstance(child, list)]
+    layer = words[0] if words else None
+    if tag == "R" and len(points) == 2:
+        return {"type": "rect", "layer": layer, "origin": points[0], "size": points[1]}
+    if tag == "Q":
+        return {"type": "polygon", "layer": layer, "points": points}
+    if tag == "J" and len(words) >= 2:
+        return {"type": "text", "layer": layer, "text": words[1],
+                "position": points[0] if points else None}
+    return None
+
+
+def layout_cell_dict(element):
+    """
+    Convert the list tree of a layout cell ``X(name ...)``.
+
+    Returns
+    -------
+    dict
+        ``name``, ``bbox``, ``nets`` (``net_id``, ``name``, ``shapes``),
+        ``pins`` (``pin_id``, ``name``), ``devices`` (``id``, ``type``,
+        ``position``, ``params``, ``terminals``, ``subdevices``) and
+        ``instances`` (``id``, ``cell``, ``position``, ``pins``).
+    """
+    words = _words(element)
+    cell = {"name": words[0] if words else None, "bbox": None, "nets": [], "pins": [],
+            "devices": [], "instances": []}
+    for child in element[1:]:
+        if not isinstance(child, list):
+            continue
+        tag = child[0]
+        child_words = _words(child)
+        if tag == "R":
+            points = [_point(item) for item in child[1:] if isinstance(item, list)]
+            if len(points) == 2 and None not in points:
+                cell["bbox"] = points
+        elif tag == "N" and child_words:
+            shapes = [_shape(item) for item in child[1:] if isinstance(item, list)]
+            cell["nets"].append({"net_id": child_words[0], "name": _name(child),
+                                 "shapes": [shape for shape in shapes if shape]})
+        elif tag == "P" and child_words:
+            cell["pins"].append({"pin_id": child_words[0], "name": _name(child)})
+        elif tag == "D" and len(child_words) >= 2:
+            positions = _children(child, "Y")
+            cell["devices"].append({
+                "id": child_words[0],
+                "type": child_words[1],
+                "position": _point(positions[0]) if positions else None,
+                "params": _params(child),
+                "terminals": _terminals(child),
+                "subdevices": [
+                    {"name": (_words(sub) or [None])[0],
+                     "transform": _point(_children(sub, "Y")[0]) if _children(sub, "Y") else None}
+                    for sub in _children(child, "D")
+                ],
+            })
+        elif tag == "X" and len(child_words) >= 2:
+            positions = _children(child, "Y")
+            cell["instances"].append({
+                "id": child_words[0],
+                "cell": child_words[1],
+                "position": _point(positions[0]) if positions else None,
+                "pins": {
+                    _words(pin)[0]: _words(pin)[1]
+                    for pin in _children(child, "P") if len(_words(pin)) >= 2
+                },
+            })
+    return cell
+
+
+def schematic_cell_dict(element):
+    """
+    Convert the list tree of a schematic cell ``X(name ...)``.
+
+    Returns
+    -------
+    dict
+        ``name``, ``nets`` (``net_id``, ``name``), ``pins``, ``devices``
+        (``id``, ``type``, ``name``, ``params``, ``terminals``) and
+        ``instances``.
+    """
+    cell = layout_cell_dict(element)
+    del cell["bbox"]
+    for net in cell["nets"]:
+        del net["shapes"]
+    devices = []
+    for child in _children(element, "D"):
+        words = _words(child)
+        if len(words) >= 2:
+            devices.append({"id": words[0], "type": words[1], "name": _name(child),
+                            "params": _params(child), "terminals": _terminals(child)})
+    cell["devices"] = devices
+    return cell
+
+
+def _side(value):
+    return None if value in (None, "()") else value
+
+
+def crossref_dict(element):
+    """
+    Convert the list tree of a circuit pair ``X(layout schematic status Z(...))``.
+
+    Returns
+    -------
+    dict
+        ``layout_name``, ``schematic_name``, ``status``, ``equivalent`` and
+        ``mapping`` with ``nets``, ``pins``, ``devices`` and ``circuits``,
+        lists of ``{"layout", "schematic", "status"}``.
+    """
+    header = _xref_header(element[1:])
+    mapping = {"nets": [], "pins": [], "devices": [], "circuits": []}
+    keys = {"N": "nets", "P": "pins", "D": "devices", "X": "circuits"}
+    for block in _children(element, "Z"):
+        for item in block[1:]:
+            if not isinstance(item, list) or item[0] not in keys:
+                continue
+            entry = _xref_header(item[1:])
+            mapping[keys[item[0]]].append(
+                {"layout": entry["layout_name"], "schematic": entry["schematic_name"],
+                 "status": entry["status"]}
+            )
+    header["mapping"] = mapping
+    return header
+
+
+def _xref_header(items):
+    """Layout name, schematic name and status of a cross-reference entry."""
+    values = []
+    for item in items:
+        if isinstance(item, list):
+            if item[0] is not None:
+                break
+            # An empty () stands for a missing side.
+            item = None
+        values.append(item)
+    values += [None] * (3 - len(values))
+    status = STATUS_NAMES.get(values[2], values[2])
+    return {
+        "layout_name": _side(values[0]),
+        "schematic_name": _side(values[1]),
+        "status": status,
+        "equivalent": (
+            True if status in MATCH_STATUSES
+            else False if status in ("NoMatch", "Mismatch") else None
+        ),
+    }
+
+
+class LVSDBReader:
+    """
+    Cells of an ``.lvsdb``, read on demand.
+
+    :meth:`scan` reads the file once and keeps the layers, the offsets of
+    the cells and the circuit pairs. Cells are read from their offset when
+    they are asked for.
+
+    Parameters
+    ----------
+    path : str or path
+        The ``.lvsdb``, optionally gzipped.
+    chunk_size : int
+        Bytes read at a time.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.filepath = path
+        self.chunk_size = chunk_size
+        self.top_cell = None
+        self.layer_map = {}
+        self.layout_offsets = {}
+        self.schematic_offsets = {}
+        self.crossrefs = {}
+        self._crossref_offsets = {}
+        self._scanned = False
+
+    def scan(self, handlers=None):
+        """
+        Read the whole file once, skipping the body of every cell.
+
+        Parameters
+        ----------
+        handlers : dict or None
+            Extra section handlers by ``(section, tag)``, e.g. ``("J",
+            "X")``, called with the scanner positioned after the opening
+            tag and its file offset. A handler must consume the element up
+            to and including its closing parenthesis.
+
+        Returns
+        -------
+        LVSDBReader
+            self
+        """
+        dispatch = {
+            ("J", "W"): self._on_top_cell,
+            ("J", "L"): self._on_layer,
+            ("J", "X"): self._on_layout_cell,
+            ("H", "X"): self._on_schematic_cell,
+            ("Z", "X"): self._on_crossref,
+        }
+        dispatch.update(handlers or {})
+        with _open(self.filepath) as stream:
+            scanner = _Scanner(stream, 0, self.chunk_size)
+            section = None
+            while True:
+                event = scanner.next()
+                if event is None:
+                    break
+                kind, offset, tag = event
+                if kind == WORD:
+                    continue
+                if kind == CLOSE:
+                    if section is None:
+                        raise LVSDBStreamError(f"Unbalanced ')' at offset {offset}.")
+                    section = None
+                    continue
+                if section is None and tag in ("J", "H", "Z"):
+                    section = tag
+                    continue
+                handler = dispatch.get((section, tag))
+                if handler is not None:
+                    handler(scanner, offset)
+                else:
+                    scanner.skip()
+        self._scanned = True
+        return self
+
+    def _on_top_cell(self, scanner, offset):
+        words = _words(scanner.element("W"))
+        self.top_cell = words[0] if words else None
+
+    def _on_layer(self, scanner, offset):
+        words = _words(scanner.element("L"))
+        if words:
+            self.layer_map[words[0]] = words[1] if len(words) > 1 else None
+
+    def _cell_name(self, scanner):
+        event = scanner.next()
+        if event is None or event[0] != WORD:
+            raise LVSDBStreamError(f"Cell without name at offset {scanner.offset}.")
+        return event[2]
+
+    def _on_layout_cell(self, scanner, offset):
+        self.layout_offsets[self._cell_name(scanner)] = offset
+        scanner.skip()
+
+    def _on_schematic_cell(self, scanner, offset):
+        self.schematic_offsets[self._cell_name(scanner)] = offset
+        scanner.skip()
+
+    def _on_crossref(self, scanner, offset):
+        # Read the names and the status, skip the net, pin and device pairs.
+        items = []
+        depth = 1
+        while len(items) < 3:
+            kind, _, value = scanner.next()
+            if kind == WORD:
+                items.append(value)
+            elif kind == OPEN and value is None:
+                # () for a missing side
+                scanner.skip()
+                items.append(None)
+            elif kind == OPEN:
+                depth += 1
+                break
+            else:
+                depth = 0
+                break
+        if depth:
+            scanner.skip(depth)
+        entry = _xref_header(items)
+        name = entry["layout_name"] or entry["schematic_name"]
+        self.crossrefs[name] = entry
+        self._crossref_offsets[name] = offset
+
+    def _ensure_scanned(self):
+        if not self._scanned:
+            self.scan()
+
+    def _read_element(self, offset, tag):
+        with _open(self.filepath) as stream:
+            stream.seek(offset)
+            scanner = _Scanner(stream, offset, self.chunk_size)
+            event = scanner.next()
+            if event is None or event[0] != OPEN or event[2] != tag:
+                raise LVSDBStreamError(f"No {tag}( element at offset {offset}.")
+            return scanner.element(tag)
+
+    def get_all_layout_cells(self):
+        self._ensure_scanned()
+        return list(self.layout_offsets)
+
+    def get_all_schematic_cells(self):
+        self._ensure_scanned()
+        return list(self.schematic_offsets)
+
+    def layout_cell(self, name):
+        """Layout cell dict, see :func:`layout_cell_dict`, None if missing."""
+        self._ensure_scanned()
+        if name not in self.layout_offsets:
+            return None
+        return layout_cell_dict(self._read_element(self.layout_offsets[name], "X"))
+
+    def schematic_cell(self, name):
+        """Schematic cell dict, see :func:`schematic_cell_dict`, None if missing."""
+        self._ensure_scanned()
+        if name not in self.schematic_offsets:
+            return None
+        return schematic_cell_dict(self._read_element(self.schematic_offsets[name], "X"))
+
+    def get_crossref(self, name):
+        """Circuit pair with its mapping, see :func:`crossref_dict`, None if missing."""
+        self._ensure_scanned()
+        if name not in self._crossref_offsets:
+            return None
+        return crossref_dict(self._read_element(self._crossref_offsets[name], "X"))
+
+    def get_nets(self, name):
+        cell = self.layout_cell(name)
+        return cell["nets"] if cell else []
+
+    def get_devices(self, name):
+        cell = self.layout_cell(name)
+        return cell["devices"] if cell else []
+
+    def get_schematic_nets(self, name):
+        cell = self.schematic_cell(name)
+        return cell["nets"] if cell else []
+
+    def get_schematic_devices(self, name):
+        cell = self.schematic_cell(name)
+        return cell["devices"] if cell else []
+
+    def circuit_pairs(self):
+        """
+        Match status of every circuit pair, as ``lvs_results.LvsResult``.
+
+        Returns
+        -------
+        list of dict
+            ``{"layout", "schematic", "status"}``.
+        """
+        self._ensure_scanned()
+        return [
+            {"layout": entry["layout_name"], "schematic": entry["schematic_name"],
+             "status": entry["status"]}
+            for entry in self.crossrefs.values()
+        ]
+
+    def summary(self):
+        """Cell counts and the circuit pairs that do not match."""
+        self._ensure_scanned()
+        return {
+            "top_cell": self.top_cell,
+            "layers": len(self.layer_map),
+            "layout_cells": len(self.layout_offsets),
+            "schematic_cells": len(self.schematic_offsets),
+            "circuit_pairs": len(self.crossrefs),
+            "mismatched_circuits": [
+                pair for pair in self.circuit_pairs() if pair["status"] not in MATCH_STATUSES
+            ],
+        }
+
+
+def _synthetic_net_name(net):
+    # Names with special characters are quoted.
+    return f"'net {net}'" if net % 100 == 0 else f"net{net}"
+
+
+def _synthetic_layout_cell(cell, layers, nets, devices):
+    lines = [f" X(CELL{cell}\n  R((0 0) (100000 100000))\n"]
+    for net in range(1, nets + 1):
+        shapes = "".join(
+            f"   R({layers[(net + shape) % len(layers)]} ({net * 10 + shape} {shape * 40}) "
+            f"(250 {1000 + shape}))\n"
+            for shape in range(4)
+        )
+        lines.append(f"  N({net} I({_synthetic_net_name(net)})\n{shapes}  )\n")
+    lines += [f"  P({pin} I(P{pin}))\n" for pin in range(1, 5)]
+    lines += [
+        f"  D({device} sg13_lv_nmos Y({device * 500} 0) E(L 0.13) E(W 1.5) "
+        f"T(S {device % nets + 1}) T(G {(device + 1) % nets + 1}) "
+        f"T(D {(device + 2) % nets + 1}) T(B 1))\n"
+        for device in range(1, devices + 1)
+    ]
+    if cell:
+        lines.append(f"  X(1 CELL{cell - 1} Y(0 0) P(0 1) P(1 2))\n")
+    lines.append(" )\n")
+    return "".join(lines)
+
+
+def _synthetic_schematic_cell(cell, nets, devices):
+    lines = [f" X(CELL{cell}\n"]
+    lines += [f"  N({net} I({_synthetic_net_name(net)}))\n" for net in range(1, nets + 1)]
+    lines += [f"  P({pin} I(P{pin}))\n" for pin in range(1, 5)]
+    lines += [
+        f"  D({device} sg13_lv_nmos I(M{device}) E(L 0.13) E(W 1.5) T(S 1) T(G 2) "
+        f"T(D 3) T(B 1))\n"
+        for device in range(1, devices + 1)
+    ]
+    lines.append(" )\n")
+    return "".join(lines)
+
+
+def _synthetic_crossref(cell, nets, devices):
+    status = "X" if cell % 5 == 4 else "1"
+    lines = [f" X(CELL{cell} CELL{cell} {status}\n  Z(\n"]
+    lines += [f"   N({net} {net} 1)\n" for net in range(1, nets + 1)]
+    lines += [f"   D({device} {device} 1)\n" for device in range(1, devices + 1)]
+    lines.append("  )\n )\n")
+    return "".join(lines)
+
+
+def write_synthetic_lvsdb(path, size_mb, nets_per_cell=2000, devices_per_cell=1000):
+    """
+    Write a short form ``.lvsdb`` of about ``size_mb`` megabytes.
+
+    Every cell has the same nets, shapes and devices in the layout and the
+    schematic, every fifth circuit pair is a mismatch.
+
+    Returns
+    -------
+    int
+        Number of cells.
+    """
+    layers = [f"l{index}" for index in range(1, 9)]
+    cell_size = sum(len(text) for text in (
+        _synthetic_layout_cell(1, layers, nets_per_cell, devices_per_cell),
+        _synthetic_schematic_cell(1, nets_per_cell, devices_per_cell),
+        _synthetic_crossref(1, nets_per_cell, devices_per_cell),
+    ))
+    cells = max(1, round(size_mb * 1_000_000 / cell_size))
+    with open(path, "w") as f:
+        f.write("#%lvsdb-klayout\nJ(\n W(TOP)\n U(0.001)\n")
+        f.writelines(f" L({layer} '{index}/0')\n" for index, layer in enumerate(layers, 1))
+        for cell in range(cells):
+            f.write(_synthetic_layout_cell(cell, layers, nets_per_cell, devices_per_cell))
+        f.write(")\nH(\n")
+        for cell in range(cells):
+            f.write(_synthetic_schematic_cell(cell, nets_per_cell, devices_per_cell))
+        f.write(")\nZ(\n")
+        for cell in range(cells):
+            f.write(_synthetic_crossref(cell, nets_per_cell, devices_per_cell))
+        f.write(")\n")
+    return cells
+
+
+def _tree_load(path):
+    """Whole-file load as done by the LVSDB parser: text, token list, tree."""
+    with _open(path) as f:
+        text = f.read()
+    tokens = [match.group(match.lastindex) for match in _TOKEN.finditer(text)
+              if match.lastindex != 1]
+    root = []
+    stack = [root]
+    for token in tokens:
+        if token == b"(":
+            child = []
+            stack[-1].append(child)
+            stack.append(child)
+        elif token == b")":
+            stack.pop()
+        else:
+            stack[-1].append(token.decode("utf-8", "replace"))
+    return root
+
+
+def _measure(method, path, cell=None):
+    """Seconds and peak memory of one way to read an ``.lvsdb``."""
+    import resource
+
+    start = time.perf_counter()
+    result = {"method": method}
+    if method == "tree":
+        result["elements"] = len(_tree_load(path))
+    else:
+        reader = LVSDBReader(path).scan()
+        result["cells"] = len(reader.layout_offsets)
+        if method == "cell":
+            name = cell or reader.top_cell or next(iter(reader.layout_offsets), None)
+            data = reader.layout_cell(name)
+            result["nets"] = len(data["nets"]) if data else 0
+    result["seconds"] = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    result["max_rss_mb"] = max_rss / 1024
+    return result
+
+
+def benchmark(path, methods=("scan", "cell", "tree"), cell=None):
+    """
+    Compare the streaming scan, the scan plus one cell and a whole-file tree.
+
+    Every method runs in a fresh interpreter so that peak memory is
+    measured per method.
+
+    Returns
+    -------
+    list of dict
+        ``method``, ``seconds`` and ``max_rss_mb`` per method.
+    """
+    results = []
+    for method in methods:
+        command = [sys.executable, os.path.abspath(__file__), str(path), "--measure", method]
+        if cell:
+            command += ["--cell", cell]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            results.append({"method": method, "error": completed.stderr.strip()})
+            continue
+        results.append(json.loads(completed.stdout))
+    return results
+
+
+def format_benchmark_table(results, size_bytes):
+    """Format benchmark results as table lines."""
+    header = f"{'Method':<8} {'Time (s)':>10} {'Peak RSS (MB)':>14} {'MB/s':>8}"
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        if "error" in entry:
+            message = (entry["error"].splitlines() or [""])[-1]
+            lines.append(f"{entry['method']:<8} failed: {message}")
+            continue
+        rate = size_bytes / 1e6 / entry["seconds"] if entry["seconds"] else 0.0
+        lines.append(
+            f"{entry['method']:<8} {entry['seconds']:>10.3f} {entry['max_rss_mb']:>14.1f} "
+            f"{rate:>8.1f}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read an .lvsdb without loading it whole.")
+    parser.add_argument("lvsdb", help="LVS database, optionally gzipped.")
+    parser.add_argument("--cell", default=None, help="Print this layout cell as JSON.")
+    parser.add_argument("--crossref", default=None, help="Print this circuit pair as JSON.")
+    parser.add_argument(
+        "--generate", type=int, metavar="MB", default=None,
+        help="Write a synthetic database of this size to LVSDB instead of reading it.",
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare time and peak memory with a whole-file tree.",
+    )
+    parser.add_argument(
+        "--methods", default="scan,cell,tree",
+        help="Benchmark methods, the tree needs memory of many times the file size.",
+    )
+    parser.add_argument("--measure", choices=("scan", "cell", "tree"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        if args.generate is not None:
+            cell_count = write_synthetic_lvsdb(args.lvsdb, args.generate)
+            print(f"{args.lvsdb}: {cell_count} cells, {os.path.getsize(args.lvsdb)} bytes")
+        elif args.measure:
+            print(json.dumps(_measure(args.measure, args.lvsdb, args.cell)))
+        elif args.benchmark:
+            results = benchmark(args.lvsdb, args.methods.split(","), args.cell)
+            print("\n".join(format_benchmark_table(results, os.path.getsize(args.lvsdb))))
+        else:
+            lvsdb_reader = LVSDBReader(args.lvsdb).scan()
+            if args.cell:
+                print(json.dumps(lvsdb_reader.layout_cell(args.cell), indent=2))
+            elif args.crossref:
+                print(json.dumps(lvsdb_reader.get_crossref(args.crossref), indent=2))
+            else:
+                print(json.dumps(lvsdb_reader.summary(), indent=2))
+    except (LVSDBStreamError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,380 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Content-hash cache of the LVS schematic netlist.
+
+The schematic hierarchy is hashed from the cellview files on disk:
+
+- every schematic gets an *own* hash from its file and from the netlist
+  relevant part (attributes such as ``lvsNetlistLine``, pins and labels) of
+  every symbol it places. The ``.SUBCKT`` block of a cell only changes if
+  its own hash changes.
+- the *netlist key* combines the own hashes of all schematics and the leaf
+  views (symbols, spice and veriloga views) of the hierarchy.
+
+A netlist with the same key is copied from the cache, no schematic is
+loaded. If only some subcells changed, each changed subcell is netlisted on
+its own and its ``.SUBCKT`` block is replaced in the previous netlist. A
+change of the top cell or of the set of cells netlists the whole schematic.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = "netlist_cache"
+# View order of the netlister: the first existing view of a cell is used.
+SWITCH_VIEWS = ("schematic", "veriloga", "spice", "symbol")
+STOP_VIEWS = ("symbol",)
+# Symbol items that do not change the netlist.
+COSMETIC_SYMBOL_ITEMS = ("line", "rect", "arc", "circle", "polygon", "text")
+SUBCKT_RE = re.compile(r"^\s*\.subckt\s+(\S+)", re.IGNORECASE)
+ENDS_RE = re.compile(r"^\s*\.ends\b", re.IGNORECASE)
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cellview_path(library_paths, lib, cell, view):
+    """Path of a cellview file, None if the library or file is missing."""
+    library_path = library_paths.get(lib)
+    if library_path is None:
+        return None
+    path = os.path.join(str(library_path), cell, f"{view}.json")
+    return path if os.path.isfile(path) else None
+
+
+def _load_items(path):
+    with open(path, "r") as f:
+        items = json.load(f)
+    return items if isinstance(items, list) else [items]
+
+
+def symbol_interface_hash(path):
+    """Hash of the netlist relevant items of a symbol view."""
+    items = [
+        item for item in _load_items(path)
+        if isinstance(item, dict) and "snapGrid" not in item
+        and item.get("type") not in COSMETIC_SYMBOL_ITEMS
+    ]
+    return _sha256(json.dumps(items, sort_keys=True))
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _leaf_view_hash(path):
+    """Hash of a spice/veriloga view and the model files next to it."""
+    cell_dir = os.path.dirname(path)
+    parts = [_file_hash(path)]
+    for name in sorted(os.listdir(cell_dir)):
+        file_path = os.path.join(cell_dir, name)
+        if not name.endswith(".json") and os.path.isfile(file_path):
+            parts.extend((name, _file_hash(file_path)))
+    return _sha256(*parts)
+
+
+def _instances(items):
+    """``(lib, cell, view)`` of every placed instance of a schematic."""
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        lib, cell, view = item.get("lib"), item.get("cell"), item.get("view")
+        if isinstance(lib, str) and isinstance(cell, str) and isinstance(view, str):
+            yield lib, cell, view
+
+
+class SchematicHierarchy:
+    """
+    Hashes of a schematic and the cellviews it uses.
+
+    Parameters
+    ----------
+    library_paths : dict
+        Library name to library directory.
+    lib, cell, view : str
+        Top schematic cellview.
+    options : str
+        Netlister options that change the output, part of the key.
+
+    Raises
+    ------
+    OSError, ValueError
+        If a schematic cannot be read.
+    """
+
+    def __init__(self, library_paths, lib, cell, view, options=""):
+        self.library_paths = library_paths
+        self.top = (lib, cell, view)
+        # (lib, cell, view) -> own hash, for schematic views
+        self.schematics = {}
+        # (lib, cell, view) -> hash, for leaf views
+        self.leaves = {}
+        self._symbol_hashes = {}
+        self._visit(lib, cell, view, os.path.join(str(library_paths[lib]), cell, f"{view}.json"))
+        self.key = _sha256(
+            CACHE_VERSION, options,
+            *sorted(f"{':'.join(name)}={digest}" for name, digest in self.schematics.items()),
+            *sorted(f"{':'.join(name)}={digest}" for name, digest in self.leaves.items()),
+        )
+
+    def _symbol_hash(self, lib, cell, view):
+        name = (lib, cell, view)
+        if name not in self._symbol_hashes:
+            path = cellview_path(self.library_paths, lib, cell, view)
+            self._symbol_hashes[name] = symbol_interface_hash(path) if path else "missing"
+        return self._symbol_hashes[name]
+
+    def _switch_view(self, lib, cell, view):
+        """View the netlister descends into for an instance of ``view``."""
+        if view in STOP_VIEWS:
+            for switch_view in SWITCH_VIEWS:
+                path = cellview_path(self.library_paths, lib, cell, switch_view)
+                if path is not None:
+                    return switch_view, path
+        return view, cellview_path(self.library_paths, lib, cell, view)
+
+    def _visit(self, lib, cell, view, path):
+        items = _load_items(path)
+        parts = [_file_hash(path)]
+        for inst_lib, inst_cell, inst_view in sorted(set(_instances(items))):
+            parts.append(f"{inst_lib}:{inst_cell}:{inst_view}")
+            parts.append(self._symbol_hash(inst_lib, inst_cell, inst_view))
+            switch_view, switch_path = self._switch_view(inst_lib, inst_cell, inst_view)
+            name = (inst_lib, inst_cell, switch_view)
+            if switch_path is None or name in self.schematics or name in self.leaves:
+                continue
+            if switch_view in STOP_VIEWS:
+                self.leaves[name] = self._symbol_hash(*name)
+            elif switch_view == "schematic":
+                # Placeholder against cycles, replaced after the visit.
+                self.schematics[name] = None
+                self._visit(inst_lib, inst_cell, switch_view, switch_path)
+            else:
+                self.leaves[name] = _leaf_view_hash(switch_path)
+        self.schematics[(lib, cell, view)] = _sha256(*parts)
+
+    def subcells(self):
+        """Own hashes of the schematics below the top, by cell name."""
+        return {
+            name[1]: digest for name, digest in self.schematics.items() if name != self.top
+        }
+
+
+def split_subckts(text):
+    """
+    Split a netlist into ``.SUBCKT`` blocks.
+
+    Returns
+    -------
+    list
+        Strings between the blocks and ``(name, block)`` tuples for the
+        blocks, in netlist order. Names are upper case.
+    """
+    parts = []
+    current = []
+    name = None
+    for line in text.splitlines(keepends=True):
+        if name is None:
+            match = SUBCKT_RE.match(line)
+            if match:
+                if current:
+                    parts.append("".join(current))
+                current = [line]
+                name = match.group(1).upper()
+                continue
+            current.append(line)
+        else:
+            current.append(line)
+            if ENDS_RE.match(line):
+                parts.append((name, "".join(current)))
+                current = []
+                name = None
+    if current:
+        parts.append("".join(current) if name is None else (name, "".join(current)))
+    return parts
+
+
+def subckt_block(text, cell_name):
+    """The ``.SUBCKT`` block of a cell in a netlist, None if missing."""
+    for part in split_subckts(text):
+        if isinstance(part, tuple) and part[0] == cell_name.upper():
+            return part[1]
+    return None
+
+
+class NetlistCache:
+    """
+    Netlists by hierarchy key in ``cache_dir``.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Cache directory, usually ``<LVS run dir>/netlist_cache``.
+    max_entries : int
+        Netlists kept, the least recently used are removed.
+    """
+
+    def __init__(self, cache_dir, max_entries=8):
+        self.cache_dir = str(cache_dir)
+        self.max_entries = max_entries
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.entries = {}
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    def _netlist_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.cir")
+
+    def lookup(self, key):
+        """Path of the cached netlist of a hierarchy key, or None."""
+        path = self._netlist_path(key)
+        if key in self.entries and os.path.isfile(path):
+            return path
+        return None
+
+    def previous(self, hierarchy):
+        """Most recent entry of the same top cellview, or None."""
+        top = ":".join(hierarchy.top)
+        candidates = [
+            (entry["used"], key, entry) for key, entry in self.entries.items()
+            if entry.get("top") == top and self.lookup(key)
+        ]
+        if not candidates:
+            return None
+        _, key, entry = max(candidates)
+        return dict(entry, key=key)
+
+    def store(self, hierarchy, netlist_path):
+        """Copy a netlist into the cache under the key of ``hierarchy``."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        shutil.copyfile(netlist_path, self._netlist_path(hierarchy.key))
+        self.entries[hierarchy.key] = {
+            "top": ":".join(hierarchy.top),
+            "top_hash": hierarchy.schematics[hierarchy.top],
+            "subcells": hierarchy.subcells(),
+            "used": time.time(),
+        }
+        self._prune()
+        self.save()
+
+    def touch(self, key):
+        self.entries[key]["used"] = time.time()
+        self.save()
+
+    def _prune(self):
+        ordered = sorted(self.entries, key=lambda key: self.entries[key]["used"])
+        for key in ordered[:max(0, len(ordered) - self.max_entries)]:
+            del self.entries[key]
+            try:
+                os.remove(self._netlist_path(key))
+            except OSError:
+                pass
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+
+def _splice(previous_text, blocks):
+    """Replace the ``.SUBCKT`` blocks of ``blocks`` in a netlist."""
+    parts = split_subckts(previous_text)
+    found = {part[0] for part in parts if isinstance(part, tuple)}
+    if not set(blocks) <= found:
+        return None
+    return "".join(
+        blocks.get(part[0], part[1]) if isinstance(part, tuple) else part for part in parts
+    )
+
+
+def write_cached_netlist(cache, hierarchy, target_path, netlist_top, netlist_cell):
+    """
+    Write the netlist of ``hierarchy`` to ``target_path``.
+
+    Parameters
+    ----------
+    cache : NetlistCache
+    hierarchy : SchematicHierarchy
+    target_path : str
+        Netlist file to write.
+    netlist_top : callable
+        ``netlist_top(path)`` netlists the top schematic into ``path``.
+    netlist_cell : callable
+        ``netlist_cell(lib, cell, view, path)`` netlists a subcell schematic
+        on its own into ``path``.
+
+    Returns
+    -------
+    dict
+        ``{"status": "hit" | "partial" | "full", "renetlisted": [cells]}``.
+    """
+    target_path = str(target_path)
+    cached = cache.lookup(hierarchy.key)
+    if cached is not None:
+        shutil.copyfile(cached, target_path)
+        cache.touch(hierarchy.key)
+        return {"status": "hit", "renetlisted": []}
+
+    previous = cache.previous(hierarchy)
+    subcells = hierarchy.subcells()
+    if (previous is not None and previous["top_hash"] == hierarchy.schematics[hierarchy.top]
+            and set(previous["subcells"]) == set(subcells)):
+        changed = sorted(
+            name for name, digest in subcells.items() if previous["subcells"][name] != digest
+        )
+        blocks = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for lib, cell, view in hierarchy.schematics:
+                if cell not in changed or (lib, cell, view) == hierarchy.top:
+                    continue
+                cell_path = os.path.join(tmp_dir, f"{cell}.cir")
+                netlist_cell(lib, cell, view, cell_path)
+                with open(cell_path, "r") as f:
+                    block = subckt_block(f.read(), cell)
+                if block is None:
+                    blocks = None
+                    break
+                blocks[cell.upper()] = block
+        if blocks is not None:
+            with open(cache.lookup(previous["key"]), "r") as f:
+                text = _splice(f.read(), blocks)
+            if text is not None:
+                with open(target_path, "w") as f:
+                    f.write(text)
+                cache.store(hierarchy, target_path)
+                return {"status": "partial", "renetlisted": changed}
+
+    netlist_top(target_path)
+    cache.store(hierarchy, target_path)
+    return {"status": "full", "renetlisted": sorted(subcells) + [hierarchy.top[1]]}
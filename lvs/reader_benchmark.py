@@ -0,0 +1,292 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Throughput of the schematic netlist reader of the LVS deck.
+
+Synthetic flat netlists of MOS transistors, subcircuit instances, poly
+and metal resistors and MIM capacitors in the forms the custom reader
+accepts are fed through ``rule_decks/custom_reader.lvs`` in KLayout:
+
+- normalize: ``CustomReader#normalize_element`` on every element line,
+  the Ruby rewrite of the lines without the KLayout SPICE parser,
+- read: a netlist read through the custom reader, as the deck reads the
+  schematic.
+
+Command line::
+
+    python reader_benchmark.py --elements 10000,100000,1000000,10000000
+    python reader_benchmark.py --netlist design.cdl --modes normalize
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+RULE_DECKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_decks")
+MODES = ("normalize", "read")
+DEFAULT_ELEMENTS = (10**4, 10**5, 10**6, 10**7)
+# Element lines of one synthetic cycle, {i} is the element number and
+# {a}, {b}, {c} are nets. 20 elements: 10 MOS, 4 instances, 4 resistors
+# and 2 capacitors.
+ELEMENT_CYCLE = (
+    ("M", "M{i} n{a} n{b} n{c} VSS sg13_lv_nmos w=1.0u l=0.13u ng=1 m=1"),
+    ("M", "M{i} n{a} n{b} n{c} VDD sg13_lv_pmos w=2.0u l=0.13u ng=1 m=1"),
+) * 5 + (
+    ("X", "X{i} n{a} n{b} VDD VSS / inv"),
+) * 4 + (
+    ("R", "R{i} n{a} n{b} sub! rsil w=0.5u l=1u m=1 R=100"),
+    ("R", "R{i} n{a} n{b} 3.1583k $SUB=sub! $[rhigh] w=0.5e-6 l=0.96e-6 b=0"),
+    ("R", "R{i} n{a} n{b} sub! rppd w = 0.5u l = 2u m=1"),
+    ("R", "R{i} n{a} n{b} 20k $[res_metal1] l=1u w=5u"),
+    ("C", "C{i} n{a} n{b} cap_cmim w=6.99u l=6.99u m=1 C=74.620f"),
+    ("C", "C{i} n{a} n{b} 74.620f $[cap_cmim] w=6.99u l=6.99u m=1"),
+)
+SUBCIRCUIT = """.SUBCKT inv A Y VDD VSS
+MN Y A VSS VSS sg13_lv_nmos w=1.0u l=0.13u ng=1 m=1
+MP Y A VDD VDD sg13_lv_pmos w=2.0u l=0.13u ng=1 m=1
+.ENDS
+"""
+RESULT_PATTERN = re.compile(r"^READER (\S+) (\d+) (\d+(?:\.\d+)?) (\d+)\s*$", re.MULTILINE)
+# Driver deck, run as klayout -b -r <driver> -rd netlist=<path> -rd mode=<mode>.
+DRIVER = """# frozen_string_literal: true
+require 'logger'
+
+logger = Logger.new($stdout)
+logger.level = Logger::WARN
+dbu(0.001)
+
+# %include {rule_decks}/custom_classes.lvs
+
+lines = 0
+start = Time.now
+case $mode
+when 'normalize'
+  reader = CustomReader.new
+  normalize = lambda do |line|
+    element = line[0].upcase
+    return if element == '*' || element == '.'
+
+    reader.normalize_element(line, element)
+    lines += 1
+  end
+  pending = nil
+  File.foreach($netlist, chomp: true) do |line|
+    next if line.strip.empty?
+
+    if line.start_with?('+')
+      pending = "#{{pending}} #{{line[1..]}}" if pending
+      next
+    end
+    normalize.call(pending) if pending
+    pending = line
+  end
+  normalize.call(pending) if pending
+when 'read'
+  netlist = RBA::Netlist.new
+  netlist.read($netlist, RBA::NetlistSpiceReader.new(CustomReader.new))
+  netlist.each_circuit do |circuit|
+    circuit.each_device {{ lines += 1 }}
+    circuit.each_subcircuit {{ lines += 1 }}
+  end
+else
+  raise "Unknown benchmark mode #{{$mode}}"
+end
+puts format('READER %s %d %.6f %d', $mode, lines, Time.now - start, RBA::Timer.memory_size / 1024)
+"""
+
+
+def write_synthetic_netlist(path, elements, nets=None):
+    """
+    Write a flat netlist with ``elements`` element lines below one top cell.
+
+    Parameters
+    ----------
+    path : str or path
+    elements : int
+    nets : int or None
+        Nets of the top cell, half the element count if None.
+
+    Returns
+    -------
+    int
+        Number of element lines.
+    """
+    nets = nets or max(elements // 2, 3)
+    with open(path, "w") as f:
+        f.write("* Synthetic netlist of reader_benchmark.py\n")
+        f.write(SUBCIRCUIT)
+        f.write(".SUBCKT top VDD VSS sub!\n")
+        chunk = []
+        for index in range(elements):
+            _, template = ELEMENT_CYCLE[index % len(ELEMENT_CYCLE)]
+            chunk.append(template.format(
+                i=index, a=index % nets, b=(index * 7 + 1) % nets, c=(index * 13 + 2) % nets,
+            ))
+            if len(chunk) == 10000:
+                f.write("\n".join(chunk))
+                f.write("\n")
+                chunk = []
+        if chunk:
+            f.write("\n".join(chunk))
+            f.write("\n")
+        f.write(".ENDS\n")
+    return elements
+
+
+def write_driver(path):
+    """Write the KLayout driver deck that includes the custom reader."""
+    with open(path, "w") as f:
+        f.write(DRIVER.format(rule_decks=RULE_DECKS))
+    return path
+
+
+def measure(netlist_path, mode, driver_path, klayout="klayout"):
+    """
+    Run one mode over a netlist in KLayout.
+
+    Returns
+    -------
+    dict
+        ``mode``, ``lines``, ``seconds`` inside the reader, ``wall_seconds``
+        of the KLayout run and ``memory_mb`` at its end, or ``mode`` and
+        ``error``.
+    """
+    command = [klayout, "-b", "-r", driver_path,
+               "-rd", f"netlist={netlist_path}", "-rd", f"mode={mode}"]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True)
+    except OSError as e:
+        return {"mode": mode, "error": str(e)}
+    wall_seconds = time.perf_counter() - start
+    m = RESULT_PATTERN.search(completed.stdout)
+    if completed.returncode != 0 or m is None:
+        return {"mode": mode, "error": (completed.stderr or completed.stdout).strip()}
+    return {
+        "mode": mode,
+        "lines": int(m.group(2)),
+        "seconds": float(m.group(3)),
+        "wall_seconds": wall_seconds,
+        "memory_mb": int(m.group(4)) / 1024,
+    }
+
+
+def benchmark(element_counts=DEFAULT_ELEMENTS, modes=MODES, klayout="klayout", netlists=None,
+              work_dir=None, keep_netlists=False):
+    """
+    Measure every mode on synthetic netlists or on the given netlists.
+
+    Parameters
+    ----------
+    element_counts : iterable of int
+        Sizes of the synthetic netlists, ignored if ``netlists`` is given.
+    modes : iterable of str
+    klayout : str
+        KLayout executable.
+    netlists : list of str or None
+        Existing netlists to read instead of synthetic ones.
+    work_dir : str or None
+        Directory of the driver and the synthetic netlists, a temporary
+        directory that is removed afterwards if None.
+    keep_netlists : bool
+        Keep the synthetic netlists, else each is removed once measured.
+
+    Returns
+    -------
+    list of dict
+        :func:`measure` results with the ``netlist`` and its ``elements``.
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix="reader_benchmark_") as tmp_dir:
+            return benchmark(element_counts, modes, klayout, netlists, tmp_dir)
+
+    os.makedirs(work_dir, exist_ok=True)
+    driver_path = write_driver(os.path.join(work_dir, "reader_benchmark.lvs"))
+    if netlists:
+        inputs = [(os.path.abspath(path), None) for path in netlists]
+    else:
+        inputs = [(os.path.join(work_dir, f"synthetic_{count}.cir"), count)
+                  for count in element_counts]
+
+    results = []
+    for netlist_path, count in inputs:
+        if count is not None:
+            write_synthetic_netlist(netlist_path, count)
+        for mode in modes:
+            result = measure(netlist_path, mode, driver_path, klayout)
+            result.update(netlist=netlist_path, elements=count)
+            results.append(result)
+        if count is not None and not keep_netlists:
+            # A synthetic netlist of 10^7 elements takes about 600 MB.
+            os.remove(netlist_path)
+    return results
+
+
+def format_benchmark_table(results):
+    """Format benchmark results as table lines."""
+    header = (f"{'Netlist':<24} {'Mode':<10} {'Lines':>10} {'Time (s)':>10} "
+              f"{'Lines/s':>10} {'Memory (MB)':>12}")
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        name = (str(entry["elements"]) if entry.get("elements") is not None
+                else os.path.basename(entry["netlist"]))
+        if "error" in entry:
+            message = (entry["error"].splitlines() or [""])[-1]
+            lines.append(f"{name:<24} {entry['mode']:<10} failed: {message}")
+            continue
+        rate = entry["lines"] / entry["seconds"] if entry["seconds"] else 0.0
+        lines.append(
+            f"{name:<24} {entry['mode']:<10} {entry['lines']:>10} {entry['seconds']:>10.3f} "
+            f"{rate:>10.0f} {entry['memory_mb']:>12.1f}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the LVS schematic reader.")
+    parser.add_argument(
+        "--elements", default=",".join(str(count) for count in DEFAULT_ELEMENTS),
+        help="Comma separated element counts of the synthetic netlists.",
+    )
+    parser.add_argument("--netlist", action="append", default=None,
+                        help="Read this netlist instead of synthetic ones, can be repeated.")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        help="Comma separated modes: normalize, read.")
+    parser.add_argument("--klayout", default="klayout", help="KLayout executable.")
+    parser.add_argument("--keep", default=None, metavar="DIR",
+                        help="Write the driver deck and the netlists to DIR and keep them.")
+    parser.add_argument("--generate", type=int, default=None, metavar="ELEMENTS",
+                        help="Only write a synthetic netlist of this size to --keep.")
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = sorted(set(modes) - set(MODES))
+    if unknown:
+        print(f"Unknown modes: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        if args.generate is not None:
+            target = os.path.join(args.keep or ".", f"synthetic_{args.generate}.cir")
+            write_synthetic_netlist(target, args.generate)
+            print(f"{target}: {args.generate} elements, {os.path.getsize(target)} bytes")
+            sys.exit(0)
+        counts = [int(count) for count in args.elements.split(",") if count]
+        results = benchmark(counts, modes, args.klayout, args.netlist, args.keep,
+                            keep_netlists=args.keep is not None)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print("\n".join(format_benchmark_table(results)))
+    sys.exit(1 if any("error" in entry for entry in results) else 0)
@@ -18,6 +18,8 @@
 """Run IHP 130nm BiCMOS Open Source PDK - SG13G2 LVS."""
 
 import argparse
+import collections
+import json
 import os
 import logging
 import klayout.db
@@ -26,6 +28,48 @@ from subprocess import Popen, PIPE, STDOUT
 import time
 import sys
 
+try:
+    from .device_families import skipped_device_families
+except ImportError:
+    from device_families import skipped_device_families
+try:
+    from .lvs_diff import (LVSDiffError, diff_results, diff_summary_text, format_diff,
+                           write_diff_report)
+except ImportError:
+    from lvs_diff import (LVSDiffError, diff_results, diff_summary_text, format_diff,
+                          write_diff_report)
+try:
+    from .lvs_results import read_lvs_result
+except ImportError:
+    from lvs_results import read_lvs_result
+try:
+    from .spice_index import SpiceIndexError, index_netlist
+except ImportError:
+    from spice_index import SpiceIndexError, index_netlist
+try:
+    from .lvs_reuse import (cell_fingerprints, deck_digest, default_reuse_db,
+                            load_reuse_db, record_results, reusable_cells)
+except ImportError:
+    from lvs_reuse import (cell_fingerprints, deck_digest, default_reuse_db,
+                           load_reuse_db, record_results, reusable_cells)
+try:
+    from ..verification.klayout_probe import (KLayoutCapabilities, KLayoutProbeError,
+                                              check_version, probe_klayout)
+    from ..verification.klayout_session import KLayoutSession, KLayoutSessionError
+    from ..verification.layout_scan import LayoutScanError, top_cell_names
+    from ..verification.run_mode import choose_run_mode, hierarchy_statistics, record_runtime
+    from ..verification.stage_timing import StageTimer, format_stage_table, write_stage_report
+    from ..verification.verification_daemon import DaemonClient
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from verification.klayout_probe import (KLayoutCapabilities, KLayoutProbeError,
+                                            check_version, probe_klayout)
+    from verification.klayout_session import KLayoutSession, KLayoutSessionError
+    from verification.layout_scan import LayoutScanError, top_cell_names
+    from verification.run_mode import choose_run_mode, hierarchy_statistics, record_runtime
+    from verification.stage_timing import StageTimer, format_stage_table, write_stage_report
+    from verification.verification_daemon import DaemonClient
+
 
 class ConsoleColorFormatter(logging.Formatter):
     """Color formatter for console logs (file logs remain plain)."""
@@ -70,15 +114,100 @@ class ImportantEventCollector(logging.Handler):
             self.warnings.append(message)
 
 
+# Last KLayout output lines kept for error reports.
+LOG_TAIL_LINES = 200
+# Unique warning/error lines kept for the summary.
+LOG_SIGNAL_LIMIT = 5
+LOG_PASS_SIGNATURE = "Congratulations! Netlists match."
+LOG_FAIL_SIGNATURE = "ERROR : Netlists don't match"
+# Outcome of a run, read by lvs_batch.py for jobs run in their own process.
+RUN_SUMMARY_FILE = "run_summary.json"
+
+
+class LayoutLogSignals:
+    """
+    Warnings, errors and outcome of a KLayout LVS log, classified line by
+    line in one pass.
+
+    Memory does not depend on the log size: only the last ``tail_lines``
+    lines and the first ``limit`` unique warnings and errors are kept.
+
+    Attributes
+    ----------
+    warnings, errors : list of str
+        First unique warning and error lines.
+    warning_count, error_count : int
+        All warning and error lines.
+    outcome : str or None
+        ``PASS`` or ``FAIL`` if the comparison result was logged.
+    tail : collections.deque
+        Last output lines.
+    stages : StageTimer
+        Stage markers of the deck.
+    """
+
+    def __init__(self, tail_lines=LOG_TAIL_LINES, limit=LOG_SIGNAL_LIMIT):
+        self.limit = limit
+        self.warnings = []
+        self.errors = []
+        self.warning_count = 0
+        self.error_count = 0
+        self.outcome = None
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.stages = StageTimer()
+
+    def feed(self, raw_line):
+        self.tail.append(raw_line)
+        line = raw_line.strip()
+        if self.stages.feed(line) is not None:
+            return
+        if "WARNING :" in line or line.startswith("WARNING:"):
+            self.warning_count += 1
+            if len(self.warnings) < self.limit and line not in self.warnings:
+                self.warnings.append(line)
+        elif "ERROR :" in line or line.startswith("ERROR:"):
+            self.error_count += 1
+            if len(self.errors) < self.limit and line not in self.errors:
+                self.errors.append(line)
+            if LOG_FAIL_SIGNATURE in line:
+                self.outcome = "FAIL"
+        elif LOG_PASS_SIGNATURE in line:
+            self.outcome = "PASS"
+
+    def tail_text(self):
+        return "".join(self.tail)
+
+
+def scan_layout_log(layout_log_path, limit=LOG_SIGNAL_LIMIT):
+    """Classify a KLayout log file line by line, None if it cannot be read."""
+    if not layout_log_path or not os.path.isfile(layout_log_path):
+        return None
+    signals = LayoutLogSignals(limit=limit)
+    try:
+        with open(layout_log_path, "r", errors="replace") as f:
+            for line in f:
+                signals.feed(line)
+    except OSError:
+        return None
+    return signals
+
+
 class KLayoutRunError(RuntimeError):
     """Raised when KLayout LVS execution fails."""
 
-    def __init__(self, message, artifacts, returncode, stdout_text="", stderr_text=""):
+    def __init__(self, message, artifacts, returncode, output_tail="", log_signals=None):
         super().__init__(message)
         self.artifacts = artifacts
         self.returncode = returncode
-        self.stdout_text = stdout_text or ""
-        self.stderr_text = stderr_text or ""
+        self.output_tail = output_tail or ""
+        self.log_signals = log_signals
+
+    @property
+    def stdout_text(self):
+        """Last lines of the KLayout output."""
+        return self.output_tail
+
+    stderr_text = stdout_text
 
 
 def setup_logging(lvs_run_dir, run_name):
@@ -109,51 +238,85 @@ def setup_logging(lvs_run_dir, run_name):
     return collector, main_log_path
 
 
-def evaluate_run_outcome(layout_log_path, effective_net_only, layout_netlist_path=None):
-    """Extract final run outcome message from KLayout LVS log."""
+def evaluate_run_outcome(
+    layout_log_path, effective_net_only, layout_netlist_path=None, report_path=None,
+    log_signals=None, lvs_result=None,
+):
+    """
+    Return the final run outcome message.
+
+    The match status is taken from the cross-reference in the LVS report if
+    it can be read, ``lvs_result`` is the report if it was already read.
+    Otherwise the signals classified while KLayout ran are used, or the
+    KLayout log is scanned.
+    """
     if effective_net_only:
         if layout_netlist_path:
             return "NET_ONLY mode: output netlist generated from --layout_netlist input."
         return "NET_ONLY mode: extracted netlist generated from layout only."
 
-    if not layout_log_path or not os.path.isfile(layout_log_path):
-        return "Comparison mode: outcome unknown (layout log not found)."
+    result = lvs_result if lvs_result is not None else read_lvs_result(report_path)
+    if result is not None and result.compared:
+        return result.outcome()
 
-    try:
-        with open(layout_log_path, "r") as f:
-            content = f.read()
-    except OSError:
-        return "Comparison mode: outcome unknown (failed to read layout log)."
+    if log_signals is None:
+        if not layout_log_path or not os.path.isfile(layout_log_path):
+            return "Comparison mode: outcome unknown (layout log not found)."
+        log_signals = scan_layout_log(layout_log_path)
+        if log_signals is None:
+            return "Comparison mode: outcome unknown (failed to read layout log)."
 
-    if "Congratulations! Netlists match." in content:
+    if log_signals.outcome == "PASS":
         return "Comparison mode: PASS (netlists match)."
-    if "ERROR : Netlists don't match" in content:
+    if log_signals.outcome == "FAIL":
         return "Comparison mode: FAIL (netlists do not match)."
     return "Comparison mode: completed (no explicit PASS/FAIL signature found)."
 
 
-def collect_layout_log_signals(layout_log_path, limit=5):
+def collect_layout_log_signals(layout_log_path, limit=LOG_SIGNAL_LIMIT, log_signals=None):
     """Collect warning/error messages from the KLayout layout log."""
-    if not layout_log_path or not os.path.isfile(layout_log_path):
+    if log_signals is None:
+        log_signals = scan_layout_log(layout_log_path, limit)
+    if log_signals is None:
         return [], []
+    return log_signals.warnings[:limit], log_signals.errors[:limit]
 
-    warning_lines = []
-    error_lines = []
 
-    try:
-        with open(layout_log_path, "r") as f:
-            for raw_line in f:
-                line = raw_line.strip()
-                if "WARNING :" in line or line.startswith("WARNING:"):
-                    warning_lines.append(line)
-                elif "ERROR :" in line or line.startswith("ERROR:"):
-                    error_lines.append(line)
-    except OSError:
-        return [], []
+def run_summary(run_meta, returncode=0, limit=LOG_SIGNAL_LIMIT):
+    """Outcome, status and KLayout log signals of a run as plain data."""
+    warnings, errors = collect_layout_log_signals(
+        run_meta.get("layout_log_path"), limit, run_meta.get("log_signals")
+    )
+    outcome = run_meta.get("outcome") or "n/a"
+    return {
+        "outcome": outcome,
+        "status": _summary_status_from_outcome(outcome),
+        "returncode": returncode,
+        "warnings": warnings,
+        "errors": errors,
+        "report_path": run_meta.get("report_path"),
+        "lvs_result": run_meta.get("lvs_result"),
+    }
+
+
+def write_run_summary(run_dir, summary):
+    """Write a run summary to ``<run_dir>/run_summary.json``."""
+    path = os.path.join(run_dir, RUN_SUMMARY_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f, indent=4)
+    os.replace(tmp_path, path)
+    return path
 
-    warning_lines = list(dict.fromkeys(warning_lines))[:limit]
-    error_lines = list(dict.fromkeys(error_lines))[:limit]
-    return warning_lines, error_lines
+
+def load_run_summary(run_dir):
+    """Read the run summary of ``run_dir``, None if there is none."""
+    try:
+        with open(os.path.join(run_dir, RUN_SUMMARY_FILE), "r") as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return summary if isinstance(summary, dict) else None
 
 
 def _summary_status_from_outcome(outcome_text):
@@ -203,10 +366,16 @@ def emit_important_summary(run_dir, run_meta, collector, total_time):
     effective_net_only = run_meta.get("effective_net_only") if run_meta else False
     run_mode = "NET_ONLY" if effective_net_only else "COMPARE"
     outcome = run_meta.get("outcome", "n/a") if run_meta else "n/a"
+    reused_cells = run_meta.get("reused_cells") if run_meta else None
+    stages = run_meta.get("stages") if run_meta else None
+    stages_path = run_meta.get("stages_path") if run_meta else None
+    skipped_devices = run_meta.get("skipped_devices") if run_meta else None
+    lvs_diff = run_meta.get("lvs_diff") if run_meta else None
     status = _summary_status_from_outcome(outcome)
 
     klayout_warns, klayout_errs = collect_layout_log_signals(
-        run_meta.get("layout_log_path") if run_meta else None
+        run_meta.get("layout_log_path") if run_meta else None,
+        log_signals=run_meta.get("log_signals") if run_meta else None,
     )
     script_warns = list(dict.fromkeys(collector.warnings))
     script_errs = list(dict.fromkeys(collector.errors))
@@ -220,13 +389,23 @@ def emit_important_summary(run_dir, run_meta, collector, total_time):
         ("Outcome", outcome),
         ("Layout", os.path.basename(layout_path) if layout_path else "n/a"),
         ("Top Cell", topcell or "n/a"),
+        ("Run Mode", run_meta.get("run_mode", "n/a") if run_meta else "n/a"),
+        ("Reused Cells", ", ".join(reused_cells) if reused_cells else "none"),
+        ("Skipped Devices", ", ".join(skipped_devices) if skipped_devices else "none"),
         ("Results Dir", run_dir),
+        ("Stage Report", stages_path or "n/a"),
+        ("LVS Diff", lvs_diff or "n/a"),
         ("Warnings", str(len(all_warns))),
         ("Errors", str(len(all_errs))),
         ("Run Time (s)", str(total_time)),
     ]
     _emit_summary_table(rows)
 
+    if stages:
+        logging.info("Stage timings:")
+        for line in format_stage_table(stages):
+            logging.info("  %s", line)
+
     if all_errs:
         logging.error("Key errors:")
         for msg in all_errs[:5]:
@@ -272,33 +451,47 @@ def discover_run_artifacts(run_dir, main_log_path):
     }
 
 
-def check_klayout_version():
+def check_klayout_version(version_text=None, klayout="klayout"):
     """
     Check klayout version and makes sure it would work with the LVS.
+
+    Parameters
+    ----------
+    version_text : str or None
+        Version string of an already running KLayout, e.g. a session host.
+        The ``klayout`` executable is probed if not given.
+    klayout : str
+        KLayout executable. Its probe is cached, see
+        ``verification/klayout_probe.py``.
+
+    Returns
+    -------
+    KLayoutCapabilities
+        Version and features of the KLayout that runs the deck.
     """
     # ======= Checking Klayout version =======
-    klayout_v_ = os.popen("klayout -b -v").read()
-    klayout_v_ = klayout_v_.split("\n")[0]
-    klayout_v_list = []
-
-    if klayout_v_ == "":
-        logging.error("Klayout is not found. Please make sure klayout is installed.")
-        exit(1)
+    if version_text:
+        capabilities = KLayoutCapabilities(klayout, version_text)
     else:
-        klayout_v_list = [int(v) for v in klayout_v_.split(" ")[-1].split(".")]
+        try:
+            capabilities = probe_klayout(klayout)
+        except KLayoutProbeError as e:
+            logging.error(str(e))
+            exit(1)
 
-    if len(klayout_v_list) < 1 or len(klayout_v_list) > 3:
-        logging.error("Was not able to get klayout version properly.")
+    problem = check_version(capabilities)
+    if problem:
+        logging.error(problem)
+        logging.error(
+            "Using this klayout version has not been assessed. Limits are unknown"
+        )
         exit(1)
-    elif len(klayout_v_list) >= 2 or len(klayout_v_list) <= 3:
-        if klayout_v_list[1] < 30 or (klayout_v_list[1] == 30 and klayout_v_list[2] < 2):
-            logging.error("Prerequisites at a minimum: KLayout 0.30.2")
-            logging.error(
-                "Using this klayout version has not been assessed. Limits are unknown"
-            )
-            exit(1)
 
-    logging.info(f"Your Klayout version is: {klayout_v_}")
+    logging.info(f"Your Klayout version is: {capabilities.version_text}")
+    return capabilities
+
+
+LAYOUT_SUFFIXES = (".gds", ".gds2", ".gds.gz", ".oas", ".oas.gz")
 
 
 def check_layout_type(layout_path):
@@ -322,7 +515,7 @@ def check_layout_type(layout_path):
         )
         exit(1)
 
-    if ".gds" not in layout_path and ".oas" not in layout_path:
+    if not layout_path.lower().endswith(LAYOUT_SUFFIXES):
         logging.error(
             f"Layout {layout_path} is not in GDS2 or OASIS format, please recheck."
         )
@@ -333,18 +526,27 @@ def check_layout_type(layout_path):
 
 def get_top_cell_names(gds_path):
     """
-    Get the top cell names from the GDS file.
+    Get the top cell names from the GDS or OASIS file.
+
+    Only the cell definitions and references are read, see
+    ``verification/layout_scan.py``. Layouts the scanner cannot read are
+    loaded with KLayout.
 
     Parameters
     ----------
     gds_path : string
-        Path to the target GDS file.
+        Path to the target GDS or OASIS file.
 
     Returns
     -------
     List of string
         Names of the top cell in the layout.
     """
+    try:
+        return top_cell_names(gds_path)
+    except LayoutScanError as e:
+        logging.warning(f"Layout scan failed, reading the full layout: {e}")
+
     layout = klayout.db.Layout()
     layout.read(gds_path)
     top_cells = [t.name for t in layout.top_cells()]
@@ -377,7 +579,8 @@ def get_run_top_cell_name(args, layout_path):
         layout_topcells = get_top_cell_names(layout_path)
         if len(layout_topcells) > 1:
             logging.error(
-                "Layout has multiple topcells. Use --topcell to determine which topcell you want."
+                "Layout has multiple topcells (%s). Use --topcell to determine which topcell you want.",
+                ", ".join(layout_topcells),
             )
             exit(1)
         else:
@@ -473,10 +676,10 @@ def generate_klayout_switches(
     """
     switches = dict()
 
-    if args.run_mode in ["flat", "deep"]:
+    if args.run_mode in ["flat", "deep", "auto"]:
         run_mode = args.run_mode
     else:
-        logging.error("Allowed klayout modes are (flat , deep) only")
+        logging.error("Allowed klayout modes are (flat , deep, auto) only")
         exit(1)
 
     switches = {
@@ -496,22 +699,156 @@ def generate_klayout_switches(
         "schematic": os.path.abspath(netlist_path) if netlist_path else None,
         "layout_netlist": os.path.abspath(layout_netlist_path) if layout_netlist_path else None,
         "ignore_top_ports_mismatch": "true" if args.ignore_top_ports_mismatch else "false",
-        "implicit_nets": f'"{args.implicit_nets}"' if args.implicit_nets else '""',
+        "implicit_nets": args.implicit_nets if args.implicit_nets else "",
+        "skip_devices": None,
     }
 
     return switches
 
 
-def build_switches_string(sws: dict):
+def select_run_mode(layout_path, topcell, layout_netlist_path=None):
+    """
+    Choose deep or flat mode from the hierarchy statistics of the layout.
+
+    Parameters
+    ----------
+    layout_path : str
+        Path to the layout file.
+    topcell : str
+        Top cell of the run.
+    layout_netlist_path : str or None
+        Pre-extracted layout netlist, no extraction runs in this case.
+
+    Returns
+    -------
+    tuple
+        ``(run_mode, statistics)``, statistics is None if the layout was not
+        scanned.
+    """
+    if layout_netlist_path:
+        logging.info("Run mode auto: flat (layout netlist input, no extraction).")
+        return "flat", None
+    try:
+        statistics = hierarchy_statistics(layout_path, topcell)
+    except LayoutScanError as e:
+        logging.warning(f"Layout statistics failed, using flat mode: {e}")
+        return "flat", None
+    run_mode, reason = choose_run_mode(statistics)
+    logging.info(f"Run mode auto: {run_mode} ({reason})")
+    return run_mode, statistics
+
+
+def select_skipped_devices(args, layout_path, netlist_path, switches):
+    """
+    Choose the device families the deck skips, see ``device_families.py``.
+
+    Families are only skipped for an extracted layout compared with a
+    schematic netlist. The selected families are passed to the deck in
+    ``skip_devices``.
+
+    Returns
+    -------
+    list of str
+        Skipped device families, empty if all families are extracted.
+    """
+    if args.no_device_scan or switches["net_only"] == "true" or switches.get("layout_netlist"):
+        return []
+    if not netlist_path:
+        logging.info("Device scan: no schematic netlist, extracting all device families.")
+        return []
+    try:
+        skipped, reason = skipped_device_families(netlist_path, layout_path)
+    except (LayoutScanError, OSError) as e:
+        logging.warning(f"Device scan failed, extracting all device families: {e}")
+        return []
+    if skipped:
+        switches["skip_devices"] = ",".join(skipped)
+        logging.info(f"Skipping device families: {', '.join(skipped)} ({reason})")
+    else:
+        logging.info(f"Device scan: extracting all device families ({reason})")
+    return skipped
+
+
+def prepare_subcell_reuse(args, lvs_dir, layout_path, netlist_path, switches):
     """
-    Build switches string from dictionary.
+    Select the subcells whose previous LVS results are reused.
+
+    Reuse applies to deep-mode comparisons of an extracted layout. The
+    selected cells are passed to the deck in ``blank_circuits``.
+
+    Returns
+    -------
+    dict or None
+        ``{"fingerprints", "reuse_db", "reused"}``, None if reuse does not
+        apply to this run.
+    """
+    if (args.no_reuse or switches["run_mode"] != "deep" or switches["net_only"] == "true"
+            or not netlist_path or switches.get("layout_netlist")):
+        return None
+    # The run dir is new for every run, the default file belongs to the layout.
+    reuse_db = args.reuse_db or default_reuse_db(layout_path)
+    try:
+        fingerprints = cell_fingerprints(
+            layout_path, netlist_path, deck_digest(lvs_dir, switches), switches["topcell"]
+        )
+    except (OSError, ValueError, RuntimeError) as e:
+        logging.warning(f"Subcell fingerprinting failed, comparing all cells: {e}")
+        return None
+    reused = reusable_cells(fingerprints, load_reuse_db(reuse_db))
+    if reused:
+        switches["blank_circuits"] = ",".join(reused)
+        logging.info(
+            "Reusing the results of %d unchanged subcells: %s", len(reused), ", ".join(reused)
+        )
+    return {"fingerprints": fingerprints, "reuse_db": reuse_db, "reused": reused}
+
+
+def compare_with_previous(compare_to, report_path, run_dir):
+    """
+    Diff the results of this run with an earlier result, see ``lvs_diff.py``.
+
+    The diff is written to ``<design>_lvs_diff.json`` next to the report
+    and logged as text.
+
+    Returns
+    -------
+    tuple
+        ``(summary text, diff report path)``, ``(None, None)`` if the diff
+        failed.
+    """
+    layout_base_name = os.path.basename(report_path)[:-len(".lvsdb")]
+    diff_path = os.path.join(run_dir, f"{layout_base_name}_lvs_diff.json")
+    try:
+        diff = diff_results(compare_to, report_path)
+        write_diff_report(diff_path, diff)
+    except (LVSDiffError, OSError) as e:
+        logging.warning(f"LVS diff with {compare_to} failed: {e}")
+        return None, None
+    for line in format_diff(diff):
+        logging.info(line)
+    logging.info(f"LVS diff written to {diff_path}")
+    return diff_summary_text(diff), diff_path
+
+
+def build_switches_args(sws: dict):
+    """
+    Build the ``-rd`` command line arguments from a switches dictionary.
 
     Parameters
     ----------
     sws : dict
-        Dictionary that holds the Antenna switches.
+        Dictionary that holds the LVS switches.
+
+    Returns
+    -------
+    list of str
+        Arguments to append to the KLayout command.
     """
-    return " ".join(f"-rd {k}={v}" for k, v in sws.items() if v is not None)
+    args = []
+    for key, value in sws.items():
+        if value is not None:
+            args.extend(["-rd", f"{key}={value}"])
+    return args
 
 
 def check_lvs_results(results_db_files: list):
@@ -532,7 +869,15 @@ def check_lvs_results(results_db_files: list):
         exit(1)
 
 
-def run_check(lvs_file: str, path: str, run_dir: str, sws: dict):
+def run_check(
+    lvs_file: str,
+    path: str,
+    run_dir: str,
+    sws: dict,
+    klayout="klayout",
+    session=None,
+    output=None,
+):
     """
     Run LVS check.
 
@@ -546,6 +891,13 @@ def run_check(lvs_file: str, path: str, run_dir: str, sws: dict):
         String that holds the full path of the run location.
     sws : dict
         Dictionary that holds all switches that needs to be passed to the antenna checks.
+    klayout : str
+        KLayout executable for one-shot runs.
+    session : KLayoutSession, DaemonClient or None
+        Run the deck in this long-lived KLayout process, or in the
+        verification daemon, instead of starting a new process.
+    output : file object or None
+        Stream for the KLayout output. [default: stdout]
 
     Returns
     -------
@@ -563,52 +915,83 @@ def run_check(lvs_file: str, path: str, run_dir: str, sws: dict):
     report_path = os.path.join(run_dir, f"{layout_base_name}.lvsdb")
     log_path = os.path.join(run_dir, f"{layout_base_name}.log")
     ext_net_path = os.path.join(run_dir, f"{layout_base_name}_extracted.cir")
+    stages_path = os.path.join(run_dir, f"{layout_base_name}_stages.json")
     new_sws["report"] = report_path
     new_sws["log"] = log_path
     new_sws["target_netlist"] = ext_net_path
+    skipped_devices = sws["skip_devices"].split(",") if sws.get("skip_devices") else []
+
+    # The deck writes the run log itself, the output is only passed through
+    # and classified, not kept.
+    log_signals = LayoutLogSignals()
+    stream = output if output is not None else sys.stdout
+
+    def echo(line):
+        log_signals.feed(line)
+        stream.write(line)
+        stream.flush()
+
+    if session is not None:
+        try:
+            result = session.run(lvs_file, new_sws, output=echo)
+        except (KLayoutSessionError, OSError) as e:
+            result = {"ok": False, "error": str(e)}
+        if not result["ok"]:
+            echo(f"ERROR: {result.get('error', 'LVS deck failed')}\n")
+        returncode = 0 if result["ok"] else 1
+    else:
+        proc = Popen(
+            [klayout, "-b", "-r", lvs_file] + build_switches_args(new_sws),
+            text=True,
+            stdout=PIPE,
+            stderr=STDOUT,
+            bufsize=1,
+        )
+        if proc.stdout:
+            for line in proc.stdout:
+                echo(line)
+        proc.wait()
+        returncode = proc.returncode
+
+    stages = log_signals.stages.stages(end_time=time.time())
+    if stages:
+        try:
+            write_stage_report(stages_path, stages, topcell=sws["topcell"],
+                               run_mode=sws.get("run_mode"), returncode=returncode,
+                               skipped_devices=skipped_devices)
+        except OSError as e:
+            logging.warning("Stage report not written: %s", e)
+            stages_path = None
+    else:
+        stages_path = None
 
-    sws_str = build_switches_string(new_sws)
-
-    run_str = f"klayout -b -r {lvs_file} {sws_str}"
-    proc = Popen(
-        run_str,
-        shell=True,
-        text=True,
-        stdout=PIPE,
-        stderr=STDOUT,
-        bufsize=1,
-    )
-
-    output_lines = []
-    if proc.stdout:
-        for line in proc.stdout:
-            output_lines.append(line)
-            sys.stdout.write(line)
-            sys.stdout.flush()
-    proc.wait()
-    combined_output = "".join(output_lines)
-
-    if proc.returncode != 0:
+    if returncode != 0:
         raise KLayoutRunError(
             "KLayout LVS execution failed.",
             artifacts={
                 "report_path": report_path,
                 "layout_log_path": log_path,
                 "extracted_netlist_path": ext_net_path,
+                "stages": stages,
+                "stages_path": stages_path,
+                "skipped_devices": skipped_devices,
             },
-            returncode=proc.returncode,
-            stdout_text=combined_output,
-            stderr_text=combined_output,
+            returncode=returncode,
+            output_tail=log_signals.tail_text(),
+            log_signals=log_signals,
         )
 
     return {
         "report_path": report_path,
         "layout_log_path": log_path,
         "extracted_netlist_path": ext_net_path,
+        "log_signals": log_signals,
+        "stages": stages,
+        "stages_path": stages_path,
     }
 
 
-def main(lvs_run_dir: str, args: argparse.Namespace):
+def main(lvs_run_dir: str, args: argparse.Namespace, session=None, output=None):
     """
     Main function to run the LVS.
 
@@ -618,10 +1001,18 @@ def main(lvs_run_dir: str, args: argparse.Namespace):
         String with absolute path of the full run dir.
     args : argparse.Namespace
         Parsed command-line arguments.
+    session : KLayoutSession, DaemonClient or None
+        Long-lived KLayout process or verification daemon to run the deck in.
+    output : file object or None
+        Stream for the KLayout output. [default: stdout]
     """
 
     # Check Klayout version
-    check_klayout_version()
+    if session is not None:
+        session.start()
+        check_klayout_version(session.version, args.klayout)
+    else:
+        check_klayout_version(klayout=args.klayout)
 
     # Resolve optional input paths.
     layout_path = normalize_optional_path(args.layout)
@@ -706,31 +1097,85 @@ def main(lvs_run_dir: str, args: argparse.Namespace):
     switches = generate_klayout_switches(
         args, layout_path, netlist_path, layout_netlist_path, effective_net_only
     )
+    run_mode_statistics = None
+    if switches["run_mode"] == "auto":
+        switches["run_mode"], run_mode_statistics = select_run_mode(
+            layout_path, switches["topcell"], layout_netlist_path
+        )
+
+    skipped_devices = select_skipped_devices(args, layout_path, netlist_path, switches)
+
+    reuse = prepare_subcell_reuse(
+        args, os.path.dirname(lvs_rule_deck), layout_path, netlist_path, switches
+    )
 
     # Run LVS check
-    run_artifacts = run_check(lvs_rule_deck, layout_path, lvs_run_dir, switches)
+    check_start = time.time()
+    run_artifacts = run_check(
+        lvs_rule_deck, layout_path, lvs_run_dir, switches, args.klayout, session, output
+    )
 
     # Check run
     check_lvs_results(run_artifacts["report_path"])
+    if run_mode_statistics is not None and os.path.isfile(run_artifacts["report_path"]):
+        # Measured runtimes calibrate the run mode model.
+        record_runtime(run_mode_statistics, switches["run_mode"], time.time() - check_start)
+
+    extracted_netlist_path = run_artifacts["extracted_netlist_path"]
+    if os.path.isfile(extracted_netlist_path):
+        # Readers of the extracted netlist seek to a subcircuit or a device
+        # line through the index, see spice_index.py.
+        try:
+            subckt_count = index_netlist(extracted_netlist_path)
+            logging.info(f"Indexed {subckt_count} subcircuits of {extracted_netlist_path}")
+        except (SpiceIndexError, OSError) as e:
+            logging.warning(f"Extracted netlist not indexed: {e}")
+
+    lvs_diff, lvs_diff_path = None, None
+    compare_to = normalize_optional_path(args.compare_to)
+    if compare_to and os.path.isfile(run_artifacts["report_path"]):
+        lvs_diff, lvs_diff_path = compare_with_previous(
+            compare_to, run_artifacts["report_path"], lvs_run_dir
+        )
 
+    # The report is read once, for the outcome, the reuse database and the
+    # summary.
+    lvs_result = read_lvs_result(run_artifacts["report_path"])
+    outcome = evaluate_run_outcome(
+        run_artifacts["layout_log_path"],
+        effective_net_only,
+        layout_netlist_path,
+        run_artifacts["report_path"],
+        run_artifacts["log_signals"],
+        lvs_result,
+    )
+    if reuse is not None and lvs_result is not None:
+        recorded = record_results(reuse["reuse_db"], reuse["fingerprints"], lvs_result)
+        logging.info("Recorded %d matched subcells in %s", recorded, reuse["reuse_db"])
     return {
+        "outcome": outcome,
+        "lvs_result": lvs_result.summary() if lvs_result is not None else None,
+        "reused_cells": reuse["reused"] if reuse is not None else [],
+        "skipped_devices": skipped_devices,
+        "lvs_diff": lvs_diff,
+        "lvs_diff_path": lvs_diff_path,
         "layout_path": layout_path,
         "topcell": switches["topcell"],
+        "run_mode": switches["run_mode"],
         "netlist_path_used": netlist_path,
         "layout_netlist_path_used": layout_netlist_path,
         "effective_net_only": effective_net_only,
         "report_path": run_artifacts["report_path"],
         "layout_log_path": run_artifacts["layout_log_path"],
         "extracted_netlist_path": run_artifacts["extracted_netlist_path"],
+        "log_signals": run_artifacts["log_signals"],
+        "stages": run_artifacts["stages"],
+        "stages_path": run_artifacts["stages_path"],
     }
 
 
-# ================================================================
-# -------------------------- MAIN --------------------------------
-# ================================================================
-
-
-if __name__ == "__main__":
+def build_arg_parser():
+    """Return the command line parser of ``run_lvs.py``."""
     USAGE = """
     run_lvs.py (--help | -h)
     run_lvs.py [--layout=<layout_path>]
@@ -739,7 +1184,9 @@ if __name__ == "__main__":
                [--no_net_names] [--spice_comments] [--net_only] [--no_simplify]
                [--no_series_res] [--no_parallel_res] [--combine_devices] [--top_lvl_pins]
                [--purge] [--purge_nets] [--ignore_top_ports_mismatch]
-               [--implicit_nets=<nets>]
+               [--implicit_nets=<nets>] [--klayout=<klayout>] [--engine=<engine>]
+               [--no_reuse] [--reuse_db=<reuse_db_path>] [--no_device_scan]
+               [--compare_to=<lvsdb_path>]
     """
 
     parser = argparse.ArgumentParser(
@@ -777,9 +1224,9 @@ if __name__ == "__main__":
     parser.add_argument(
         "--run_mode",
         type=str,
-        choices=["flat", "deep"],
+        choices=["flat", "deep", "auto"],
         default="flat",
-        help="KLayout run mode. [default: flat]",
+        help="KLayout run mode, auto chooses from the layout hierarchy. [default: flat]",
     )
     parser.add_argument("--no_net_names", action="store_true", help="Omit net names in extracted netlist.")
     parser.add_argument("--spice_comments", action="store_true", help="Include comments in extracted netlist.")
@@ -805,6 +1252,55 @@ if __name__ == "__main__":
         action="store_true",
         help="Ignore top-level port mismatches during comparison.",
     )
+    parser.add_argument(
+        "--no_reuse",
+        action="store_true",
+        help="Compare all subcells, also those unchanged since a matching run.",
+    )
+    parser.add_argument(
+        "--reuse_db",
+        type=str,
+        default=None,
+        help="Fingerprints of matched subcells. [default: one file per layout in "
+        "~/.cache/revolution-eda/lvs_reuse]",
+    )
+    parser.add_argument(
+        "--no_device_scan",
+        action="store_true",
+        help="Extract all device families, also those the schematic and the layout do not use.",
+    )
+    parser.add_argument(
+        "--compare_to",
+        type=str,
+        default=None,
+        help=(
+            "Earlier .lvsdb, or its .lvsdb.idx index, to diff the results of "
+            "this run with."
+        ),
+    )
+    parser.add_argument(
+        "--klayout", type=str, default="klayout", help="KLayout executable."
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=["process", "session", "daemon"],
+        default="process",
+        help=(
+            "Run the deck in a one-shot KLayout process, a long-lived KLayout "
+            "session or the verification daemon. [default: process]"
+        ),
+    )
+    return parser
+
+
+# ================================================================
+# -------------------------- MAIN --------------------------------
+# ================================================================
+
+
+if __name__ == "__main__":
+    parser = build_arg_parser()
     args = parser.parse_args()
 
     # Generate a timestamped run directory name
@@ -827,12 +1323,24 @@ if __name__ == "__main__":
 
     try:
         # Calling main function
-        run_meta = main(lvs_run_dir, args)
+        if args.engine == "session":
+            with KLayoutSession(args.klayout) as session:
+                run_meta = main(lvs_run_dir, args, session)
+        elif args.engine == "daemon":
+            daemon = DaemonClient()
+            if not daemon.available():
+                logging.warning(
+                    "No verification daemon is running, using a one-shot KLayout process."
+                )
+                daemon = None
+            run_meta = main(lvs_run_dir, args, daemon)
+        else:
+            run_meta = main(lvs_run_dir, args)
     except SystemExit as e:
         exit_code = e.code if isinstance(e.code, int) else 1
     except KLayoutRunError as e:
         logging.error("KLayout run failed with exit code %s.", e.returncode)
-        for line in e.stderr_text.splitlines():
+        for line in e.output_tail.splitlines():
             stripped = line.strip()
             if not stripped:
                 continue
@@ -850,6 +1358,10 @@ if __name__ == "__main__":
             "report_path": e.artifacts.get("report_path"),
             "layout_log_path": e.artifacts.get("layout_log_path"),
             "extracted_netlist_path": e.artifacts.get("extracted_netlist_path"),
+            "log_signals": e.log_signals,
+            "stages": e.artifacts.get("stages"),
+            "stages_path": e.artifacts.get("stages_path"),
+            "skipped_devices": e.artifacts.get("skipped_devices"),
         }
         exit_code = e.returncode
     except Exception:
@@ -868,11 +1380,13 @@ if __name__ == "__main__":
                 "layout_log_path": discovered.get("layout_log_path"),
                 "extracted_netlist_path": discovered.get("extracted_netlist_path"),
             }
-        if run_meta:
+        if run_meta and not run_meta.get("outcome"):
             run_meta["outcome"] = evaluate_run_outcome(
                 run_meta.get("layout_log_path"),
                 run_meta.get("effective_net_only", False),
                 run_meta.get("layout_netlist_path_used"),
+                run_meta.get("report_path"),
+                run_meta.get("log_signals"),
             )
         logging.getLogger().removeHandler(collector)
         emit_important_summary(
@@ -881,6 +1395,11 @@ if __name__ == "__main__":
             collector,
             round(time.time() - t0, 3),
         )
+        if run_meta:
+            try:
+                write_run_summary(lvs_run_dir, run_summary(run_meta, exit_code))
+            except OSError as e:
+                logging.warning("Run summary not written: %s", e)
 
     if exit_code != 0:
         raise SystemExit(exit_code)
@@ -0,0 +1,420 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Offset index of a SPICE netlist, read through a memory map.
+
+The extracted netlist the deck writes through ``CustomWriter``
+(``<design>_extracted.cir``) reaches hundreds of MB on flat runs. Reading
+one cell or one device should not load the whole file:
+
+- the file is memory-mapped and scanned once for the ``.SUBCKT`` and
+  ``.ENDS`` lines, which gives the byte range of every subcircuit,
+- the element lines of a subcircuit, devices and instances with their
+  ``+`` continuation lines, are indexed by element name the first time
+  the subcircuit is asked for,
+- a subcircuit or an element line is read as a slice of the map, only
+  the pages it spans are read from disk.
+
+Both indexes are kept in ``<netlist>.idx`` next to the netlist, in the
+format of ``lvsdb_index.py``, and are reused while the netlist is
+unchanged. Names are case-insensitive, as in SPICE.
+
+Command line::
+
+    python spice_index.py design_extracted.cir
+    python spice_index.py design_extracted.cir --cell TOP --device M$12
+    python spice_index.py --generate 500 /tmp/synthetic_extracted.cir
+    python spice_index.py /tmp/synthetic_extracted.cir --benchmark
+"""
+
+import argparse
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+
+try:
+    from .lvsdb_index import open_index, update_index
+except ImportError:
+    from lvsdb_index import open_index, update_index
+
+SUBCKTS_KEY = "spice_index.subckts"
+ELEMENTS_KEY = "spice_index.elements\x1f"
+# .SUBCKT and .ENDS lines with the name that follows, and the first word of
+# every line that is not a continuation line. The patterns start with the
+# newline before the line, which the regular expression engine finds much
+# faster than a line start.
+_SECTION = re.compile(rb"\n[ \t]*\.(subckt|ends)\b[ \t]*([^\s]*)", re.I)
+_LINE = re.compile(rb"\n[ \t]*([^\s+][^\s]*)")
+
+
+class SpiceIndexError(ValueError):
+    """Raised if a netlist has unbalanced ``.SUBCKT`` and ``.ENDS`` lines."""
+
+
+def _section_lines(data):
+    """Keyword, name, line start and match end of every ``.SUBCKT`` and ``.ENDS`` line."""
+    # The first line has no newline before it.
+    first = _SECTION.match(b"\n" + data[:4096])
+    if first is not None:
+        yield first.group(1).lower(), first.group(2), 0, first.end() - 1
+    for m in _SECTION.finditer(data):
+        yield m.group(1).lower(), m.group(2), m.start() + 1, m.end()
+
+
+def _logical_line(data):
+    """Join an element line and its continuation lines, without comment lines."""
+    parts = []
+    for line in data.decode("utf-8", "replace").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("*"):
+            continue
+        parts.append(stripped[1:].strip() if stripped.startswith("+") else stripped)
+    return " ".join(parts)
+
+
+class SpiceIndex:
+    """
+    Subcircuits and element lines of a SPICE netlist, read on demand.
+
+    Parameters
+    ----------
+    path : str or path
+        The netlist, plain text.
+    use_index : bool
+        Read the indexes from ``<netlist>.idx`` and add new ones to it.
+
+    Attributes
+    ----------
+    subckts : dict
+        Upper case subcircuit name to ``(start, end)`` byte offsets, from
+        the ``.SUBCKT`` line to the end of the ``.ENDS`` line.
+    """
+
+    def __init__(self, path, use_index=True):
+        self.path = os.fspath(path)
+        self.use_index = use_index
+        self.subckts = {}
+        self._data = None
+        self._index = None
+        self._elements = {}
+        self._new_entries = {}
+
+    def open(self):
+        """
+        Map the netlist and read or build the subcircuit index.
+
+        Returns
+        -------
+        SpiceIndex
+            self
+
+        Raises
+        ------
+        OSError
+            If the netlist cannot be read.
+        SpiceIndexError
+            If a ``.SUBCKT`` is not closed.
+        """
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # An empty file cannot be mapped.
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self.use_index:
+            self._index = open_index(self.path)
+        if self._index is not None and SUBCKTS_KEY in self._index:
+            self.subckts = {name: tuple(span)
+                            for name, span in self._index.get(SUBCKTS_KEY).items()}
+        else:
+            self.subckts = self._scan_subckts()
+            self._new_entries[SUBCKTS_KEY] = self.subckts
+        return self
+
+    def _scan_subckts(self):
+        subckts = {}
+        name, start = None, None
+        for keyword, word, line_start, match_end in _section_lines(self._data):
+            if keyword == b"subckt":
+                if name is not None:
+                    raise SpiceIndexError(
+                        f"{self.path}: .SUBCKT {name} at offset {start} is not closed."
+                    )
+                name = word.decode("utf-8", "replace").upper()
+                start = line_start
+            elif name is not None:
+                end = self._data.find(b"\n", match_end)
+                subckts[name] = (start, len(self._data) if end < 0 else end + 1)
+                name = None
+        if name is not None:
+            raise SpiceIndexError(f"{self.path}: .SUBCKT {name} at offset {start} is not closed.")
+        return subckts
+
+    def cells(self):
+        """Subcircuit names in netlist order."""
+        return sorted(self.subckts, key=lambda name: self.subckts[name][0])
+
+    def _span(self, cell):
+        span = self.subckts.get(cell.upper())
+        if span is None:
+            raise KeyError(cell)
+        return span
+
+    def subckt_text(self, cell):
+        """
+        Text of a subcircuit, from its ``.SUBCKT`` line to its ``.ENDS`` line.
+
+        Raises
+        ------
+        KeyError
+            If the netlist has no such subcircuit.
+        """
+        start, end = self._span(cell)
+        return self._data[start:end].decode("utf-8", "replace")
+
+    def pins(self, cell):
+        """Pin names of a subcircuit, as in its ``.SUBCKT`` line."""
+        start, end = self._span(cell)
+        # The header ends where the next line that is not a continuation starts.
+        m = _LINE.search(self._data, start, end)
+        header_end = m.start() + 1 if m is not None else end
+        return _logical_line(self._data[start:header_end]).split()[2:]
+
+    def elements(self, cell):
+        """
+        Element lines of a subcircuit by upper case element name.
+
+        Returns
+        -------
+        dict
+            Element name to ``(start, end)`` byte offsets, the range holds
+            the line and its continuation lines.
+        """
+        cell = cell.upper()
+        elements = self._elements.get(cell)
+        if elements is not None:
+            return elements
+        key = ELEMENTS_KEY + cell
+        if self._index is not None and key in self._index:
+            names, offsets = self._index.get(key)
+            spans = array("Q")
+            spans.frombytes(offsets)
+        else:
+            names, spans = self._scan_elements(cell)
+            self._new_entries[key] = (names, spans.tobytes())
+        elements = {name: (spans[2 * i], spans[2 * i + 1]) for i, name in enumerate(names)}
+        self._elements[cell] = elements
+        return elements
+
+    def _scan_elements(self, cell):
+        start, end = self._span(cell)
+        names = []
+        spans = array("Q")
+        is_open = False
+        for m in _LINE.finditer(self._data, start, end):
+            line_start = m.start() + 1
+            if is_open:
+                spans.append(line_start)
+                is_open = False
+            word = m.group(1)
+            if word[:1] in (b"*", b"."):
+                continue
+            names.append(word.decode("utf-8", "replace").upper())
+            spans.append(line_start)
+            is_open = True
+        if is_open:
+            spans.append(end)
+        return names, spans
+
+    def element_line(self, cell, name):
+        """
+        Logical line of a device or instance, continuation lines joined.
+
+        Raises
+        ------
+        KeyError
+            If the subcircuit or the element is missing.
+        """
+        start, end = self.elements(cell)[name.upper()]
+        return _logical_line(self._data[start:end])
+
+    def iter_elements(self, cell):
+        """Yield ``(name, logical line)`` of every element of a subcircuit in order."""
+        for name, (start, end) in self.elements(cell).items():
+            yield name, _logical_line(self._data[start:end])
+
+    def close(self, write_index=True):
+        """
+        Unmap the netlist and add the new indexes to ``<netlist>.idx``.
+
+        Returns
+        -------
+        str or None
+            Path of the index if it was written.
+        """
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
+        if not (write_index and self.use_index and self._new_entries):
+            return None
+        path = update_index(self.path, self._new_entries)
+        self._new_entries = {}
+        return path
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close(write_index=exc_type is None)
+        except (OSError, ValueError):
+            if exc_type is None:
+                raise
+
+
+def index_netlist(path, cells=()):
+    """
+    Write the subcircuit index of a netlist, and the element index of
+    ``cells``, to ``<netlist>.idx``.
+
+    By default only the subcircuit offsets are indexed; the element index
+    of a subcircuit is built the first time :meth:`SpiceIndex.elements`
+    reads it.
+
+    Returns
+    -------
+    int
+        Number of subcircuits.
+    """
+    with SpiceIndex(path) as index:
+        for cell in cells:
+            if cell.upper() in index.subckts:
+                index.elements(cell)
+        return len(index.subckts)
+
+
+def write_synthetic_netlist(path, size_mb, devices_per_cell=100_000):
+    """
+    Write a netlist in the form of the extracted netlist of about
+    ``size_mb`` megabytes: subcircuits of MOS transistors with continuation
+    lines and a top cell that places them.
+
+    Returns
+    -------
+    int
+        Number of subcircuits, the top cell included.
+    """
+    device = ("M$%d %s %s %s VSS sg13_lv_nmos L=0.13u W=1.5u AS=0.27p AD=0.27p\n"
+              "+ PS=3.36u PD=3.36u\n")
+    cell_size = len(device % (devices_per_cell, "n1000", "n1001", "n1002")) * devices_per_cell
+    cells = max(1, round(size_mb * 1_000_000 / cell_size))
+    with open(path, "w") as f:
+        f.write("* Extracted by KLayout\n\n")
+        for cell in range(cells):
+            f.write(f".SUBCKT CELL{cell} A B VSS\n")
+            for start in range(1, devices_per_cell + 1, 10_000):
+                f.write("".join(
+                    device % (number, f"n{number % 997}", f"n{number % 991}", f"n{number % 983}")
+                    for number in range(start, min(start + 10_000, devices_per_cell + 1))
+                ))
+            f.write(f".ENDS CELL{cell}\n\n")
+        f.write(".SUBCKT TOP A B VSS\n")
+        f.writelines(f"X${cell} A B VSS CELL{cell}\n" for cell in range(cells))
+        f.write(".ENDS TOP\n")
+    return cells + 1
+
+
+def benchmark(path, cell=None, device=None):
+    """
+    Time reading one element line from a whole-file load and from the index.
+
+    Returns
+    -------
+    list of dict
+        ``method`` and ``seconds``: ``load`` reads and splits the whole
+        file, ``build`` maps the netlist and scans it, ``cells`` indexes the
+        elements of one cell, ``indexed`` opens the index, written before,
+        and reads the line.
+    """
+    results = []
+    start = time.perf_counter()
+    with open(path, "r") as f:
+        lines = f.read().splitlines()
+    results.append({"method": "load", "seconds": time.perf_counter() - start,
+                    "lines": len(lines)})
+    del lines
+
+    start = time.perf_counter()
+    index = SpiceIndex(path, use_index=False).open()
+    results.append({"method": "build", "seconds": time.perf_counter() - start,
+                    "cells": len(index.subckts)})
+    cell = cell or index.cells()[0]
+    start = time.perf_counter()
+    elements = index.elements(cell)
+    device = device or next(iter(elements))
+    index.element_line(cell, device)
+    results.append({"method": "cells", "seconds": time.perf_counter() - start,
+                    "elements": len(elements)})
+    index.close()
+
+    index_netlist(path, [cell])
+    start = time.perf_counter()
+    with SpiceIndex(path) as index:
+        index.element_line(cell, device)
+    results.append({"method": "indexed", "seconds": time.perf_counter() - start})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offset index of a SPICE netlist.")
+    parser.add_argument("netlist", help="SPICE netlist, e.g. an extracted netlist.")
+    parser.add_argument("--cell", default=None, help="Print this subcircuit.")
+    parser.add_argument("--device", default=None,
+                        help="Print this device or instance line of --cell.")
+    parser.add_argument("--no_index", action="store_true",
+                        help="Do not read or write the index file.")
+    parser.add_argument(
+        "--generate", type=int, metavar="MB", default=None,
+        help="Write a synthetic netlist of this size to NETLIST instead of reading it.",
+    )
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare a whole-file load with the index.")
+    args = parser.parse_args()
+
+    try:
+        if args.generate is not None:
+            cell_count = write_synthetic_netlist(args.netlist, args.generate)
+            print(f"{args.netlist}: {cell_count} subcircuits, "
+                  f"{os.path.getsize(args.netlist)} bytes")
+        elif args.benchmark:
+            for entry in benchmark(args.netlist, args.cell, args.device):
+                print(f"{entry['method']:<8} {entry['seconds']:>10.3f} s")
+        else:
+            with SpiceIndex(args.netlist, use_index=not args.no_index) as netlist_index:
+                if args.cell and args.device:
+                    print(netlist_index.element_line(args.cell, args.device))
+                elif args.cell:
+                    sys.stdout.write(netlist_index.subckt_text(args.cell))
+                else:
+                    for cell_name in netlist_index.cells():
+                        cell_start, cell_end = netlist_index.subckts[cell_name]
+                        print(f"{cell_name} {cell_end - cell_start} bytes")
+    except KeyError as e:
+        print(f"Not in {args.netlist}: {e}", file=sys.stderr)
+        sys.exit(1)
+    except (SpiceIndexError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,490 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""One queue for the DRC and LVS runs of all open editors.
+
+Runs are submitted as jobs and started within one concurrency budget that
+all editors of the process share:
+
+- priority: interactive jobs, e.g. a check of the cell being edited, are
+  started before batch jobs such as a maximal DRC. ``reserved`` slots are
+  never given to batch jobs, so an interactive check does not wait until
+  a long batch run ends; the budget is raised to ``reserved + 1`` if it is
+  smaller, so that batch jobs still have a slot,
+- kind limits: at most ``limit`` batch jobs of a kind (``drc``, ``lvs``)
+  run at the same time. Interactive jobs only count against the budget, a
+  kind limit never keeps them from the reserved slots,
+- cancellation: a queued job is dropped, a running job is asked to stop
+  through its handle, which kills the KLayout process,
+- progress: the output of a running job is fed to its progress estimate.
+  :class:`StageProgress` times the stage markers of the LVS deck
+  (``stage_timing.py``) against the stage report of the previous run,
+  :class:`ProfileProgress` adds up the rule profile lines of a DRC deck
+  against the total time of the previous profile.
+
+The queue does not start processes. A job's ``launch`` callable starts it
+and returns a handle with a ``cancel()`` method, the caller passes the
+output and the end of the process to :meth:`JobQueue.feed` and
+:meth:`JobQueue.finish`. All calls must come from one thread, the GUI
+thread in the editors (``verificationQueue.py``). The budget is read from
+``REVEDA_VERIFICATION_JOBS``, half the CPU count by default, the kind
+limits from ``REVEDA_DRC_RUN_LIMIT`` and ``REVEDA_LVS_RUN_LIMIT``.
+
+Command line::
+
+    python job_queue.py lvs_run/design_stages.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from .stage_timing import END_STAGE, StageTimer
+except ImportError:
+    from stage_timing import END_STAGE, StageTimer
+
+INTERACTIVE, BATCH = "interactive", "batch"
+PRIORITIES = {INTERACTIVE: 0, BATCH: 10}
+QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = (
+    "queued", "running", "finished", "failed", "cancelled"
+)
+DONE_STATES = (FINISHED, FAILED, CANCELLED)
+BUDGET_VARIABLE = "REVEDA_VERIFICATION_JOBS"
+LIMIT_VARIABLES = {"drc": "REVEDA_DRC_RUN_LIMIT", "lvs": "REVEDA_LVS_RUN_LIMIT"}
+# Progress stays below 1 until the process has ended, the results are
+# still written after the last marker.
+MAX_RUNNING_FRACTION = 0.99
+
+
+def default_budget():
+    """Concurrency budget from ``REVEDA_VERIFICATION_JOBS``, half the CPUs if unset."""
+    try:
+        budget = int(os.environ.get(BUDGET_VARIABLE, "0"))
+    except ValueError:
+        budget = 0
+    return budget if budget > 0 else max(1, (os.cpu_count() or 2) // 2)
+
+
+def default_limits():
+    """Kind limits from ``REVEDA_DRC_RUN_LIMIT`` and ``REVEDA_LVS_RUN_LIMIT``, unset kinds have none."""
+    limits = {}
+    for kind, variable in LIMIT_VARIABLES.items():
+        try:
+            limit = int(os.environ.get(variable, "0"))
+        except ValueError:
+            limit = 0
+        if limit > 0:
+            limits[kind] = limit
+    return limits
+
+
+def expected_stages(report_path, **match):
+    """
+    Stage times of an earlier run from its stage report, see
+    ``stage_timing.write_stage_report``.
+
+    Parameters
+    ----------
+    match
+        Report entries that must be equal, e.g. ``run_mode="deep"``.
+
+    Returns
+    -------
+    list of tuple
+        ``(name, seconds)``, empty if the report is missing, unreadable or
+        of a different run.
+    """
+    try:
+        with open(report_path, "r") as f:
+            report = json.load(f)
+        if any(report.get(key) != value for key, value in match.items()):
+            return []
+        return [(stage["name"], float(stage["seconds"])) for stage in report.get("stages", [])]
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return []
+
+
+def stop_child_on_terminate(proc, grace=5.0):
+    """
+    Stop the child process ``proc`` when this process gets SIGTERM.
+
+    Wrappers that run KLayout as a child, e.g. the one-shot fallback of
+    the daemon client, call this so that cancelling their job does not
+    leave KLayout running. Only has an effect in the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def stop(signum, frame):
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(grace)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, stop)
+
+
+class StageProgress:
+    """
+    Progress of a deck that logs stage markers.
+
+    Parameters
+    ----------
+    expected : list of tuple or None
+        ``(name, seconds)`` of an earlier run, see :func:`expected_stages`.
+        Without it only the running stage is known.
+    """
+
+    def __init__(self, expected=None):
+        self.timer = StageTimer()
+        self.expected = {}
+        for name, seconds in expected or ():
+            self.expected[name] = self.expected.get(name, 0.0) + seconds
+        self.total = sum(self.expected.values())
+
+    def feed(self, line):
+        """Read one output line, return True if a stage started."""
+        return self.timer.feed(line) is not None
+
+    @property
+    def stage(self):
+        """Name of the running stage, None before the first marker."""
+        return self.timer.current
+
+    def fraction(self, now=None):
+        """Estimated share of the run that is done, None without an earlier run."""
+        if not self.total:
+            return None
+        markers = self.timer.markers
+        if not markers:
+            return 0.0
+        done = sum(self.expected.get(name, 0.0) for name, _, _ in markers[:-1])
+        name, start, _ = markers[-1]
+        if name == END_STAGE:
+            return MAX_RUNNING_FRACTION
+        now = time.time() if now is None else now
+        done += min(max(now - start, 0.0), self.expected.get(name, 0.0))
+        return min(done / self.total, MAX_RUNNING_FRACTION)
+
+    def stages(self, end_time=None):
+        """Stage timings of the run so far, see ``StageTimer.stages``."""
+        return self.timer.stages(end_time=end_time)
+
+
+class ProfileProgress:
+    """
+    Progress of a deck that logs the time of every rule it has run.
+
+    Parameters
+    ----------
+    expected_seconds : float or None
+        Total time of an earlier run.
+    line_seconds : callable
+        ``line_seconds(line)`` returns ``(name, seconds)`` of a profile
+        line, None for other lines.
+    """
+
+    def __init__(self, expected_seconds, line_seconds):
+        self.total = expected_seconds or 0.0
+        self.line_seconds = line_seconds
+        self.done = 0.0
+        self.stage = None
+
+    def feed(self, line):
+        """Read one output line, return True if it was a profile line."""
+        entry = self.line_seconds(line)
+        if entry is None:
+            return False
+        self.stage, seconds = entry
+        self.done += seconds
+        return True
+
+    def fraction(self, now=None):
+        """Estimated share of the run that is done, None without an earlier run."""
+        if not self.total:
+            return None
+        return min(self.done / self.total, MAX_RUNNING_FRACTION)
+
+
+class VerificationJob:
+    """
+    One DRC or LVS run.
+
+    Parameters
+    ----------
+    kind : str
+        ``drc`` or ``lvs``, kind limits apply per kind to batch jobs.
+    name : str
+        Shown in the progress, e.g. the cell name.
+    launch : callable
+        ``launch(job)`` starts the run and returns a handle with
+        ``cancel()``. It may raise OSError or RuntimeError.
+    priority : str
+        ``interactive`` or ``batch``.
+    progress : StageProgress, ProfileProgress or None
+    owner : object
+        The dialogue or editor that submitted the job.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, name, launch, priority=INTERACTIVE, progress=None, owner=None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown job priority {priority}.")
+        self.id = next(self._ids)
+        self.kind = kind
+        self.name = name
+        self.launch = launch
+        self.priority = priority
+        self.progress = progress
+        self.owner = owner
+        self.state = QUEUED
+        self.handle = None
+        self.submitted = time.time()
+        self.started = None
+        self.ended = None
+        self.returncode = None
+        self.error = None
+        self.cancel_requested = False
+        self._partial = ""
+
+    @property
+    def done(self):
+        return self.state in DONE_STATES
+
+    def fraction(self, now=None):
+        """Estimated share that is done, 1 when ended, None if unknown."""
+        if self.done:
+            return 1.0
+        if self.state == QUEUED or self.progress is None:
+            return 0.0 if self.state == QUEUED else None
+        return self.progress.fraction(now)
+
+    def status_text(self, now=None):
+        """One line status, e.g. ``LVS top: running, extraction.mos, 42%``."""
+        parts = [self.state]
+        if self.state == RUNNING:
+            if self.cancel_requested:
+                parts.append("cancelling")
+            stage = self.progress.stage if self.progress is not None else None
+            if stage:
+                parts.append(stage)
+            fraction = self.fraction(now)
+            if fraction is not None:
+                parts.append(f"{fraction:.0%}")
+            parts.append(f"{(now or time.time()) - self.started:.0f} s")
+        elif self.ended is not None and self.started is not None:
+            parts.append(f"{self.ended - self.started:.1f} s")
+        if self.error:
+            parts.append(self.error)
+        return f"{self.kind.upper()} {self.name}: {', '.join(parts)}"
+
+
+class JobQueue:
+    """
+    Queue of verification jobs with priorities, kind limits and one budget.
+
+    Parameters
+    ----------
+    budget : int or None
+        Jobs running at the same time, :func:`default_budget` if None.
+    reserved : int
+        Slots of the budget that batch jobs do not use. The budget is at
+        least ``reserved + 1``.
+    limits : dict or None
+        Batch jobs of a kind running at the same time, e.g. ``{"drc": 2}``,
+        :func:`default_limits` if None.
+    on_change : callable or None
+        ``on_change(job)`` is called when a job is queued, started, gets a
+        new stage or ends.
+    """
+
+    def __init__(self, budget=None, reserved=1, limits=None, on_change=None):
+        self.reserved = max(0, reserved)
+        self.budget = max(budget or default_budget(), self.reserved + 1)
+        self.limits = {}
+        for kind, limit in (default_limits() if limits is None else limits).items():
+            if limit is not None and limit > 0:
+                self.limits[kind] = limit
+        self.on_change = on_change
+        self.jobs = []
+        self._dispatching = False
+        self._redispatch = False
+
+    def _changed(self, job):
+        if self.on_change is not None:
+            self.on_change(job)
+
+    def set_limit(self, kind, limit):
+        """Run at most ``limit`` batch jobs of ``kind`` at the same time, None for no limit."""
+        if limit is None or limit < 1:
+            self.limits.pop(kind, None)
+        else:
+            self.limits[kind] = limit
+        self.dispatch()
+
+    def running(self):
+        return [job for job in self.jobs if job.state == RUNNING]
+
+    def queued(self):
+        """Queued jobs in start order: priority, then submission."""
+        return sorted((job for job in self.jobs if job.state == QUEUED),
+                      key=lambda job: (PRIORITIES[job.priority], job.id))
+
+    def position(self, job):
+        """Jobs queued before ``job``, None if it is not queued."""
+        queued = self.queued()
+        return queued.index(job) if job in queued else None
+
+    def submit(self, job):
+        """Queue a job and start it if the budget allows."""
+        self.jobs.append(job)
+        self._changed(job)
+        self.dispatch()
+        return job
+
+    def _slots(self, priority):
+        if priority == INTERACTIVE:
+            return self.budget
+        return self.budget - self.reserved
+
+    def dispatch(self):
+        """Start queued jobs while the budget and the kind limits allow."""
+        # A launch or a change callback may finish or cancel jobs and so
+        # call dispatch again, the queue is then looked at once more.
+        self._redispatch = True
+        if self._dispatching:
+            return
+        self._dispatching = True
+        try:
+            while self._redispatch:
+                self._redispatch = False
+                self._dispatch_queued()
+        finally:
+            self._dispatching = False
+
+    def _dispatch_queued(self):
+        running = self.running()
+        for job in self.queued():
+            if job.state != QUEUED:
+                continue
+            if len(running) >= self.budget:
+                break
+            if len(running) >= self._slots(job.priority):
+                continue
+            # Kind limits hold back batch jobs only, an interactive job is
+            # limited by the budget alone and so always gets a reserved slot.
+            limit = self.limits.get(job.kind) if job.priority == BATCH else None
+            if limit is not None and sum(other.kind == job.kind and other.priority == BATCH
+                                         for other in running) >= limit:
+                continue
+            self._start(job)
+            if job.state == RUNNING:
+                running.append(job)
+
+    def _start(self, job):
+        job.state = RUNNING
+        job.started = time.time()
+        try:
+            job.handle = job.launch(job)
+        except (OSError, RuntimeError) as e:
+            job.state = FAILED
+            job.error = str(e)
+            job.ended = time.time()
+            self.jobs.remove(job)
+        self._changed(job)
+
+    def feed(self, job, text):
+        """Pass output of a running job to its progress estimate."""
+        if job.progress is None:
+            return
+        lines = (job._partial + text).split("\n")
+        job._partial = lines.pop()
+        if any([job.progress.feed(line) for line in lines]):
+            self._changed(job)
+
+    def finish(self, job, returncode):
+        """Record the end of a running job and start the next ones."""
+        if job.done:
+            return
+        if job._partial and job.progress is not None:
+            job.progress.feed(job._partial)
+        job._partial = ""
+        job.returncode = returncode
+        job.ended = time.time()
+        if job.cancel_requested:
+            job.state = CANCELLED
+        else:
+            job.state = FINISHED if returncode == 0 else FAILED
+        if job in self.jobs:
+            self.jobs.remove(job)
+        self._changed(job)
+        self.dispatch()
+
+    def cancel(self, job):
+        """
+        Cancel a job. A queued job ends at once, a running job when its
+        process has ended and :meth:`finish` is called.
+        """
+        if job.state == QUEUED:
+            job.state = CANCELLED
+            job.ended = time.time()
+            self.jobs.remove(job)
+            self._changed(job)
+            self.dispatch()
+        elif job.state == RUNNING and not job.cancel_requested:
+            job.cancel_requested = True
+            self._changed(job)
+            if job.handle is not None:
+                job.handle.cancel()
+
+    def cancel_owner(self, owner, kind=None):
+        """Cancel the queued and running jobs of an owner, of one kind if given."""
+        for job in list(self.jobs):
+            if job.owner is owner and (kind is None or job.kind == kind):
+                self.cancel(job)
+
+    def owner_jobs(self, owner, kind=None):
+        """Queued and running jobs of an owner."""
+        return [job for job in self.jobs
+                if job.owner is owner and (kind is None or job.kind == kind)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Progress estimate of a deck run from an earlier stage report.")
+    parser.add_argument("stages", help="Stage report of an earlier run (<design>_stages.json).")
+    args = parser.parse_args()
+
+    stage_times = expected_stages(args.stages)
+    if not stage_times:
+        print(f"{args.stages}: no stages.", file=sys.stderr)
+        sys.exit(1)
+    total_seconds = sum(seconds for _, seconds in stage_times)
+    elapsed = 0.0
+    print(f"{'Stage':<32} {'Starts at':>10}")
+    for stage_name, stage_seconds in stage_times:
+        print(f"{stage_name:<32} {elapsed / total_seconds:>10.1%}")
+        elapsed += stage_seconds
+    print(f"Budget: {default_budget()} jobs ({BUDGET_VARIABLE})")
+    for limit_kind, limit in default_limits().items():
+        print(f"{limit_kind.upper()} batch limit: {limit} jobs ({LIMIT_VARIABLES[limit_kind]})")
+    sys.exit(0)
@@ -0,0 +1,108 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+# Long-lived KLayout batch host, see klayout_session.py.
+#
+# Started as "klayout -b -r klayout_host.rb". Reads one JSON job per line
+# from stdin:
+#   {"id": 1, "deck": "/path/sg13g2.lvs", "variables": {"input": "..."}}
+# Every variable is set as a global like "-rd name=value" would do, then the
+# deck is run as a macro. Deck output goes to stdout, the job ends with
+#   KLAYOUT_HOST_DONE {"id": 1, "ok": true, "seconds": 1.2}
+# {"command": "quit"} or the end of stdin stops the host.
+#
+# All jobs share one Ruby interpreter. After every job the Ruby state it
+# left behind is undone: globals it created are reset to nil and the ones it
+# changed restored, and the top-level constants (the classes of the decks)
+# and methods defined in files of the deck directory are removed. Not
+# undone are changes to classes that existed before the job, libraries the
+# deck required, which stay loaded, and state held by KLayout itself, e.g.
+# registered libraries or technologies. If the state cannot be restored the
+# job ends with "restart": true and the session starts a new host.
+
+require "json"
+
+$stdout.sync = true
+
+GLOBAL_NAME = /\A\$[A-Za-z_]\w*\z/
+
+def ruby_state
+  global_variables.grep(GLOBAL_NAME).to_h { |name| [name, eval(name.to_s)] }
+end
+
+def defined_in?(location, deck_dir)
+  !location.nil? && !location.empty? && File.expand_path(location[0]).start_with?(deck_dir)
+end
+
+# Returns false if the state could not be restored completely.
+def restore_ruby_state(globals, deck)
+  global_variables.grep(GLOBAL_NAME).each do |name|
+    if globals.key?(name)
+      value = globals[name]
+      eval("#{name} = value") unless eval(name.to_s).equal?(value)
+    else
+      eval("#{name} = nil")
+    end
+  rescue StandardError, SyntaxError
+    # Read-only globals keep their value.
+  end
+  deck_dir = File.dirname(File.expand_path(deck)) + File::SEPARATOR
+  Object.constants.each do |name|
+    next unless defined_in?(Object.const_source_location(name), deck_dir)
+    Object.send(:remove_const, name)
+  end
+  (Object.private_instance_methods(false) + Object.public_instance_methods(false)).each do |name|
+    next unless defined_in?(Object.instance_method(name).source_location, deck_dir)
+    Object.send(:remove_method, name)
+  end
+  true
+rescue StandardError => e
+  puts "WARNING: KLayout host state not restored: #{e.class}: #{e.message}"
+  false
+end
+
+host_state = ruby_state
+puts "KLAYOUT_HOST_READY #{RBA::Application.instance.version}"
+
+while (line = $stdin.gets)
+  line = line.strip
+  next if line.empty?
+
+  result = { "ok" => true }
+  begin
+    job = JSON.parse(line)
+  rescue JSON::ParserError => e
+    puts "KLAYOUT_HOST_DONE " + JSON.generate({ "ok" => false, "error" => e.message })
+    next
+  end
+  break if job["command"] == "quit"
+
+  (job["variables"] || {}).each do |name, value|
+    next unless name =~ /\A[A-Za-z_]\w*\z/
+    value = value.nil? ? nil : value.to_s
+    eval("$#{name} = value")
+  end
+
+  start_time = Time.now
+  begin
+    RBA::Macro.new(job["deck"]).run
+  rescue SystemExit => e
+    result = { "ok" => e.success?, "error" => "exit #{e.status}" }
+  rescue Exception => e
+    result = { "ok" => false, "error" => "#{e.class}: #{e.message}" }
+  end
+  # Nothing of this job may leak into the next one.
+  result["restart"] = true unless restore_ruby_state(host_state, job["deck"].to_s)
+  GC.start
+  result["id"] = job["id"]
+  result["seconds"] = (Time.now - start_time).round(3)
+  puts "KLAYOUT_HOST_DONE " + JSON.generate(result)
+end
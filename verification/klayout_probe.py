@@ -0,0 +1,273 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""KLayout binary, version and features, probed once and cached.
+
+The probe starts KLayout once with ``klayout_probe.rb``, which reports the
+version and the features the DRC and LVS tooling relies on. The result is
+cached in memory and in a per-user cache file, keyed by the resolved path,
+size and modification time of the binary, so a later run with the same
+binary does not start KLayout at all. If the Ruby probe cannot run, the
+version is taken from ``klayout -b -v``.
+
+Command line::
+
+    python klayout_probe.py --klayout /opt/klayout/klayout --refresh
+"""
+
+import argparse
+import getpass
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+PROBE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "klayout_probe.rb")
+PROBE_PREFIX = "KLAYOUT_PROBE "
+PROBE_TIMEOUT = 60
+MINIMUM_VERSION = (0, 30, 2)
+CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "revolution-eda",
+    f"klayout_probe_{getpass.getuser()}.json",
+)
+CACHE_VERSION = 1
+
+_probes = {}
+_probes_lock = threading.Lock()
+
+
+class KLayoutProbeError(RuntimeError):
+    """Raised if the KLayout binary cannot be found or started."""
+
+
+def parse_version(version_text):
+    """
+    Return the version tuple of a KLayout version string.
+
+    ``"KLayout 0.30.2"`` gives ``(0, 30, 2)``, a missing patch level is
+    taken as 0. Returns None if the text has no version number.
+    """
+    match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", version_text or "")
+    if match is None:
+        return None
+    return tuple(int(part) if part else 0 for part in match.groups())
+
+
+def format_version(version):
+    return ".".join(str(part) for part in version)
+
+
+class KLayoutCapabilities:
+    """
+    Probe result of one KLayout binary.
+
+    Attributes
+    ----------
+    executable : str
+        Resolved path of the binary.
+    version_text : str
+        Version line as printed by KLayout, e.g. ``KLayout 0.30.2``.
+    version : tuple of int or None
+        Parsed version.
+    features : dict
+        Feature name to bool. Empty if only the version could be read.
+    """
+
+    def __init__(self, executable, version_text, features=None):
+        self.executable = executable
+        self.version_text = version_text
+        self.version = parse_version(version_text)
+        self.features = dict(features or {})
+
+    def has(self, feature):
+        """True if the probe found ``feature``."""
+        return bool(self.features.get(feature))
+
+    def supports(self, minimum=MINIMUM_VERSION):
+        """True if the version is at least ``minimum``."""
+        return self.version is not None and self.version >= tuple(minimum)
+
+    def to_dict(self):
+        return {
+            "executable": self.executable,
+            "version_text": self.version_text,
+            "features": self.features,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["executable"], data["version_text"], data.get("features"))
+
+
+def resolve_executable(klayout="klayout"):
+    """
+    Return the resolved path of a KLayout executable.
+
+    Raises
+    ------
+    KLayoutProbeError
+        If the executable is not found.
+    """
+    path = shutil.which(klayout or "klayout")
+    if path is None:
+        raise KLayoutProbeError(
+            f"KLayout executable {klayout!r} not found. Please make sure klayout is installed."
+        )
+    return os.path.realpath(path)
+
+
+def _binary_key(executable):
+    stat = os.stat(executable)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_cache(cache_file):
+    try:
+        with open(cache_file, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def _write_cache(cache_file, entries):
+    """Write the cache atomically, concurrent runs may probe at the same time."""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": entries}, f, indent=2)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        # The cache only saves time, a read-only home must not fail runs.
+        pass
+
+
+def _run_probe(executable):
+    """Start KLayout once and return its capabilities."""
+    try:
+        completed = subprocess.run(
+            [executable, "-b", "-r", PROBE_SCRIPT],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT,
+        )
+        for line in completed.stdout.splitlines():
+            if line.startswith(PROBE_PREFIX):
+                result = json.loads(line[len(PROBE_PREFIX):])
+                return KLayoutCapabilities(executable, result["version"], result["features"])
+    except (OSError, subprocess.TimeoutExpired, ValueError, KeyError):
+        pass
+
+    # Builds without Ruby still report their version.
+    try:
+        completed = subprocess.run(
+            [executable, "-b", "-v"], capture_output=True, text=True, timeout=PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise KLayoutProbeError(f"Cannot start KLayout {executable}: {e}") from None
+    version_text = (completed.stdout.strip().splitlines() or [""])[0].strip()
+    if not version_text:
+        raise KLayoutProbeError(f"KLayout {executable} did not report its version.")
+    return KLayoutCapabilities(executable, version_text)
+
+
+def probe_klayout(klayout="klayout", cache_file=CACHE_FILE, refresh=False):
+    """
+    Return the capabilities of a KLayout executable.
+
+    KLayout is started only if neither this process nor the cache file has
+    a probe of the same binary.
+
+    Parameters
+    ----------
+    klayout : str
+        KLayout executable name or path.
+    cache_file : str or None
+        Cache file, None disables the file cache.
+    refresh : bool
+        Probe again even if a cached result exists.
+
+    Returns
+    -------
+    KLayoutCapabilities
+
+    Raises
+    ------
+    KLayoutProbeError
+        If the executable is not found or does not start.
+    """
+    executable = resolve_executable(klayout)
+    key = _binary_key(executable)
+    with _probes_lock:
+        cached = _probes.get(executable)
+        if cached is not None and cached[0] == key and not refresh:
+            return cached[1]
+
+        entries = _read_cache(cache_file) if cache_file else {}
+        entry = entries.get(executable)
+        if entry is not None and entry.get("key") == key and not refresh:
+            capabilities = KLayoutCapabilities.from_dict(entry["capabilities"])
+        else:
+            capabilities = _run_probe(executable)
+            if cache_file:
+                # Re-read, another run may have added a binary meanwhile.
+                entries = _read_cache(cache_file)
+                entries[executable] = {"key": key, "capabilities": capabilities.to_dict()}
+                _write_cache(cache_file, entries)
+        _probes[executable] = (key, capabilities)
+        return capabilities
+
+
+def check_version(capabilities, minimum=MINIMUM_VERSION):
+    """
+    Return an error message if the KLayout version is too old or unknown,
+    None otherwise.
+    """
+    if capabilities.version is None:
+        return f"Was not able to get the KLayout version from {capabilities.version_text!r}."
+    if not capabilities.supports(minimum):
+        return (
+            f"Prerequisites at a minimum: KLayout {format_version(minimum)}, "
+            f"found {format_version(capabilities.version)}."
+        )
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the version and features of KLayout.")
+    parser.add_argument("--klayout", type=str, default="klayout", help="KLayout executable.")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached probes.")
+    parser.add_argument("--json", action="store_true", help="Print the probe as JSON.")
+    args = parser.parse_args()
+
+    try:
+        probe = probe_klayout(args.klayout, refresh=args.refresh)
+    except KLayoutProbeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(probe.to_dict(), indent=2))
+    else:
+        print(f"Executable: {probe.executable}")
+        print(f"Version:    {probe.version_text}")
+        for name, available in sorted(probe.features.items()):
+            print(f"  {name:<14} {'yes' if available else 'no'}")
+    problem = check_version(probe)
+    if problem:
+        print(problem, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
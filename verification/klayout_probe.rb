@@ -0,0 +1,39 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+# KLayout capability probe, see klayout_probe.py.
+#
+# Started as "klayout -b -r klayout_probe.rb". Prints one line:
+#   KLAYOUT_PROBE {"version": "KLayout 0.30.2", "features": {...}}
+
+require "json"
+
+def probe_feature
+  yield ? true : false
+rescue StandardError
+  false
+end
+
+features = {
+  "ruby" => true,
+  "python" => probe_feature { !RBA::Interpreter.python_interpreter.nil? },
+  "lvs" => probe_feature { RBA::LayoutVsSchematic.method_defined?(:xref) },
+  "lvsdb_read" => probe_feature { RBA::LayoutVsSchematic.method_defined?(:read) },
+  "deep_mode" => probe_feature { defined?(RBA::DeepShapeStore) },
+  "oasis_strict" => probe_feature { RBA::SaveLayoutOptions.method_defined?(:oasis_strict_mode=) },
+  "macro_run" => probe_feature { RBA::Macro.method_defined?(:run) },
+}
+
+$stdout.sync = true
+puts "KLAYOUT_PROBE " + JSON.generate({
+  "version" => RBA::Application.instance.version,
+  "features" => features,
+})
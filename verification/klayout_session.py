@@ -0,0 +1,187 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Run DRC/LVS decks in a long-lived KLayout batch process.
+
+The Python ``klayout`` package has no Ruby interpreter, so it cannot run
+the ``.lvs``/``.lydrc`` DSL decks itself. A :class:`KLayoutSession` keeps
+one ``klayout -b`` process running ``klayout_host.rb`` and sends it one job
+per deck run. The process startup is paid once per session instead of once
+per run.
+"""
+
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+
+HOST_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "klayout_host.rb")
+READY_PREFIX = "KLAYOUT_HOST_READY"
+DONE_PREFIX = "KLAYOUT_HOST_DONE "
+
+
+class KLayoutSessionError(RuntimeError):
+    """Raised when the KLayout host process fails or a job times out."""
+
+
+class KLayoutSession:
+    """
+    A KLayout batch process that runs decks on request.
+
+    Parameters
+    ----------
+    klayout : str
+        KLayout executable.
+    max_jobs : int
+        Jobs after which the process is restarted to release memory the
+        host cannot reclaim. The host undoes the Ruby state of every job,
+        see klayout_host.rb for what it does not undo.
+    start_timeout : float
+        Seconds to wait for the host to come up.
+    """
+
+    def __init__(self, klayout="klayout", max_jobs=50, start_timeout=60.0):
+        self.klayout = klayout
+        self.max_jobs = max_jobs
+        self.start_timeout = start_timeout
+        self.version = None
+        self._process = None
+        self._lines = None
+        self._jobs_run = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _read_output(self, process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def start(self):
+        """Start the host process unless it is running."""
+        if self.alive:
+            return
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(
+            [self.klayout, "-b", "-r", HOST_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._read_output, args=(self._process, self._lines), daemon=True
+        ).start()
+        self._jobs_run = 0
+        while True:
+            line = self._next_line(self.start_timeout)
+            if line.startswith(READY_PREFIX):
+                self.version = line[len(READY_PREFIX):].strip()
+                return
+
+    def _next_line(self, timeout):
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.cancel()
+            self._process.wait()
+            self._process = None
+            raise KLayoutSessionError(f"KLayout host timed out after {timeout:g} s.") from None
+        if line is None:
+            returncode = self._process.wait()
+            self._process = None
+            raise KLayoutSessionError(f"KLayout host exited with code {returncode}.")
+        return line
+
+    def run(self, deck, variables, output=None, timeout=None):
+        """
+        Run a deck and wait for it to finish.
+
+        Parameters
+        ----------
+        deck : str
+            Path of the ``.lvs`` or ``.lydrc`` deck.
+        variables : dict
+            Deck variables, as given with ``-rd`` on the command line. None
+            values are skipped.
+        output : callable or None
+            Called with every output line of the run.
+        timeout : float or None
+            Seconds without output after which the run is cancelled.
+
+        Returns
+        -------
+        dict
+            ``{"ok": bool, "seconds": float}``, plus ``error`` on failure.
+
+        Raises
+        ------
+        KLayoutSessionError
+            If the host process dies or the run times out.
+        """
+        with self._lock:
+            if self.max_jobs and self._jobs_run >= self.max_jobs:
+                self.close()
+            self.start()
+            job = {
+                "id": next(self._ids),
+                "deck": os.path.abspath(deck),
+                "variables": {
+                    key: str(value) for key, value in variables.items() if value is not None
+                },
+            }
+            self._process.stdin.write(json.dumps(job) + "\n")
+            self._process.stdin.flush()
+            self._jobs_run += 1
+            while True:
+                line = self._next_line(timeout)
+                if line.startswith(DONE_PREFIX):
+                    result = json.loads(line[len(DONE_PREFIX):])
+                    if result.get("restart"):
+                        # The host could not undo the state the job left.
+                        self.close()
+                    return result
+                if output is not None:
+                    output(line)
+
+    def cancel(self):
+        """Kill the host process, a running job fails with KLayoutSessionError."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def close(self):
+        """Stop the host process."""
+        process = self._process
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.stdin.write(json.dumps({"command": "quit"}) + "\n")
+                process.stdin.flush()
+                process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+        self._process = None
@@ -0,0 +1,265 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Layout export for the KLayout DRC and LVS runners.
+
+The layout editor writes GDS. For OASIS runs the exported cell is rewritten
+as OASIS with CBLOCK compression and strict mode. This makes the file much
+smaller and faster to read back in KLayout. The OASIS file replaces the GDS
+file in the run directory. The editor export has to run on the GUI thread,
+the rewrite (:func:`convert_export`) does not and the dialogues run it in a
+worker thread.
+
+The rewrite reads and writes the layout once more, so OASIS only pays off
+where KLayout reads the layout more than once or the file is kept. Run this
+module as a script to time the whole export, rewrite and KLayout read
+pipeline of both formats for a layout::
+
+    python layout_export.py big_design.gds --repeat 3
+    python layout_export.py --synthetic 400 --repeat 3
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+LAYOUT_FORMATS = {"GDS": ".gds", "OASIS": ".oas"}
+OASIS_COMPRESSION_LEVEL = 10
+
+
+def layout_suffix(layout_format):
+    """Return the file suffix of a layout format name (``GDS``/``OASIS``)."""
+    return LAYOUT_FORMATS.get(str(layout_format).upper(), ".gds")
+
+
+def layout_file_path(run_dir, cell_name, layout_format="GDS"):
+    """Path of the exported layout of a cell in a run directory."""
+    return pathlib.Path(run_dir) / f"{cell_name}{layout_suffix(layout_format)}"
+
+
+def oasis_save_options(compression_level=OASIS_COMPRESSION_LEVEL):
+    """KLayout save options for compressed strict-mode OASIS."""
+    import klayout.db
+
+    options = klayout.db.SaveLayoutOptions()
+    options.format = "OASIS"
+    options.oasis_compression_level = compression_level
+    options.oasis_write_cblocks = True
+    options.oasis_strict_mode = True
+    return options
+
+
+def convert_to_oasis(source_path, target_path, compression_level=OASIS_COMPRESSION_LEVEL):
+    """
+    Rewrite a layout file as compressed OASIS.
+
+    KLayout's Python module is used if it is installed, gdstk otherwise.
+
+    Raises
+    ------
+    RuntimeError
+        If neither KLayout's Python module nor gdstk is available.
+    """
+    try:
+        import klayout.db
+    except ImportError:
+        try:
+            import gdstk
+        except ImportError:
+            raise RuntimeError(
+                "OASIS export needs the klayout or gdstk Python module."
+            ) from None
+        library = gdstk.read_gds(str(source_path))
+        # gdstk writes CBLOCKs for compression levels above zero.
+        library.write_oas(str(target_path), compression_level=min(compression_level, 9),
+                          validation="crc32")
+        return pathlib.Path(target_path)
+
+    layout = klayout.db.Layout()
+    layout.read(str(source_path))
+    layout.write(str(target_path), oasis_save_options(compression_level))
+    return pathlib.Path(target_path)
+
+
+def export_layout(scene, run_dir, cell_name, unit, precision, dbu):
+    """
+    Export the cell of a layout scene as GDS for a DRC/LVS run.
+
+    Must be called on the GUI thread, see :func:`convert_export` for the
+    format of the run.
+
+    Parameters
+    ----------
+    scene : layout scene
+        Scene providing ``exportCellGDS``.
+    run_dir : pathlib.Path
+        Run directory, the layout is written as ``<cell_name>.gds``.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the written GDS file.
+    """
+    run_dir = pathlib.Path(run_dir)
+    scene.exportCellGDS(run_dir, unit, precision, dbu)
+    return layout_file_path(run_dir, cell_name, "GDS")
+
+
+def convert_export(gds_path, layout_format="GDS"):
+    """
+    Bring an exported GDS file into the layout format of the run.
+
+    For ``OASIS`` the file is rewritten as compressed OASIS next to it and
+    the GDS file is removed. Does not touch the scene and can run in a
+    worker thread.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the layout file of the run.
+    """
+    gds_path = pathlib.Path(gds_path)
+    if layout_suffix(layout_format) != ".oas":
+        return gds_path
+    oas_path = gds_path.with_suffix(".oas")
+    convert_to_oasis(gds_path, oas_path)
+    gds_path.unlink(missing_ok=True)
+    return oas_path
+
+
+def make_synthetic_layout(path, size=200):
+    """
+    Write a hierarchical test layout with ``size`` x ``size`` cell placements.
+
+    The placements are one array of a small block with shapes on front-end
+    and metal layers. The top cell adds flat routing paths, which do not
+    repeat.
+    """
+    import klayout.db
+
+    layout = klayout.db.Layout()
+    layout.dbu = 0.001
+    layers = [layout.layer(number, 0) for number in (1, 5, 6, 8, 19, 10, 29, 30)]
+    top = layout.create_cell("TOP")
+    block = layout.create_cell("BLOCK")
+    for index, layer in enumerate(layers):
+        for row in range(6):
+            block.shapes(layer).insert(
+                klayout.db.Box(200 * index, 400 * row, 200 * index + 150, 400 * row + 300)
+            )
+    pitch = 2000
+    top.insert(klayout.db.CellInstArray(
+        block.cell_index(), klayout.db.Trans(),
+        klayout.db.Vector(pitch, 0), klayout.db.Vector(0, pitch), size, size,
+    ))
+    routing = layers[-3:]
+    for row in range(size):
+        for column in range(0, size, 4):
+            x = column * pitch
+            y = row * pitch + 2500
+            top.shapes(routing[row % len(routing)]).insert(klayout.db.Path(
+                [klayout.db.Point(x, y), klayout.db.Point(x + 3 * pitch, y),
+                 klayout.db.Point(x + 3 * pitch, y + 700)], 160,
+            ))
+    layout.write(str(path))
+    return pathlib.Path(path)
+
+
+def benchmark_layout_formats(layout_path, repeat=3):
+    """
+    Time the export pipeline of a DRC/LVS run for GDS and OASIS.
+
+    Both formats start with the GDS export of the editor, here a GDS write
+    of the layout. OASIS then adds the rewrite of :func:`convert_export`.
+    The result is read by KLayout as the deck does.
+
+    Returns
+    -------
+    list of dict
+        One entry per format with ``format``, ``write_seconds`` (GDS
+        export), ``convert_seconds``, ``read_seconds`` (best of ``repeat``
+        each) and ``size_bytes`` of the file KLayout reads.
+    """
+    import klayout.db
+
+    layout = klayout.db.Layout()
+    layout.read(str(layout_path))
+    gds_options = klayout.db.SaveLayoutOptions()
+    gds_options.format = "GDS2"
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in LAYOUT_FORMATS:
+            write_times = []
+            convert_times = []
+            read_times = []
+            for _ in range(repeat):
+                gds_path = pathlib.Path(tmp_dir) / "benchmark.gds"
+                start = time.perf_counter()
+                layout.write(str(gds_path), gds_options)
+                write_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                target = convert_export(gds_path, name)
+                convert_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                klayout.db.Layout().read(str(target))
+                read_times.append(time.perf_counter() - start)
+            results.append({
+                "format": name,
+                "write_seconds": min(write_times),
+                "convert_seconds": min(convert_times),
+                "read_seconds": min(read_times),
+                "size_bytes": os.path.getsize(target),
+            })
+            target.unlink()
+    return results
+
+
+def format_benchmark_table(results):
+    """Format benchmark results as table lines."""
+    header = (f"{'Format':<8} {'Export (s)':>10} {'Convert (s)':>11} {'Read (s)':>10} "
+              f"{'Total (s)':>10} {'Size (MB)':>10}")
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        total = entry["write_seconds"] + entry["convert_seconds"] + entry["read_seconds"]
+        lines.append(
+            f"{entry['format']:<8} {entry['write_seconds']:>10.3f} "
+            f"{entry['convert_seconds']:>11.3f} {entry['read_seconds']:>10.3f} "
+            f"{total:>10.3f} {entry['size_bytes'] / 1e6:>10.2f}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the GDS and compressed OASIS export pipelines of a run."
+    )
+    parser.add_argument("layout", nargs="?", default=None, help="Layout to benchmark.")
+    parser.add_argument(
+        "--synthetic", type=int, default=None,
+        help="Benchmark a generated N x N placement layout instead.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions. [default: 3]")
+    args = parser.parse_args()
+
+    if args.layout is None and args.synthetic is None:
+        parser.error("give a layout or --synthetic N")
+    with tempfile.TemporaryDirectory() as work_dir:
+        layout_path = args.layout
+        if layout_path is None:
+            layout_path = make_synthetic_layout(
+                os.path.join(work_dir, "synthetic.gds"), args.synthetic
+            )
+        benchmark = benchmark_layout_formats(layout_path, args.repeat)
+    print("\n".join(format_benchmark_table(benchmark)))
+    sys.exit(0)
@@ -0,0 +1,1013 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Cell hierarchy of GDS and OASIS files without loading the layout.
+
+Listing the top cells with ``klayout.db.Layout().read`` decodes every shape
+of the layout, which takes long and needs a lot of memory for a full chip.
+The scanners here only read cell definitions and cell references:
+
+- GDS: the STRNAME and SNAME records. Other records are skipped by their
+  length without decoding, the file is read in chunks. Statistics scans
+  also stop at element records to count shapes and array instances.
+- OASIS: OASIS records have no length field, so every record is parsed,
+  but only CELLNAME, CELL and PLACEMENT values and shape counts are kept.
+  CBLOCKs are inflated one at a time. The file is memory-mapped.
+
+Layer scans (:func:`scan_layout_layers`) collect the layers that have
+shapes or texts instead, and the strings of the texts on selected layers.
+
+``.gz`` files are supported. Run this module as a script to compare the scan
+with a full KLayout read::
+
+    python layout_scan.py chip.gds --benchmark
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+OASIS_MAGIC = b"%SEMI-OASIS\r\n"
+GDS_CHUNK_SIZE = 1 << 22
+
+# GDS record types
+GDS_ENDLIB = 0x04
+GDS_STRNAME = 0x06
+GDS_ENDSTR = 0x07
+GDS_BOUNDARY = 0x08
+GDS_PATH = 0x09
+GDS_SREF = 0x0A
+GDS_AREF = 0x0B
+GDS_LAYER = 0x0D
+GDS_DATATYPE = 0x0E
+GDS_SNAME = 0x12
+GDS_COLROW = 0x13
+GDS_TEXTTYPE = 0x16
+GDS_STRING = 0x19
+GDS_BOX = 0x2D
+GDS_BOXTYPE = 0x2E
+# Record types the GDS scan stops at, all others are skipped by length.
+_GDS_NAME_RECORDS = bytes(
+    1 if record_type in (GDS_ENDLIB, GDS_STRNAME, GDS_SNAME) else 0 for record_type in range(256)
+)
+_GDS_STATISTICS_RECORDS = bytes(
+    1 if record_type in (GDS_ENDLIB, GDS_STRNAME, GDS_SNAME, GDS_BOUNDARY, GDS_PATH,
+                         GDS_BOX, GDS_SREF, GDS_AREF, GDS_COLROW) else 0
+    for record_type in range(256)
+)
+_GDS_LAYER_RECORDS = bytes(
+    1 if record_type in (GDS_ENDLIB, GDS_LAYER, GDS_DATATYPE, GDS_BOXTYPE, GDS_TEXTTYPE,
+                         GDS_STRING) else 0
+    for record_type in range(256)
+)
+
+
+class LayoutScanError(ValueError):
+    """Raised if a layout file cannot be scanned."""
+
+
+class LayoutHierarchy:
+    """
+    Cells of a layout file and the cells they place.
+
+    Attributes
+    ----------
+    cells : list of str
+        Defined cells in file order.
+    children : dict
+        Cell name to the set of cell names it places.
+    shape_counts : dict
+        Cell name to the number of shapes of the cell itself, texts are not
+        counted. Only filled by statistics scans.
+    instance_counts : dict
+        ``(parent, child)`` to the number of placed instances, arrays count
+        with all their elements. Only filled by statistics scans.
+    """
+
+    def __init__(self):
+        self.cells = []
+        self.children = {}
+        self.shape_counts = {}
+        self.instance_counts = {}
+
+    def add_cell(self, name):
+        if name not in self.children:
+            self.cells.append(name)
+            self.children[name] = set()
+
+    def add_reference(self, parent, child):
+        self.children.setdefault(parent, set()).add(child)
+
+    def add_shapes(self, cell, count=1):
+        self.shape_counts[cell] = self.shape_counts.get(cell, 0) + count
+
+    def add_instances(self, parent, child, count=1):
+        self.add_reference(parent, child)
+        key = (parent, child)
+        self.instance_counts[key] = self.instance_counts.get(key, 0) + count
+
+    def top_cells(self):
+        """Defined cells that no other cell places, in file order."""
+        placed = set()
+        for children in self.children.values():
+            placed.update(children)
+        return [name for name in self.cells if name not in placed]
+
+
+class LayoutLayers:
+    """
+    Layers used by the shapes and texts of a layout file, all cells together.
+
+    Attributes
+    ----------
+    shape_layers : set of tuple
+        ``(layer, datatype)`` of the shapes, boxes count with their box type.
+    text_layers : set of tuple
+        ``(layer, texttype)`` of the texts.
+    texts : dict
+        ``(layer, texttype)`` to the set of text strings, only for the text
+        layers the scan was asked for.
+    """
+
+    def __init__(self, text_layers=()):
+        self.shape_layers = set()
+        self.text_layers = set()
+        self.texts = {tuple(key): set() for key in text_layers}
+
+    def add_text(self, key, string):
+        strings = self.texts.get(key)
+        if strings is not None:
+            strings.add(string)
+
+
+def _open_layout(path):
+    if str(path).lower().endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def is_oasis(path):
+    """True if the file starts with the OASIS magic bytes."""
+    with _open_layout(path) as stream:
+        return stream.read(len(OASIS_MAGIC)) == OASIS_MAGIC
+
+
+def _gds_string(data):
+    return data.rstrip(b"\0").decode("utf-8", "replace")
+
+
+def scan_gds(path, statistics=False):
+    """
+    Read the cell hierarchy of a GDS file.
+
+    Parameters
+    ----------
+    path : str
+        GDS file, optionally gzipped.
+    statistics : bool
+        Also count the shapes and instances of every cell. The scan then
+        stops at every element instead of only at cell names.
+
+    Returns
+    -------
+    LayoutHierarchy
+
+    Raises
+    ------
+    LayoutScanError
+        If the file is not a valid GDS stream.
+    """
+    hierarchy = LayoutHierarchy()
+    current = None
+    stops = _GDS_STATISTICS_RECORDS if statistics else _GDS_NAME_RECORDS
+    # Placement of the current SREF or AREF element: (is array, cell name).
+    in_array = False
+    placed = None
+    with _open_layout(path) as stream:
+        buffer = stream.read(GDS_CHUNK_SIZE)
+        if buffer[2:4] != b"\x00\x02":
+            raise LayoutScanError(f"{path}: not a GDS file.")
+        pos = 0
+        while True:
+            last = len(buffer) - 4
+            # Skip the records that are not needed without decoding them.
+            while pos <= last:
+                record_type = buffer[pos + 2]
+                if stops[record_type]:
+                    break
+                length = (buffer[pos] << 8) | buffer[pos + 1]
+                if length < 4:
+                    raise LayoutScanError(f"{path}: invalid GDS record length {length}.")
+                pos += length
+            if pos > last:
+                # The next record header is not in the buffer.
+                if pos > len(buffer):
+                    skip = pos - len(buffer)
+                    if len(stream.read(skip)) < skip:
+                        raise LayoutScanError(f"{path}: truncated GDS record.")
+                    buffer = b""
+                else:
+                    buffer = buffer[pos:]
+                pos = 0
+                chunk = stream.read(GDS_CHUNK_SIZE)
+                if not chunk:
+                    if buffer:
+                        raise LayoutScanError(f"{path}: truncated GDS record.")
+                    break
+                buffer += chunk
+                continue
+            if record_type == GDS_ENDLIB:
+                break
+            length = (buffer[pos] << 8) | buffer[pos + 1]
+            if len(buffer) - pos < length:
+                buffer = buffer[pos:] + stream.read(GDS_CHUNK_SIZE)
+                pos = 0
+                if len(buffer) < length:
+                    raise LayoutScanError(f"{path}: truncated GDS record.")
+            if record_type == GDS_STRNAME:
+                current = _gds_string(buffer[pos + 4:pos + length])
+                hierarchy.add_cell(current)
+            elif current is None:
+                pass
+            elif record_type == GDS_SNAME:
+                name = _gds_string(buffer[pos + 4:pos + length])
+                if not statistics:
+                    hierarchy.add_reference(current, name)
+                elif in_array:
+                    # Counted with the COLROW record that follows.
+                    placed = name
+                else:
+                    hierarchy.add_instances(current, name)
+            elif record_type == GDS_SREF or record_type == GDS_AREF:
+                in_array = record_type == GDS_AREF
+            elif record_type == GDS_COLROW:
+                if placed is not None and length >= 8:
+                    columns, rows = struct.unpack_from(">hh", buffer, pos + 4)
+                    hierarchy.add_instances(current, placed, max(columns, 1) * max(rows, 1))
+                placed = None
+            else:
+                hierarchy.add_shapes(current)
+            pos += length
+    return hierarchy
+
+
+def scan_gds_layers(path, text_layers=()):
+    """
+    Read the layers of the shapes and texts of a GDS file.
+
+    Parameters
+    ----------
+    path : str
+        GDS file, optionally gzipped.
+    text_layers : iterable of tuple
+        ``(layer, texttype)`` whose text strings are collected.
+
+    Returns
+    -------
+    LayoutLayers
+
+    Raises
+    ------
+    LayoutScanError
+        If the file is not a valid GDS stream.
+    """
+    layers = LayoutLayers(text_layers)
+    collect_texts = bool(layers.texts)
+    layer = None
+    text_key = None
+    with _open_layout(path) as stream:
+        buffer = stream.read(GDS_CHUNK_SIZE)
+        if buffer[2:4] != b"\x00\x02":
+            raise LayoutScanError(f"{path}: not a GDS file.")
+        pos = 0
+        while True:
+            last = len(buffer) - 4
+            while pos <= last:
+                record_type = buffer[pos + 2]
+                if _GDS_LAYER_RECORDS[record_type]:
+                    break
+                length = (buffer[pos] << 8) | buffer[pos + 1]
+                if length < 4:
+                    raise LayoutScanError(f"{path}: invalid GDS record length {length}.")
+                pos += length
+            if pos > last:
+                if pos > len(buffer):
+                    skip = pos - len(buffer)
+                    if len(stream.read(skip)) < skip:
+                        raise LayoutScanError(f"{path}: truncated GDS record.")
+                    buffer = b""
+                else:
+                    buffer = buffer[pos:]
+                pos = 0
+                chunk = stream.read(GDS_CHUNK_SIZE)
+                if not chunk:
+                    if buffer:
+                        raise LayoutScanError(f"{path}: truncated GDS record.")
+                    break
+                buffer += chunk
+                continue
+            if record_type == GDS_ENDLIB:
+                break
+            length = (buffer[pos] << 8) | buffer[pos + 1]
+            if len(buffer) - pos < length:
+                buffer = buffer[pos:] + stream.read(GDS_CHUNK_SIZE)
+                pos = 0
+                if len(buffer) < length:
+                    raise LayoutScanError(f"{path}: truncated GDS record.")
+            if length < 6:
+                raise LayoutScanError(f"{path}: invalid GDS record length {length}.")
+            if record_type == GDS_STRING:
+                if collect_texts and text_key is not None:
+                    layers.add_text(text_key, _gds_string(buffer[pos + 4:pos + length]))
+                text_key = None
+            else:
+                # LAYER, DATATYPE, BOXTYPE and TEXTTYPE hold one 2-byte integer.
+                value = struct.unpack_from(">H", buffer, pos + 4)[0]
+                if record_type == GDS_LAYER:
+                    layer = value
+                elif record_type == GDS_TEXTTYPE:
+                    text_key = (layer, value)
+                    layers.text_layers.add(text_key)
+                else:
+                    layers.shape_layers.add((layer, value))
+            pos += length
+    return layers
+
+
+def gds_cell_digests(path):
+    """
+    Read the hierarchy of a GDS file and a digest of every cell.
+
+    A cell digest is the SHA-256 of the records between STRNAME and
+    ENDSTR: the shapes, texts and placements of the cell itself. Child
+    cells only contribute their names, combine the digests along the
+    hierarchy to detect changes below a cell.
+
+    Returns
+    -------
+    tuple
+        ``(LayoutHierarchy, {cell name: hex digest})``
+
+    Raises
+    ------
+    LayoutScanError
+        If the file is not a valid GDS stream.
+    """
+    hierarchy = LayoutHierarchy()
+    digests = {}
+    current = None
+    digest = None
+    # Start of the not yet hashed part of the current cell in the buffer.
+    start = None
+    with _open_layout(path) as stream:
+        buffer = stream.read(GDS_CHUNK_SIZE)
+        if buffer[2:4] != b"\x00\x02":
+            raise LayoutScanError(f"{path}: not a GDS file.")
+        pos = 0
+        while True:
+            available = len(buffer) - pos
+            length = (buffer[pos] << 8) | buffer[pos + 1] if available >= 2 else 0
+            if available < 4 or available < length:
+                if start is not None:
+                    digest.update(buffer[start:pos])
+                    start = 0
+                chunk = stream.read(max(GDS_CHUNK_SIZE, length))
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                if not chunk:
+                    if buffer:
+                        raise LayoutScanError(f"{path}: truncated GDS record.")
+                    break
+                continue
+            if length < 4:
+                raise LayoutScanError(f"{path}: invalid GDS record length {length}.")
+            record_type = buffer[pos + 2]
+            if record_type == GDS_STRNAME:
+                current = _gds_string(buffer[pos + 4:pos + length])
+                hierarchy.add_cell(current)
+                digest = hashlib.sha256()
+                start = pos + length
+            elif record_type == GDS_SNAME:
+                if current is not None:
+                    hierarchy.add_reference(current, _gds_string(buffer[pos + 4:pos + length]))
+            elif record_type == GDS_ENDSTR:
+                if current is not None:
+                    digest.update(buffer[start:pos])
+                    digests[current] = digest.hexdigest()
+                current = None
+                start = None
+            elif record_type == GDS_ENDLIB:
+                break
+            pos += length
+    return hierarchy, digests
+
+
+class _OasisScanner:
+    """Record parser keeping the cell names, placements and shape counts of
+    an OASIS file."""
+
+    def __init__(self, path, text_layers=None):
+        self.path = path
+        self.data = b""
+        self.pos = 0
+        self.cell_names = {}
+        self.implicit_cell_names = 0
+        self.current = None
+        # Cells and placements, cells are names or reference numbers that
+        # are resolved once all CELLNAME records are read.
+        self.cells = []
+        self.placements = {}
+        self.shape_counts = {}
+        # The layers seen. Text strings are only kept for the text layers
+        # in ``text_layers``, as names or reference numbers that are
+        # resolved once all TEXTSTRING records are read.
+        self.reset_modal()
+        self.shape_layers = set()
+        self.text_layer_keys = set()
+        self.texts = {tuple(key): set() for key in text_layers} if text_layers else None
+        self.text_strings = {}
+        self.implicit_text_strings = 0
+
+    def reset_modal(self):
+        """Reset the modal variables, as at the start of every CELL."""
+        self.placement_cell = None
+        # Elements of the last repetition, reused by repetition type 0.
+        self.repetition_count = 1
+        self.layer = None
+        self.datatype = None
+        self.text_layer = None
+        self.text_type = None
+        self.text_string = None
+
+    # -- primitives --------------------------------------------------------
+
+    def uint(self):
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return value
+
+    def skip_int(self, count=1):
+        """Skip ``count`` unsigned or signed integers."""
+        data = self.data
+        pos = self.pos
+        for _ in range(count):
+            while data[pos] & 0x80:
+                pos += 1
+            pos += 1
+        self.pos = pos
+
+    def string(self):
+        length = self.uint()
+        start = self.pos
+        self.pos = start + length
+        if self.pos > len(self.data):
+            raise IndexError("string past end of data")
+        return bytes(self.data[start:self.pos])
+
+    def skip_string(self):
+        length = self.uint()
+        self.pos += length
+
+    def skip_real(self):
+        real_type = self.uint()
+        self._skip_real_body(real_type)
+
+    def _skip_real_body(self, real_type):
+        if real_type < 4:
+            self.skip_int()
+        elif real_type < 6:
+            self.skip_int(2)
+        elif real_type == 6:
+            self.pos += 4
+        elif real_type == 7:
+            self.pos += 8
+        else:
+            raise LayoutScanError(f"{self.path}: invalid OASIS real type {real_type}.")
+
+    def skip_interval(self):
+        interval_type = self.uint()
+        if interval_type == 4:
+            self.skip_int(2)
+        elif interval_type:
+            self.skip_int()
+
+    def skip_g_delta(self):
+        if self.uint() & 1:
+            self.skip_int()
+
+    def skip_point_list(self):
+        list_type = self.uint()
+        count = self.uint()
+        if list_type < 4:
+            self.skip_int(count)
+        elif list_type < 6:
+            for _ in range(count):
+                self.skip_g_delta()
+        else:
+            raise LayoutScanError(f"{self.path}: invalid OASIS point list type {list_type}.")
+
+    def skip_repetition(self):
+        """Skip a repetition, its element count is kept in ``repetition_count``."""
+        repetition_type = self.uint()
+        if repetition_type == 0:
+            return
+        # Dimensions are stored minus two, n elements have n - 1 spaces.
+        if repetition_type == 1 or repetition_type == 8:
+            columns = self.uint() + 2
+            rows = self.uint() + 2
+            self.repetition_count = columns * rows
+            if repetition_type == 1:
+                self.skip_int(2)
+            else:
+                self.skip_g_delta()
+                self.skip_g_delta()
+            return
+        dimension = self.uint()
+        self.repetition_count = dimension + 2
+        if repetition_type in (2, 3):
+            self.skip_int()
+        elif repetition_type in (4, 6):
+            self.skip_int(dimension + 1)
+        elif repetition_type in (5, 7):
+            self.skip_int(dimension + 2)
+        elif repetition_type == 9:
+            self.skip_g_delta()
+        elif repetition_type in (10, 11):
+            if repetition_type == 11:
+                self.skip_int()
+            for _ in range(dimension + 1):
+                self.skip_g_delta()
+        else:
+            raise LayoutScanError(f"{self.path}: invalid OASIS repetition type {repetition_type}.")
+
+    def skip_property_value(self):
+        value_type = self.uint()
+        if value_type < 8:
+            self._skip_real_body(value_type)
+        elif value_type < 10 or value_type > 12:
+            self.skip_int()
+        else:
+            self.skip_string()
+
+    # -- records -----------------------------------------------------------
+
+    def _skip_geometry(self, info, fields):
+        """Skip the optional fields of a geometry record, ``fields`` are
+        ``(bit, kind)`` in file order."""
+        for bit, kind in fields:
+            if info & bit:
+                if kind == "int":
+                    self.skip_int()
+                elif kind == "points":
+                    self.skip_point_list()
+                else:
+                    self.skip_repetition()
+
+    def parse_records(self, data, pos=0):
+        """Parse records from ``data`` until END or the end of the data."""
+        self.data = data
+        self.pos = pos
+        end = len(data)
+        while self.pos < end:
+            record = self.uint()
+            if record == 0 or record == 15 or record == 16 or record == 29:
+                # PAD, XYABSOLUTE, XYRELATIVE, repeated PROPERTY
+                continue
+            if record == 17 or record == 18:
+                info = data[self.pos]
+                self.pos += 1
+                if info & 0x80:
+                    if info & 0x40:
+                        self.placement_cell = self.uint()
+                    else:
+                        self.placement_cell = self.string().decode("utf-8", "replace")
+                if record == 18:
+                    if info & 0x04:
+                        self.skip_real()
+                    if info & 0x02:
+                        self.skip_real()
+                self._skip_geometry(info, ((0x20, "int"), (0x10, "int"), (0x08, "rep")))
+                if self.current is not None:
+                    key = (self.current, self.placement_cell)
+                    count = self.repetition_count if info & 0x08 else 1
+                    self.placements[key] = self.placements.get(key, 0) + count
+            elif 19 <= record <= 27:
+                info = data[self.pos]
+                self.pos += 1
+                self._skip_shape(record, info)
+                if record == 19:
+                    key = (self.text_layer, self.text_type)
+                    self.text_layer_keys.add(key)
+                    if self.texts is not None and key in self.texts:
+                        self.texts[key].add(self.text_string)
+                    continue
+                self.shape_layers.add((self.layer, self.datatype))
+                if self.current is not None:
+                    count = self.repetition_count if info & 0x04 else 1
+                    self.shape_counts[self.current] = self.shape_counts.get(self.current, 0) + count
+            elif record == 28:
+                info = data[self.pos]
+                self.pos += 1
+                if info & 0x04:
+                    if info & 0x02:
+                        self.skip_int()
+                    else:
+                        self.skip_string()
+                if not info & 0x08:
+                    count = info >> 4
+                    if count == 15:
+                        count = self.uint()
+                    for _ in range(count):
+                        self.skip_property_value()
+            elif record == 13 or record == 14:
+                if record == 13:
+                    self.current = self.uint()
+                else:
+                    self.current = self.string().decode("utf-8", "replace")
+                self.cells.append(self.current)
+                # A cell does not inherit the modal state of the previous one.
+                self.reset_modal()
+            elif record == 3 or record == 4:
+                name = self.string().decode("utf-8", "replace")
+                if record == 3:
+                    number = self.implicit_cell_names
+                    self.implicit_cell_names += 1
+                else:
+                    number = self.uint()
+                self.cell_names[number] = name
+            elif record == 5 or record == 6:
+                if self.texts is None:
+                    self.skip_string()
+                    if record == 6:
+                        self.skip_int()
+                    continue
+                string = self.string().decode("utf-8", "replace")
+                if record == 5:
+                    number = self.implicit_text_strings
+                    self.implicit_text_strings += 1
+                else:
+                    number = self.uint()
+                self.text_strings[number] = string
+            elif record in (7, 9):
+                self.skip_string()
+            elif record in (8, 10):
+                self.skip_string()
+                self.skip_int()
+            elif record == 11 or record == 12:
+                self.skip_string()
+                self.skip_interval()
+                self.skip_interval()
+            elif record == 30 or record == 32:
+                self.skip_int()
+                self.skip_string()
+            elif record == 31:
+                self.skip_int()
+                self.skip_string()
+                self.skip_int()
+            elif record == 33:
+                info = data[self.pos]
+                self.pos += 1
+                self.skip_int()
+                self._read_layer(info)
+                self.skip_string()
+                self._skip_geometry(info, ((0x10, "int"), (0x08, "int"), (0x04, "rep")))
+                self.shape_layers.add((self.layer, self.datatype))
+            elif record == 34:
+                compression = self.uint()
+                uncompressed_size = self.uint()
+                compressed_size = self.uint()
+                if compression != 0:
+                    raise LayoutScanError(
+                        f"{self.path}: unknown OASIS CBLOCK compression {compression}."
+                    )
+                start = self.pos
+                self.pos = start + compressed_size
+                block = zlib.decompress(bytes(data[start:self.pos]), -15, uncompressed_size)
+                resume = self.pos
+                self.parse_records(block)
+                self.data = data
+                self.pos = resume
+            elif record == 1:
+                self.skip_string()
+                self.skip_real()
+                if self.uint() == 0:
+                    # Table offsets are in START, not in END.
+                    self.skip_int(12)
+            elif record == 2:
+                return True
+            else:
+                raise LayoutScanError(f"{self.path}: invalid OASIS record {record}.")
+        return False
+
+    def _read_layer(self, info):
+        """Read the layer and datatype fields of a geometry record."""
+        if info & 0x01:
+            self.layer = self.uint()
+        if info & 0x02:
+            self.datatype = self.uint()
+
+    def _skip_shape(self, record, info):
+        if record == 19:
+            # TEXT: 0CNXYRTL
+            if info & 0x40:
+                if self.texts is None:
+                    if info & 0x20:
+                        self.skip_int()
+                    else:
+                        self.skip_string()
+                elif info & 0x20:
+                    self.text_string = self.uint()
+                else:
+                    self.text_string = self.string().decode("utf-8", "replace")
+            if info & 0x01:
+                self.text_layer = self.uint()
+            if info & 0x02:
+                self.text_type = self.uint()
+            self._skip_geometry(info, ((0x10, "int"), (0x08, "int"), (0x04, "rep")))
+            return
+        # Geometry records start with layer and datatype: ......DL
+        self._read_layer(info)
+        if record == 20:
+            # RECTANGLE: SWHXYRDL
+            self._skip_geometry(info, ((0x40, "int"), (0x20, "int")))
+        elif record == 21:
+            # POLYGON: 00PXYRDL
+            self._skip_geometry(info, ((0x20, "points"),))
+        elif record == 22:
+            # PATH: EWPXYRDL
+            self._skip_geometry(info, ((0x40, "int"),))
+            if info & 0x80:
+                scheme = self.uint()
+                if scheme & 0x0C == 0x0C:
+                    self.skip_int()
+                if scheme & 0x03 == 0x03:
+                    self.skip_int()
+            self._skip_geometry(info, ((0x20, "points"),))
+        elif record <= 25:
+            # TRAPEZOID: 0WHXYRDL with delta-a and/or delta-b
+            self._skip_geometry(info, ((0x40, "int"), (0x20, "int")))
+            self.skip_int(2 if record == 23 else 1)
+        elif record == 26:
+            # CTRAPEZOID: TWHXYRDL
+            self._skip_geometry(info, ((0x80, "int"), (0x40, "int"), (0x20, "int")))
+        else:
+            # CIRCLE: 00rXYRDL
+            self._skip_geometry(info, ((0x20, "int"),))
+        self._skip_geometry(info, ((0x10, "int"), (0x08, "int"), (0x04, "rep")))
+
+    def hierarchy(self):
+        """Cell hierarchy with reference numbers replaced by cell names."""
+
+        def cell_name(cell):
+            if isinstance(cell, int):
+                return self.cell_names.get(cell, f"$CELL{cell}")
+            return cell
+
+        hierarchy = LayoutHierarchy()
+        for cell in self.cells:
+            hierarchy.add_cell(cell_name(cell))
+        for (parent, child), count in self.placements.items():
+            hierarchy.add_instances(cell_name(parent), cell_name(child), count)
+        for cell, count in self.shape_counts.items():
+            hierarchy.add_shapes(cell_name(cell), count)
+        return hierarchy
+
+    def layers(self):
+        """Layers of the shapes and texts with text reference numbers resolved."""
+
+        def text_string(string):
+            if isinstance(string, int):
+                return self.text_strings.get(string, f"$TEXT{string}")
+            return string
+
+        layers = LayoutLayers(self.texts or ())
+        layers.shape_layers.update(self.shape_layers)
+        layers.text_layers.update(self.text_layer_keys)
+        for key, strings in (self.texts or {}).items():
+            layers.texts[key].update(text_string(string) for string in strings)
+        return layers
+
+
+def _parse_oasis(path, scanner):
+    """
+    Parse an OASIS file with ``scanner`` and return it.
+
+    ``.gz`` files are inflated to a temporary file first, so that memory
+    use does not depend on the file size.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if str(path).lower().endswith(".gz"):
+            plain_path = os.path.join(tmp_dir, "layout.oas")
+            with gzip.open(path, "rb") as source, open(plain_path, "wb") as target:
+                shutil.copyfileobj(source, target, GDS_CHUNK_SIZE)
+        else:
+            plain_path = path
+        with open(plain_path, "rb") as stream:
+            if os.fstat(stream.fileno()).st_size == 0:
+                raise LayoutScanError(f"{path}: empty file.")
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(OASIS_MAGIC)] != OASIS_MAGIC:
+                    raise LayoutScanError(f"{path}: not an OASIS file.")
+                try:
+                    scanner.parse_records(data, len(OASIS_MAGIC))
+                except (IndexError, zlib.error) as error:
+                    raise LayoutScanError(f"{path}: corrupt OASIS file ({error}).") from None
+    return scanner
+
+
+def scan_oasis(path):
+    """
+    Read the cell hierarchy of an OASIS file.
+
+    Returns
+    -------
+    LayoutHierarchy
+
+    Raises
+    ------
+    LayoutScanError
+        If the file is not a valid OASIS file.
+    """
+    return _parse_oasis(path, _OasisScanner(path)).hierarchy()
+
+
+def scan_layout(path, statistics=False):
+    """
+    Read the cell hierarchy of a GDS or OASIS file.
+
+    With ``statistics`` the shapes and instances of every cell are counted
+    as well. OASIS scans always count them, as every record is parsed.
+
+    Raises
+    ------
+    LayoutScanError
+        If the file cannot be read or is neither GDS nor OASIS.
+    """
+    try:
+        if is_oasis(path):
+            return scan_oasis(path)
+        return scan_gds(path, statistics)
+    except (OSError, EOFError) as error:
+        raise LayoutScanError(f"{path}: {error}") from None
+
+
+def scan_layout_layers(path, text_layers=()):
+    """
+    Read the layers of the shapes and texts of a GDS or OASIS file.
+
+    Parameters
+    ----------
+    path : str
+        GDS or OASIS file, optionally gzipped.
+    text_layers : iterable of tuple
+        ``(layer, texttype)`` whose text strings are collected.
+
+    Returns
+    -------
+    LayoutLayers
+
+    Raises
+    ------
+    LayoutScanError
+        If the file cannot be read or is neither GDS nor OASIS.
+    """
+    try:
+        if is_oasis(path):
+            return _parse_oasis(path, _OasisScanner(path, text_layers)).layers()
+        return scan_gds_layers(path, text_layers)
+    except (OSError, EOFError) as error:
+        raise LayoutScanError(f"{path}: {error}") from None
+
+
+def top_cell_names(path):
+    """Top cell names of a GDS or OASIS file, see :func:`scan_layout`."""
+    return scan_layout(path).top_cells()
+
+
+def _measure(method, path):
+    """Top cells, seconds and peak memory of one way to list top cells."""
+    import resource
+
+    start = time.perf_counter()
+    if method == "scan":
+        top_cells = top_cell_names(path)
+    else:
+        import klayout.db
+
+        layout = klayout.db.Layout()
+        layout.read(path)
+        top_cells = [cell.name for cell in layout.top_cells()]
+    seconds = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    return {"method": method, "seconds": seconds, "max_rss_mb": max_rss / 1024,
+            "top_cells": top_cells}
+
+
+def benchmark_top_cell_discovery(path, methods=("scan", "klayout")):
+    """
+    Compare the scanner with a full KLayout read.
+
+    Every method runs in a fresh interpreter so that peak memory is
+    measured per method.
+
+    Returns
+    -------
+    list of dict
+        ``method``, ``seconds``, ``max_rss_mb`` and ``top_cells`` per method.
+    """
+    results = []
+    for method in methods:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), str(path), "--measure", method],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            results.append({"method": method, "error": completed.stderr.strip()})
+            continue
+        results.append(json.loads(completed.stdout))
+    return results
+
+
+def format_benchmark_table(results, size_bytes):
+    """Format benchmark results as table lines."""
+    header = f"{'Method':<8} {'Time (s)':>10} {'Peak RSS (MB)':>14} {'MB/s':>8}  Top cells"
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        if "error" in entry:
+            message = (entry["error"].splitlines() or [""])[-1]
+            lines.append(f"{entry['method']:<8} failed: {message}")
+            continue
+        rate = size_bytes / 1e6 / entry["seconds"] if entry["seconds"] else 0.0
+        lines.append(
+            f"{entry['method']:<8} {entry['seconds']:>10.3f} {entry['max_rss_mb']:>14.1f} "
+            f"{rate:>8.1f}  {', '.join(entry['top_cells'])}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the top cells of a GDS or OASIS file.")
+    parser.add_argument("layout", help="GDS or OASIS file, optionally gzipped.")
+    parser.add_argument("--hierarchy", action="store_true", help="Print every cell and its children.")
+    parser.add_argument(
+        "--layers", action="store_true", help="Print the layers with shapes and with texts."
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare time and peak memory with a full KLayout read.",
+    )
+    parser.add_argument("--measure", choices=("scan", "klayout"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        if args.measure:
+            print(json.dumps(_measure(args.measure, args.layout)))
+        elif args.benchmark:
+            benchmark = benchmark_top_cell_discovery(args.layout)
+            print("\n".join(format_benchmark_table(benchmark, os.path.getsize(args.layout))))
+        elif args.layers:
+            layout_layers = scan_layout_layers(args.layout)
+            for layer, datatype in sorted(layout_layers.shape_layers):
+                print(f"{layer}/{datatype}")
+            for layer, texttype in sorted(layout_layers.text_layers):
+                print(f"{layer}/{texttype} (texts)")
+        elif args.hierarchy:
+            hierarchy = scan_layout(args.layout)
+            for name in hierarchy.cells:
+                print(f"{name}: {' '.join(sorted(hierarchy.children[name]))}")
+        else:
+            print("\n".join(top_cell_names(args.layout)))
+    except LayoutScanError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
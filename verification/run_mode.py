@@ -0,0 +1,285 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Choose the KLayout run mode, deep or flat, from the layout hierarchy.
+
+Flat mode processes every shape of the flattened layout, deep mode every
+shape of the cells once plus the interactions between placements. The
+statistics come from a streaming scan of the layout file
+(``layout_scan.py``), so no layout is loaded:
+
+- shapes: shapes of the cells below the top cell, every cell counted once,
+- flat shapes: shapes of the flattened layout,
+- instances: placed instances, array elements counted one by one,
+- depth: hierarchy levels below the top cell,
+- reuse factor: flat shapes per shape.
+
+The predicted runtime of a mode is ``setup + per_item * work`` where the
+work is the flat shape count for flat mode and the shape count plus a
+weighted instance count for deep mode. Measured runtimes are kept in a
+per-user history file, and the prediction of a mode is scaled by the median
+ratio of measured to predicted runtime of its recorded runs.
+
+Command line::
+
+    python run_mode.py chip.gds --topcell TOP
+"""
+
+import argparse
+import getpass
+import json
+import os
+import statistics
+import sys
+import tempfile
+
+try:
+    from .layout_scan import LayoutScanError, scan_layout
+except ImportError:
+    from layout_scan import LayoutScanError, scan_layout
+
+RUN_MODES = ("deep", "flat")
+HISTORY_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "revolution-eda",
+    f"run_mode_history_{getpass.getuser()}.json",
+)
+HISTORY_VERSION = 1
+HISTORY_LENGTH = 50
+# Seconds per run and per work item of the uncalibrated model.
+DEFAULT_MODEL = {
+    "flat": {"setup": 2.0, "per_item": 2e-6},
+    "deep": {"setup": 4.0, "per_item": 4e-6},
+}
+# Work of one placement in deep mode, in shapes.
+INSTANCE_WEIGHT = 20
+
+
+class HierarchyStatistics:
+    """
+    Hierarchy statistics below one top cell.
+
+    Attributes
+    ----------
+    topcell : str
+    cells : int
+        Cells used below and including the top cell.
+    depth : int
+        Hierarchy levels below the top cell, 0 for a flat layout.
+    instances : int
+        Placed instances in the used cells, every cell counted once.
+    flat_instances : int
+        Instances of the flattened layout.
+    shapes : int
+        Shapes of the used cells, every cell counted once.
+    flat_shapes : int
+        Shapes of the flattened layout.
+    """
+
+    def __init__(self, topcell, cells, depth, instances, flat_instances, shapes, flat_shapes):
+        self.topcell = topcell
+        self.cells = cells
+        self.depth = depth
+        self.instances = instances
+        self.flat_instances = flat_instances
+        self.shapes = shapes
+        self.flat_shapes = flat_shapes
+
+    @property
+    def reuse_factor(self):
+        """Flat shapes per shape, 1.0 for a flat layout."""
+        return self.flat_shapes / self.shapes if self.shapes else 1.0
+
+    def work(self, mode):
+        """Work items of a run in ``mode``."""
+        if mode == "flat":
+            return self.flat_shapes
+        return self.shapes + INSTANCE_WEIGHT * self.instances
+
+    def to_dict(self):
+        return {
+            "topcell": self.topcell,
+            "cells": self.cells,
+            "depth": self.depth,
+            "instances": self.instances,
+            "flat_instances": self.flat_instances,
+            "shapes": self.shapes,
+            "flat_shapes": self.flat_shapes,
+            "reuse_factor": round(self.reuse_factor, 3),
+        }
+
+
+def statistics_from_hierarchy(hierarchy, topcell=None):
+    """
+    Compute the statistics of a counted ``LayoutHierarchy``.
+
+    Parameters
+    ----------
+    hierarchy : LayoutHierarchy
+        Result of a statistics scan.
+    topcell : str or None
+        Top cell, the first top cell of the file if None.
+
+    Raises
+    ------
+    LayoutScanError
+        If the top cell is not in the layout.
+    """
+    if topcell is None:
+        top_cells = hierarchy.top_cells()
+        topcell = top_cells[0] if top_cells else None
+    if topcell not in hierarchy.children:
+        raise LayoutScanError(f"Cell {topcell} is not in the layout.")
+
+    placements = {}
+    for (parent, child), count in hierarchy.instance_counts.items():
+        placements.setdefault(parent, []).append((child, count))
+
+    # Per cell: (depth, flat instances, flat shapes), cycles count as leaves.
+    flat = {}
+
+    def visit(cell, path):
+        if cell in flat:
+            return flat[cell]
+        if cell in path:
+            return 0, 0, 0
+        depth = 0
+        flat_instances = 0
+        flat_shapes = hierarchy.shape_counts.get(cell, 0)
+        for child, count in placements.get(cell, ()):
+            child_depth, child_instances, child_shapes = visit(child, path | {cell})
+            depth = max(depth, child_depth + 1)
+            flat_instances += count * (1 + child_instances)
+            flat_shapes += count * child_shapes
+        flat[cell] = (depth, flat_instances, flat_shapes)
+        return flat[cell]
+
+    depth, flat_instances, flat_shapes = visit(topcell, frozenset())
+    used = set()
+    pending = [topcell]
+    while pending:
+        cell = pending.pop()
+        if cell not in used:
+            used.add(cell)
+            pending.extend(hierarchy.children.get(cell, ()))
+    return HierarchyStatistics(
+        topcell,
+        len(used),
+        depth,
+        sum(count for cell in used for _, count in placements.get(cell, ())),
+        flat_instances,
+        sum(hierarchy.shape_counts.get(cell, 0) for cell in used),
+        flat_shapes,
+    )
+
+
+def hierarchy_statistics(layout_path, topcell=None):
+    """
+    Scan a GDS or OASIS file and return the statistics below ``topcell``.
+
+    Raises
+    ------
+    LayoutScanError
+        If the file cannot be scanned or has no such top cell.
+    """
+    return statistics_from_hierarchy(scan_layout(layout_path, statistics=True), topcell)
+
+
+def load_history(history_file=HISTORY_FILE):
+    """Recorded runs, ``{mode: [{"work", "seconds"}, ...]}``."""
+    try:
+        with open(history_file, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != HISTORY_VERSION:
+        return {}
+    return data.get("runs", {})
+
+
+def _default_runtime(mode, work):
+    model = DEFAULT_MODEL[mode]
+    return model["setup"] + model["per_item"] * work
+
+
+def calibration(history, mode):
+    """Median ratio of measured to predicted runtime of a mode, 1.0 without runs."""
+    ratios = [
+        run["seconds"] / _default_runtime(mode, run["work"]) for run in history.get(mode, [])
+    ]
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def predict_runtimes(stats, history=None):
+    """Predicted seconds of a run in every mode, ``{mode: seconds}``."""
+    history = history or {}
+    return {
+        mode: _default_runtime(mode, stats.work(mode)) * calibration(history, mode)
+        for mode in RUN_MODES
+    }
+
+
+def choose_run_mode(stats, history_file=HISTORY_FILE):
+    """
+    Return the run mode predicted to be faster and the reason for the log.
+
+    Returns
+    -------
+    tuple
+        ``(mode, reason)``
+    """
+    history = load_history(history_file) if history_file else {}
+    predicted = predict_runtimes(stats, history)
+    mode = min(RUN_MODES, key=lambda name: predicted[name])
+    runs = sum(len(history.get(name, [])) for name in RUN_MODES)
+    reason = (
+        f"reuse factor {stats.reuse_factor:.1f} ({stats.flat_shapes} flat shapes, "
+        f"{stats.shapes} shapes in {stats.cells} cells), {stats.instances} instances, "
+        f"depth {stats.depth}: predicted deep {predicted['deep']:.1f} s, "
+        f"flat {predicted['flat']:.1f} s"
+    )
+    if runs:
+        reason += f", calibrated on {runs} runs"
+    return mode, reason
+
+
+def record_runtime(stats, mode, seconds, history_file=HISTORY_FILE):
+    """Add a measured runtime to the history, keeping the latest runs per mode."""
+    history = load_history(history_file)
+    runs = history.setdefault(mode, [])
+    runs.append({"work": stats.work(mode), "seconds": round(seconds, 3)})
+    del runs[:-HISTORY_LENGTH]
+    try:
+        os.makedirs(os.path.dirname(history_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(history_file), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": HISTORY_VERSION, "runs": history}, f, indent=2)
+        os.replace(tmp_path, history_file)
+    except OSError:
+        # The history only refines the model, a read-only home must not fail runs.
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Choose the KLayout run mode of a layout.")
+    parser.add_argument("layout", help="GDS or OASIS file, optionally gzipped.")
+    parser.add_argument("--topcell", type=str, default=None, help="Top cell name.")
+    args = parser.parse_args()
+
+    try:
+        layout_statistics = hierarchy_statistics(args.layout, args.topcell)
+    except (LayoutScanError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    run_mode, run_mode_reason = choose_run_mode(layout_statistics)
+    print(json.dumps(layout_statistics.to_dict(), indent=2))
+    print(f"{run_mode}: {run_mode_reason}")
+    sys.exit(0)
@@ -0,0 +1,215 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Stage timings of a KLayout deck from the stage markers in its output.
+
+The LVS deck logs a marker at the start of every stage, e.g. a layer
+derivation or device extraction rule deck, the schematic read, the
+alignment or the compare::
+
+    STAGE <name> <epoch seconds> <memory KB>
+
+A stage ends where the next one starts, the ``end`` marker ends the deck.
+The time from ``end`` to the end of the KLayout run, when the report and
+the netlist are written, is the ``write_results`` stage. Stage names are
+dotted, the first part is the group, e.g. ``extraction.mos``.
+
+Command line::
+
+    python stage_timing.py lvs_run/design.log --json design_stages.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+STAGE_PATTERN = re.compile(r"\bSTAGE (\S+) (\d+(?:\.\d+)?) (\d+)\s*$")
+END_STAGE = "end"
+WRITE_STAGE = "write_results"
+REPORT_VERSION = 1
+
+
+def parse_stage_marker(line):
+    """
+    Parse a stage marker line.
+
+    Returns
+    -------
+    tuple or None
+        ``(name, epoch seconds, memory KB)``, None for other lines.
+    """
+    if "STAGE " not in line:
+        return None
+    m = STAGE_PATTERN.search(line)
+    if m is None:
+        return None
+    return m.group(1), float(m.group(2)), int(m.group(3))
+
+
+class StageTimer:
+    """
+    Stage markers of one deck run, fed one output line at a time.
+
+    Attributes
+    ----------
+    markers : list of tuple
+        ``(name, epoch seconds, memory KB)`` in run order.
+    """
+
+    def __init__(self):
+        self.markers = []
+
+    def feed(self, line):
+        """Record the marker in ``line``, return it or None."""
+        marker = parse_stage_marker(line)
+        if marker is not None:
+            self.markers.append(marker)
+        return marker
+
+    @property
+    def current(self):
+        """Name of the running stage, None before the first and after the last."""
+        if not self.markers or self.markers[-1][0] == END_STAGE:
+            return None
+        return self.markers[-1][0]
+
+    def stages(self, end_time=None):
+        """
+        Timing and memory of every stage.
+
+        Parameters
+        ----------
+        end_time : float or None
+            Epoch seconds when the run ended. Times ``write_results`` or, if
+            the run stopped inside a stage, the last stage.
+
+        Returns
+        -------
+        list of dict
+            ``name``, ``group``, ``seconds``, ``share`` of the timed total,
+            ``memory_mb`` at the end and ``memory_delta_mb``, the memory
+            values are None where no marker follows.
+        """
+        markers = list(self.markers)
+        if markers and markers[-1][0] == END_STAGE and end_time is not None:
+            markers[-1] = (WRITE_STAGE,) + markers[-1][1:]
+        stages = []
+        for index, (name, start, memory_kb) in enumerate(markers):
+            if index + 1 < len(markers):
+                end, end_memory_kb = markers[index + 1][1], markers[index + 1][2]
+            elif name != END_STAGE and end_time is not None:
+                end, end_memory_kb = max(end_time, start), None
+            else:
+                continue
+            stages.append({
+                "name": name,
+                "group": name.split(".")[0],
+                "seconds": round(end - start, 3),
+                "memory_mb": round(end_memory_kb / 1024, 1) if end_memory_kb is not None else None,
+                "memory_delta_mb": (
+                    round((end_memory_kb - memory_kb) / 1024, 1)
+                    if end_memory_kb is not None else None
+                ),
+            })
+        total = sum(stage["seconds"] for stage in stages)
+        for stage in stages:
+            stage["share"] = round(stage["seconds"] / total, 4) if total else 0.0
+        return stages
+
+
+def group_totals(stages):
+    """Seconds and share per stage group in run order, ``[(group, seconds, share)]``."""
+    totals = {}
+    for stage in stages:
+        seconds, share = totals.get(stage["group"], (0.0, 0.0))
+        totals[stage["group"]] = (seconds + stage["seconds"], share + stage["share"])
+    return [(group, round(seconds, 3), round(share, 4)) for group, (seconds, share) in totals.items()]
+
+
+def _memory_text(value, signed=False):
+    if value is None:
+        return "n/a"
+    return f"{value:+.1f}" if signed else f"{value:.1f}"
+
+
+def format_stage_table(stages):
+    """Format stage timings as table lines, followed by the group totals."""
+    width = max([len(stage["name"]) for stage in stages] + [len("Stage")])
+    header = f"{'Stage':<{width}} {'Time (s)':>10} {'Share':>7} {'Memory (MB)':>12} {'Delta (MB)':>11}"
+    lines = [header, "-" * len(header)]
+    for stage in stages:
+        lines.append(
+            f"{stage['name']:<{width}} {stage['seconds']:>10.3f} {stage['share']:>7.1%} "
+            f"{_memory_text(stage['memory_mb']):>12} "
+            f"{_memory_text(stage['memory_delta_mb'], signed=True):>11}"
+        )
+    groups = [entry for entry in group_totals(stages)
+              if sum(stage["group"] == entry[0] for stage in stages) > 1]
+    if groups:
+        lines.append("-" * len(header))
+        for group, seconds, share in groups:
+            lines.append(f"{group + ' (total)':<{width}} {seconds:>10.3f} {share:>7.1%}")
+    return lines
+
+
+def write_stage_report(path, stages, **extra):
+    """
+    Write the stage timings as JSON.
+
+    ``extra`` items, e.g. the top cell or the run mode, are stored with
+    the stages.
+    """
+    report = dict(extra)
+    report.update({
+        "version": REPORT_VERSION,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages), 3),
+        "stages": stages,
+        "groups": [
+            {"group": group, "seconds": seconds, "share": share}
+            for group, seconds, share in group_totals(stages)
+        ],
+    })
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def stage_timer_from_log(log_path):
+    """Stage markers of a deck log file."""
+    timer = StageTimer()
+    with open(log_path, "r", errors="replace") as f:
+        for line in f:
+            timer.feed(line)
+    return timer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stage timings of a KLayout deck log.")
+    parser.add_argument("log", help="Log written by the deck.")
+    parser.add_argument("--json", default=None, help="Also write the timings to this file.")
+    args = parser.parse_args()
+
+    try:
+        timings = stage_timer_from_log(args.log).stages()
+    except OSError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    if not timings:
+        print(f"{args.log}: no stage markers.", file=sys.stderr)
+        sys.exit(1)
+    print("\n".join(format_stage_table(timings)))
+    if args.json:
+        write_stage_report(args.json, timings, log=os.path.abspath(args.log))
+    sys.exit(0)
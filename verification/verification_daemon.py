@@ -0,0 +1,538 @@
+#
+# Revolution EDA
+#
+# Copyright (c) 2026 Revolution Semiconductor
+#
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0.
+# If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+##
+
+"""Local DRC/LVS worker daemon.
+
+The daemon keeps a pool of warm KLayout sessions (see klayout_session.py)
+and runs deck jobs for clients on the same machine. It listens on a
+localhost TCP port. The port and an access token are written to a state
+file that only the current user can read.
+
+Protocol: one JSON object per line in both directions. Every request
+carries the token.
+
+    {"op": "run", "deck": "...", "variables": {...}, "timeout": 600}
+        -> {"event": "accepted", "job": 3}
+        -> {"event": "log", "line": "..."}            (repeated)
+        -> {"event": "done", "ok": true, "seconds": 12.3}
+    {"op": "cancel", "job": 3}   (on the run connection or a new one)
+    {"op": "status"}             -> {"event": "status", ...}
+    {"op": "shutdown"}
+
+Closing a run connection cancels its job.
+
+Command line::
+
+    python verification_daemon.py serve --workers 2
+    python verification_daemon.py run --klayout klayout -- -b -r deck.lvs -rd input=a.gds
+    python verification_daemon.py status
+    python verification_daemon.py stop
+
+``run`` accepts KLayout's own batch arguments. If no daemon is running, it
+starts the given KLayout executable with these arguments instead, so
+callers can use it in place of ``klayout``.
+"""
+
+import argparse
+import getpass
+import itertools
+import json
+import logging
+import os
+import queue
+import secrets
+import select
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    from .job_queue import stop_child_on_terminate
+    from .klayout_session import KLayoutSession, KLayoutSessionError
+except ImportError:
+    from job_queue import stop_child_on_terminate
+    from klayout_session import KLayoutSession, KLayoutSessionError
+
+DAEMON_SCRIPT = os.path.abspath(__file__)
+HOST = "127.0.0.1"
+# In the per-user runtime directory, or the per-user cache directory where
+# there is none; never in the shared temporary directory.
+STATE_FILE = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.environ.get("XDG_CACHE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".cache"),
+    "revolution-eda",
+    f"verification_daemon_{getpass.getuser()}.json",
+)
+
+
+def _owned_by_user(stat_result):
+    """True if a file is the current user's and nobody else can access it."""
+    if not hasattr(os, "getuid"):
+        return True
+    return stat_result.st_uid == os.getuid() and not stat_result.st_mode & 0o077
+
+
+def read_state(state_file=STATE_FILE):
+    """
+    Return the ``{"port", "token", "pid"}`` state of a running daemon, or None.
+
+    A state file that belongs to another user or that others can access is
+    ignored.
+    """
+    try:
+        fd = os.open(state_file, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None
+    with os.fdopen(fd, "r") as f:
+        if not _owned_by_user(os.fstat(f.fileno())):
+            logging.warning("Ignoring %s, it is not private to the current user.", state_file)
+            return None
+        try:
+            return json.load(f)
+        except ValueError:
+            return None
+
+
+def write_state(state, state_file=STATE_FILE):
+    """Write the state to a new private file, then move it into place."""
+    state_dir = os.path.dirname(state_file)
+    os.makedirs(state_dir, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_file)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+
+class DaemonJob:
+    """A deck run queued in the daemon."""
+
+    def __init__(self, job_id, deck, variables, timeout=None):
+        self.id = job_id
+        self.deck = deck
+        self.variables = variables
+        self.timeout = timeout
+        self.events = queue.Queue()
+        self.state = "queued"
+        self.session = None
+        self.submitted = time.time()
+
+    def cancel(self):
+        """Cancel the job, a running job loses its KLayout process."""
+        if self.state == "queued":
+            self.state = "cancelled"
+            self.events.put({"event": "done", "ok": False, "error": "cancelled"})
+        elif self.state == "running":
+            self.state = "cancelled"
+            if self.session is not None:
+                self.session.cancel()
+
+
+class WorkerPool:
+    """Worker threads, each owning one KLayout session."""
+
+    def __init__(self, workers=2, klayout="klayout", max_jobs=50):
+        self.jobs = queue.Queue()
+        self.active = {}
+        self.finished = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.sessions = [KLayoutSession(klayout, max_jobs) for _ in range(max(1, workers))]
+        self.threads = [
+            threading.Thread(target=self._work, args=(session,), daemon=True)
+            for session in self.sessions
+        ]
+
+    def start(self):
+        for session in self.sessions:
+            session.start()
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, deck, variables, timeout=None):
+        job = DaemonJob(next(self._ids), deck, variables, timeout)
+        with self._lock:
+            self.active[job.id] = job
+        self.jobs.put(job)
+        return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.active.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def _work(self, session):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            if job.state == "queued":
+                self._run(session, job)
+            with self._lock:
+                self.active.pop(job.id, None)
+                self.finished += 1
+
+    def _run(self, session, job):
+        job.state = "running"
+        job.session = session
+        try:
+            result = session.run(
+                job.deck,
+                job.variables,
+                output=lambda line: job.events.put({"event": "log", "line": line}),
+                timeout=job.timeout,
+            )
+        except KLayoutSessionError as e:
+            result = {"ok": False, "error": str(e)}
+        if job.state == "cancelled":
+            result = {"ok": False, "error": "cancelled"}
+        job.state = "done"
+        job.events.put(dict(result, event="done"))
+
+    def status(self):
+        with self._lock:
+            jobs = [
+                {"job": job.id, "state": job.state, "deck": job.deck}
+                for job in self.active.values()
+            ]
+        return {
+            "workers": len(self.sessions),
+            "versions": [session.version for session in self.sessions],
+            "queued": sum(1 for job in jobs if job["state"] == "queued"),
+            "jobs": jobs,
+            "finished": self.finished,
+        }
+
+    def stop(self):
+        for job_id in list(self.active):
+            self.cancel(job_id)
+        for _ in self.threads:
+            self.jobs.put(None)
+        for session in self.sessions:
+            session.close()
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Serve one client connection."""
+
+    def send(self, message):
+        self.wfile.write((json.dumps(message) + "\n").encode())
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return
+        if not secrets.compare_digest(str(request.get("token", "")), self.server.token):
+            self.send({"event": "error", "error": "invalid token"})
+            return
+        op = request.get("op")
+        pool = self.server.pool
+        if op == "run":
+            self.run_job(pool, request)
+        elif op == "cancel":
+            self.send({"event": "cancelled", "ok": pool.cancel(request.get("job"))})
+        elif op == "status":
+            self.send(dict(pool.status(), event="status"))
+        elif op == "shutdown":
+            self.send({"event": "shutdown"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self.send({"event": "error", "error": f"unknown op {op}"})
+
+    def _client_request(self):
+        """Return a pending client message, ``{}`` if the client is gone."""
+        readable, _, _ = select.select([self.connection], [], [], 0)
+        if not readable:
+            return None
+        line = self.rfile.readline()
+        if not line:
+            return {}
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def run_job(self, pool, request):
+        job = pool.submit(
+            request["deck"], request.get("variables", {}), request.get("timeout")
+        )
+        try:
+            self.send({"event": "accepted", "job": job.id})
+            while True:
+                try:
+                    event = job.events.get(timeout=0.5)
+                except queue.Empty:
+                    message = self._client_request()
+                    if message == {} or (message and message.get("op") == "cancel"):
+                        job.cancel()
+                    continue
+                self.send(event)
+                if event["event"] == "done":
+                    return
+        except OSError:
+            # The client went away.
+            job.cancel()
+
+
+class VerificationDaemon(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, pool, port=0):
+        super().__init__((HOST, port), DaemonRequestHandler)
+        self.pool = pool
+        self.token = secrets.token_hex(16)
+
+
+def serve(workers=2, klayout="klayout", port=0, state_file=STATE_FILE, max_jobs=50):
+    """Run the daemon until it is shut down."""
+    pool = WorkerPool(workers, klayout, max_jobs)
+    pool.start()
+    with VerificationDaemon(pool, port) as server:
+        write_state(
+            {"port": server.server_address[1], "token": server.token, "pid": os.getpid()},
+            state_file,
+        )
+        logging.info(
+            "Verification daemon on %s:%d with %d KLayout workers.",
+            HOST, server.server_address[1], workers,
+        )
+        try:
+            server.serve_forever()
+        finally:
+            pool.stop()
+            try:
+                os.remove(state_file)
+            except OSError:
+                pass
+
+
+class DaemonClient:
+    """
+    Client of a running verification daemon.
+
+    It can be used in place of a KLayoutSession: ``start``, ``version``,
+    ``run`` and ``cancel`` behave the same way.
+    """
+
+    def __init__(self, state=None, state_file=STATE_FILE, connect_timeout=2.0):
+        self.state = state or read_state(state_file)
+        self.connect_timeout = connect_timeout
+        self.version = None
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Check that the daemon answers and fetch its KLayout version.
+
+        Raises
+        ------
+        ConnectionError
+            If no daemon is running.
+        """
+        try:
+            status = self.request({"op": "status"})
+        except (OSError, ValueError):
+            raise ConnectionError("No verification daemon is running.") from None
+        versions = [version for version in status.get("versions", []) if version]
+        self.version = versions[0] if versions else None
+
+    def available(self):
+        """True if a daemon answers on the recorded port."""
+        try:
+            return self.request({"op": "status"})["event"] == "status"
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def _connect(self):
+        if not self.state:
+            raise ConnectionRefusedError("No verification daemon is running.")
+        sock = socket.create_connection((HOST, self.state["port"]), self.connect_timeout)
+        sock.settimeout(None)
+        return sock
+
+    def _send(self, sock, message):
+        sock.sendall((json.dumps(dict(message, token=self.state["token"])) + "\n").encode())
+
+    def request(self, message):
+        """Send a single request and return the reply."""
+        with self._connect() as sock:
+            self._send(sock, message)
+            with sock.makefile("r") as reply:
+                return json.loads(reply.readline())
+
+    def run(self, deck, variables, output=None, timeout=None):
+        """
+        Run a deck in the daemon.
+
+        Parameters
+        ----------
+        deck : str
+            Deck path.
+        variables : dict
+            Deck variables as given with ``-rd``.
+        output : callable or None
+            Called with every log line.
+        timeout : float or None
+            Seconds without output after which the daemon cancels the job.
+
+        Returns
+        -------
+        dict
+            ``{"ok": bool, ...}`` as reported by the KLayout host.
+        """
+        with self._connect() as sock:
+            self._send(sock, {"op": "run", "deck": os.path.abspath(deck),
+                              "variables": variables, "timeout": timeout})
+            job_id = None
+            try:
+                with sock.makefile("r") as events:
+                    for line in events:
+                        event = json.loads(line)
+                        if event["event"] == "accepted":
+                            job_id = event["job"]
+                            with self._lock:
+                                self._running.add(job_id)
+                        elif event["event"] == "log" and output is not None:
+                            output(event["line"])
+                        elif event["event"] == "done":
+                            return event
+                        elif event["event"] == "error":
+                            raise ConnectionError(event["error"])
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+        raise ConnectionError("Verification daemon closed the connection.")
+
+    def cancel(self, job_id=None):
+        """Cancel a job, or all jobs started by this client."""
+        with self._lock:
+            job_ids = [job_id] if job_id is not None else list(self._running)
+        cancelled = False
+        for running_id in job_ids:
+            try:
+                cancelled |= self.request({"op": "cancel", "job": running_id}).get("ok", False)
+            except (OSError, ValueError):
+                pass
+        return cancelled
+
+
+def parse_klayout_arguments(klayout_args):
+    """
+    Extract the deck and ``-rd`` variables from KLayout batch arguments.
+
+    Returns
+    -------
+    tuple
+        ``(deck, variables)``, deck is None if no ``-r`` was given.
+    """
+    deck = None
+    variables = {}
+    args = iter(klayout_args)
+    for arg in args:
+        if arg == "-r":
+            deck = next(args, None)
+        elif arg == "-rd":
+            name, _, value = next(args, "").partition("=")
+            if name:
+                variables[name] = value
+    return deck, variables
+
+
+def client_arguments(klayout, klayout_args):
+    """
+    Arguments to run ``klayout_args`` through the daemon with this script.
+
+    Callers start ``sys.executable`` with these arguments instead of
+    ``klayout`` with ``klayout_args``.
+    """
+    return [DAEMON_SCRIPT, "run", "--klayout", klayout or "klayout", "--", *klayout_args]
+
+
+def run_klayout(klayout, klayout_args, output=None, state_file=STATE_FILE):
+    """
+    Run KLayout batch arguments in the daemon, or in a one-shot process.
+
+    Returns
+    -------
+    int
+        Exit code, 0 if the deck ran successfully.
+    """
+    write = output or (lambda line: (sys.stdout.write(line), sys.stdout.flush()))
+    deck, variables = parse_klayout_arguments(klayout_args)
+    client = DaemonClient(state_file=state_file)
+    if deck is not None and client.state:
+        try:
+            result = client.run(deck, variables, output=write)
+        except OSError:
+            result = None
+        if result is not None:
+            if not result.get("ok"):
+                write(f"ERROR: {result.get('error', 'deck failed')}\n")
+            return 0 if result.get("ok") else 1
+    proc = subprocess.Popen(
+        [klayout, *klayout_args], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1,
+    )
+    stop_child_on_terminate(proc)
+    for line in proc.stdout:
+        write(line)
+    return proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local KLayout DRC/LVS worker daemon.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the daemon.")
+    serve_parser.add_argument("--workers", type=int, default=2, help="KLayout sessions.")
+    serve_parser.add_argument("--klayout", type=str, default="klayout", help="KLayout executable.")
+    serve_parser.add_argument("--port", type=int, default=0, help="Port, 0 picks a free one.")
+    serve_parser.add_argument(
+        "--max_jobs", type=int, default=50, help="Jobs after which a session is restarted."
+    )
+    run_parser = commands.add_parser("run", help="Run KLayout batch arguments.")
+    run_parser.add_argument("--klayout", type=str, default="klayout",
+                            help="KLayout executable used without a daemon.")
+    run_parser.add_argument("klayout_args", nargs=argparse.REMAINDER,
+                            help="KLayout arguments after --.")
+    commands.add_parser("status", help="Show the daemon status.")
+    commands.add_parser("stop", help="Stop the daemon.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-7s | %(message)s")
+    if args.command == "serve":
+        serve(args.workers, args.klayout, args.port, max_jobs=args.max_jobs)
+    elif args.command == "run":
+        klayout_args = args.klayout_args[1:] if args.klayout_args[:1] == ["--"] else args.klayout_args
+        sys.exit(run_klayout(args.klayout, klayout_args))
+    else:
+        daemon = DaemonClient()
+        try:
+            reply = daemon.request({"op": "status" if args.command == "status" else "shutdown"})
+        except (OSError, ValueError):
+            print("No verification daemon is running.", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(reply, indent=2))
@@ -0,0 +1,287 @@
+#     "Commons Clause" License Condition v1.0
+#    #
+#     The Software is provided to you by the Licensor under the License, as defined
+#     below, subject to the following condition.
+#  #
+#     Without limiting other conditions in the License, the grant of rights under the
+#     License will not include, and the License does not grant to you, the right to
+#     Sell the Software.
+#  #
+#     For purposes of the foregoing, "Sell" means practicing any or all of the rights
+#     granted to you under the License to provide to third parties, for a fee or other
+#     consideration (including without limitation fees for hosting) a product or service whose value
+#     derives, entirely or substantially, from the functionality of the Software. Any
+#     license notice or attribution required by the License must also include this
+#     Commons Clause License Condition notice.
+#  #
+#    Add-ons and extensions developed for this software may be distributed
+#    under their own separate licenses.
+#  #
+#     Software: Revolution EDA
+#     License: Mozilla Public License 2.0
+#     Licensor: Revolution Semiconductor (Registered in the Netherlands)
+
+import importlib
+import logging
+
+from PySide6.QtCore import QObject, QProcess, QThread, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+
+from revedaEditor.backend.pdkLoader import importPDKModule
+
+logger = logging.getLogger("reveda")
+
+verification = importPDKModule("verification")
+# Without a verification package the dialogues refuse to run, see
+# klayoutDRCClick and klayoutLVSClick.
+jobQueue = (importlib.import_module(f"{verification.__name__}.job_queue")
+            if verification is not None else None)
+
+
+class verificationProcess:
+    """
+    KLayout process of a queued DRC or LVS job, see job_queue.py.
+
+    Output is passed to the job's progress estimate and to the ``output``
+    and ``error`` callbacks, ``finished(job)`` is called once the process
+    has ended, the job state then tells if it was cancelled.
+    """
+
+    killDelay = 5000
+
+    def __init__(self, owner: 'verificationJobQueue', job, executable: str,
+                 arguments: list, output=None, error=None, finished=None):
+        self.owner = owner
+        self.job = job
+        self.output = output
+        self.error = error
+        self.finished = finished
+        self.process = QProcess(owner)
+        self.process.readyReadStandardOutput.connect(self._readOutput)
+        self.process.readyReadStandardError.connect(self._readError)
+        self.process.finished.connect(self._processFinished)
+        self.process.errorOccurred.connect(self._processError)
+        self.process.start(executable, arguments)
+
+    def _readOutput(self) -> None:
+        text = self.process.readAllStandardOutput().data().decode(
+            "utf-8", errors="replace")
+        if not text:
+            return
+        self.owner.queue.feed(self.job, text)
+        if self.output is not None:
+            self.output(text)
+
+    def _readError(self) -> None:
+        text = self.process.readAllStandardError().data().decode(
+            "utf-8", errors="replace")
+        if text and self.error is not None:
+            self.error(text)
+
+    def _processFinished(self, exitCode: int, exitStatus) -> None:
+        self._readOutput()
+        self._readError()
+        if exitStatus != QProcess.ExitStatus.NormalExit:
+            exitCode = -1
+        self.owner.queue.finish(self.job, exitCode)
+        if self.finished is not None:
+            self.finished(self.job)
+        self.process.deleteLater()
+
+    def _processError(self, error) -> None:
+        # A process that could not be started never emits finished.
+        if error == QProcess.ProcessError.FailedToStart:
+            self.job.error = self.process.errorString()
+            self._processFinished(-1, QProcess.ExitStatus.CrashExit)
+
+    def cancel(self) -> None:
+        """Ask KLayout to stop, kill it if it is still running after killDelay ms."""
+        if self.process.state() == QProcess.ProcessState.NotRunning:
+            return
+        self.process.terminate()
+        QTimer.singleShot(self.killDelay, self._kill)
+
+    def _kill(self) -> None:
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            logger.warning(f"{self.job.kind.upper()} {self.job.name} did not stop, killing it.")
+            self.process.kill()
+
+
+class verificationJobQueue(QObject):
+    """
+    The DRC and LVS job queue of all editors, see job_queue.JobQueue.
+
+    jobChanged is emitted when a job is queued, started, reaches a new
+    stage or ends, and every progressInterval ms while jobs are running.
+    """
+
+    jobChanged = Signal(object)
+    progressInterval = 1000
+
+    def __init__(self, budget: int = None, parent=None):
+        super().__init__(parent)
+        self.queue = jobQueue.JobQueue(budget, on_change=self._jobChanged)
+        # finished callbacks of jobs that have not been started yet.
+        self._queuedFinished = {}
+        self.progressTimer = QTimer(self)
+        self.progressTimer.setInterval(self.progressInterval)
+        self.progressTimer.timeout.connect(self._updateProgress)
+
+    def _jobChanged(self, job) -> None:
+        if job.done:
+            # A job cancelled in the queue has no process to report it.
+            finished = self._queuedFinished.pop(job.id, None)
+            if finished is not None:
+                finished(job)
+        if self.queue.running():
+            self.progressTimer.start()
+        else:
+            self.progressTimer.stop()
+        self.jobChanged.emit(job)
+
+    def _updateProgress(self) -> None:
+        for job in self.queue.running():
+            self.jobChanged.emit(job)
+
+    def setLimit(self, kind: str, limit) -> None:
+        """Run at most ``limit`` batch jobs of ``kind`` at the same time."""
+        self.queue.set_limit(kind, limit)
+
+    def limit(self, kind: str):
+        """Batch limit of ``kind``, None if there is none."""
+        return self.queue.limits.get(kind)
+
+    def submitProcess(self, kind: str, name: str, executable: str,
+                      arguments: list, priority: str = None,
+                      progress=None, owner=None, output=None, error=None,
+                      finished=None):
+        """
+        Queue a KLayout run, it starts when the budget allows.
+
+        Returns the job, see job_queue.VerificationJob. ``priority``
+        defaults to an interactive job.
+        """
+        priority = priority or jobQueue.INTERACTIVE
+        def launch(job):
+            # The process reports the end from now on.
+            self._queuedFinished.pop(job.id, None)
+            try:
+                return verificationProcess(self, job, executable, arguments,
+                                           output, error, finished)
+            except (OSError, RuntimeError):
+                # The queue fails the job, _jobChanged then calls finished.
+                if finished is not None:
+                    self._queuedFinished[job.id] = finished
+                raise
+
+        job = jobQueue.VerificationJob(kind, name, launch, priority, progress,
+                                       owner)
+        if finished is not None:
+            self._queuedFinished[job.id] = finished
+        logger.info(f"{kind.upper()} {name} queued as {priority} job "
+                    f"({len(self.queue.running())}/{self.queue.budget} running).")
+        return self.queue.submit(job)
+
+    def cancel(self, job) -> None:
+        self.queue.cancel(job)
+
+    def cancelOwner(self, owner, kind: str = None) -> None:
+        self.queue.cancel_owner(owner, kind)
+
+    def ownerJobs(self, owner, kind: str = None) -> list:
+        return self.queue.owner_jobs(owner, kind)
+
+
+class verificationTask(QThread):
+    """
+    Run the preparation of a DRC or LVS run off the GUI thread, e.g. the
+    rewrite of an exported layout.
+
+    ``done`` delivers the return value of ``task()``, ``failed`` the error
+    message if it raised.
+    """
+
+    done = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, task, parent=None):
+        super().__init__(parent)
+        self.task = task
+
+    def run(self):
+        try:
+            result = self.task()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result)
+
+
+def runTask(task, done, failed, parent) -> verificationTask:
+    """Start ``task()`` in a worker thread, ``done(result)`` runs on the GUI thread."""
+    thread = verificationTask(task, parent)
+    thread.done.connect(done)
+    thread.failed.connect(failed)
+    thread.finished.connect(thread.deleteLater)
+    # The parent keeps the thread until it has finished.
+    parent.verificationTask = thread
+    thread.start()
+    return thread
+
+
+_sharedQueue = None
+
+
+def sharedJobQueue() -> verificationJobQueue:
+    """The job queue shared by all open editors."""
+    global _sharedQueue
+    if _sharedQueue is None:
+        _sharedQueue = verificationJobQueue(parent=QApplication.instance())
+    return _sharedQueue
+
+
+def connectRunLimit(edit, kind: str) -> None:
+    """
+    Show the batch limit of ``kind`` in ``edit``, an edited value is set on
+    the shared queue. The limit starts from REVEDA_DRC_RUN_LIMIT or
+    REVEDA_LVS_RUN_LIMIT, see job_queue.default_limits.
+    """
+    jobs = sharedJobQueue()
+    limit = jobs.limit(kind)
+    edit.setText("" if limit is None else str(limit))
+    edit.setToolTip(f"{kind.upper()} batch jobs run at the same time in all "
+                    f"editors, empty for no limit. Interactive runs are "
+                    f"only limited by the job budget.")
+
+    def apply():
+        text = edit.text().strip()
+        try:
+            value = int(text) if text else None
+        except ValueError:
+            logger.error(f"{kind.upper()} run limit {text} is not a number.")
+            return
+        if value != jobs.limit(kind):
+            jobs.setLimit(kind, value)
+
+    edit.editingFinished.connect(apply)
+
+
+def connectJobStatus(dialog, slot) -> None:
+    """Pass the job changes of the shared queue to ``slot`` until ``dialog`` is closed."""
+    jobChanged = sharedJobQueue().jobChanged
+    jobChanged.connect(slot)
+    connected = True
+
+    def disconnect(*args):
+        nonlocal connected
+        if not connected:
+            return
+        connected = False
+        try:
+            jobChanged.disconnect(slot)
+        except (RuntimeError, TypeError):
+            # Already gone with the dialogue.
+            pass
+
+    dialog.finished.connect(disconnect)
+    dialog.destroyed.connect(disconnect)